@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Golden-page regression check for optimized OCR payloads.
+
+Each golden page is a v6 `.rm` file with a reference transcription next to it
+(`page.rm` + `page.md`). Every page is OCR'd twice, once as the full-page PDF
+the pipeline used to send and once as the optimized payload (ink-cropped,
+cheapest of PNG/WebP/PDF by estimated prompt tokens), and both transcriptions
+are scored against the reference. The script fails if the optimized payload
+scores noticeably worse on any page, whether or not processing.ocr.payload is
+enabled yet.
+
+Usage:
+    poetry run python scripts/ocr_payload_regression.py <golden_dir>
+    poetry run python scripts/ocr_payload_regression.py <golden_dir> --tolerance 3 --dpi 120
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.append(os.getcwd())
+
+from rapidfuzz import fuzz
+
+from src.core.rm_scene import parse_scene
+from src.processors.gemini_vision_ocr import GeminiVisionOCREngine
+from src.processors.ocr_payload import OCRPayloadOptimizer
+from src.utils.config import Config
+
+
+def transcribe(engine, payload):
+    result = engine.process_file(str(payload.path))
+    text = '\n\n'.join(r.text for r in result.ocr_results) if result.success else ''
+    return text, result.input_tokens or 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('golden_dir', help='Directory with page.rm + page.md pairs')
+    parser.add_argument('--tolerance', type=float, default=2.0,
+                        help='Allowed similarity drop (0-100 scale) per page (default: 2)')
+    parser.add_argument('--dpi', type=int, help='Raster DPI (overrides processing.ocr.payload.dpi)')
+    args = parser.parse_args()
+
+    config = Config()
+    engine = GeminiVisionOCREngine(config=config)
+    if not engine.is_available():
+        print("❌ Gemini OCR not available (google-genai or API key missing)")
+        return 2
+
+    optimizer = OCRPayloadOptimizer.from_config(config)
+    optimizer.enabled = True
+    if args.dpi:
+        optimizer.dpi = args.dpi
+    baseline = OCRPayloadOptimizer(formats=('pdf',))
+    if not optimizer.is_available():
+        print("❌ rsvg-convert not found - needed to render payloads")
+        return 2
+
+    pages = sorted(p for p in Path(args.golden_dir).glob('*.rm') if p.with_suffix('.md').exists())
+    if not pages:
+        print(f"❌ No golden pages (page.rm + page.md) in {args.golden_dir}")
+        return 2
+
+    print(f"{'Page':<24} {'Full KB':>8} {'Opt KB':>8} {'Fmt':>5} {'Full tok':>9} {'Opt tok':>8} "
+          f"{'Full sim':>9} {'Opt sim':>8}")
+    totals = {'full_bytes': 0, 'opt_bytes': 0, 'full_tokens': 0, 'opt_tokens': 0}
+    regressions = []
+
+    with tempfile.TemporaryDirectory(prefix='ocr_payload_regression_') as tmpdir:
+        for rm_file in pages:
+            scene = parse_scene(rm_file.read_bytes())
+            reference = rm_file.with_suffix('.md').read_text(encoding='utf-8')
+
+            full = baseline.build(scene, Path(tmpdir) / f"{rm_file.stem}_full", crop=scene.bbox)
+            optimized = optimizer.build(scene, Path(tmpdir) / f"{rm_file.stem}_opt")
+            if not full or not optimized:
+                print(f"{rm_file.stem:<24} render failed")
+                regressions.append(rm_file.stem)
+                continue
+
+            full_text, full_tokens = transcribe(engine, full)
+            opt_text, opt_tokens = transcribe(engine, optimized)
+            full_score = fuzz.ratio(full_text, reference)
+            opt_score = fuzz.ratio(opt_text, reference)
+            if opt_score < full_score - args.tolerance:
+                regressions.append(rm_file.stem)
+
+            totals['full_bytes'] += full.size_bytes
+            totals['opt_bytes'] += optimized.size_bytes
+            totals['full_tokens'] += full_tokens
+            totals['opt_tokens'] += opt_tokens
+            print(f"{rm_file.stem:<24} {full.size_bytes / 1024:>8.1f} {optimized.size_bytes / 1024:>8.1f} "
+                  f"{optimized.format:>5} {full_tokens:>9} {opt_tokens:>8} {full_score:>9.1f} {opt_score:>8.1f}")
+
+    print(f"\nPayload: {totals['full_bytes'] / 1024:.1f} KB → {totals['opt_bytes'] / 1024:.1f} KB, "
+          f"prompt tokens: {totals['full_tokens']} → {totals['opt_tokens']}")
+    if regressions:
+        print(f"❌ Transcription quality regressed on: {', '.join(regressions)}")
+        return 1
+    print(f"✅ No page lost more than {args.tolerance} similarity points")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -27,6 +27,7 @@ logger = logging.getLogger(__name__)
 
 from src.utils.config import Config
 from src.utils.api_keys import get_api_key_manager
+from src.utils import metrics, profiling
 from src.core.database import DatabaseManager
 from src.core.events import setup_default_handlers, get_event_bus, EventType
 from src.processors.enhanced_highlight_extractor import (
@@ -38,6 +39,7 @@ from src.processors.notebook_text_extractor import (
     extract_text_from_directory,
     analyze_remarkable_library
 )
+from src.processors.page_pipeline import last_pipeline_stats
 
 
 # Configure logging
@@ -66,8 +68,10 @@ def setup_logging(config: Config):
 @click.group()
 @click.option('--config', '-c', help='Path to configuration file')
 @click.option('--verbose', '-v', is_flag=True, help='Enable verbose logging')
+@click.option('--profile', type=click.Choice(profiling.PROFILE_MODES),
+              help='Profile the command (cprofile: .pstats, wall: flamegraph .folded, alloc: tracemalloc report)')
 @click.pass_context
-def cli(ctx, config: Optional[str], verbose: bool):
+def cli(ctx, config: Optional[str], verbose: bool, profile: Optional[str]):
     """reMarkable Integration CLI - Extract and sync content from reMarkable tablets."""
     
     # Initialize configuration
@@ -81,6 +85,16 @@ def cli(ctx, config: Optional[str], verbose: bool):
     # Setup logging
     setup_logging(ctx.obj['config'])
     
+    # Enable pipeline metrics if configured (never for `metrics` itself, which
+    # would overwrite the snapshot it is about to read)
+    if ctx.invoked_subcommand != 'metrics':
+        metrics.configure(ctx.obj['config'], command=ctx.invoked_subcommand)
+    
+    # Profile the subcommand; the artifact is written when it exits (even via sys.exit)
+    if profile:
+        session = profiling.start_session(ctx.obj['config'], profile, ctx.invoked_subcommand)
+        ctx.call_on_close(session.stop)
+    
     # Validate configuration
     issues = ctx.obj['config'].validate()
     if issues:
@@ -592,6 +606,116 @@ def database_recent_activity(ctx, database: Optional[str], limit: int):
         sys.exit(1)
 
 
+@database.command('duplicate-todos')
+@click.option('--database', help='Database path (overrides config)')
+@click.option('--threshold', default=0.8, type=float, help='Minimum similarity to report (default: 0.8)')
+@click.option('--limit', default=50, help='Number of duplicate pairs to show (default: 50)')
+@click.pass_context
+def database_duplicate_todos(ctx, database: Optional[str], threshold: float, limit: int):
+    """Find near-duplicate todos across pages and notebooks."""
+    
+    config_obj = ctx.obj['config']
+    db_path = database or config_obj.get('database.path')
+    
+    try:
+        from src.processors.intelligent_todo_deduplication import IntelligentTodoDeduplicator
+        
+        db_manager = DatabaseManager(db_path)
+        
+        with db_manager.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT t.id, t.notebook_uuid, t.page_number, t.text, t.confidence,
+                       COALESCE(nm.visible_name, t.notebook_uuid)
+                FROM todos t
+                LEFT JOIN notebook_metadata nm ON nm.notebook_uuid = t.notebook_uuid
+            ''')
+            todos = [
+                {'id': row[0], 'notebook_uuid': row[1], 'page_number': row[2], 'text': row[3],
+                 'confidence': row[4], 'notebook_name': row[5]}
+                for row in cursor.fetchall()
+            ]
+        
+        deduplicator = IntelligentTodoDeduplicator(similarity_threshold=threshold)
+        duplicates = deduplicator.find_cross_page_duplicates(todos)
+        
+        if not duplicates:
+            click.echo(f"✅ No duplicate todos found among {len(todos)} todos")
+            return
+        
+        click.echo(f"🔍 {len(duplicates)} duplicate pairs among {len(todos)} todos:")
+        click.echo()
+        for todo, duplicate, similarity in duplicates[:limit]:
+            click.echo(f"{similarity:.2f}  #{todo['id']} {todo['notebook_name']} p{todo['page_number']}: {todo['text'][:60]}")
+            click.echo(f"      #{duplicate['id']} {duplicate['notebook_name']} p{duplicate['page_number']}: {duplicate['text'][:60]}")
+        if len(duplicates) > limit:
+            click.echo(f"\n... and {len(duplicates) - limit} more (use --limit)")
+        
+    except Exception as e:
+        click.echo(f"Failed to find duplicate todos: {e}", err=True)
+        sys.exit(1)
+
+
+@cli.group('metrics')
+@click.pass_context
+def metrics_group(ctx):
+    """Pipeline metrics commands."""
+    pass
+
+
+@metrics_group.command('dump')
+@click.option('--snapshot', help='Snapshot file (overrides metrics.snapshot_file)')
+@click.option('--format', 'output_format', type=click.Choice(['prometheus', 'json']), default='prometheus',
+              help='Output format (default: prometheus)')
+@click.pass_context
+def metrics_dump(ctx, snapshot: Optional[str], output_format: str):
+    """Print metrics recorded by the last batch run (requires metrics.enabled)."""
+    
+    config_obj = ctx.obj['config']
+    snapshot_file = snapshot or config_obj.get('metrics.snapshot_file', './data/metrics_snapshot.json')
+    
+    data = metrics.load_snapshot(snapshot_file)
+    if data is None:
+        click.echo(f"❌ No metrics snapshot found at {snapshot_file}", err=True)
+        click.echo("Enable metrics (metrics.enabled: true or REMARKABLE_METRICS=1) and run a command first.")
+        sys.exit(1)
+    
+    if output_format == 'json':
+        import json
+        click.echo(json.dumps(data, indent=2))
+    else:
+        click.echo(f"# Snapshot of '{data.get('command')}' at {data.get('generated_at')}")
+        click.echo(metrics.render_prometheus(data), nl=False)
+
+
+@metrics_group.command('ocr-savings')
+@click.option('--log-file', help='Log file to scan (overrides logging.file)')
+@click.option('--days', default=7, show_default=True, help='Number of days to report on')
+@click.pass_context
+def metrics_ocr_savings(ctx, log_file: Optional[str], days: int):
+    """Report OCR calls avoided by ink fingerprints and blank-page detection."""
+    from src.processors.ocr_savings import summarize_ocr_savings
+    
+    config_obj = ctx.obj['config']
+    log_file = log_file or config_obj.get('logging.file')
+    if not log_file or not Path(log_file).exists():
+        click.echo(f"❌ No log file found{f' at {log_file}' if log_file else ''} (set logging.file or pass --log-file)", err=True)
+        sys.exit(1)
+    
+    cost_per_page = config_obj.get('processing.ocr.blank_page_detection.estimated_cost_per_page', 0.003)
+    report = summarize_ocr_savings(log_file, days=days, cost_per_page=cost_per_page)
+    
+    click.echo(f"📊 OCR savings {report['since']} → {report['until']}")
+    click.echo(f"{'Day':<12} {'OCR calls':>10} {'Ink unchanged':>14} {'Blank':>8}")
+    for day, counts in report['days'].items():
+        click.echo(f"{day:<12} {counts['ocr_calls']:>10} {counts['ink_unchanged']:>14} {counts['blank']:>8}")
+    
+    totals = report['totals']
+    click.echo(f"{'Total':<12} {totals['ocr_calls']:>10} {totals['ink_unchanged']:>14} {totals['blank']:>8}")
+    click.echo(f"✅ Avoided {totals['avoided']} OCR calls ({report['avoided_ratio']:.0%} of changed pages), "
+               f"~${report['estimated_cost_saved']:.3f} saved")
+
+
 @cli.group()
 @click.pass_context
 def process(ctx):
@@ -773,6 +897,19 @@ def process_file(ctx, file_path: str, enhanced: bool, show: bool):
         sys.exit(1)
 
 
+def _setup_event_handlers(ctx, db_manager: DatabaseManager):
+    """Persist pipeline events if database.event_persistence.enabled, flushing them when the command exits."""
+    config_obj = ctx.obj['config']
+    if not config_obj.get('database.event_persistence.enabled', False):
+        return None
+    event_bus = setup_default_handlers(
+        db_manager, config=config_obj,
+        log_events=config_obj.get('database.event_persistence.log_events', False)
+    )
+    ctx.call_on_close(event_bus.shutdown)
+    return event_bus
+
+
 def _find_remarkable_sync_directory(config_obj, fallback_dir: str) -> Optional[str]:
     """Find the best reMarkable sync directory for metadata updates."""
     
@@ -838,11 +975,13 @@ def _find_remarkable_sync_directory(config_obj, fallback_dir: str) -> Optional[s
 @click.option('--include-pdf-epub', is_flag=True, help='Include notebooks with PDF/EPUB files in text extraction')
 @click.option('--max-pages', type=int, help='Maximum pages to process per notebook (for testing)')
 @click.option('--skip-metadata-update', is_flag=True, help='Skip automatic metadata update (faster but may use stale data)')
+@click.option('--pipeline/--sequential', default=None,
+              help='Overlap rendering, OCR and storage across notebooks (default: processing.pipeline.enabled)')
 @click.pass_context
 def process_all(ctx, directory: str, output_dir: Optional[str], export_highlights: Optional[str], 
                 export_text: Optional[str], database: Optional[str], language: str, confidence: float, output_format: str,
                 enhanced_highlights: bool, include_pdf_epub: bool, max_pages: Optional[int],
-                skip_metadata_update: bool):
+                skip_metadata_update: bool, pipeline: Optional[bool]):
     """Process directory with both handwritten text extraction AND highlight extraction."""
     
     if not os.path.exists(directory):
@@ -864,6 +1003,7 @@ def process_all(ctx, directory: str, output_dir: Optional[str], export_highlight
         click.echo()
         
         db_manager = DatabaseManager(db_path)
+        _setup_event_handlers(ctx, db_manager)
         
         # Step 0: Auto-update metadata (unless skipped)
         if not skip_metadata_update:
@@ -878,9 +1018,10 @@ def process_all(ctx, directory: str, output_dir: Optional[str], export_highlight
                     
                     # Get data directory from config  
                     data_dir = config_obj.get('remarkable.data_directory', './data')
+                    cover_workers = config_obj.get('remarkable.cover_extraction_workers', 0)
                     
                     with db_manager.get_connection() as conn:
-                        updated_count = update_notebook_metadata(metadata_dir, conn, data_dir)
+                        updated_count = update_notebook_metadata(metadata_dir, conn, data_dir, cover_workers)
                     
                     click.echo(f"✅ Updated {updated_count} notebook metadata records")
                 except Exception as e:
@@ -910,7 +1051,8 @@ def process_all(ctx, directory: str, output_dir: Optional[str], export_highlight
             output_format=output_format,
             include_pdf_epub=include_pdf_epub,
             max_pages=max_pages,
-            exclude_notebooks=exclude_notebooks
+            exclude_notebooks=exclude_notebooks,
+            pipeline=pipeline
         )
         
         click.echo(f"✅ Text extraction completed: {len([r for r in text_results.values() if r.success])} notebooks processed")
@@ -974,6 +1116,12 @@ def process_all(ctx, directory: str, output_dir: Optional[str], export_highlight
         if total_text_regions > 0:
             click.echo(f"   📝 Total text regions extracted: {total_text_regions}")
         
+        pipeline_stats = last_pipeline_stats()
+        if pipeline_stats:
+            click.echo("\n🏭 Pipeline:")
+            for line in pipeline_stats.format_report():
+                click.echo(f"   {line}")
+        
     except Exception as e:
         click.echo(f"Combined processing failed: {e}", err=True)
         logging.exception("Combined processing error")
@@ -1012,9 +1160,10 @@ def update_notebook_paths(ctx, remarkable_dir: Optional[str]):
         
         # Get data directory from config
         data_dir = config_obj.get('remarkable.data_directory', './data')
+        cover_workers = config_obj.get('remarkable.cover_extraction_workers', 0)
         
         with db_manager.get_connection() as conn:
-            updated_count = update_notebook_metadata(remarkable_dir, conn, data_dir)
+            updated_count = update_notebook_metadata(remarkable_dir, conn, data_dir, cover_workers)
         
         click.echo(f"✅ Updated {updated_count} notebook metadata records in database")
         
@@ -1133,6 +1282,7 @@ def watch_directory(ctx, source_directory: Optional[str],
     # Setup database and text extractor
     db_path = config_obj.get('database.path')
     db_manager = DatabaseManager(db_path)
+    _setup_event_handlers(ctx, db_manager)
     
     # Initialize text extractor with database manager for thread safety
     exclude_notebooks = config_obj.get('remarkable.exclude_notebooks', {})
@@ -1150,6 +1300,18 @@ def watch_directory(ctx, source_directory: Optional[str],
         click.echo(f"⚡ Process immediately: {'Yes' if process_immediately else 'No'}")
         click.echo()
         
+        # Expose live metrics while watching
+        if metrics.is_enabled():
+            metrics.start_http_server(
+                config_obj.get('metrics.host', '127.0.0.1'),
+                config_obj.get('metrics.port', 9464)
+            )
+        
+        # Sampling profiler that can be switched on/off without a restart (kill -USR2 <pid>)
+        profile_toggle = profiling.SignalToggledProfiler(config_obj, 'watch')
+        if profile_toggle.install():
+            ctx.call_on_close(profile_toggle.stop)
+        
         # Create watcher
         watcher = ReMarkableWatcher(config_obj)
         watcher.set_text_extractor(text_extractor)
@@ -1179,7 +1341,10 @@ def watch_directory(ctx, source_directory: Optional[str],
                 
                 # Do initial metadata change detection and update once at startup
                 with db_manager.get_connection() as conn:
-                    changed_uuids = detect_metadata_changes(source_dir, conn, source_dir)
+                    changed_uuids = detect_metadata_changes(
+                        source_dir, conn, source_dir,
+                        config_obj.get('remarkable.cover_extraction_workers', 0)
+                    )
                     
                     if changed_uuids:
                         # Update changed metadata in database
@@ -1311,7 +1476,8 @@ def sync_todos(ctx, tasks_database_id: Optional[str], days_back: int, dry_run: b
         todo_sync = NotionTodoSync(
             notion_token=notion_token,
             tasks_database_id=tasks_database_id,
-            db_path=config_obj.get('database.path')
+            db_path=config_obj.get('database.path'),
+            max_workers=config_obj.get('integrations.notion.todo_export_workers', 4)
         )
         
         click.echo(f"🚀 Starting todo sync...")
@@ -1327,6 +1493,9 @@ def sync_todos(ctx, tasks_database_id: Optional[str], days_back: int, dry_run: b
             click.echo(f"✅ Exported {stats['exported']} todos")
             if stats['errors'] > 0:
                 click.echo(f"❌ {stats['errors']} failed to export")
+            if stats.get('requests'):
+                click.echo(f"⚡ {stats['requests']} Notion requests ({stats['requests_per_todo']}/todo), "
+                           f"{stats['todos_per_minute']} todos/min")
         
         # Show export statistics
         export_stats = todo_sync.get_export_stats()
@@ -1737,6 +1906,16 @@ def sync_status(ctx, database: Optional[str]):
             recent = sync_records.get('recent_activity_24h', 0)
             click.echo(f"  Recent activity (24h): {recent}")
         
+        # Retry queue
+        retry_queue = status.get('retry_queue', {})
+        if retry_queue:
+            click.echo("\n🔁 Retry Queue:")
+            click.echo(f"  Pending retries: {retry_queue.get('pending', 0)} ({retry_queue.get('due', 0)} due)")
+            click.echo(f"  Dead-lettered: {retry_queue.get('dead', 0)}")
+            next_in = retry_queue.get('next_attempt_in_s')
+            if next_in is not None:
+                click.echo(f"  Next attempt in: {next_in:.0f}s")
+        
         # Configuration
         config = status.get('config', {})
         if config:
@@ -14,6 +14,7 @@ from typing import Dict, List, Optional, Any, Tuple
 from contextlib import contextmanager
 
 from .database import DatabaseManager
+from .sync_notifier import get_sync_notifier
 
 logger = logging.getLogger(__name__)
 
@@ -23,6 +24,7 @@ class ChangeTracker:
     
     def __init__(self, db_manager: DatabaseManager):
         self.db_manager = db_manager
+        self.notifier = get_sync_notifier(db_manager)
     
     def track_change(self, source_table: str, source_id: str, operation: str,
                     content_before: Optional[str] = None, 
@@ -49,51 +51,50 @@ class ChangeTracker:
         hash_after = self._calculate_content_hash(content_after) if content_after is not None else None
         changed_fields_json = json.dumps(changed_fields) if changed_fields else None
         
-        # 🔒 Use shorter, focused transactions to prevent locks
+        def record(conn):
+            cursor = conn.cursor()
+            
+            # Check for duplicates
+            cursor.execute('''
+                SELECT id FROM sync_changelog 
+                WHERE source_table = ? AND source_id = ? AND operation = ? 
+                AND content_hash_after = ? AND process_status = 'pending'
+                AND changed_at >= datetime('now', '-5 minutes')
+            ''', (source_table, source_id, operation, hash_after))
+            
+            existing_record = cursor.fetchone()
+            if existing_record:
+                return existing_record[0], False
+            
+            # Insert new record
+            cursor.execute('''
+                INSERT INTO sync_changelog (
+                    source_table, source_id, operation, 
+                    changed_fields, content_hash_before, content_hash_after,
+                    trigger_source, process_status
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (
+                source_table, source_id, operation,
+                changed_fields_json, hash_before, hash_after,
+                trigger_source, 'pending'
+            ))
+            return cursor.lastrowid, True
+        
+        # 🔒 The duplicate check and insert run on the database writer, so they
+        # can neither race each other nor be dropped on a locked database
         try:
-            with self.db_manager.get_connection_context() as conn:
-                cursor = conn.cursor()
-                
-                # Check for duplicates
-                cursor.execute('''
-                    SELECT id FROM sync_changelog 
-                    WHERE source_table = ? AND source_id = ? AND operation = ? 
-                    AND content_hash_after = ? AND process_status = 'pending'
-                    AND changed_at >= datetime('now', '-5 minutes')
-                ''', (source_table, source_id, operation, hash_after))
-                
-                existing_record = cursor.fetchone()
-                if existing_record:
-                    logger.debug(f"🔄 Skipping duplicate {operation} for {source_table}:{source_id} (existing #{existing_record[0]})")
-                    return existing_record[0]
-                
-                # Insert new record
-                cursor.execute('''
-                    INSERT INTO sync_changelog (
-                        source_table, source_id, operation, 
-                        changed_fields, content_hash_before, content_hash_after,
-                        trigger_source, process_status
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    source_table, source_id, operation,
-                    changed_fields_json, hash_before, hash_after,
-                    trigger_source, 'pending'
-                ))
-                
-                changelog_id = cursor.lastrowid
-                conn.commit()
-                
-                logger.debug(f"📝 Tracked {operation} for {source_table}:{source_id} (changelog #{changelog_id})")
-                return changelog_id
-                
+            changelog_id, created = self.db_manager.write(record)
         except Exception as e:
-            # Handle database locks gracefully
-            if "database is locked" in str(e).lower():
-                logger.warning(f"⏱️ Database temporarily locked, skipping tracking for {source_table}:{source_id}")
-                return -1  # Indicate skipped
-            else:
-                logger.error(f"Failed to track change for {source_table}:{source_id}: {e}")
-                raise
+            logger.error(f"Failed to track change for {source_table}:{source_id}: {e}")
+            raise
+        
+        if not created:
+            logger.debug(f"🔄 Skipping duplicate {operation} for {source_table}:{source_id} (existing #{changelog_id})")
+            return changelog_id
+        
+        logger.debug(f"📝 Tracked {operation} for {source_table}:{source_id} (changelog #{changelog_id})")
+        self.notifier.notify(f"{source_table}:{source_id}")
+        return changelog_id
     
     def track_notebook_change(self, notebook_uuid: str, operation: str, 
                             notebook_data: Optional[Dict] = None,
@@ -244,17 +245,13 @@ class ChangeTracker:
         status = 'processed' if success else 'failed'
         placeholders = ','.join(['?'] * len(changelog_ids))
         
-        with self.db_manager.get_connection_context() as conn:
-            cursor = conn.cursor()
-            cursor.execute(f'''
-                UPDATE sync_changelog 
-                SET process_status = ?, processed_at = CURRENT_TIMESTAMP
-                WHERE id IN ({placeholders})
-            ''', [status] + changelog_ids)
-            
-            conn.commit()
-            
-            logger.debug(f"📋 Marked {len(changelog_ids)} changes as {status}")
+        self.db_manager.write(lambda conn: conn.execute(f'''
+            UPDATE sync_changelog 
+            SET process_status = ?, processed_at = CURRENT_TIMESTAMP
+            WHERE id IN ({placeholders})
+        ''', [status] + changelog_ids))
+        
+        logger.debug(f"📋 Marked {len(changelog_ids)} changes as {status}")
     
     def get_sync_health_metrics(self) -> Dict[str, Any]:
         """Get metrics about sync health and pending changes."""
@@ -334,36 +331,33 @@ class ChangeTracker:
     
     def _process_batch_changes(self, changes: List[Tuple], trigger_source: str):
         """Process a batch of changes efficiently."""
-        with self.db_manager.get_connection_context() as conn:
-            cursor = conn.cursor()
+        batch_data = []
+        for source_table, source_id, operation, kwargs in changes:
+            # Prepare data for batch insert
+            content_before = kwargs.get('content_before')
+            content_after = kwargs.get('content_after')
+            changed_fields = kwargs.get('changed_fields')
             
-            batch_data = []
-            for source_table, source_id, operation, kwargs in changes:
-                # Prepare data for batch insert
-                content_before = kwargs.get('content_before')
-                content_after = kwargs.get('content_after')
-                changed_fields = kwargs.get('changed_fields')
-                
-                hash_before = self._calculate_content_hash(content_before) if content_before else None
-                hash_after = self._calculate_content_hash(content_after) if content_after else None
-                changed_fields_json = json.dumps(changed_fields) if changed_fields else None
-                
-                batch_data.append((
-                    source_table, source_id, operation,
-                    changed_fields_json, hash_before, hash_after,
-                    trigger_source, 'pending'
-                ))
+            hash_before = self._calculate_content_hash(content_before) if content_before else None
+            hash_after = self._calculate_content_hash(content_after) if content_after else None
+            changed_fields_json = json.dumps(changed_fields) if changed_fields else None
             
-            cursor.executemany('''
-                INSERT INTO sync_changelog (
-                    source_table, source_id, operation,
-                    changed_fields, content_hash_before, content_hash_after,
-                    trigger_source, process_status
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            ''', batch_data)
-            
-            conn.commit()
-            logger.info(f"📦 Batch tracked {len(changes)} changes from {trigger_source}")
+            batch_data.append((
+                source_table, source_id, operation,
+                changed_fields_json, hash_before, hash_after,
+                trigger_source, 'pending'
+            ))
+        
+        self.db_manager.write(lambda conn: conn.executemany('''
+            INSERT INTO sync_changelog (
+                source_table, source_id, operation,
+                changed_fields, content_hash_before, content_hash_after,
+                trigger_source, process_status
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', batch_data))
+        logger.info(f"📦 Batch tracked {len(changes)} changes from {trigger_source}")
+        
+        self.notifier.notify(f"batch:{trigger_source}")
     
     def _calculate_content_hash(self, content: str) -> str:
         """Calculate SHA-256 hash of content."""
@@ -2,19 +2,37 @@
 Database abstraction layer for reMarkable Integration.
 
 Provides a unified interface for database operations and manages connections.
+
+Writes go through one DatabaseWriter per database file: a thread that owns
+the process's only write connection and applies queued commands in batched
+transactions. Reads keep using their own connections, which WAL lets run
+alongside the writer.
 """
 
+import atexit
 import os
+import queue
 import sqlite3
 import shutil
 import logging
+import threading
+import time
+from concurrent.futures import Future
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Callable, Dict, List, Optional, Union
 from contextlib import contextmanager
 
+from ..utils import metrics
+
 logger = logging.getLogger(__name__)
 
+# Commands applied in one writer transaction at most
+WRITER_BATCH_SIZE = 100
+# Retries of a batch that hits "database is locked" (another process writing)
+WRITER_LOCK_RETRIES = 5
+WRITER_LOCK_BACKOFF_SECONDS = 0.1
+
 
 class DatabaseManager:
     """Database manager for the reMarkable integration pipeline."""
@@ -252,6 +270,8 @@ class DatabaseManager:
                 bounding_box TEXT,
                 language TEXT,
                 page_content_hash TEXT,  -- For incremental updates
+                ink_fingerprint TEXT,    -- Normalized stroke geometry, survives file rewrites
+                text_segments TEXT,      -- JSON vertical extents of the page's text blocks (region OCR)
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 UNIQUE(notebook_uuid, page_uuid, text, confidence)
@@ -307,6 +327,8 @@ class DatabaseManager:
         migrations = [
             (1, 'Add page_content_hash to notebook_text_extractions', self._migration_001),
             (2, 'Add updated_at triggers', self._migration_002),
+            (3, 'Add ink_fingerprint to notebook_text_extractions', self._migration_003),
+            (4, 'Add text_segments to notebook_text_extractions', self._migration_004),
         ]
         
         # Apply pending migrations
@@ -362,6 +384,26 @@ class DatabaseManager:
             END
         ''')
     
+    def _migration_003(self, cursor):
+        """Add ink_fingerprint column to notebook_text_extractions if it doesn't exist."""
+        try:
+            cursor.execute('ALTER TABLE notebook_text_extractions ADD COLUMN ink_fingerprint TEXT')
+        except sqlite3.OperationalError as e:
+            if 'duplicate column name' in str(e).lower():
+                logger.debug("ink_fingerprint column already exists")
+            else:
+                raise
+    
+    def _migration_004(self, cursor):
+        """Add text_segments column to notebook_text_extractions if it doesn't exist."""
+        try:
+            cursor.execute('ALTER TABLE notebook_text_extractions ADD COLUMN text_segments TEXT')
+        except sqlite3.OperationalError as e:
+            if 'duplicate column name' in str(e).lower():
+                logger.debug("text_segments column already exists")
+            else:
+                raise
+    
     def get_connection(self) -> sqlite3.Connection:
         """
         Get a database connection.
@@ -380,6 +422,34 @@ class DatabaseManager:
             logger.error(f"Failed to connect to database: {e}")
             raise
     
+    def write(self, command: Callable[[sqlite3.Connection], Any]) -> Any:
+        """
+        Run a write command on the database's writer thread and wait for its commit.
+        
+        Args:
+            command: Called with the write connection; must not commit or roll back
+            
+        Returns:
+            Whatever the command returned
+        """
+        return self.submit_write(command).result()
+    
+    def submit_write(self, command: Callable[[sqlite3.Connection], Any]) -> Future:
+        """Queue a write command without waiting; the future resolves after its commit."""
+        writer = get_database_writer(self.db_path)
+        if not writer.closed:
+            return writer.submit(command)
+        # Writers are closed at interpreter exit; late writes commit on their own connection
+        future: Future = Future()
+        conn = self.get_connection()
+        try:
+            future.set_result(_write_directly(conn, command))
+        except Exception as e:
+            future.set_exception(e)
+        finally:
+            conn.close()
+        return future
+    
     @contextmanager
     def get_connection_context(self):
         """
@@ -640,4 +710,241 @@ class DatabaseManager:
     
     def __repr__(self) -> str:
         """Detailed string representation."""
-        return f"DatabaseManager(db_path={self.db_path}, backup_enabled={self.backup_enabled})"
\ No newline at end of file
+        return f"DatabaseManager(db_path={self.db_path}, backup_enabled={self.backup_enabled})"
+
+
+class _WriterConnection:
+    """The writer's connection as seen by commands: transactions belong to the writer."""
+    
+    def __init__(self, connection: sqlite3.Connection):
+        self._connection = connection
+    
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        return False
+    
+    def commit(self) -> None:
+        pass
+    
+    def rollback(self) -> None:
+        pass
+    
+    def close(self) -> None:
+        pass
+
+
+def _is_locked_error(error: Exception) -> bool:
+    return isinstance(error, sqlite3.OperationalError) and (
+        'locked' in str(error).lower() or 'busy' in str(error).lower())
+
+
+class DatabaseWriter:
+    """
+    Single writer thread for one SQLite database file.
+    
+    Components used to write through their own connections from whatever
+    thread they ran on, and contended for SQLite's write lock; a deferred
+    transaction that read before writing could fail with "database is
+    locked" without waiting. Here every write is a command queued to one
+    thread. The thread takes what is queued (up to batch_size commands),
+    applies it in one BEGIN IMMEDIATE transaction with a savepoint per
+    command, so a failing command only undoes itself, and resolves each
+    command's future after the commit. A batch that still finds the
+    database locked (another process writing) is retried with backoff.
+    """
+    
+    def __init__(self, db_path: Union[str, Path], batch_size: int = WRITER_BATCH_SIZE,
+                 lock_retries: int = WRITER_LOCK_RETRIES):
+        self.db_path = str(db_path)
+        self.batch_size = max(1, batch_size)
+        self.lock_retries = lock_retries
+        self._queue: queue.Queue = queue.Queue()
+        self._closed = False
+        self._stats_lock = threading.Lock()
+        self._stats = {'commands': 0, 'batches': 0, 'failed': 0, 'lock_retries': 0}
+        self._thread = threading.Thread(target=self._run, name=f"db-writer-{Path(self.db_path).name}",
+                                        daemon=True)
+        self._thread.start()
+    
+    def submit(self, command: Callable[[sqlite3.Connection], Any]) -> Future:
+        """Queue a write command; the future resolves after its commit."""
+        future: Future = Future()
+        if threading.current_thread() is self._thread:
+            # Called from inside another command: already in the writer's transaction
+            try:
+                future.set_result(command(self._proxy))
+            except Exception as e:
+                future.set_exception(e)
+            return future
+        if self._closed:
+            raise RuntimeError(f"Database writer for {self.db_path} is closed")
+        self._queue.put((command, future))
+        return future
+    
+    def write(self, command: Callable[[sqlite3.Connection], Any]) -> Any:
+        """Run a write command and wait for its commit."""
+        return self.submit(command).result()
+    
+    @property
+    def closed(self) -> bool:
+        return self._closed
+    
+    def get_stats(self) -> Dict[str, int]:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats['queue_depth'] = self._queue.qsize()
+        return stats
+    
+    def close(self, timeout: float = 10.0) -> None:
+        """Apply what is queued and stop the thread."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join(timeout=timeout)
+    
+    def _count(self, key: str, amount: int = 1) -> None:
+        with self._stats_lock:
+            self._stats[key] += amount
+    
+    def _connect(self) -> sqlite3.Connection:
+        # Autocommit mode: the writer issues BEGIN/COMMIT itself
+        conn = sqlite3.connect(self.db_path, timeout=30.0, isolation_level=None)
+        conn.execute("PRAGMA foreign_keys = ON")
+        conn.execute("PRAGMA busy_timeout = 30000")
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.row_factory = sqlite3.Row
+        return conn
+    
+    def _run(self) -> None:
+        connection = self._connect()
+        self._proxy = _WriterConnection(connection)
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is None:
+                break
+            batch = [item]
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            batch = [(command, future) for command, future in batch if future.set_running_or_notify_cancel()]
+            if batch:
+                self._apply(connection, batch)
+        connection.close()
+    
+    def _apply(self, connection: sqlite3.Connection, batch: List[tuple]) -> None:
+        """Apply a batch in one transaction and resolve its futures."""
+        for attempt in range(self.lock_retries + 1):
+            outcomes = []
+            try:
+                with metrics.stage('db_write'):
+                    connection.execute('BEGIN IMMEDIATE')
+                    for command, _ in batch:
+                        connection.execute('SAVEPOINT command')
+                        try:
+                            outcomes.append((True, command(self._proxy)))
+                        except Exception as e:
+                            if _is_locked_error(e):
+                                raise
+                            connection.execute('ROLLBACK TO command')
+                            outcomes.append((False, e))
+                        connection.execute('RELEASE command')
+                    connection.execute('COMMIT')
+                break
+            except Exception as e:
+                if connection.in_transaction:
+                    connection.execute('ROLLBACK')
+                if _is_locked_error(e) and attempt < self.lock_retries:
+                    self._count('lock_retries')
+                    metrics.inc('db_write_lock_retries')
+                    logger.debug(f"Database locked by another process, retrying {len(batch)} writes: {e}")
+                    time.sleep(WRITER_LOCK_BACKOFF_SECONDS * 2 ** attempt)
+                    continue
+                logger.error(f"Database write batch failed ({len(batch)} commands): {e}")
+                outcomes = [(False, e)] * len(batch)
+                break
+        
+        failed = 0
+        for (_, future), (succeeded, value) in zip(batch, outcomes):
+            if succeeded:
+                future.set_result(value)
+            else:
+                failed += 1
+                future.set_exception(value)
+        self._count('commands', len(batch))
+        self._count('batches')
+        self._count('failed', failed)
+        metrics.inc('db_write_commands_total', len(batch))
+        metrics.inc('db_write_batches_total')
+
+
+_writers: Dict[str, DatabaseWriter] = {}
+_writers_lock = threading.Lock()
+
+
+def get_database_writer(db_path: Union[str, Path]) -> DatabaseWriter:
+    """Get the process-wide writer for a database file, starting it on first use."""
+    key = os.path.realpath(str(db_path))
+    with _writers_lock:
+        writer = _writers.get(key)
+        if writer is None:
+            writer = _writers[key] = DatabaseWriter(key)
+        return writer
+
+
+def database_file(connection: sqlite3.Connection) -> Optional[str]:
+    """File behind a connection's main database, or None for in-memory databases."""
+    try:
+        for _, name, path in connection.execute('PRAGMA database_list').fetchall():
+            if name == 'main':
+                return path or None
+    except sqlite3.Error as e:
+        logger.debug(f"Could not resolve database file: {e}")
+    return None
+
+
+def write_through(connection: sqlite3.Connection, command: Callable[[sqlite3.Connection], Any]) -> Any:
+    """
+    Run a write command for the database behind `connection`.
+    
+    File databases use their writer thread; in-memory databases (which only
+    this connection can see) run the command on the connection and commit, as
+    do writes after the writer was closed at exit.
+    """
+    path = database_file(connection)
+    if path:
+        writer = get_database_writer(path)
+        if not writer.closed:
+            return writer.write(command)
+    return _write_directly(connection, command)
+
+
+def _write_directly(connection: sqlite3.Connection, command: Callable[[sqlite3.Connection], Any]) -> Any:
+    """Run a write command on a connection of the caller's and commit it."""
+    try:
+        result = command(connection)
+        connection.commit()
+        return result
+    except Exception:
+        connection.rollback()
+        raise
+
+
+@atexit.register
+def _close_writers() -> None:
+    with _writers_lock:
+        writers = list(_writers.values())
+    for writer in writers:
+        writer.close()
@@ -3,10 +3,15 @@ Event System for reMarkable Pipeline
 
 This module provides a centralized event system for the pipeline, allowing
 different components to communicate through events. It supports both synchronous
-and asynchronous event handling.
+and asynchronous event handling; slow handlers (like database persistence) can be
+wrapped in a BufferedEventHandler so publishers never wait on them.
 """
 
+import atexit
 import logging
+import queue
+import threading
+import time
 from datetime import datetime
 from enum import Enum
 from typing import Any, Callable, Dict, List, Optional
@@ -86,6 +91,123 @@ class EventHandler:
     def handle(self, event: Event) -> None:
         """Handle an event. Must be implemented by subclasses."""
         raise NotImplementedError("Subclasses must implement handle method")
+    
+    def handle_batch(self, events: List[Event]) -> None:
+        """Handle several events at once. Subclasses may override for bulk I/O."""
+        for event in events:
+            self.handle(event)
+    
+    def close(self) -> None:
+        """Release resources and flush pending work. No-op by default."""
+        pass
+
+
+class BufferedEventHandler(EventHandler):
+    """
+    Wraps a handler so publishers only enqueue events.
+    
+    A background thread drains the bounded queue and passes events to the
+    wrapped handler's handle_batch() once batch_size events are waiting or
+    flush_interval seconds have passed. When the queue is full, publish waits
+    up to enqueue_timeout seconds (counted as delayed) and then drops the
+    event (counted as dropped).
+    """
+    
+    def __init__(self, handler: EventHandler, max_queue_size: int = 10000,
+                 batch_size: int = 200, flush_interval: float = 1.0,
+                 enqueue_timeout: float = 0.05):
+        self.handler = handler
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.enqueue_timeout = enqueue_timeout
+        
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue_size)
+        self._stop = threading.Event()
+        self._stats_lock = threading.Lock()
+        self._stats = {'enqueued': 0, 'handled': 0, 'delayed': 0, 'dropped': 0, 'failed': 0, 'batches': 0}
+        
+        self._worker = threading.Thread(
+            target=self._run, name=f"events-{handler.__class__.__name__}", daemon=True
+        )
+        self._worker.start()
+        atexit.register(self.close)
+    
+    def _count(self, key: str, amount: int = 1) -> None:
+        with self._stats_lock:
+            self._stats[key] += amount
+    
+    def handle(self, event: Event) -> None:
+        """Enqueue an event without blocking on the wrapped handler."""
+        if self._stop.is_set():
+            self._count('dropped')
+            return
+        
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            self._count('delayed')
+            try:
+                self._queue.put(event, timeout=self.enqueue_timeout)
+            except queue.Full:
+                self._count('dropped')
+                logger.debug(f"Event queue full, dropped {event.event_type.value}")
+                return
+        self._count('enqueued')
+    
+    def _run(self) -> None:
+        """Drain the queue in batches until closed."""
+        while not (self._stop.is_set() and self._queue.empty()):
+            batch = []
+            deadline = time.monotonic() + self.flush_interval
+            
+            while len(batch) < self.batch_size:
+                try:
+                    if self._stop.is_set():
+                        # Shutting down: take whatever is already queued without waiting
+                        batch.append(self._queue.get_nowait())
+                        continue
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            
+            if batch:
+                self._deliver(batch)
+    
+    def _deliver(self, batch: List[Event]) -> None:
+        try:
+            self.handler.handle_batch(batch)
+            self._count('handled', len(batch))
+        except Exception as e:
+            self._count('failed', len(batch))
+            logger.error(f"Error in buffered handler {self.handler.__class__.__name__} "
+                         f"({len(batch)} events): {e}")
+        self._count('batches')
+    
+    def get_stats(self) -> Dict[str, int]:
+        """Get counters for enqueued/handled/delayed/dropped/failed events."""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats['queue_depth'] = self._queue.qsize()
+        return stats
+    
+    def close(self, timeout: float = 10.0) -> None:
+        """Stop accepting events and flush what is queued."""
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        self._worker.join(timeout=timeout)
+        
+        stats = self.get_stats()
+        if stats['queue_depth']:
+            logger.warning(f"Buffered handler {self.handler.__class__.__name__} closed with "
+                           f"{stats['queue_depth']} unflushed events")
+        if stats['dropped'] or stats['delayed']:
+            logger.warning(f"Buffered handler {self.handler.__class__.__name__}: "
+                           f"{stats['dropped']} events dropped, {stats['delayed']} delayed by backpressure")
+        self.handler.close()
 
 
 class EventBus:
@@ -173,6 +295,29 @@ class EventBus:
         """Clear event history."""
         self._event_history.clear()
         logger.info("Event history cleared")
+    
+    def get_handler_stats(self) -> Dict[str, Dict[str, int]]:
+        """Get queue statistics for all buffered handlers, keyed by wrapped handler name."""
+        stats = {}
+        for handler in self._unique_handlers():
+            if isinstance(handler, BufferedEventHandler):
+                stats[handler.handler.__class__.__name__] = handler.get_stats()
+        return stats
+    
+    def shutdown(self) -> None:
+        """Close all subscribed handlers, flushing buffered events."""
+        for handler in self._unique_handlers():
+            try:
+                handler.close()
+            except Exception as e:
+                logger.error(f"Error closing handler {handler.__class__.__name__}: {e}")
+    
+    def _unique_handlers(self) -> List[EventHandler]:
+        seen = {}
+        for handlers in self._handlers.values():
+            for handler in handlers:
+                seen[id(handler)] = handler
+        return list(seen.values())
 
 
 class LoggingEventHandler(EventHandler):
@@ -210,41 +355,45 @@ class DatabaseEventHandler(EventHandler):
     def _initialize_table(self) -> None:
         """Create events table if it doesn't exist."""
         try:
-            with self.db_manager.get_connection_context() as conn:
-                cursor = conn.cursor()
-                cursor.execute('''
-                    CREATE TABLE IF NOT EXISTS events (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        event_type TEXT NOT NULL,
-                        data TEXT,
-                        timestamp TEXT NOT NULL,
-                        source TEXT,
-                        correlation_id TEXT,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                    )
-                ''')
-                conn.commit()
+            self.db_manager.write(lambda conn: conn.execute('''
+                CREATE TABLE IF NOT EXISTS events (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    event_type TEXT NOT NULL,
+                    data TEXT,
+                    timestamp TEXT NOT NULL,
+                    source TEXT,
+                    correlation_id TEXT,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            '''))
         except Exception as e:
             logger.error(f"Error creating events table: {e}")
     
+    @staticmethod
+    def _event_row(event: Event) -> tuple:
+        return (
+            event.event_type.value,
+            json.dumps(event.data, default=str) if event.data else None,
+            event.timestamp.isoformat(),
+            event.source,
+            event.correlation_id
+        )
+    
     def handle(self, event: Event) -> None:
         """Store event in database."""
-        try:
-            with self.db_manager.get_connection_context() as conn:
-                cursor = conn.cursor()
-                cursor.execute('''
-                    INSERT INTO events (event_type, data, timestamp, source, correlation_id)
-                    VALUES (?, ?, ?, ?, ?)
-                ''', (
-                    event.event_type.value,
-                    json.dumps(event.data) if event.data else None,
-                    event.timestamp.isoformat(),
-                    event.source,
-                    event.correlation_id
-                ))
-                conn.commit()
-        except Exception as e:
-            logger.error(f"Error storing event in database: {e}")
+        self.handle_batch([event])
+    
+    def handle_batch(self, events: List[Event]) -> None:
+        """Store several events in a single transaction."""
+        if not events:
+            return
+        
+        # Errors propagate: BufferedEventHandler counts them as failed, EventBus.publish logs them
+        rows = [self._event_row(event) for event in events]
+        self.db_manager.write(lambda conn: conn.executemany('''
+            INSERT INTO events (event_type, data, timestamp, source, correlation_id)
+            VALUES (?, ?, ?, ?, ?)
+        ''', rows))
 
 
 class HighlightEventHandler(EventHandler):
@@ -336,6 +485,7 @@ class IntegrationEventHandler(EventHandler):
 
 # Global event bus instance
 _event_bus = None
+_default_handlers_configured = False
 
 
 def get_event_bus() -> EventBus:
@@ -346,18 +496,41 @@ def get_event_bus() -> EventBus:
     return _event_bus
 
 
-def setup_default_handlers(db_manager=None, integration_manager=None) -> EventBus:
-    """Set up default event handlers."""
+def setup_default_handlers(db_manager=None, integration_manager=None, config=None,
+                           log_events: bool = True) -> EventBus:
+    """Set up default event handlers.
+    
+    Database persistence is buffered on a background writer unless
+    database.event_persistence.async is disabled in config. Handlers are
+    only subscribed once; later calls return the configured bus.
+    """
+    global _default_handlers_configured
     event_bus = get_event_bus()
+    if _default_handlers_configured:
+        logger.debug("Default event handlers already configured")
+        return event_bus
+    _default_handlers_configured = True
     
     # Add logging handler
-    logging_handler = LoggingEventHandler()
-    for event_type in EventType:
-        event_bus.subscribe(event_type, logging_handler)
+    if log_events:
+        logging_handler = LoggingEventHandler()
+        for event_type in EventType:
+            event_bus.subscribe(event_type, logging_handler)
     
     # Add database handler if database manager is provided
     if db_manager:
         db_handler = DatabaseEventHandler(db_manager)
+        
+        get = config.get if config else (lambda key, default=None: default)
+        if get('database.event_persistence.async', True):
+            db_handler = BufferedEventHandler(
+                db_handler,
+                max_queue_size=get('database.event_persistence.queue_size', 10000),
+                batch_size=get('database.event_persistence.batch_size', 200),
+                flush_interval=get('database.event_persistence.flush_interval_seconds', 1.0),
+                enqueue_timeout=get('database.event_persistence.enqueue_timeout_seconds', 0.05)
+            )
+        
         for event_type in EventType:
             event_bus.subscribe(event_type, db_handler)
     
@@ -418,8 +591,6 @@ def publish_highlight_event(file_path: str, highlight_count: int, title: str, **
 
 if __name__ == "__main__":
     # Example usage
-    import time
-    
     # Set up event bus with logging
     event_bus = setup_default_handlers()
     
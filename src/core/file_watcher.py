@@ -26,6 +26,7 @@ from watchdog.events import FileSystemEventHandler, FileSystemEvent
 from .events import get_event_bus, EventType, publish_file_event
 from .unified_sync import UnifiedSyncManager
 from ..utils.config import Config
+from ..utils.cancellation import CancellationToken
 
 logger = logging.getLogger(__name__)
 
@@ -281,6 +282,10 @@ class ReMarkableWatcher:
     def __init__(self, config: Config):
         self.config = config
         self._processing_locks = {}  # notebook_uuid -> timestamp to prevent duplicate processing
+        self._active_runs = {}  # notebook_uuid -> (executor future, CancellationToken) of a running extraction
+        self._run_locks = {}  # notebook_uuid -> asyncio.Lock serializing run starts
+        self._rerun_pending = set()  # notebook_uuids with one more run scheduled after the active one
+        self._rerun_tasks = set()  # references to scheduled reruns, so they aren't garbage collected
         
         # Initialize components
         self.source_watcher = SourceWatcher(config)
@@ -327,7 +332,10 @@ class ReMarkableWatcher:
                         access_token=readwise_api_key,
                         db_connection=db_manager.get_connection(),
                         author_name="reMarkable",
-                        default_category="books"
+                        default_category="books",
+                        book_cache_refresh_interval=self.config.get(
+                            'integrations.readwise.book_cache_refresh_seconds', 300
+                        )
                     )
                     self.unified_sync_manager.register_target(readwise_target)
                     logger.info("✅ Readwise sync target registered")
@@ -724,6 +732,11 @@ class ReMarkableWatcher:
             await self.source_watcher.stop()
             # ProcessingWatcher not used in unified approach
             
+            # Extractions still running stop at their next page boundary, without reruns
+            self._rerun_pending.clear()
+            for _, token in list(self._active_runs.values()):
+                token.cancel("watcher stopping")
+            
             self.is_running = False
             logger.info("ReMarkable watching system stopped")
     
@@ -765,7 +778,8 @@ class ReMarkableWatcher:
                     logger.info(f"🔄 Refreshing metadata for {len(changed_uuids)} changed notebooks: {list(changed_uuids)}")
                     notion_target = self.unified_sync_manager.get_target("notion")
                     if notion_target and hasattr(notion_target, 'refresh_metadata_for_notebooks'):
-                        notion_target.refresh_metadata_for_notebooks(changed_uuids)
+                        # Paced Notion calls: keep them off the event loop
+                        await asyncio.to_thread(notion_target.refresh_metadata_for_notebooks, changed_uuids)
                     else:
                         logger.warning("⚠️ Notion target not available or doesn't support metadata refresh")
                 elif self.notion_sync_client:
@@ -803,7 +817,7 @@ class ReMarkableWatcher:
                                 notion_target = self.unified_sync_manager.get_target("notion")
                                 if notion_target and hasattr(notion_target, 'refresh_metadata_for_notebooks'):
                                     logger.info(f"🔄 Refreshing metadata for individual notebook: {result.notebook_name}")
-                                    notion_target.refresh_metadata_for_notebooks({notebook_uuid})
+                                    await asyncio.to_thread(notion_target.refresh_metadata_for_notebooks, {notebook_uuid})
 
                             # Trigger unified sync for all configured integrations (Notion, Readwise, etc.)
                             if self.unified_sync_manager:
@@ -867,7 +881,7 @@ class ReMarkableWatcher:
                                 notion_target = self.unified_sync_manager.get_target("notion")
                                 if notion_target and hasattr(notion_target, 'refresh_metadata_for_notebooks'):
                                     logger.info(f"🔄 Refreshing metadata for immediate notebook change: {result.notebook_name}")
-                                    notion_target.refresh_metadata_for_notebooks({file_uuid})
+                                    await asyncio.to_thread(notion_target.refresh_metadata_for_notebooks, {file_uuid})
 
                                 # Also sync content (including backlog pages) for this notebook
                                 logger.info(f"🔄 Syncing content for immediate notebook change: {result.notebook_name}")
@@ -1247,56 +1261,94 @@ class ReMarkableWatcher:
         except Exception:
             return 0
 
-    async def _process_notebook_async(self, notebook_uuid: str):
-        """Process notebook asynchronously (wrapper for sync text extractor)."""
-        # Check for recent processing to avoid duplicates
+    async def _process_notebook_async(self, notebook_uuid: str, rerun: bool = False):
+        """Process notebook asynchronously (wrapper for sync text extractor).
+
+        Args:
+            notebook_uuid: Notebook to process
+            rerun: This is the run scheduled for events that arrived during the previous one
+        """
         import time
-        current_time = time.time()
-
-        logger.info(f"🔍 Processing check for {notebook_uuid}: locks={list(self._processing_locks.keys())}")
-
-        if notebook_uuid in self._processing_locks:
-            last_processed = self._processing_locks[notebook_uuid]
-            time_since = current_time - last_processed
-            logger.info(f"🔍 Last processed {time_since:.1f}s ago")
-            if time_since < 5.0:  # 5 second cooldown
-                logger.info(f"⏭️ Skipping duplicate processing for {notebook_uuid} (processed {time_since:.1f}s ago)")
-                return NotebookProcessingResult(
-                    success=False,
-                    error_message="Skipped duplicate processing",
-                    notebook_name="Unknown",
-                    notebook_uuid=notebook_uuid,
-                    processed_page_numbers=set(),
-                    todos=[],
-                    processing_time_ms=0
-                )
 
-        # Mark as being processed
-        logger.info(f"🔍 Marking {notebook_uuid} as processing at {current_time}")
-        self._processing_locks[notebook_uuid] = current_time
-
-        # Run the synchronous text extraction in a thread pool with a timeout sized
-        # to the notebook. A flat 60s could not cover first-time OCR of a multi-page
-        # notebook (every page processed from scratch), so the whole notebook would be
-        # abandoned. Scale the budget by declared page count; each individual OCR call
-        # is separately bounded by the engine's per-request timeout.
-        loop = asyncio.get_event_loop()
-        num_pages = max(self._count_declared_pages(notebook_uuid), 1)
-        base_s = self.config.get('processing.ocr.notebook_timeout_base_seconds', 120)
-        per_page_s = self.config.get('processing.ocr.notebook_timeout_per_page_seconds', 150)
-        notebook_timeout = base_s + per_page_s * num_pages
+        # Events for one notebook arrive as concurrent tasks. The cooldown check, the
+        # check for an active run and the start of this one happen under a per-notebook
+        # lock, so events queued behind a run see it (or its cooldown) when they wake up
+        run_lock = self._run_locks.setdefault(notebook_uuid, asyncio.Lock())
+        async with run_lock:
+            if rerun:
+                self._rerun_pending.discard(notebook_uuid)
+            elif notebook_uuid in self._rerun_pending:
+                logger.info(f"⏭️ Run after the active one already scheduled for {notebook_uuid}")
+                return self._skipped_result(notebook_uuid, "Rerun already scheduled")
+
+            # Check for recent processing to avoid duplicates
+            current_time = time.time()
+
+            logger.info(f"🔍 Processing check for {notebook_uuid}: locks={list(self._processing_locks.keys())}")
+
+            # (A scheduled rerun goes ahead even right after the run it follows)
+            if not rerun and notebook_uuid in self._processing_locks:
+                last_processed = self._processing_locks[notebook_uuid]
+                time_since = current_time - last_processed
+                logger.info(f"🔍 Last processed {time_since:.1f}s ago")
+                if time_since < 5.0:  # 5 second cooldown
+                    logger.info(f"⏭️ Skipping duplicate processing for {notebook_uuid} (processed {time_since:.1f}s ago)")
+                    return NotebookProcessingResult(
+                        success=False,
+                        error_message="Skipped duplicate processing",
+                        notebook_name="Unknown",
+                        notebook_uuid=notebook_uuid,
+                        processed_page_numbers=set(),
+                        todos=[],
+                        processing_time_ms=0
+                    )
+
+            # A previous run (still inside its timeout, or cancelled and finishing its
+            # current page) may already have looked at the pages this event changed.
+            # Instead of OCRing the same pages concurrently, run once more after it
+            previous = self._active_runs.get(notebook_uuid)
+            if previous and not previous[0].done():
+                logger.info(f"⏳ {notebook_uuid} is being processed - running it again when that run finishes")
+                self._rerun_pending.add(notebook_uuid)
+                previous[0].add_done_callback(lambda _: self._start_rerun(notebook_uuid))
+                return self._skipped_result(notebook_uuid, "Rerun scheduled after the active run")
+
+            # Mark as being processed
+            current_time = time.time()
+            logger.info(f"🔍 Marking {notebook_uuid} as processing at {current_time}")
+            self._processing_locks[notebook_uuid] = current_time
+
+            # Run the synchronous text extraction in a thread pool with a timeout sized
+            # to the notebook. A flat 60s could not cover first-time OCR of a multi-page
+            # notebook (every page processed from scratch), so the whole notebook would be
+            # abandoned. Scale the budget by declared page count; each individual OCR call
+            # is separately bounded by the engine's per-request timeout. On timeout the
+            # run is cancelled cooperatively: it stops at the next page boundary and
+            # stores the pages it finished, freeing its executor thread.
+            loop = asyncio.get_event_loop()
+            num_pages = max(self._count_declared_pages(notebook_uuid), 1)
+            base_s = self.config.get('processing.ocr.notebook_timeout_base_seconds', 120)
+            per_page_s = self.config.get('processing.ocr.notebook_timeout_per_page_seconds', 150)
+            notebook_timeout = base_s + per_page_s * num_pages
+            cancel_token = CancellationToken()
+            run = loop.run_in_executor(None, self._process_notebook_sync, notebook_uuid, cancel_token)
+            active_run = (run, cancel_token)
+            self._active_runs[notebook_uuid] = active_run
+
+            def forget_run(_):
+                if self._active_runs.get(notebook_uuid) is active_run:
+                    del self._active_runs[notebook_uuid]
+                if cancel_token.cancelled:
+                    logger.info(f"⏹️ Cancelled run of {notebook_uuid} has stopped")
+
+            run.add_done_callback(forget_run)
         try:
-            result = await asyncio.wait_for(
-                loop.run_in_executor(
-                    None,
-                    self._process_notebook_sync,
-                    notebook_uuid
-                ),
-                timeout=notebook_timeout
-            )
+            # Shielded so the timeout doesn't detach the future from the still-running thread
+            result = await asyncio.wait_for(asyncio.shield(run), timeout=notebook_timeout)
         except asyncio.TimeoutError:
+            cancel_token.cancel(f"timeout after {notebook_timeout:.0f}s")
             logger.error(f"⏰ Processing timeout ({notebook_timeout:.0f}s for ~{num_pages} pages) "
-                         f"for {notebook_uuid} - skipping")
+                         f"for {notebook_uuid} - stopping after the current page")
             return NotebookProcessingResult(
                 success=False,
                 error_message=f"Processing timeout after {notebook_timeout:.0f} seconds",
@@ -1335,10 +1387,30 @@ class ReMarkableWatcher:
         
         return result
     
-    def _process_notebook_sync(self, notebook_uuid: str):
+    def _start_rerun(self, notebook_uuid: str) -> None:
+        """Start the run scheduled for events that arrived while a run was active."""
+        if notebook_uuid not in self._rerun_pending:
+            return  # Watcher stopped
+        task = asyncio.ensure_future(self._process_notebook_async(notebook_uuid, rerun=True))
+        self._rerun_tasks.add(task)
+        task.add_done_callback(self._rerun_tasks.discard)
+
+    @staticmethod
+    def _skipped_result(notebook_uuid: str, reason: str) -> NotebookProcessingResult:
+        return NotebookProcessingResult(
+            success=False,
+            error_message=reason,
+            notebook_name="Unknown",
+            notebook_uuid=notebook_uuid,
+            processed_page_numbers=set(),
+            todos=[],
+            processing_time_ms=0
+        )
+
+    def _process_notebook_sync(self, notebook_uuid: str, cancel_token: Optional[CancellationToken] = None):
         """Synchronous notebook processing."""
         if self.text_extractor:
-            return self.text_extractor.process_notebook_incremental(notebook_uuid)
+            return self.text_extractor.process_notebook_incremental(notebook_uuid, cancel_token=cancel_token)
         return None
 
     async def _sync_notebook_todos_async(self, notebook_uuid: str, notebook_name: str):
@@ -4,12 +4,15 @@ Handles building and storing folder hierarchy from .metadata files.
 """
 
 import json
+import hashlib
 import logging
+import struct
 import zipfile
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, Optional, List
-from dataclasses import dataclass
+from typing import Dict, Iterable, Optional, List, Tuple
+from dataclasses import dataclass, asdict
 import sqlite3
 from xml.etree import ElementTree as ET
 from .sync_hooks import track_notebook_operation
@@ -37,16 +40,349 @@ class RemarkableItem:
     version: Optional[int] = None
     path: Optional[str] = None
 
+# (mtime_ns, size) pairs of the .metadata, .content and .epub files; None parts mean "missing"
+FileSignature = Tuple[Optional[int], Optional[int], Optional[int], Optional[int], Optional[int], Optional[int]]
+
+@dataclass
+class EpubCover:
+    """Cover extracted from an EPUB, keyed by the EPUB's content hash."""
+    epub_hash: str
+    cover_path: Optional[str] = None
+    width: Optional[int] = None
+    height: Optional[int] = None
+
+def _hash_file(file_path: Path, chunk_size: int = 1024 * 1024) -> str:
+    """Calculate SHA-256 of a file without loading it into memory."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _read_image_dimensions(image_path: str) -> Tuple[Optional[int], Optional[int]]:
+    """Read (width, height) from a PNG, GIF or JPEG header without decoding the image."""
+    try:
+        with open(image_path, 'rb') as f:
+            data = f.read()
+
+        if data.startswith(b'\x89PNG\r\n\x1a\n') and len(data) >= 24:
+            return struct.unpack('>II', data[16:24])
+
+        if data[:6] in (b'GIF87a', b'GIF89a') and len(data) >= 10:
+            return struct.unpack('<HH', data[6:10])
+
+        if data.startswith(b'\xff\xd8'):
+            # Walk JPEG segments until a start-of-frame marker (SOF0-SOF15, excluding DHT/JPG/DAC)
+            offset = 2
+            while offset + 9 < len(data):
+                if data[offset] != 0xFF:
+                    offset += 1
+                    continue
+                marker = data[offset + 1]
+                if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7:
+                    offset += 2
+                    continue
+                segment_length = struct.unpack('>H', data[offset + 2:offset + 4])[0]
+                if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+                    height, width = struct.unpack('>HH', data[offset + 5:offset + 9])
+                    return width, height
+                offset += 2 + segment_length
+
+    except Exception as e:
+        logger.debug(f"Could not read image dimensions for {image_path}: {e}")
+
+    return None, None
+
+class MetadataCatalog:
+    """
+    Persistent catalog of parsed reMarkable items keyed by UUID.
+
+    Each entry stores the (mtime, size) of the item's .metadata, .content and
+    .epub files together with the parsed RemarkableItem, so scans only re-parse
+    items whose source files actually changed. For EPUBs it also records the
+    EPUB content hash and the extracted cover's dimensions.
+    """
+
+    _SELECT_COLUMNS = '''
+        notebook_uuid, metadata_mtime_ns, metadata_size,
+        content_mtime_ns, content_size, epub_mtime_ns, epub_size, item_data
+    '''
+
+    def __init__(self, db_connection):
+        self.db_connection = db_connection
+        self._create_table()
+
+    def _create_table(self) -> None:
+        """Create the metadata_catalog table if it doesn't exist."""
+        try:
+            with self.db_connection:
+                cursor = self.db_connection.cursor()
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS metadata_catalog (
+                        notebook_uuid TEXT PRIMARY KEY,
+                        metadata_mtime_ns INTEGER,
+                        metadata_size INTEGER,
+                        content_mtime_ns INTEGER,
+                        content_size INTEGER,
+                        epub_mtime_ns INTEGER,
+                        epub_size INTEGER,
+                        epub_hash TEXT,
+                        cover_width INTEGER,
+                        cover_height INTEGER,
+                        item_data TEXT NOT NULL,
+                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    )
+                ''')
+
+                # Add new columns to existing catalogs if they don't exist
+                new_columns = [
+                    ('epub_mtime_ns', 'INTEGER'),
+                    ('epub_size', 'INTEGER'),
+                    ('epub_hash', 'TEXT'),
+                    ('cover_width', 'INTEGER'),
+                    ('cover_height', 'INTEGER')
+                ]
+
+                for column_name, column_def in new_columns:
+                    try:
+                        cursor.execute(f'ALTER TABLE metadata_catalog ADD COLUMN {column_name} {column_def}')
+                    except sqlite3.OperationalError:
+                        # Column already exists, ignore
+                        pass
+
+                cursor.execute('''
+                    CREATE INDEX IF NOT EXISTS idx_metadata_catalog_epub_hash
+                    ON metadata_catalog(epub_hash)
+                ''')
+        except Exception as e:
+            logger.error(f"Error creating metadata_catalog table: {e}")
+
+    @staticmethod
+    def _row_to_entry(row) -> Tuple[FileSignature, Dict]:
+        signature = tuple(row[1:7])
+        return signature, json.loads(row[7])
+
+    def get(self, uuid: str) -> Optional[Tuple[FileSignature, Dict]]:
+        """Get the cached (signature, item data) for a single UUID."""
+        try:
+            cursor = self.db_connection.execute(
+                f'SELECT {self._SELECT_COLUMNS} FROM metadata_catalog WHERE notebook_uuid = ?',
+                (uuid,)
+            )
+            row = cursor.fetchone()
+            return self._row_to_entry(row) if row else None
+        except Exception as e:
+            logger.debug(f"Could not read catalog entry for {uuid}: {e}")
+            return None
+
+    def load_all(self) -> Dict[str, Tuple[FileSignature, Dict]]:
+        """Load every catalog entry in one query."""
+        try:
+            cursor = self.db_connection.execute(f'SELECT {self._SELECT_COLUMNS} FROM metadata_catalog')
+            return {row[0]: self._row_to_entry(row) for row in cursor.fetchall()}
+        except Exception as e:
+            logger.warning(f"Could not load metadata catalog: {e}")
+            return {}
+
+    def get_cover(self, uuid: str) -> Optional[Tuple[Tuple[Optional[int], Optional[int]], EpubCover]]:
+        """Get ((epub_mtime_ns, epub_size), cover) recorded for an EPUB."""
+        try:
+            cursor = self.db_connection.execute('''
+                SELECT epub_mtime_ns, epub_size, epub_hash, cover_width, cover_height, item_data
+                FROM metadata_catalog WHERE notebook_uuid = ? AND epub_hash IS NOT NULL
+            ''', (uuid,))
+            row = cursor.fetchone()
+            if not row:
+                return None
+            cover_path = json.loads(row[5]).get('cover_image_path')
+            return (row[0], row[1]), EpubCover(row[2], cover_path, row[3], row[4])
+        except Exception as e:
+            logger.debug(f"Could not read cached cover for {uuid}: {e}")
+            return None
+
+    def load_covers_by_hash(self) -> Dict[str, EpubCover]:
+        """Load every known EPUB cover keyed by EPUB content hash."""
+        covers = {}
+        try:
+            cursor = self.db_connection.execute('''
+                SELECT epub_hash, cover_width, cover_height, item_data
+                FROM metadata_catalog WHERE epub_hash IS NOT NULL
+            ''')
+            for epub_hash, width, height, item_data in cursor.fetchall():
+                cover_path = json.loads(item_data).get('cover_image_path')
+                if cover_path:
+                    covers[epub_hash] = EpubCover(epub_hash, cover_path, width, height)
+        except Exception as e:
+            logger.debug(f"Could not load cover cache: {e}")
+        return covers
+
+    def upsert_many(self, entries: List[Tuple[str, FileSignature, RemarkableItem]],
+                    covers: Optional[Dict[str, EpubCover]] = None) -> None:
+        """Store freshly parsed items with their file signatures in one transaction."""
+        if not entries:
+            return
+
+        covers = covers or {}
+        rows = []
+        for uuid, signature, item in entries:
+            item_data = asdict(item)
+            item_data.pop('path', None)  # Paths depend on ancestors, never cache them
+            cover = covers.get(uuid)
+            rows.append((
+                uuid, *signature, json.dumps(item_data),
+                cover.epub_hash if cover else None,
+                cover.width if cover else None,
+                cover.height if cover else None
+            ))
+
+        try:
+            with self.db_connection:
+                self.db_connection.executemany('''
+                    INSERT OR REPLACE INTO metadata_catalog
+                    (notebook_uuid, metadata_mtime_ns, metadata_size,
+                     content_mtime_ns, content_size, epub_mtime_ns, epub_size,
+                     item_data, epub_hash, cover_width, cover_height, updated_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+                ''', rows)
+        except Exception as e:
+            logger.warning(f"Could not update metadata catalog: {e}")
+
+    def prune(self, present_uuids: Iterable[str]) -> int:
+        """Remove entries for items whose .metadata file no longer exists."""
+        present = set(present_uuids)
+        try:
+            cursor = self.db_connection.execute('SELECT notebook_uuid FROM metadata_catalog')
+            stale = [(row[0],) for row in cursor.fetchall() if row[0] not in present]
+            if stale:
+                with self.db_connection:
+                    self.db_connection.executemany(
+                        'DELETE FROM metadata_catalog WHERE notebook_uuid = ?', stale
+                    )
+            return len(stale)
+        except Exception as e:
+            logger.warning(f"Could not prune metadata catalog: {e}")
+            return 0
+
 class NotebookPathManager:
     """Manages reMarkable notebook folder paths and database integration."""
-    
-    def __init__(self, remarkable_dir: str, db_connection=None, data_dir: str = None):
+
+    def __init__(self, remarkable_dir: str, db_connection=None, data_dir: str = None,
+                 cover_workers: int = 0):
+        """
+        Args:
+            remarkable_dir: reMarkable directory containing .metadata/.content files
+            db_connection: Optional database connection (enables the metadata catalog)
+            data_dir: Application data directory; covers are stored in data_dir/covers
+            cover_workers: Extract covers of changed EPUBs in a thread pool of this
+                size (0 extracts inline during the scan)
+        """
         self.remarkable_dir = Path(remarkable_dir)
         self.db_connection = db_connection
         self.data_dir = Path(data_dir) if data_dir else Path('/data')
         self.items: Dict[str, RemarkableItem] = {}
         self.paths_cache: Dict[str, str] = {}
-    
+        self.catalog = MetadataCatalog(db_connection) if db_connection else None
+        self.cover_workers = cover_workers
+        self.epub_covers: Dict[str, EpubCover] = {}
+        self._pending_covers: List[str] = []
+        self._covers_by_hash: Optional[Dict[str, EpubCover]] = None
+
+    def _get_file_signature(self, uuid: str) -> FileSignature:
+        """Get (mtime_ns, size) of the item's .metadata, .content and .epub files."""
+        signature = []
+        for suffix in ('.metadata', '.content', '.epub'):
+            try:
+                stat = (self.remarkable_dir / f"{uuid}{suffix}").stat()
+                signature.extend([stat.st_mtime_ns, stat.st_size])
+            except OSError:
+                signature.extend([None, None])
+        return tuple(signature)
+
+    def _is_cached_item_usable(self, item_data: Dict) -> bool:
+        """Check that derived artifacts referenced by a cached item still exist."""
+        cover_path = item_data.get('cover_image_path')
+        return not cover_path or Path(cover_path).exists()
+
+    def _get_covers_by_hash(self) -> Dict[str, EpubCover]:
+        """Lazily load known covers keyed by EPUB hash (must be called on the owning thread)."""
+        if self._covers_by_hash is None:
+            self._covers_by_hash = self.catalog.load_covers_by_hash() if self.catalog else {}
+        return self._covers_by_hash
+
+    def _get_epub_cover(self, uuid: str) -> Optional[str]:
+        """
+        Get the cover for an EPUB, extracting it only when the EPUB file changed.
+
+        With cover_workers > 0, extraction is deferred to _resolve_pending_covers()
+        and None is returned for now.
+        """
+        epub_file = self.remarkable_dir / f"{uuid}.epub"
+        try:
+            stat = epub_file.stat()
+        except OSError:
+            logger.debug(f"EPUB file not found for {uuid}")
+            return None
+
+        cached = self.catalog.get_cover(uuid) if self.catalog else None
+        if cached:
+            epub_signature, cover = cached
+            if (tuple(epub_signature) == (stat.st_mtime_ns, stat.st_size)
+                    and (not cover.cover_path or Path(cover.cover_path).exists())):
+                self.epub_covers[uuid] = cover
+                return cover.cover_path
+
+        if self.cover_workers > 0:
+            self._pending_covers.append(uuid)
+            return None
+
+        self._get_covers_by_hash()
+        cover = self._load_or_extract_cover(uuid)
+        if cover:
+            self.epub_covers[uuid] = cover
+            return cover.cover_path
+        return None
+
+    def _load_or_extract_cover(self, uuid: str) -> Optional[EpubCover]:
+        """Hash the EPUB and reuse a cover already extracted for that content, else extract it.
+
+        Touches only the filesystem, so it is safe to run in a worker thread.
+        """
+        epub_file = self.remarkable_dir / f"{uuid}.epub"
+        try:
+            epub_hash = _hash_file(epub_file)
+        except OSError as e:
+            logger.debug(f"Could not hash EPUB for {uuid}: {e}")
+            return None
+
+        known = (self._covers_by_hash or {}).get(epub_hash)
+        if known and known.cover_path and Path(known.cover_path).exists():
+            logger.debug(f"Reusing cached cover for {uuid} (EPUB content unchanged)")
+            return EpubCover(epub_hash, known.cover_path, known.width, known.height)
+
+        cover_path = self._extract_epub_cover(uuid)
+        width, height = _read_image_dimensions(cover_path) if cover_path else (None, None)
+        return EpubCover(epub_hash, cover_path, width, height)
+
+    def _resolve_pending_covers(self) -> None:
+        """Extract covers deferred by _get_epub_cover() using the cover thread pool."""
+        if not self._pending_covers:
+            return
+
+        pending = list(dict.fromkeys(self._pending_covers))
+        self._pending_covers.clear()
+        self._get_covers_by_hash()
+
+        logger.info(f"🖼️ Extracting covers for {len(pending)} changed EPUBs ({self.cover_workers} workers)")
+        with ThreadPoolExecutor(max_workers=self.cover_workers) as executor:
+            results = list(executor.map(self._load_or_extract_cover, pending))
+
+        for uuid, cover in zip(pending, results):
+            if not cover:
+                continue
+            self.epub_covers[uuid] = cover
+            if uuid in self.items:
+                self.items[uuid].cover_image_path = cover.cover_path
+
     def _get_document_metadata(self, uuid: str) -> tuple[str, Optional[str], Optional[str], Optional[str], Optional[str]]:
         """
         Extract document type and metadata by reading .content file.
@@ -84,7 +420,7 @@ class NotebookPathManager:
             elif file_type == 'epub':
                 # Extract EPUB metadata and cover from documentMetadata block
                 authors, publisher, pub_date = self._extract_document_metadata(content_data)
-                cover_path = self._extract_epub_cover(uuid)
+                cover_path = self._get_epub_cover(uuid)
                 return 'epub', authors, publisher, pub_date, cover_path
             else:
                 logger.debug(f"Unknown fileType '{file_type}' for {uuid}")
@@ -274,69 +610,151 @@ class NotebookPathManager:
             logger.debug(f"Error finding largest image: {e}")
             return None
 
+    def _parse_item(self, uuid: str, metadata_file: Path) -> Optional[RemarkableItem]:
+        """Parse a single item from its .metadata and .content files."""
+        try:
+            with open(metadata_file, 'r') as f:
+                metadata = json.load(f)
+
+            # Extract document type and metadata
+            document_type, authors, publisher, publication_date, cover_image_path = self._get_document_metadata(uuid)
+
+            item = RemarkableItem(
+                uuid=uuid,
+                visible_name=metadata.get('visibleName', 'Unknown'),
+                parent=metadata.get('parent', ''),  # Empty string means root
+                item_type=metadata.get('type', 'Unknown'),
+                document_type=document_type,
+                authors=authors,
+                publisher=publisher,
+                publication_date=publication_date,
+                cover_image_path=cover_image_path,
+                last_modified=metadata.get('lastModified'),
+                last_opened=metadata.get('lastOpened'),
+                last_opened_page=metadata.get('lastOpenedPage'),
+                deleted=metadata.get('deleted', False),
+                pinned=metadata.get('pinned', False),
+                synced=metadata.get('synced', False),
+                version=metadata.get('version')
+            )
+
+            # Convert empty parent to None for root items
+            if item.parent == '':
+                item.parent = None
+
+            metadata_info = f"Type: {document_type}"
+            if authors:
+                metadata_info += f", Author: {authors}"
+            if publisher:
+                metadata_info += f", Publisher: {publisher}"
+            if publication_date:
+                metadata_info += f", Date: {publication_date}"
+
+            logger.debug(f"Loaded: {item.visible_name} (UUID: {uuid[:8]}..., {metadata_info}, Parent: {item.parent[:8] if item.parent else 'ROOT'})")
+            return item
+
+        except Exception as e:
+            logger.warning(f"Error reading {metadata_file}: {e}")
+            return None
+
+    def _load_item(self, uuid: str, metadata_file: Path, cached_entry,
+                   catalog_updates: List[Tuple[str, FileSignature, RemarkableItem]]) -> Tuple[Optional[RemarkableItem], bool]:
+        """
+        Load an item from the catalog if its files are unchanged, otherwise re-parse it.
+
+        Returns:
+            Tuple of (item, reparsed) - reparsed is True if the source files were read
+        """
+        signature = self._get_file_signature(uuid)
+
+        if cached_entry:
+            cached_signature, item_data = cached_entry
+            if tuple(cached_signature) == signature and self._is_cached_item_usable(item_data):
+                try:
+                    return RemarkableItem(**item_data), False
+                except TypeError as e:
+                    logger.debug(f"Discarding incompatible catalog entry for {uuid}: {e}")
+
+        item = self._parse_item(uuid, metadata_file)
+        if item and self.catalog:
+            catalog_updates.append((uuid, signature, item))
+        return item, True
+
     def scan_metadata_files(self) -> None:
-        """Scan all .metadata files in the reMarkable directory and determine document types."""
+        """Scan all .metadata files in the reMarkable directory and determine document types.
+
+        Items whose .metadata/.content/.epub files are unchanged since the last scan
+        are loaded from the metadata catalog instead of being re-parsed.
+        """
         logger.info(f"Scanning metadata files in: {self.remarkable_dir}")
-        
+
         metadata_files = list(self.remarkable_dir.glob("*.metadata"))
         logger.info(f"Found {len(metadata_files)} metadata files")
-        
+
+        cached_entries = self.catalog.load_all() if self.catalog else {}
+        catalog_updates = []
+        reparsed_count = 0
+
         for metadata_file in metadata_files:
-            try:
-                uuid = metadata_file.stem
-                with open(metadata_file, 'r') as f:
-                    metadata = json.load(f)
-                
-                # Extract document type and metadata
-                document_type, authors, publisher, publication_date, cover_image_path = self._get_document_metadata(uuid)
-                
-                item = RemarkableItem(
-                    uuid=uuid,
-                    visible_name=metadata.get('visibleName', 'Unknown'),
-                    parent=metadata.get('parent', ''),  # Empty string means root
-                    item_type=metadata.get('type', 'Unknown'),
-                    document_type=document_type,
-                    authors=authors,
-                    publisher=publisher,
-                    publication_date=publication_date,
-                    cover_image_path=cover_image_path,
-                    last_modified=metadata.get('lastModified'),
-                    last_opened=metadata.get('lastOpened'),
-                    last_opened_page=metadata.get('lastOpenedPage'),
-                    deleted=metadata.get('deleted', False),
-                    pinned=metadata.get('pinned', False),
-                    synced=metadata.get('synced', False),
-                    version=metadata.get('version')
-                )
-                
-                # Convert empty parent to None for root items
-                if item.parent == '':
-                    item.parent = None
-                    
+            uuid = metadata_file.stem
+            item, reparsed = self._load_item(uuid, metadata_file, cached_entries.get(uuid), catalog_updates)
+            reparsed_count += int(reparsed)
+            if item:
                 self.items[uuid] = item
-                
-                metadata_info = f"Type: {document_type}"
-                if authors:
-                    metadata_info += f", Author: {authors}"
-                if publisher:
-                    metadata_info += f", Publisher: {publisher}"
-                if publication_date:
-                    metadata_info += f", Date: {publication_date}"
-                
-                logger.debug(f"Loaded: {item.visible_name} (UUID: {uuid[:8]}..., {metadata_info}, Parent: {item.parent[:8] if item.parent else 'ROOT'})")
-                
-            except Exception as e:
-                logger.warning(f"Error reading {metadata_file}: {e}")
-        
+
+        self._resolve_pending_covers()
+
+        if self.catalog:
+            self.catalog.upsert_many(catalog_updates, self.epub_covers)
+            removed = self.catalog.prune(f.stem for f in metadata_files)
+            if removed:
+                logger.debug(f"Removed {removed} deleted items from metadata catalog")
+
         # Log statistics
         doc_types = {}
         for item in self.items.values():
             doc_types[item.document_type] = doc_types.get(item.document_type, 0) + 1
-        
-        logger.info(f"Successfully loaded {len(self.items)} items:")
+
+        logger.info(f"Successfully loaded {len(self.items)} items "
+                    f"({reparsed_count} re-parsed, {len(metadata_files) - reparsed_count} unchanged):")
         for doc_type, count in sorted(doc_types.items()):
             logger.info(f"  📄 {doc_type}: {count}")
-    
+
+    def scan_items(self, uuids: Iterable[str]) -> None:
+        """
+        Load only the given items and their ancestors.
+
+        Ancestors are needed so build_path() can resolve the full folder path;
+        nothing else in the library is touched.
+        """
+        pending = list(uuids)
+        catalog_updates = []
+        reparsed_count = 0
+
+        while pending:
+            uuid = pending.pop()
+            if not uuid or uuid == 'trash' or uuid in self.items:
+                continue
+
+            metadata_file = self.remarkable_dir / f"{uuid}.metadata"
+            if not metadata_file.exists():
+                continue
+
+            cached_entry = self.catalog.get(uuid) if self.catalog else None
+            item, reparsed = self._load_item(uuid, metadata_file, cached_entry, catalog_updates)
+            reparsed_count += int(reparsed)
+            if item:
+                self.items[uuid] = item
+                if item.parent:
+                    pending.append(item.parent)
+
+        self._resolve_pending_covers()
+
+        if self.catalog:
+            self.catalog.upsert_many(catalog_updates, self.epub_covers)
+
+        logger.debug(f"Loaded {len(self.items)} items (including ancestors), {reparsed_count} re-parsed")
+
     def build_path(self, uuid: str) -> str:
         """Build the full path for an item by traversing up the parent chain."""
         if uuid in self.paths_cache:
@@ -553,12 +971,13 @@ class NotebookPathManager:
         
         return documents
 
-def detect_metadata_changes(remarkable_dir: str, db_connection, data_dir: str = None) -> set:
+def detect_metadata_changes(remarkable_dir: str, db_connection, data_dir: str = None,
+                            cover_workers: int = 0) -> set:
     """Detect notebooks with changed metadata and return their UUIDs."""
     logger.info("🔄 Checking for metadata changes...")
     
     # Get current metadata from reMarkable source
-    manager = NotebookPathManager(remarkable_dir, db_connection, data_dir)
+    manager = NotebookPathManager(remarkable_dir, db_connection, data_dir, cover_workers)
     manager.scan_metadata_files()
     manager.build_all_paths()
     current_items = list(manager.items.values())
@@ -609,9 +1028,9 @@ def update_changed_metadata_only(remarkable_dir: str, db_connection, changed_uui
         
     logger.info(f"🔄 Updating {len(changed_uuids)} changed metadata records in database...")
     manager = NotebookPathManager(remarkable_dir, db_connection, data_dir)
-    manager.scan_metadata_files()
-    manager.build_all_paths()
-    
+    # Only the changed items and their ancestors are needed to build paths
+    manager.scan_items(changed_uuids)
+
     updated_count = 0
     notebooks_to_track = []  # Track notebooks that need sync tracking AFTER DB transaction
     
@@ -671,9 +1090,10 @@ def update_changed_metadata_only(remarkable_dir: str, db_connection, changed_uui
     logger.info(f"✅ Updated {updated_count} changed metadata records")
     return updated_count
 
-def update_notebook_metadata(remarkable_dir: str, db_connection, data_dir: str = None) -> int:
+def update_notebook_metadata(remarkable_dir: str, db_connection, data_dir: str = None,
+                             cover_workers: int = 0) -> int:
     """Convenience function to update notebook metadata in database."""
-    manager = NotebookPathManager(remarkable_dir, db_connection, data_dir)
+    manager = NotebookPathManager(remarkable_dir, db_connection, data_dir, cover_workers)
     return manager.update_database_metadata()
 
 def get_notebook_path(notebook_uuid: str, db_connection) -> Optional[str]:
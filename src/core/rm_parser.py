@@ -44,6 +44,8 @@ except ImportError:
     PRE_V6_SUPPORT = False
     print("Warning: rm2svg module not available, pre-v6 support disabled")
 
+from .rm_scene import SCENE_SUPPORT, get_scene_cache, scene_to_svg
+
 
 @dataclass
 class PageInfo:
@@ -243,8 +245,13 @@ class RemarkableParser:
                 version = head[-1] if head[:-1] == head_fmt[:-1] else None
             
             if version == '6' and VERSION_6_SUPPORT:
-                # Use rmc for v6
-                rmc.rm_to_svg(str(page_path), output_path)
+                # Render from the parse-once scene cache; rmc directly if it can't be parsed
+                scene = get_scene_cache().load(str(page_path)) if SCENE_SUPPORT else None
+                if scene is not None:
+                    with open(output_path, 'wt') as outfile:
+                        scene_to_svg(scene, outfile)
+                else:
+                    rmc.rm_to_svg(str(page_path), output_path)
                 # Return default page info for v6 files
                 return PageInfo(
                     width=1404,  # Default reMarkable width
@@ -0,0 +1,662 @@
+"""
+Parse-once representation of v6 .rm pages.
+
+rmscene parsing is pure Python and dominates CPU time on dense pages, and the
+same page used to be parsed for SVG rendering, scraped byte-wise for highlights
+and hashed again by change detection. This module parses a page once into a
+compact, array-backed `ParsedScene` (strokes, glyph ranges, layers, root text)
+and caches it on disk keyed by the file's SHA-256, so:
+
+- rendering an unchanged page again (new prompt/model) skips parsing entirely
+- highlight extraction reads glyph ranges instead of scraping bytes
+- page statistics (stroke counts, ink bounds) come straight from the arrays
+
+Group anchors, the page bounding box and root-text line positions are resolved
+with rmc's own helpers at parse time, and `scene_to_svg` writes the same SVG as
+`rmc.rm_to_svg`, so cached and uncached rendering are interchangeable.
+"""
+
+import hashlib
+import io
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from xml.sax.saxutils import escape
+
+import numpy as np
+
+from ..utils import metrics
+
+try:
+    from rmscene import read_tree
+    from rmscene import scene_items as si
+    from rmscene.text import TextDocument
+    from rmc.exporters.svg import (
+        LINE_HEIGHTS, SVG_HEADER, TEXT_TOP_Y, build_anchor_pos, get_anchor, get_bounding_box, scale
+    )
+    from rmc.exporters.writing_tools import Pen
+    SCENE_SUPPORT = True
+except ImportError:
+    SCENE_SUPPORT = False
+
+logger = logging.getLogger(__name__)
+
+# Bump when the on-disk layout changes; older cache files are simply ignored
+SCENE_FORMAT_VERSION = 1
+
+V6_HEADER = b'reMarkable .lines file, version=6'
+
+# draw_ops opcodes
+OP_OPEN_GROUP = 0
+OP_STROKE = 1
+OP_CLOSE_GROUP = 2
+
+# Columns of ParsedScene.points
+POINT_FIELDS = ('x', 'y', 'speed', 'direction', 'width', 'pressure')
+
+# rmscene Pen values that remove ink rather than add it (ERASER, ERASER_AREA)
+ERASER_TOOLS = (6, 8)
+
+# Grid (screen units) point positions are snapped to before fingerprinting
+FINGERPRINT_QUANTUM = 0.5
+
+TEXT_STYLE = '''
+            <style>
+                text.heading {
+                    font: 14pt serif;
+                }
+                text.bold {
+                    font: 8pt sans-serif bold;
+                }
+                text, text.plain {
+                    font: 7pt sans-serif;
+                }
+            </style>
+'''
+
+
+@dataclass
+class ParsedScene:
+    """Array-backed contents of one v6 page."""
+    points: np.ndarray            # float32 (N, 6), see POINT_FIELDS; relative to the stroke's group
+    stroke_offsets: np.ndarray    # int64 (S + 1,); stroke i is points[offsets[i]:offsets[i + 1]]
+    stroke_tool: np.ndarray       # int16 (S,), rmscene Pen value
+    stroke_color: np.ndarray      # int16 (S,), rmscene PenColor value
+    stroke_thickness: np.ndarray  # float64 (S,), thickness_scale
+    stroke_group: np.ndarray      # int32 (S,), index into group_ids
+    draw_ops: np.ndarray          # int32 (K, 2), (opcode, index) in document order
+    group_anchors: np.ndarray     # float64 (G, 2), anchor translation of each group
+    group_offsets: np.ndarray     # float64 (G, 2), absolute translation (sum of ancestors)
+    group_ids: List[str]
+    layers: List[str]
+    bbox: Tuple[float, float, float, float]  # x_min, x_max, y_min, y_max (screen units)
+    text_lines: List[Tuple[float, float, str, str]] = field(default_factory=list)  # x, y, style, text
+    has_root_text: bool = False
+    glyphs: List[Dict[str, Any]] = field(default_factory=list)
+
+    @property
+    def stroke_count(self) -> int:
+        return len(self.stroke_tool)
+
+    @property
+    def point_count(self) -> int:
+        return len(self.points)
+
+    def stroke_points(self, index: int) -> np.ndarray:
+        """Points of one stroke (view, group-relative)."""
+        return self.points[self.stroke_offsets[index]:self.stroke_offsets[index + 1]]
+
+    def absolute_xy(self) -> np.ndarray:
+        """(N, 2) point positions in page coordinates."""
+        if not self.point_count:
+            return np.zeros((0, 2), dtype=np.float64)
+        per_point_group = np.repeat(self.stroke_group, np.diff(self.stroke_offsets))
+        return self.points[:, :2].astype(np.float64) + self.group_offsets[per_point_group]
+
+    def ink_mask(self) -> np.ndarray:
+        """(S,) True for strokes that put ink on the page (not erasers)."""
+        return ~np.isin(self.stroke_tool, ERASER_TOOLS)
+
+    def stroke_lengths(self) -> np.ndarray:
+        """(S,) polyline length of each stroke in screen units."""
+        lengths = np.zeros(self.stroke_count, dtype=np.float64)
+        if self.point_count < 2:
+            return lengths
+        stroke_of_point = np.repeat(np.arange(self.stroke_count), np.diff(self.stroke_offsets))
+        xy = self.points[:, :2].astype(np.float64)
+        segment = np.hypot(*np.diff(xy, axis=0).T)
+        same_stroke = stroke_of_point[1:] == stroke_of_point[:-1]
+        lengths += np.bincount(stroke_of_point[1:][same_stroke], weights=segment[same_stroke],
+                               minlength=self.stroke_count)
+        return lengths
+
+    def ink_bbox(self) -> Optional[Tuple[float, float, float, float]]:
+        """x_min, x_max, y_min, y_max of all ink in page coordinates, or None if there is none."""
+        xy = self.absolute_xy()
+        if len(xy):
+            per_point_ink = np.repeat(self.ink_mask(), np.diff(self.stroke_offsets))
+            xy = xy[per_point_ink]
+        if not len(xy):
+            return None
+        return (float(xy[:, 0].min()), float(xy[:, 0].max()), float(xy[:, 1].min()), float(xy[:, 1].max()))
+
+    def highlight_texts(self) -> List[str]:
+        """Highlighted text of each glyph range, in document order."""
+        return [glyph['text'] for glyph in self.glyphs if glyph.get('text')]
+
+    def stroke_digests(self, quantum: float = FINGERPRINT_QUANTUM) -> List[bytes]:
+        """(S,) digest of each stroke's tool, color, thickness and quantized page-coordinate points."""
+        xy = np.round(self.absolute_xy() / quantum).astype(np.int64)
+        digests = []
+        for index in range(self.stroke_count):
+            stroke = hashlib.sha256(np.array([
+                self.stroke_tool[index],
+                self.stroke_color[index],
+                round(float(self.stroke_thickness[index]) * 1000),
+            ], dtype=np.int64).tobytes())
+            stroke.update(xy[self.stroke_offsets[index]:self.stroke_offsets[index + 1]].tobytes())
+            digests.append(stroke.digest())
+        return digests
+
+    def ink_fingerprint(self, quantum: float = FINGERPRINT_QUANTUM) -> str:
+        """
+        Hash of what is drawn on the page, independent of how the file encodes it.
+
+        Covers every stroke digest (see stroke_digests) plus root text and
+        highlighted text. Stroke order, CRDT ids, speed/pressure samples and
+        layer bookkeeping are left out, so a page the tablet rewrote without
+        touching the ink keeps its fingerprint.
+        """
+        fingerprint = hashlib.sha256()
+        for digest in sorted(self.stroke_digests(quantum)):
+            fingerprint.update(digest)
+        text = [[round(x / quantum), round(y / quantum), style, line] for x, y, style, line in self.text_lines]
+        fingerprint.update(json.dumps([text, self.highlight_texts()]).encode('utf-8'))
+        return fingerprint.hexdigest()
+
+    def stats(self) -> Dict[str, Any]:
+        """Page statistics for logging and heuristics."""
+        ink = self.ink_mask()
+        return {
+            'strokes': self.stroke_count,
+            'ink_strokes': int(ink.sum()),
+            'ink_length': float(self.stroke_lengths()[ink].sum()),
+            'points': self.point_count,
+            'glyph_ranges': len(self.glyphs),
+            'layers': len(self.layers),
+            'text_lines': len(self.text_lines),
+            'ink_bbox': self.ink_bbox(),
+        }
+
+    def save(self, path: Path) -> None:
+        """Write the scene as a compressed .npz (atomic replace)."""
+        meta = {
+            'version': SCENE_FORMAT_VERSION,
+            'group_ids': self.group_ids,
+            'layers': self.layers,
+            'bbox': list(self.bbox),
+            'text_lines': [list(line) for line in self.text_lines],
+            'has_root_text': self.has_root_text,
+            'glyphs': self.glyphs,
+        }
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp_path, 'wb') as f:
+            np.savez_compressed(
+                f,
+                points=self.points, stroke_offsets=self.stroke_offsets,
+                stroke_tool=self.stroke_tool, stroke_color=self.stroke_color,
+                stroke_thickness=self.stroke_thickness, stroke_group=self.stroke_group,
+                draw_ops=self.draw_ops, group_anchors=self.group_anchors, group_offsets=self.group_offsets,
+                meta=np.frombuffer(json.dumps(meta).encode('utf-8'), dtype=np.uint8),
+            )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: Path) -> Optional['ParsedScene']:
+        """Read a scene written by save(), or None if it is from another format version."""
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(data['meta'].tobytes().decode('utf-8'))
+            if meta.get('version') != SCENE_FORMAT_VERSION:
+                return None
+            return cls(
+                points=data['points'], stroke_offsets=data['stroke_offsets'],
+                stroke_tool=data['stroke_tool'], stroke_color=data['stroke_color'],
+                stroke_thickness=data['stroke_thickness'], stroke_group=data['stroke_group'],
+                draw_ops=data['draw_ops'], group_anchors=data['group_anchors'],
+                group_offsets=data['group_offsets'],
+                group_ids=meta['group_ids'], layers=meta['layers'], bbox=tuple(meta['bbox']),
+                text_lines=[tuple(line) for line in meta['text_lines']],
+                has_root_text=meta['has_root_text'], glyphs=meta['glyphs'],
+            )
+
+
+def parse_scene(data: bytes) -> ParsedScene:
+    """Parse v6 .rm bytes into a ParsedScene (requires rmscene and rmc)."""
+    if not SCENE_SUPPORT:
+        raise ImportError("rmscene/rmc not available")
+
+    tree = read_tree(io.BytesIO(data))
+    anchor_pos = build_anchor_pos(tree.root_text)
+
+    point_chunks: List[np.ndarray] = []
+    offsets = [0]
+    tools, colors, thicknesses, stroke_groups = [], [], [], []
+    ops: List[Tuple[int, int]] = []
+    group_ids: List[str] = []
+    anchors: List[Tuple[float, float]] = []
+    offsets_abs: List[Tuple[float, float]] = []
+    glyphs: List[Dict[str, Any]] = []
+
+    def walk(group, parent_offset: Tuple[float, float]) -> None:
+        index = len(group_ids)
+        anchor_x, anchor_y = get_anchor(group, anchor_pos)
+        absolute = (parent_offset[0] + anchor_x, parent_offset[1] + anchor_y)
+        group_ids.append(str(group.node_id))
+        anchors.append((anchor_x, anchor_y))
+        offsets_abs.append(absolute)
+        ops.append((OP_OPEN_GROUP, index))
+
+        for child_id in group.children:
+            child = group.children[child_id]
+            if isinstance(child, si.Group):
+                walk(child, absolute)
+            elif isinstance(child, si.Line):
+                stroke = np.array(
+                    [(p.x, p.y, p.speed, p.direction, p.width, p.pressure) for p in child.points],
+                    dtype=np.float32
+                ).reshape(-1, len(POINT_FIELDS))
+                ops.append((OP_STROKE, len(tools)))
+                point_chunks.append(stroke)
+                offsets.append(offsets[-1] + len(stroke))
+                tools.append(int(child.tool))
+                colors.append(int(child.color))
+                thicknesses.append(float(child.thickness_scale))
+                stroke_groups.append(index)
+            elif isinstance(child, si.GlyphRange):
+                glyphs.append({
+                    'start': child.start,
+                    'length': child.length,
+                    'color': int(child.color),
+                    'text': child.text,
+                    'rects': [[r.x, r.y, r.w, r.h] for r in child.rectangles],
+                })
+
+        ops.append((OP_CLOSE_GROUP, index))
+
+    walk(tree.root, (0.0, 0.0))
+
+    layers = []
+    for child_id in tree.root.children:
+        child = tree.root.children[child_id]
+        if isinstance(child, si.Group):
+            layers.append(child.label.value if child.label is not None else '')
+
+    text_lines = []
+    if tree.root_text is not None:
+        y_offset = TEXT_TOP_Y
+        doc = TextDocument.from_scene_item(tree.root_text)
+        for paragraph in doc.contents:
+            y_offset += LINE_HEIGHTS.get(paragraph.style.value, 70)
+            if str(paragraph):
+                text_lines.append((tree.root_text.pos_x, tree.root_text.pos_y + y_offset,
+                                   paragraph.style.value.name.lower(), str(paragraph).strip()))
+
+    return ParsedScene(
+        points=(np.concatenate(point_chunks) if point_chunks
+                else np.zeros((0, len(POINT_FIELDS)), dtype=np.float32)),
+        stroke_offsets=np.array(offsets, dtype=np.int64),
+        stroke_tool=np.array(tools, dtype=np.int16),
+        stroke_color=np.array(colors, dtype=np.int16),
+        stroke_thickness=np.array(thicknesses, dtype=np.float64),
+        stroke_group=np.array(stroke_groups, dtype=np.int32),
+        draw_ops=np.array(ops, dtype=np.int32).reshape(-1, 2),
+        group_anchors=np.array(anchors, dtype=np.float64).reshape(-1, 2),
+        group_offsets=np.array(offsets_abs, dtype=np.float64).reshape(-1, 2),
+        group_ids=group_ids,
+        layers=layers,
+        bbox=tuple(float(v) for v in get_bounding_box(tree.root, anchor_pos)),
+        text_lines=text_lines,
+        has_root_text=tree.root_text is not None,
+        glyphs=glyphs,
+    )
+
+
+def scene_to_svg(scene: ParsedScene, output, strokes: Optional[Set[int]] = None,
+                 crop: Optional[Tuple[float, float, float, float]] = None) -> None:
+    """
+    Write a ParsedScene as SVG (same drawing as rmc.rm_to_svg).
+
+    Args:
+        strokes: Only draw these stroke indices (and no root text)
+        crop: x_min, x_max, y_min, y_max to use instead of the page bounding box
+    """
+    x_min, x_max, y_min, y_max = crop or scene.bbox
+    width_pt = scale(x_max - x_min + 1)
+    height_pt = scale(y_max - y_min + 1)
+    output.write(SVG_HEADER.substitute(width=width_pt,
+                                       height=height_pt,
+                                       viewbox=f"{scale(x_min)} {scale(y_min)} {width_pt} {height_pt}") + "\n")
+    output.write('\t<g id="p1" style="display:inline">\n')
+
+    if scene.has_root_text and strokes is None:
+        output.write('\t\t<g class="root-text" style="display:inline">')
+        output.write(TEXT_STYLE)
+        for xpos, ypos, style, text in scene.text_lines:
+            output.write(f'\t\t\t<text x="{scale(xpos)}" y="{scale(ypos)}" class="{style}">{escape(text)}</text>\n')
+        output.write('\t\t</g>\n')
+
+    for opcode, index in scene.draw_ops.tolist():
+        if opcode == OP_STROKE:
+            if strokes is None or index in strokes:
+                _write_stroke(scene, index, output)
+        elif opcode == OP_OPEN_GROUP:
+            anchor_x, anchor_y = scene.group_anchors[index].tolist()
+            output.write(f'\t\t<g id="{scene.group_ids[index]}" '
+                         f'transform="translate({scale(anchor_x)}, {scale(anchor_y)})">\n')
+        else:
+            output.write('\t\t</g>\n')
+
+    output.write('\t</g>\n')
+    output.write('</svg>\n')
+
+
+def _write_stroke(scene: ParsedScene, index: int, output) -> None:
+    pen = Pen.create(si.Pen(int(scene.stroke_tool[index])), si.PenColor(int(scene.stroke_color[index])),
+                     float(scene.stroke_thickness[index]))
+    points = scene.stroke_points(index)
+    xy = points[:, :2].astype(np.float64) * scale(1.0)
+    coords = [f'{x:.3f},{y:.3f} ' for x, y in xy.tolist()]
+    attrs = points[:, 2:].tolist()
+
+    last_segment_width = segment_width = 0
+    for start in range(0, len(coords), pen.segment_length):
+        if start:
+            output.write('"/>\n')
+        speed, direction, width, pressure = attrs[start]
+        segment_color = pen.get_segment_color(speed, direction, width, pressure, last_segment_width)
+        segment_width = pen.get_segment_width(speed, direction, width, pressure, last_segment_width)
+        segment_opacity = pen.get_segment_opacity(speed, direction, width, pressure, last_segment_width)
+        output.write('\t\t\t<polyline ')
+        output.write(f'style="fill:none; stroke:{segment_color}; '
+                     f'stroke-width:{scale(segment_width):.3f}; opacity:{segment_opacity}" ')
+        output.write(f'stroke-linecap="{pen.stroke_linecap}" ')
+        output.write('points="')
+        if start:
+            # Join to previous segment
+            output.write(coords[start - 1])
+        output.write(''.join(coords[start:start + pen.segment_length]))
+        last_segment_width = segment_width
+
+    output.write('" />\n')
+
+
+# Memoized content hashes keyed by (path, size, mtime_ns)
+_hash_cache: 'OrderedDict[str, Tuple[int, int, str]]' = OrderedDict()
+_hash_lock = threading.Lock()
+_HASH_CACHE_SIZE = 8192
+
+
+def file_sha256(path: str) -> str:
+    """
+    SHA-256 of a file's content, memoized on (size, mtime).
+
+    Shared by change detection and the scene cache so each page is hashed
+    once per modification.
+    """
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    with _hash_lock:
+        cached = _hash_cache.get(path)
+        if cached and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+            _hash_cache.move_to_end(path)
+            return cached[2]
+
+    with open(path, 'rb') as f:
+        digest = hashlib.sha256(f.read()).hexdigest()
+
+    with _hash_lock:
+        _hash_cache[path] = (stat.st_size, stat.st_mtime_ns, digest)
+        _hash_cache.move_to_end(path)
+        while len(_hash_cache) > _HASH_CACHE_SIZE:
+            _hash_cache.popitem(last=False)
+    return digest
+
+
+class SceneCache:
+    """Two-level (memory LRU + on-disk .npz) cache of parsed v6 pages keyed by content hash."""
+
+    def __init__(self, directory: Optional[str] = None, memory_entries: int = 32,
+                 max_disk_mb: Optional[float] = None, prune_every: int = 200):
+        """
+        Args:
+            directory: Where parsed scenes are stored (None = memory only)
+            memory_entries: Parsed scenes kept in memory
+            max_disk_mb: Disk budget; least recently used entries beyond it are
+                deleted on creation and every `prune_every` writes (None = never prune)
+            prune_every: Disk writes between automatic prunes
+        """
+        self.directory = Path(directory) if directory else None
+        self.memory_entries = memory_entries
+        self.max_disk_bytes = int(max_disk_mb * 1024 * 1024) if max_disk_mb else None
+        self.prune_every = max(1, prune_every)
+        # Content hashes still needed on disk; set by the text extractor (see prune())
+        self.keep_provider: Optional[Callable[[], Set[str]]] = None
+        self._memory: 'OrderedDict[str, ParsedScene]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._prune_lock = threading.Lock()
+        self._writes = 0
+        self.stats = {'memory_hits': 0, 'disk_hits': 0, 'parsed': 0, 'failed': 0, 'pruned': 0}
+        if self.directory:
+            try:
+                self.directory.mkdir(parents=True, exist_ok=True)
+            except OSError as e:
+                logger.warning(f"⚠️ Scene cache directory unavailable, caching in memory only: {e}")
+                self.directory = None
+        if self.directory and self.max_disk_bytes:
+            self.prune()
+
+    def _disk_path(self, digest: str) -> Path:
+        return self.directory / digest[:2] / f"{digest}.v{SCENE_FORMAT_VERSION}.npz"
+
+    def _remember(self, digest: str, scene: ParsedScene) -> None:
+        with self._lock:
+            self._memory[digest] = scene
+            self._memory.move_to_end(digest)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def _count(self, result: str) -> None:
+        with self._lock:
+            self.stats[result] += 1
+        metrics.inc('scene_cache_lookups', result=result)
+
+    def load_digest(self, digest: str) -> Optional[ParsedScene]:
+        """
+        Scene previously cached for this content hash, e.g. an older version of a page.
+
+        Returns:
+            ParsedScene, or None if it is in neither the memory nor the disk cache
+        """
+        with self._lock:
+            scene = self._memory.get(digest)
+            if scene is not None:
+                self._memory.move_to_end(digest)
+        if scene is not None:
+            self._count('memory_hits')
+            return scene
+
+        disk_path = self._disk_path(digest) if self.directory else None
+        if disk_path and disk_path.exists():
+            try:
+                scene = ParsedScene.load(disk_path)
+            except Exception as e:
+                logger.warning(f"⚠️ Ignoring unreadable scene cache entry {disk_path.name}: {e}")
+                scene = None
+            if scene is not None:
+                self._remember(digest, scene)
+                self._count('disk_hits')
+                try:
+                    # The mtime is the entry's last use, for least-recently-used pruning
+                    os.utime(disk_path)
+                except OSError:
+                    pass
+                return scene
+        return None
+
+    def load(self, rm_path: str) -> Optional[ParsedScene]:
+        """
+        Parsed scene for a .rm page, parsing it only if this content was never seen.
+
+        Returns:
+            ParsedScene, or None if the file is not v6 or cannot be parsed
+        """
+        if not SCENE_SUPPORT:
+            return None
+
+        try:
+            digest = file_sha256(rm_path)
+        except OSError as e:
+            logger.debug(f"Cannot hash {rm_path}: {e}")
+            return None
+
+        scene = self.load_digest(digest)
+        if scene is not None:
+            return scene
+
+        disk_path = self._disk_path(digest) if self.directory else None
+        try:
+            with open(rm_path, 'rb') as f:
+                data = f.read()
+            if not data.startswith(V6_HEADER):
+                return None
+            with metrics.stage('rm_parse'):
+                scene = parse_scene(data)
+        except Exception as e:
+            self._count('failed')
+            logger.debug(f"Could not parse {rm_path} with rmscene: {e}")
+            return None
+
+        self._count('parsed')
+        self._remember(digest, scene)
+        if disk_path:
+            try:
+                disk_path.parent.mkdir(parents=True, exist_ok=True)
+                scene.save(disk_path)
+            except OSError as e:
+                logger.warning(f"⚠️ Could not write scene cache entry for {os.path.basename(rm_path)}: {e}")
+            else:
+                self._after_write()
+        return scene
+
+    def _after_write(self) -> None:
+        if not self.max_disk_bytes:
+            return
+        with self._lock:
+            self._writes += 1
+            due = self._writes % self.prune_every == 0
+        if due:
+            keep = None
+            if self.keep_provider is not None:
+                try:
+                    keep = self.keep_provider()
+                except Exception as e:
+                    logger.warning(f"⚠️ Could not list scene cache entries in use, pruning by size only: {e}")
+            self.prune(keep)
+
+    def prune(self, keep: Optional[Set[str]] = None) -> int:
+        """
+        Delete disk entries that are no longer useful.
+
+        Entries written by another format version (and leftover temp files) are
+        always deleted. With `keep`, entries whose content hash is not in it are
+        deleted too: region OCR only compares a page with its last stored
+        version, so older versions of an edited page are never read again. What
+        remains is trimmed to max_disk_mb, least recently used first.
+
+        Args:
+            keep: Content hashes that must stay (None = keep all current-format entries)
+
+        Returns:
+            Number of entries deleted
+        """
+        if not self.directory:
+            return 0
+
+        suffix = f".v{SCENE_FORMAT_VERSION}.npz"
+        stale_before = time.time() - 3600
+        entries = []
+        removed = 0
+        with self._prune_lock:
+            for path in self.directory.glob('*/*'):
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                if path.name.endswith('.tmp'):
+                    # In-progress writes are renamed within moments; older ones were abandoned
+                    if stat.st_mtime < stale_before:
+                        removed += self._unlink(path)
+                elif not path.name.endswith(suffix) or (keep is not None and path.name[:-len(suffix)] not in keep):
+                    removed += self._unlink(path)
+                else:
+                    entries.append((stat.st_mtime, stat.st_size, path))
+
+            if self.max_disk_bytes:
+                total = sum(size for _, size, _ in entries)
+                for _, size, path in sorted(entries):
+                    if total <= self.max_disk_bytes:
+                        break
+                    removed += self._unlink(path)
+                    total -= size
+
+        if removed:
+            with self._lock:
+                self.stats['pruned'] += removed
+            metrics.inc('scene_cache_pruned', removed)
+            logger.info(f"🧹 Scene cache: removed {removed} entries")
+        return removed
+
+    @staticmethod
+    def _unlink(path: Path) -> int:
+        try:
+            path.unlink()
+            return 1
+        except OSError as e:
+            logger.debug(f"Could not remove scene cache entry {path.name}: {e}")
+            return 0
+
+
+# Global cache instance shared by renderer, highlight extraction and page statistics
+_scene_cache = None
+_scene_cache_lock = threading.Lock()
+
+
+def get_scene_cache(config=None) -> SceneCache:
+    """Get the process-wide scene cache, creating it from config on first use."""
+    global _scene_cache
+    with _scene_cache_lock:
+        if _scene_cache is None:
+            if config is None:
+                try:
+                    from ..utils.config import Config
+                    config = Config()
+                except Exception as e:
+                    logger.debug(f"Scene cache using defaults: {e}")
+            get = config.get if config else (lambda key, default=None: default)
+            directory = None
+            if get('processing.scene_cache.enabled', True):
+                directory = get('processing.scene_cache.directory', None) or os.path.join(
+                    get('remarkable.data_directory', './data'), 'scene_cache')
+            _scene_cache = SceneCache(
+                directory,
+                memory_entries=get('processing.scene_cache.memory_entries', 32),
+                max_disk_mb=get('processing.scene_cache.max_disk_mb', 512),
+                prune_every=get('processing.scene_cache.prune_every', 200),
+            )
+        return _scene_cache
@@ -25,6 +25,10 @@ import json
 logger = logging.getLogger(__name__)
 
 
+# Keep IN (...) lists well below SQLite's bound-variable limit
+SQL_VARIABLE_CHUNK = 500
+
+
 class SyncStatus(Enum):
     """Status of a sync operation."""
     PENDING = "pending"
@@ -374,24 +378,19 @@ class DeduplicationService:
             ID of the created sync record
         """
         try:
-            with self.db_manager.get_connection_context() as conn:
-                cursor = conn.cursor()
-                now = datetime.now().isoformat()
-                synced_at = now if status == SyncStatus.SUCCESS else None
-                
-                cursor.execute('''
-                    INSERT OR REPLACE INTO sync_records 
-                    (content_hash, target_name, external_id, item_type, status, 
-                     retry_count, created_at, updated_at, synced_at)
-                    VALUES (?, ?, ?, ?, ?, 0, ?, ?, ?)
-                ''', (content_hash, target_name, external_id, item_type.value, 
-                      status.value, now, now, synced_at))
-                
-                record_id = cursor.lastrowid
-                conn.commit()
-                
-                self.logger.debug(f"Registered sync: {content_hash[:8]}... -> {target_name} ({external_id})")
-                return record_id
+            now = datetime.now().isoformat()
+            synced_at = now if status == SyncStatus.SUCCESS else None
+            
+            record_id = self.db_manager.write(lambda conn: conn.execute('''
+                INSERT OR REPLACE INTO sync_records 
+                (content_hash, target_name, external_id, item_type, status, 
+                 retry_count, created_at, updated_at, synced_at)
+                VALUES (?, ?, ?, ?, ?, 0, ?, ?, ?)
+            ''', (content_hash, target_name, external_id, item_type.value, 
+                  status.value, now, now, synced_at)).lastrowid)
+            
+            self.logger.debug(f"Registered sync: {content_hash[:8]}... -> {target_name} ({external_id})")
+            return record_id
         except Exception as e:
             self.logger.error(f"Error registering sync: {e}")
             raise
@@ -413,46 +412,42 @@ class DeduplicationService:
             True if record was updated, False otherwise
         """
         try:
-            with self.db_manager.get_connection_context() as conn:
-                cursor = conn.cursor()
-                now = datetime.now().isoformat()
-                synced_at = now if status == SyncStatus.SUCCESS else None
-                
-                # Build dynamic query based on provided parameters
-                set_clauses = ['status = ?', 'updated_at = ?']
-                params = [status.value, now]
-                
-                if error_message is not None:
-                    set_clauses.append('error_message = ?')
-                    params.append(error_message)
-                
-                if external_id is not None:
-                    set_clauses.append('external_id = ?')
-                    params.append(external_id)
-                
-                if synced_at:
-                    set_clauses.append('synced_at = ?')
-                    params.append(synced_at)
-                
-                # Add WHERE clause parameters
-                params.extend([content_hash, target_name])
-                
-                query = f'''
-                    UPDATE sync_records 
-                    SET {', '.join(set_clauses)}
-                    WHERE content_hash = ? AND target_name = ?
-                '''
-                
-                cursor.execute(query, params)
-                updated = cursor.rowcount > 0
-                conn.commit()
-                
-                if updated:
-                    self.logger.debug(f"Updated sync status: {content_hash[:8]}... -> {target_name} = {status.value}")
-                else:
-                    self.logger.warning(f"No sync record found to update: {content_hash[:8]}... -> {target_name}")
-                
-                return updated
+            now = datetime.now().isoformat()
+            synced_at = now if status == SyncStatus.SUCCESS else None
+            
+            # Build dynamic query based on provided parameters
+            set_clauses = ['status = ?', 'updated_at = ?']
+            params = [status.value, now]
+            
+            if error_message is not None:
+                set_clauses.append('error_message = ?')
+                params.append(error_message)
+            
+            if external_id is not None:
+                set_clauses.append('external_id = ?')
+                params.append(external_id)
+            
+            if synced_at:
+                set_clauses.append('synced_at = ?')
+                params.append(synced_at)
+            
+            # Add WHERE clause parameters
+            params.extend([content_hash, target_name])
+            
+            query = f'''
+                UPDATE sync_records 
+                SET {', '.join(set_clauses)}
+                WHERE content_hash = ? AND target_name = ?
+            '''
+            
+            updated = self.db_manager.write(lambda conn: conn.execute(query, params).rowcount) > 0
+            
+            if updated:
+                self.logger.debug(f"Updated sync status: {content_hash[:8]}... -> {target_name} = {status.value}")
+            else:
+                self.logger.warning(f"No sync record found to update: {content_hash[:8]}... -> {target_name}")
+            
+            return updated
         except Exception as e:
             self.logger.error(f"Error updating sync status: {e}")
             return False
@@ -468,14 +463,42 @@ class DeduplicationService:
         Returns:
             External ID if duplicate exists, None otherwise
         """
-        existing_syncs = await self.find_existing_syncs(content_hash)
+        duplicates = await self.find_duplicates([content_hash], target_name)
+        return duplicates.get(content_hash)
+    
+    async def find_duplicates(self, content_hashes: List[str], target_name: str) -> Dict[str, str]:
+        """
+        Bulk variant of is_duplicate: one query for a whole batch of hashes.
         
-        for sync_record in existing_syncs:
-            if (sync_record.target_name == target_name and 
-                sync_record.status == SyncStatus.SUCCESS):
-                return sync_record.external_id
+        Args:
+            content_hashes: Hashes of the content to check
+            target_name: Name of the target system
+            
+        Returns:
+            Mapping of content hash to external ID for hashes already synced
+        """
+        hashes = list(dict.fromkeys(h for h in content_hashes if h))
+        if not hashes:
+            return {}
         
-        return None
+        try:
+            duplicates = {}
+            with self.db_manager.get_connection_context() as conn:
+                cursor = conn.cursor()
+                for start in range(0, len(hashes), SQL_VARIABLE_CHUNK):
+                    chunk = hashes[start:start + SQL_VARIABLE_CHUNK]
+                    placeholders = ','.join('?' * len(chunk))
+                    cursor.execute(f'''
+                        SELECT content_hash, external_id
+                        FROM sync_records
+                        WHERE target_name = ? AND status = ?
+                        AND content_hash IN ({placeholders})
+                    ''', [target_name, SyncStatus.SUCCESS.value, *chunk])
+                    duplicates.update(cursor.fetchall())
+            return duplicates
+        except Exception as e:
+            self.logger.error(f"Error finding duplicates in {target_name}: {e}")
+            return {}
     
     async def get_sync_stats(self) -> Dict[str, Any]:
         """Get statistics about sync operations."""
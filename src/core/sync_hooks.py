@@ -13,6 +13,7 @@ from contextlib import contextmanager
 
 from .database import DatabaseManager
 from .change_tracker import ChangeTracker
+from ..utils import metrics
 
 logger = logging.getLogger(__name__)
 
@@ -267,10 +268,11 @@ def track_notebook_operation(operation: str, notebook_uuid: str,
     """Convenience function to track notebook operations."""
     hook_manager = get_hook_manager()
     
-    if operation == 'INSERT':
-        hook_manager.track_notebook_insertion(notebook_uuid, data or {}, trigger_source)
-    elif operation == 'UPDATE':
-        hook_manager.track_notebook_update(notebook_uuid, data or {}, trigger_source)
+    with metrics.stage('change_tracking', entity='notebook', notebook=notebook_uuid):
+        if operation == 'INSERT':
+            hook_manager.track_notebook_insertion(notebook_uuid, data or {}, trigger_source)
+        elif operation == 'UPDATE':
+            hook_manager.track_notebook_update(notebook_uuid, data or {}, trigger_source)
 
 
 def track_page_operation(operation: str, notebook_uuid: str, page_number: int,
@@ -281,12 +283,13 @@ def track_page_operation(operation: str, notebook_uuid: str, page_number: int,
     """Convenience function to track page operations."""
     hook_manager = get_hook_manager()
     
-    if operation == 'INSERT':
-        hook_manager.track_page_insertion(notebook_uuid, page_number, data or {}, trigger_source)
-    elif operation == 'UPDATE':
-        hook_manager.track_page_update(
-            notebook_uuid, page_number, content_before, content_after, data, trigger_source
-        )
+    with metrics.stage('change_tracking', entity='page', notebook=notebook_uuid):
+        if operation == 'INSERT':
+            hook_manager.track_page_insertion(notebook_uuid, page_number, data or {}, trigger_source)
+        elif operation == 'UPDATE':
+            hook_manager.track_page_update(
+                notebook_uuid, page_number, content_before, content_after, data, trigger_source
+            )
 
 
 def track_todo_operation(operation: str, todo_id: int,
@@ -295,7 +298,8 @@ def track_todo_operation(operation: str, todo_id: int,
     """Convenience function to track todo operations."""
     hook_manager = get_hook_manager()
     
-    if operation == 'INSERT':
-        hook_manager.track_todo_insertion(todo_id, data or {}, trigger_source)
-    elif operation == 'UPDATE':
-        hook_manager.track_todo_update(todo_id, data or {}, trigger_source)
\ No newline at end of file
+    with metrics.stage('change_tracking', entity='todo'):
+        if operation == 'INSERT':
+            hook_manager.track_todo_insertion(todo_id, data or {}, trigger_source)
+        elif operation == 'UPDATE':
+            hook_manager.track_todo_update(todo_id, data or {}, trigger_source)
\ No newline at end of file
@@ -0,0 +1,90 @@
+"""
+Wakeup notifications for the sync queue.
+
+ChangeTracker rings the notifier after every committed changelog write, so
+SyncQueueProcessor can start a pass immediately instead of polling:
+
+- in-process: waiting processors get their asyncio.Event set (thread-safe,
+  so OCR worker threads can notify an event loop)
+- cross-process: a small doorbell file next to the database is rewritten;
+  processors in other processes (e.g. `sync run` alongside `watch`) check
+  it a few times per second, which costs one small file read
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DOORBELL_SUFFIX = '.sync-doorbell'
+
+
+class SyncNotifier:
+    """Notifies sync processors that new changelog rows are pending."""
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.doorbell_path = Path(f"{db_path}{DOORBELL_SUFFIX}") if db_path else None
+        self._waiters: List[Tuple[asyncio.AbstractEventLoop, asyncio.Event]] = []
+        self._lock = threading.Lock()
+        self._sequence = 0
+
+    def subscribe(self, event: asyncio.Event, loop: Optional[asyncio.AbstractEventLoop] = None) -> None:
+        """Set `event` (on `loop`) whenever a change is tracked in this process."""
+        loop = loop or asyncio.get_running_loop()
+        with self._lock:
+            self._waiters.append((loop, event))
+
+    def unsubscribe(self, event: asyncio.Event) -> None:
+        with self._lock:
+            self._waiters = [(loop, e) for loop, e in self._waiters if e is not event]
+
+    def notify(self, source: str = '') -> None:
+        """Wake in-process waiters and ring the cross-process doorbell."""
+        with self._lock:
+            waiters = list(self._waiters)
+            self._sequence += 1
+            sequence = self._sequence
+
+        for loop, event in waiters:
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                self.unsubscribe(event)  # Loop already closed
+
+        if self.doorbell_path:
+            try:
+                self.doorbell_path.write_text(f"{os.getpid()}:{sequence}:{time.time_ns()}")
+            except OSError as e:
+                logger.debug(f"Could not ring sync doorbell {self.doorbell_path}: {e}")
+
+        if source:
+            logger.debug(f"🔔 Sync wakeup ({source})")
+
+    def read_doorbell(self) -> Optional[str]:
+        """Current doorbell stamp; a different value means another process tracked changes."""
+        if not self.doorbell_path:
+            return None
+        try:
+            return self.doorbell_path.read_text()
+        except OSError:
+            return None
+
+
+# One notifier per database file
+_notifiers: Dict[str, SyncNotifier] = {}
+_notifiers_lock = threading.Lock()
+
+
+def get_sync_notifier(db_manager=None) -> SyncNotifier:
+    """Get the notifier for a database (by its path)."""
+    db_path = getattr(db_manager, 'db_path', None)
+    key = str(db_path) if db_path else ''
+    with _notifiers_lock:
+        if key not in _notifiers:
+            _notifiers[key] = SyncNotifier(key or None)
+        return _notifiers[key]
@@ -15,23 +15,37 @@ import json
 
 from .sync_engine import (
     SyncTarget, SyncItem, SyncResult, SyncStatus, SyncItemType, 
-    ContentFingerprint, DeduplicationService
+    ContentFingerprint, DeduplicationService, SQL_VARIABLE_CHUNK
 )
 from .page_level_sync import PageLevelSyncManager, PageAwareSyncProcessor
+from .sync_notifier import get_sync_notifier
+from .sync_retry import SyncRetryQueue
 
 logger = logging.getLogger(__name__)
 
+# Target capability required to sync changes from each changelog table
+TABLE_CAPABILITIES = {
+    'notebook_text_extractions': 'notebooks',
+    'pages': 'page_text',
+    'todos': 'todos',
+    'highlights': 'highlights',
+    'enhanced_highlights': 'highlights',
+}
+
 
 @dataclass
 class SyncQueueConfig:
     """Configuration for the sync queue processor."""
     batch_size: int = 10  # Number of items to process in one batch
-    retry_delay_base: int = 30  # Base delay in seconds for retries
+    retry_delay_base: int = 30  # Base delay in seconds for retries (doubles per attempt, jittered)
     max_retry_delay: int = 3600  # Maximum delay in seconds (1 hour)
-    max_retries: int = 5  # Maximum number of retry attempts
+    max_retries: int = 5  # Attempts before a change is dead-lettered
     concurrent_syncs: int = 3  # Number of concurrent sync operations
     health_check_interval: int = 300  # Health check interval in seconds (5 min)
     stale_threshold_hours: int = 24  # Consider syncs stale after this many hours
+    poll_interval: float = 30.0  # Safety-net poll when no wakeup arrives (seconds)
+    debounce_seconds: float = 0.2  # Wait after a wakeup so a burst of changes lands in one pass
+    doorbell_check_interval: float = 0.25  # How often to check for changes from other processes
 
 
 class SyncQueueProcessor:
@@ -50,9 +64,19 @@ class SyncQueueProcessor:
         self.dedup_service = DeduplicationService(db_manager)
         self.page_sync_manager = PageLevelSyncManager(db_manager, self.dedup_service)
         self.page_processor = PageAwareSyncProcessor(self, self.page_sync_manager)
+        self.retry_queue = SyncRetryQueue(
+            db_manager,
+            retry_delay_base=self.config.retry_delay_base,
+            max_retry_delay=self.config.max_retry_delay,
+            max_retries=self.config.max_retries
+        )
         self.logger = logging.getLogger(f"{__name__}.SyncQueueProcessor")
         self.is_running = False
         self._stop_event = asyncio.Event()
+        self._wakeup = asyncio.Event()
+        self._notifier = get_sync_notifier(db_manager)
+        self._doorbell_seen: Optional[str] = None
+        self._last_health_check = 0.0
     
     def add_target(self, target: SyncTarget) -> None:
         """Add a sync target to the processor."""
@@ -88,67 +112,109 @@ class SyncQueueProcessor:
         self.logger.info("Stopping sync queue processor")
         self.is_running = False
         self._stop_event.set()
+        self._wakeup.set()
     
     async def _run_processor(self) -> None:
-        """Main processing loop."""
+        """Main processing loop: runs a pass on every change notification, polling only as a safety net."""
+        loop = asyncio.get_running_loop()
+        self._notifier.subscribe(self._wakeup, loop)
+        self._doorbell_seen = self._notifier.read_doorbell()
+        last_batch: List[int] = []
+        
         try:
             while self.is_running:
+                # Changes tracked from here on will wake the next pass
+                self._wakeup.clear()
+                self._doorbell_seen = self._notifier.read_doorbell()
+                
                 # Process pending changes
-                await self._process_pending_changes()
+                batch = await self._process_pending_changes()
                 
                 # Retry failed syncs
                 await self._retry_failed_syncs()
                 
-                # Health check
-                await self._health_check()
-                
-                # Wait before next iteration
-                try:
-                    await asyncio.wait_for(
-                        self._stop_event.wait(), 
-                        timeout=30.0  # Check every 30 seconds
-                    )
-                    break  # Stop event was set
-                except asyncio.TimeoutError:
-                    continue  # Normal timeout, continue processing
+                # Health check (network calls, so not on every wakeup)
+                if loop.time() - self._last_health_check >= self.config.health_check_interval:
+                    self._last_health_check = loop.time()
+                    await self._health_check()
+                
+                # A full batch that made progress means more is waiting: go again right away
+                if len(batch) >= self.config.batch_size and batch != last_batch:
+                    last_batch = batch
+                    continue
+                last_batch = batch
+                
+                await self._wait_for_work()
                     
         except Exception as e:
             self.logger.error(f"Error in sync processor main loop: {e}")
         finally:
+            self._notifier.unsubscribe(self._wakeup)
             self.is_running = False
             self.logger.info("Sync queue processor stopped")
     
-    async def _process_pending_changes(self) -> None:
-        """Process pending changes from the sync_changelog."""
+    async def _wait_for_work(self) -> None:
+        """Wait for a change notification (in-process or doorbell), a stop, or the safety-net poll."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.config.poll_interval
+        
+        while self.is_running:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return  # Safety-net poll
+            try:
+                await asyncio.wait_for(
+                    self._wakeup.wait(),
+                    timeout=min(remaining, self.config.doorbell_check_interval)
+                )
+                break
+            except asyncio.TimeoutError:
+                if self._notifier.read_doorbell() != self._doorbell_seen:
+                    break  # Another process tracked changes
+        
+        # Debounce so e.g. all pages of a freshly OCR'd notebook go out in one pass
+        if self.is_running and self.config.debounce_seconds > 0:
+            try:
+                await asyncio.wait_for(self._stop_event.wait(), timeout=self.config.debounce_seconds)
+            except asyncio.TimeoutError:
+                pass
+    
+    async def _process_pending_changes(self) -> List[int]:
+        """Process pending changes from the sync_changelog; returns the changelog IDs fetched."""
         try:
             pending_changes = await self._get_pending_changes()
             
             if not pending_changes:
-                return
+                return []
             
             self.logger.info(f"Processing {len(pending_changes)} pending changes")
             
-            # Group changes by target for efficient processing
+            # Group changes by target: eligibility is a set lookup per target, not a check per change
+            changes_by_target: Dict[str, List[Dict[str, Any]]] = {}
             for target_name, target in self.targets.items():
-                self.logger.info(f"Checking {len(pending_changes)} changes for target {target_name}")
-                
-                target_changes = []
-                for change in pending_changes:
-                    should_sync = await self._should_sync_to_target(change, target)
-                    if should_sync:
-                        target_changes.append(change)
-                    else:
-                        self.logger.debug(f"Skipping change {change['id']} for target {target_name}: not supported")
+                eligible_tables = self._eligible_tables(target)
+                target_changes = [c for c in pending_changes if c['table_name'] in eligible_tables]
                 
                 self.logger.info(f"Target {target_name}: {len(target_changes)} eligible changes")
                 
                 if target_changes:
-                    await self._process_target_changes(target, target_changes)
+                    changes_by_target[target_name] = target_changes
                 else:
                     self.logger.warning(f"No changes eligible for target {target_name}")
+            
+            # Load records once for the whole batch (one query per source table), shared by all targets
+            sync_items = await self._prepare_sync_items(
+                [change for changes in changes_by_target.values() for change in changes]
+            )
+            
+            for target_name, target_changes in changes_by_target.items():
+                await self._process_target_changes(self.targets[target_name], target_changes, sync_items)
+            
+            return [change['id'] for change in pending_changes]
                     
         except Exception as e:
             self.logger.error(f"Error processing pending changes: {e}")
+            return []
     
     async def _get_pending_changes(self) -> List[Dict[str, Any]]:
         """Get pending changes from sync_changelog."""
@@ -166,69 +232,134 @@ class SyncQueueProcessor:
                     LIMIT ?
                 ''', (self.config.batch_size,))
                 
-                changes = []
-                for row in cursor.fetchall():
-                    changed_fields = json.loads(row[4]) if row[4] else {}
-                    changes.append({
-                        'id': row[0],
-                        'table_name': row[1],  # source_table
-                        'record_id': row[2],   # source_id
-                        'change_type': row[3], # operation
-                        'change_data': changed_fields,
-                        'created_at': row[5]   # changed_at
-                    })
-                
-                return changes
+                return [self._row_to_change(row) for row in cursor.fetchall()]
                 
         except Exception as e:
             self.logger.error(f"Error getting pending changes: {e}")
             return []
     
+    async def _get_changes_by_id(self, change_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+        """Load specific changelog entries (e.g. for retries), keyed by ID."""
+        if not change_ids:
+            return {}
+        try:
+            with self.db_manager.get_connection_context() as conn:
+                cursor = conn.cursor()
+                placeholders = ','.join('?' * len(change_ids))
+                cursor.execute(f'''
+                    SELECT sc.id, sc.source_table, sc.source_id, sc.operation, 
+                           sc.changed_fields, sc.changed_at
+                    FROM sync_changelog sc
+                    WHERE sc.id IN ({placeholders})
+                ''', change_ids)
+                return {row[0]: self._row_to_change(row) for row in cursor.fetchall()}
+                
+        except Exception as e:
+            self.logger.error(f"Error loading changes {change_ids}: {e}")
+            return {}
+    
+    @staticmethod
+    def _row_to_change(row) -> Dict[str, Any]:
+        changed_fields = json.loads(row[4]) if row[4] else {}
+        return {
+            'id': row[0],
+            'table_name': row[1],  # source_table
+            'record_id': row[2],   # source_id
+            'change_type': row[3], # operation
+            'change_data': changed_fields,
+            'created_at': row[5]   # changed_at
+        }
+    
+    @staticmethod
+    def _eligible_tables(target: SyncTarget) -> Set[str]:
+        """Changelog tables a target accepts, based on its declared capabilities."""
+        capabilities = target.get_target_info().get('capabilities', {})
+        return {
+            table_name for table_name, capability in TABLE_CAPABILITIES.items()
+            if capabilities.get(capability, False)
+        }
+    
     async def _should_sync_to_target(self, change: Dict[str, Any], target: SyncTarget) -> bool:
         """Determine if a change should be synced to a specific target."""
-        table_name = change['table_name']
-        change_type = change['change_type']
+        return change['table_name'] in self._eligible_tables(target)
+    
+    async def _prepare_sync_items(self, changes: List[Dict[str, Any]]) -> Dict[int, Optional[SyncItem]]:
+        """
+        Build sync items for a batch of changes, keyed by changelog ID.
         
-        # Get target capabilities
-        target_info = target.get_target_info()
-        capabilities = target_info.get('capabilities', {})
+        Records are loaded with one query per source table rather than one per
+        change. Page changes are skipped; the page processor handles them.
+        """
+        record_ids: Dict[str, Set[str]] = {}
+        for change in changes:
+            if change['table_name'] != 'pages':
+                record_ids.setdefault(change['table_name'], set()).add(str(change['record_id']))
         
-        self.logger.debug(f"Checking change {change['id']} ({table_name}) against target {target.target_name} capabilities: {capabilities}")
+        records = {
+            table_name: await self._get_records_data(table_name, list(ids))
+            for table_name, ids in record_ids.items()
+        }
         
-        # Check if target supports this type of content
-        if table_name == 'notebook_text_extractions' and capabilities.get('notebooks', False):
-            return True
-        elif table_name == 'pages' and capabilities.get('page_text', False):
-            return True
-        elif table_name == 'todos' and capabilities.get('todos', False):
-            return True
-        elif table_name == 'highlights' and capabilities.get('highlights', False):
-            return True
-        elif table_name == 'enhanced_highlights' and capabilities.get('highlights', False):
-            return True
+        sync_items: Dict[int, Optional[SyncItem]] = {}
+        for change in changes:
+            if change['table_name'] == 'pages' or change['id'] in sync_items:
+                continue
+            record_data = records[change['table_name']].get(str(change['record_id']))
+            sync_items[change['id']] = self._build_sync_item(change, record_data)
         
-        self.logger.debug(f"Change {change['id']} not eligible for target {target.target_name}: {table_name} not supported")
-        return False
+        return sync_items
     
-    async def _process_target_changes(self, target: SyncTarget, changes: List[Dict[str, Any]]) -> None:
+    async def _process_target_changes(self, target: SyncTarget, changes: List[Dict[str, Any]],
+                                      sync_items: Dict[int, Optional[SyncItem]]) -> None:
         """Process changes for a specific target."""
         try:
             self.logger.debug(f"Processing {len(changes)} changes for target {target.target_name}")
             
+            # One sync_records lookup for the whole batch instead of one per change
+            content_hashes = [
+                sync_items[change['id']].content_hash for change in changes if sync_items.get(change['id'])
+            ]
+            existing_ids = await self.dedup_service.find_duplicates(content_hashes, target.target_name)
+            
+            # Changes with the same content hash (e.g. several text extraction changes
+            # for one notebook) are synced once: run concurrently, each would miss the
+            # lookup above and create its own record in the target
+            lead_changes: List[Dict[str, Any]] = []
+            merged: Dict[int, List[Dict[str, Any]]] = {}
+            lead_by_hash: Dict[str, Dict[str, Any]] = {}
+            for change in changes:
+                sync_item = sync_items.get(change['id'])
+                lead = lead_by_hash.get(sync_item.content_hash) if sync_item else None
+                if lead is not None:
+                    merged[lead['id']].append(change)
+                    continue
+                if sync_item:
+                    lead_by_hash[sync_item.content_hash] = change
+                    merged[change['id']] = []
+                lead_changes.append(change)
+            
             # Create semaphore to limit concurrent syncs
             semaphore = asyncio.Semaphore(self.config.concurrent_syncs)
             
             # Process changes concurrently
             tasks = []
-            for change in changes:
+            for change in lead_changes:
+                sync_item = sync_items.get(change['id'])
+                existing_id = existing_ids.get(sync_item.content_hash) if sync_item else None
                 task = asyncio.create_task(
-                    self._process_single_change(target, change, semaphore)
+                    self._process_single_change(target, change, semaphore, sync_item, existing_id)
                 )
                 tasks.append(task)
             
             # Wait for all tasks to complete
             results = await asyncio.gather(*tasks, return_exceptions=True)
             
+            for lead in lead_changes:
+                for change in merged.get(lead['id'], ()):
+                    await self._mark_change_processed(change['id'], f"Merged into change {lead['id']}")
+                    self.retry_queue.complete(change['id'], target.target_name)
+            merged_count = len(changes) - len(lead_changes)
+            
             # Log results
             success_count = sum(1 for r in results if isinstance(r, bool) and r)
             error_count = sum(1 for r in results if isinstance(r, Exception))
@@ -236,14 +367,22 @@ class SyncQueueProcessor:
             self.logger.info(
                 f"Target {target.target_name}: {success_count} successful, "
                 f"{error_count} errors out of {len(changes)} changes"
+                + (f" ({merged_count} merged as duplicates)" if merged_count else "")
             )
             
         except Exception as e:
             self.logger.error(f"Error processing changes for target {target.target_name}: {e}")
     
     async def _process_single_change(self, target: SyncTarget, change: Dict[str, Any], 
-                                   semaphore: asyncio.Semaphore) -> bool:
-        """Process a single change for a target."""
+                                   semaphore: asyncio.Semaphore, sync_item: Optional[SyncItem],
+                                   existing_id: Optional[str]) -> bool:
+        """
+        Process a single change for a target.
+        
+        `sync_item` and `existing_id` come from the batch lookups in
+        _prepare_sync_items and DeduplicationService.find_duplicates, so only
+        the target calls happen here.
+        """
         async with semaphore:
             try:
                 self.logger.info(f"Processing change {change['id']}: {change['table_name']} - {change['record_id']}")
@@ -253,22 +392,14 @@ class SyncQueueProcessor:
                     self.logger.info(f"Delegating page change {change['id']} to page processor")
                     return await self.page_processor.process_page_change(change)
                 
-                # Convert change to sync item (for non-page changes)
-                self.logger.debug(f"Converting change {change['id']} to sync item")
-                sync_item = await self._change_to_sync_item(change)
                 if not sync_item:
                     self.logger.warning(f"Could not create sync item for change {change['id']}")
                     await self._mark_change_processed(change['id'], "No sync item created")
+                    self.retry_queue.complete(change['id'], target.target_name)
                     return False
                 
                 self.logger.info(f"Created sync item for {sync_item.item_type}: {sync_item.item_id}")
                 
-                # Check for duplicates
-                self.logger.debug(f"Checking for duplicates of {sync_item.content_hash}")
-                existing_id = await self.dedup_service.is_duplicate(
-                    sync_item.content_hash, target.target_name
-                )
-                
                 if existing_id:
                     # Update existing item
                     self.logger.info(f"Updating existing item {existing_id}")
@@ -297,20 +428,24 @@ class SyncQueueProcessor:
                     change['id'], 
                     f"Processing error: {str(e)}"
                 )
+                self.retry_queue.complete(change['id'], target.target_name)
                 return False
     
     async def _change_to_sync_item(self, change: Dict[str, Any]) -> Optional[SyncItem]:
         """Convert a changelog entry to a sync item."""
+        # Handle page-level changes specially
+        if change['table_name'] == 'pages':
+            return await self._handle_page_level_change(change)
+        
+        sync_items = await self._prepare_sync_items([change])
+        return sync_items.get(change['id'])
+    
+    def _build_sync_item(self, change: Dict[str, Any], record_data: Optional[Dict[str, Any]]) -> Optional[SyncItem]:
+        """Build the sync item for a changelog entry from its loaded record."""
         try:
             table_name = change['table_name']
             record_id = change['record_id']
             
-            # Handle page-level changes specially
-            if table_name == 'pages':
-                return await self._handle_page_level_change(change)
-            
-            # Get the actual record data
-            record_data = await self._get_record_data(table_name, record_id)
             if not record_data:
                 self.logger.warning(f"No record found for {table_name}.{record_id}")
                 return None
@@ -412,76 +547,83 @@ class SyncQueueProcessor:
     
     async def _get_record_data(self, table_name: str, record_id: str) -> Optional[Dict[str, Any]]:
         """Get the full record data for a table/record_id."""
+        records = await self._get_records_data(table_name, [str(record_id)])
+        return records.get(str(record_id))
+    
+    async def _get_records_data(self, table_name: str, record_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get the full record data for several records of one table, keyed by record ID."""
+        records: Dict[str, Dict[str, Any]] = {}
         try:
             with self.db_manager.get_connection_context() as conn:
                 cursor = conn.cursor()
                 
-                if table_name in ['notebook_text_extractions', 'notebooks']:
-                    # Get aggregated notebook data
-                    cursor.execute('''
-                        SELECT notebook_uuid, notebook_name, 
-                               GROUP_CONCAT(text, '\n\n') as full_text,
-                               COUNT(*) as page_count,
-                               AVG(confidence) as avg_confidence
-                        FROM notebook_text_extractions
-                        WHERE notebook_uuid = ?
-                        GROUP BY notebook_uuid, notebook_name
-                    ''', (record_id,))
+                for start in range(0, len(record_ids), SQL_VARIABLE_CHUNK):
+                    chunk = record_ids[start:start + SQL_VARIABLE_CHUNK]
+                    placeholders = ','.join('?' * len(chunk))
                     
-                    row = cursor.fetchone()
-                    if row:
-                        return {
-                            'notebook_uuid': row[0],
-                            'title': row[1] or 'Untitled Notebook',
-                            'text_content': row[2] or '',
-                            'page_count': row[3],
-                            'avg_confidence': row[4],
-                            'type': 'notebook'
-                        }
-                
-                elif table_name == 'todos':
-                    cursor.execute('''
-                        SELECT notebook_uuid, page_number, text, 
-                               confidence, created_at
-                        FROM todos
-                        WHERE id = ?
-                    ''', (record_id,))
+                    if table_name in ['notebook_text_extractions', 'notebooks']:
+                        # Get aggregated notebook data
+                        cursor.execute(f'''
+                            SELECT notebook_uuid, notebook_name, 
+                                   GROUP_CONCAT(text, '\n\n') as full_text,
+                                   COUNT(*) as page_count,
+                                   AVG(confidence) as avg_confidence
+                            FROM notebook_text_extractions
+                            WHERE notebook_uuid IN ({placeholders})
+                            GROUP BY notebook_uuid, notebook_name
+                        ''', chunk)
+                        
+                        for row in cursor.fetchall():
+                            records[str(row[0])] = {
+                                'notebook_uuid': row[0],
+                                'title': row[1] or 'Untitled Notebook',
+                                'text_content': row[2] or '',
+                                'page_count': row[3],
+                                'avg_confidence': row[4],
+                                'type': 'notebook'
+                            }
                     
-                    row = cursor.fetchone()
-                    if row:
-                        return {
-                            'notebook_uuid': row[0],
-                            'page_number': row[1],
-                            'text': row[2],
-                            'confidence': row[3],
-                            'created_at': row[4],
-                            'type': 'todo'
-                        }
-                
-                elif table_name in ['highlights', 'enhanced_highlights']:
-                    cursor.execute(f'''
-                        SELECT source_file, page_number, text, 
-                               corrected_text, created_at
-                        FROM {table_name}
-                        WHERE id = ?
-                    ''', (record_id,))
+                    elif table_name == 'todos':
+                        cursor.execute(f'''
+                            SELECT id, notebook_uuid, page_number, text, 
+                                   confidence, created_at
+                            FROM todos
+                            WHERE id IN ({placeholders})
+                        ''', chunk)
+                        
+                        for row in cursor.fetchall():
+                            records[str(row[0])] = {
+                                'notebook_uuid': row[1],
+                                'page_number': row[2],
+                                'text': row[3],
+                                'confidence': row[4],
+                                'created_at': row[5],
+                                'type': 'todo'
+                            }
                     
-                    row = cursor.fetchone()
-                    if row:
-                        return {
-                            'source_file': row[0],
-                            'page_number': row[1],
-                            'text': row[2],
-                            'corrected_text': row[3],
-                            'created_at': row[4],
-                            'type': 'highlight'
-                        }
-                
-                return None
+                    elif table_name in ['highlights', 'enhanced_highlights']:
+                        cursor.execute(f'''
+                            SELECT id, source_file, page_number, text, 
+                                   corrected_text, created_at
+                            FROM {table_name}
+                            WHERE id IN ({placeholders})
+                        ''', chunk)
+                        
+                        for row in cursor.fetchall():
+                            records[str(row[0])] = {
+                                'source_file': row[1],
+                                'page_number': row[2],
+                                'text': row[3],
+                                'corrected_text': row[4],
+                                'created_at': row[5],
+                                'type': 'highlight'
+                            }
+                
+            return records
                 
         except Exception as e:
-            self.logger.error(f"Error getting record data for {table_name}.{record_id}: {e}")
-            return None
+            self.logger.error(f"Error getting record data for {len(record_ids)} {table_name} records: {e}")
+            return {}
     
     async def _handle_sync_result(self, target: SyncTarget, item: SyncItem, 
                                 result: SyncResult, change_id: int, action: str) -> None:
@@ -502,6 +644,7 @@ class SyncQueueProcessor:
                     change_id,
                     f"Successfully {action}d in {target.target_name}: {result.target_id}"
                 )
+                self.retry_queue.complete(change_id, target.target_name)
                 
                 self.logger.debug(
                     f"Successfully {action}d {item.item_type} {item.item_id} "
@@ -517,6 +660,17 @@ class SyncQueueProcessor:
                     result.error_message
                 )
                 
+                # Hand the change over to the retry queue (backoff instead of
+                # re-sending it on every pass while it stays pending)
+                delay = self.retry_queue.schedule(
+                    change_id, target.target_name, item.content_hash, result.error_message
+                )
+                await self._mark_change_processed(
+                    change_id,
+                    f"Retry scheduled for {target.target_name}: {result.error_message}" if delay is not None
+                    else f"Dead-lettered for {target.target_name}: {result.error_message}"
+                )
+                
                 self.logger.warning(
                     f"Sync failed, will retry: {item.item_type} {item.item_id} "
                     f"to {target.target_name}: {result.error_message}"
@@ -535,6 +689,7 @@ class SyncQueueProcessor:
                     change_id,
                     f"Failed to sync to {target.target_name}: {result.error_message}"
                 )
+                self.retry_queue.complete(change_id, target.target_name)
                 
                 self.logger.error(
                     f"Sync permanently failed: {item.item_type} {item.item_id} "
@@ -547,66 +702,45 @@ class SyncQueueProcessor:
     async def _mark_change_processed(self, change_id: int, note: str = None) -> None:
         """Mark a change as processed in the sync_changelog."""
         try:
-            with self.db_manager.get_connection_context() as conn:
-                cursor = conn.cursor()
-                cursor.execute('''
-                    UPDATE sync_changelog 
-                    SET processed_at = CURRENT_TIMESTAMP,
-                        process_status = ?
-                    WHERE id = ?
-                ''', (note, change_id))
-                conn.commit()
+            self.db_manager.write(lambda conn: conn.execute('''
+                UPDATE sync_changelog 
+                SET processed_at = CURRENT_TIMESTAMP,
+                    process_status = ?
+                WHERE id = ?
+            ''', (note, change_id)))
                 
         except Exception as e:
             self.logger.error(f"Error marking change {change_id} as processed: {e}")
     
     async def _retry_failed_syncs(self) -> None:
-        """Retry failed sync operations with exponential backoff."""
+        """Re-run changes from the retry queue whose backoff has elapsed."""
         try:
-            # Get sync records that need retry
-            with self.db_manager.get_connection_context() as conn:
-                cursor = conn.cursor()
-                cursor.execute('''
-                    SELECT content_hash, target_name, retry_count, updated_at
-                    FROM sync_records
-                    WHERE status = 'retry'
-                    AND retry_count < ?
-                    AND updated_at < datetime('now', '-' || (? * (1 << retry_count)) || ' seconds')
-                    LIMIT ?
-                ''', (self.config.max_retries, self.config.retry_delay_base, self.config.batch_size))
-                
-                retry_records = cursor.fetchall()
-            
-            if not retry_records:
+            # Only due entries are read (partial index), however many failures have piled up
+            due = self.retry_queue.due(self.targets.keys(), self.config.batch_size)
+            if not due:
                 return
             
-            self.logger.info(f"Retrying {len(retry_records)} failed syncs")
+            self.logger.info(f"Retrying {len(due)} failed syncs")
+            
+            changes = await self._get_changes_by_id([entry['changelog_id'] for entry in due])
+            changes_by_target: Dict[str, List[Dict[str, Any]]] = {}
+            for entry in due:
+                change = changes.get(entry['changelog_id'])
+                if change is None:
+                    # Changelog row was cleaned up; nothing left to retry
+                    self.retry_queue.complete(entry['changelog_id'], entry['target_name'])
+                    continue
+                changes_by_target.setdefault(entry['target_name'], []).append(change)
             
-            # Process retries
-            for content_hash, target_name, retry_count, updated_at in retry_records:
-                if target_name in self.targets:
-                    await self._retry_single_sync(content_hash, target_name, retry_count)
+            sync_items = await self._prepare_sync_items(
+                [change for target_changes in changes_by_target.values() for change in target_changes]
+            )
+            for target_name, target_changes in changes_by_target.items():
+                await self._process_target_changes(self.targets[target_name], target_changes, sync_items)
                     
         except Exception as e:
             self.logger.error(f"Error retrying failed syncs: {e}")
     
-    async def _retry_single_sync(self, content_hash: str, target_name: str, retry_count: int) -> None:
-        """Retry a single failed sync operation."""
-        try:
-            # This would need to reconstruct the sync item from the original data
-            # For now, just update the retry count
-            await self.dedup_service.update_sync_status(
-                content_hash,
-                target_name,
-                SyncStatus.RETRY,
-                f"Retry attempt {retry_count + 1}"
-            )
-            
-            self.logger.debug(f"Scheduled retry {retry_count + 1} for {content_hash[:8]}... -> {target_name}")
-            
-        except Exception as e:
-            self.logger.error(f"Error retrying sync {content_hash} -> {target_name}: {e}")
-    
     async def _health_check(self) -> None:
         """Perform health checks on targets and detect stale syncs."""
         try:
@@ -656,6 +790,7 @@ class SyncQueueProcessor:
                 'targets': target_info,
                 'pending_changes': pending_changes,
                 'sync_records': dedup_stats,
+                'retry_queue': self.retry_queue.get_stats(),
                 'config': {
                     'batch_size': self.config.batch_size,
                     'max_retries': self.config.max_retries,
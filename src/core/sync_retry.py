@@ -0,0 +1,188 @@
+"""
+Persistent retry queue for failed syncs.
+
+A change whose sync to a target failed with a retryable error is handed from
+sync_changelog to this queue. Each entry carries `next_attempt_at` (jittered
+exponential backoff) and a partial index covers only pending entries, so a
+processor pass costs O(due retries) regardless of how many historical
+failures exist. After `max_retries` attempts an entry is dead-lettered.
+"""
+
+import logging
+import random
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Queue entry states
+RETRY_PENDING = 'pending'
+RETRY_DEAD = 'dead'
+
+
+class SyncRetryQueue:
+    """Schedules retries of changelog entries per target with jittered backoff."""
+
+    def __init__(self, db_manager, retry_delay_base: float = 30, max_retry_delay: float = 3600,
+                 max_retries: int = 5):
+        self.db_manager = db_manager
+        self.retry_delay_base = retry_delay_base
+        self.max_retry_delay = max_retry_delay
+        self.max_retries = max_retries
+        self._ensure_table()
+
+    def _ensure_table(self) -> None:
+        with self.db_manager.get_connection_context() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS sync_retry_queue (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    changelog_id INTEGER NOT NULL,
+                    target_name TEXT NOT NULL,
+                    content_hash TEXT,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    status TEXT NOT NULL DEFAULT 'pending',  -- pending | dead
+                    next_attempt_at REAL NOT NULL,           -- Unix epoch seconds
+                    last_error TEXT,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    UNIQUE(changelog_id, target_name)
+                )
+            ''')
+            # Only pending entries are indexed: dead letters never slow down due-item lookups
+            conn.execute('''
+                CREATE INDEX IF NOT EXISTS idx_sync_retry_due
+                ON sync_retry_queue(next_attempt_at) WHERE status = 'pending'
+            ''')
+            conn.commit()
+
+    def compute_delay(self, attempts: int) -> float:
+        """Backoff before attempt `attempts + 1`: exponential, capped, with equal jitter."""
+        delay = min(self.max_retry_delay, self.retry_delay_base * (2 ** max(0, attempts - 1)))
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    def schedule(self, changelog_id: int, target_name: str, content_hash: Optional[str] = None,
+                 error: Optional[str] = None) -> Optional[float]:
+        """
+        Record a failed attempt and schedule the next one.
+
+        Returns:
+            Seconds until the next attempt, or None if the entry was dead-lettered
+        """
+        def record_attempt(conn):
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT attempts FROM sync_retry_queue WHERE changelog_id = ? AND target_name = ?
+            ''', (changelog_id, target_name))
+            row = cursor.fetchone()
+            attempts = (row[0] if row else 0) + 1
+            now = time.time()
+
+            if attempts >= self.max_retries:
+                status, delay = RETRY_DEAD, None
+                next_attempt_at = now
+            else:
+                status, delay = RETRY_PENDING, self.compute_delay(attempts)
+                next_attempt_at = now + delay
+
+            cursor.execute('''
+                INSERT INTO sync_retry_queue
+                (changelog_id, target_name, content_hash, attempts, status, next_attempt_at, last_error)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(changelog_id, target_name) DO UPDATE SET
+                    content_hash = COALESCE(excluded.content_hash, content_hash),
+                    attempts = excluded.attempts,
+                    status = excluded.status,
+                    next_attempt_at = excluded.next_attempt_at,
+                    last_error = excluded.last_error,
+                    updated_at = CURRENT_TIMESTAMP
+            ''', (changelog_id, target_name, content_hash, attempts, status, next_attempt_at, error))
+
+            # Keep sync_records' counters meaningful for status reports and cleanup
+            if content_hash:
+                cursor.execute('''
+                    UPDATE sync_records
+                    SET retry_count = ?, status = ?, error_message = ?, updated_at = ?
+                    WHERE content_hash = ? AND target_name = ?
+                ''', (attempts, 'failed' if status == RETRY_DEAD else 'retry', error,
+                      datetime.now().isoformat(), content_hash, target_name))
+            return attempts, delay
+
+        # Read and update in one writer transaction, so concurrent failures can't lose an attempt
+        attempts, delay = self.db_manager.write(record_attempt)
+
+        if delay is None:
+            logger.error(f"☠️  Change {changelog_id} → {target_name} dead-lettered after {attempts} attempts: {error}")
+        else:
+            logger.info(f"🔁 Change {changelog_id} → {target_name}: retry {attempts}/{self.max_retries - 1} in {delay:.0f}s")
+        return delay
+
+    def due(self, target_names: Iterable[str], limit: int, now: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Pending entries whose next attempt is due, oldest first (served by the partial index)."""
+        target_names = list(target_names)
+        if not target_names:
+            return []
+        placeholders = ','.join('?' * len(target_names))
+        with self.db_manager.get_connection_context() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f'''
+                SELECT changelog_id, target_name, content_hash, attempts, last_error
+                FROM sync_retry_queue
+                WHERE status = 'pending' AND next_attempt_at <= ?
+                AND target_name IN ({placeholders})
+                ORDER BY next_attempt_at
+                LIMIT ?
+            ''', [now if now is not None else time.time(), *target_names, limit])
+            return [
+                {'changelog_id': row[0], 'target_name': row[1], 'content_hash': row[2],
+                 'attempts': row[3], 'last_error': row[4]}
+                for row in cursor.fetchall()
+            ]
+
+    def complete(self, changelog_id: int, target_name: str) -> None:
+        """Remove an entry after a successful (or permanently failed) attempt."""
+        self.db_manager.write(lambda conn: conn.execute(
+            'DELETE FROM sync_retry_queue WHERE changelog_id = ? AND target_name = ?',
+            (changelog_id, target_name)))
+
+    def dead_letters(self, limit: int = 100) -> List[Dict[str, Any]]:
+        """Entries that exhausted their retries, newest first."""
+        with self.db_manager.get_connection_context() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT changelog_id, target_name, content_hash, attempts, last_error, updated_at
+                FROM sync_retry_queue WHERE status = 'dead'
+                ORDER BY updated_at DESC LIMIT ?
+            ''', (limit,))
+            return [
+                {'changelog_id': row[0], 'target_name': row[1], 'content_hash': row[2],
+                 'attempts': row[3], 'last_error': row[4], 'updated_at': row[5]}
+                for row in cursor.fetchall()
+            ]
+
+    def purge_dead_letters(self, older_than_hours: int = 24) -> int:
+        """Delete dead letters older than the given age; returns the number removed."""
+        return self.db_manager.write(lambda conn: conn.execute('''
+            DELETE FROM sync_retry_queue
+            WHERE status = 'dead' AND updated_at < datetime('now', ?)
+        ''', (f'-{int(older_than_hours)} hours',)).rowcount)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Counts of pending/due/dead entries."""
+        with self.db_manager.get_connection_context() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT status, COUNT(*) FROM sync_retry_queue GROUP BY status')
+            counts = dict(cursor.fetchall())
+            cursor.execute('''
+                SELECT COUNT(*) FROM sync_retry_queue
+                WHERE status = 'pending' AND next_attempt_at <= ?
+            ''', (time.time(),))
+            due_count = cursor.fetchone()[0]
+            cursor.execute("SELECT MIN(next_attempt_at) FROM sync_retry_queue WHERE status = 'pending'")
+            next_at = cursor.fetchone()[0]
+        return {
+            'pending': counts.get(RETRY_PENDING, 0),
+            'due': due_count,
+            'dead': counts.get(RETRY_DEAD, 0),
+            'next_attempt_in_s': max(0.0, next_at - time.time()) if next_at is not None else None,
+        }
@@ -12,6 +12,7 @@ Key Features:
 - Support for incremental and real-time sync
 """
 
+import asyncio
 import json
 import logging
 from abc import ABC, abstractmethod
@@ -20,6 +21,7 @@ from typing import Any, Dict, List, Optional, Set, Union
 
 from .database import DatabaseManager
 from .sync_engine import SyncItem, SyncResult, SyncStatus, SyncItemType, ContentFingerprint
+from .sync_retry import SyncRetryQueue
 
 logger = logging.getLogger(__name__)
 
@@ -41,7 +43,7 @@ class UnifiedSyncManager:
     def _ensure_sync_records_table(self):
         """Ensure the unified sync_records table exists with all required columns."""
         try:
-            with self.db_manager.get_connection() as conn:
+            def create_tables(conn):
                 cursor = conn.cursor()
                 cursor.execute('''
                     CREATE TABLE IF NOT EXISTS sync_records (
@@ -69,6 +71,8 @@ class UnifiedSyncManager:
                     'CREATE INDEX IF NOT EXISTS idx_sync_records_status ON sync_records(status)',
                     'CREATE INDEX IF NOT EXISTS idx_sync_records_item_id ON sync_records(item_id)',
                     'CREATE INDEX IF NOT EXISTS idx_sync_records_content_target_item ON sync_records(content_hash, target_name, item_id)',
+                    # Partial index: cleanup only touches failed rows
+                    "CREATE INDEX IF NOT EXISTS idx_sync_records_failed ON sync_records(updated_at) WHERE status = 'failed'",
                 ]
                 
                 for index_sql in indexes:
@@ -107,8 +111,8 @@ class UnifiedSyncManager:
                 for index_sql in page_indexes:
                     cursor.execute(index_sql)
 
-                conn.commit()
-                self.logger.debug("Unified sync_records and page_sync_records tables with indexes ensured")
+            self.db_manager.write(create_tables)
+            self.logger.debug("Unified sync_records and page_sync_records tables with indexes ensured")
         except Exception as e:
             self.logger.error(f"Error ensuring sync records table: {e}")
             raise
@@ -403,7 +407,7 @@ class UnifiedSyncManager:
             metadata: Additional metadata to store
         """
         try:
-            with self.db_manager.get_connection() as conn:
+            def record(conn):
                 cursor = conn.cursor()
                 now = datetime.utcnow().isoformat()
                 synced_at = now if result.success else None
@@ -476,7 +480,8 @@ class UnifiedSyncManager:
 
                     self.logger.debug(f"Recorded sync result: {content_hash[:8]}... -> {target_name} = {result.status.value}")
 
-                conn.commit()
+            # Queued on the database writer; the event loop keeps running until it commits
+            await asyncio.wrap_future(self.db_manager.submit_write(record))
 
         except Exception as e:
             self.logger.error(f"Error recording sync result: {e}")
@@ -836,21 +841,20 @@ class UnifiedSyncManager:
             older_than_hours: Only clean up failures older than this many hours
         """
         try:
-            with self.db_manager.get_connection() as conn:
-                cursor = conn.cursor()
-                
-                cursor.execute('''
-                    DELETE FROM sync_records 
-                    WHERE status = 'failed' 
-                    AND retry_count >= ?
-                    AND updated_at < datetime('now', '-{} hours')
-                '''.format(older_than_hours), (max_retries,))
-                
-                deleted_count = cursor.rowcount
-                conn.commit()
-                
-                if deleted_count > 0:
-                    self.logger.info(f"Cleaned up {deleted_count} failed sync records")
+            deleted_count = self.db_manager.write(lambda conn: conn.execute('''
+                DELETE FROM sync_records 
+                WHERE status = 'failed' 
+                AND retry_count >= ?
+                AND updated_at < datetime('now', '-{} hours')
+            '''.format(older_than_hours), (max_retries,)).rowcount)
+            
+            if deleted_count > 0:
+                self.logger.info(f"Cleaned up {deleted_count} failed sync records")
+            
+            # Dead letters in the retry queue age out on the same schedule
+            purged = SyncRetryQueue(self.db_manager).purge_dead_letters(older_than_hours)
+            if purged > 0:
+                self.logger.info(f"Purged {purged} dead-lettered retries")
                     
         except Exception as e:
             self.logger.error(f"Error cleaning up failed syncs: {e}")
@@ -858,7 +862,6 @@ class UnifiedSyncManager:
 
 if __name__ == "__main__":
     # Example usage
-    import asyncio
     from .database import DatabaseManager
     
     async def test_unified_sync():
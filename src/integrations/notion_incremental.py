@@ -225,26 +225,20 @@ class NotionSyncTracker:
     def mark_notebook_synced(self, notebook_uuid: str, notion_page_id: str, 
                            content_hash: str, metadata_hash: str, total_pages: int):
         """Mark a notebook as synced with current state."""
-        with self.db_manager.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute('''
-                INSERT OR REPLACE INTO notion_notebook_sync 
-                (notebook_uuid, notion_page_id, content_hash, metadata_hash, total_pages, last_synced)
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', (notebook_uuid, notion_page_id, content_hash, metadata_hash, total_pages, datetime.now()))
-            conn.commit()
+        self.db_manager.write(lambda conn: conn.execute('''
+            INSERT OR REPLACE INTO notion_notebook_sync 
+            (notebook_uuid, notion_page_id, content_hash, metadata_hash, total_pages, last_synced)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', (notebook_uuid, notion_page_id, content_hash, metadata_hash, total_pages, datetime.now())))
     
     def mark_page_synced(self, notebook_uuid: str, page_number: int, page_uuid: str, 
                         content_hash: str, notion_block_id: Optional[str] = None, page_content: Optional[str] = None):
         """Mark a specific page as synced."""
-        with self.db_manager.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute('''
-                INSERT OR REPLACE INTO notion_page_sync 
-                (notebook_uuid, page_number, page_uuid, content_hash, notion_block_id, last_synced, last_synced_content)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            ''', (notebook_uuid, page_number, page_uuid, content_hash, notion_block_id, datetime.now(), page_content))
-            conn.commit()
+        self.db_manager.write(lambda conn: conn.execute('''
+            INSERT OR REPLACE INTO notion_page_sync 
+            (notebook_uuid, page_number, page_uuid, content_hash, notion_block_id, last_synced, last_synced_content)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', (notebook_uuid, page_number, page_uuid, content_hash, notion_block_id, datetime.now(), page_content)))
     
     def get_synced_notebooks(self) -> Set[str]:
         """Get set of notebook UUIDs that have been synced to Notion."""
@@ -255,11 +249,11 @@ class NotionSyncTracker:
     
     def remove_sync_record(self, notebook_uuid: str):
         """Remove sync tracking for a notebook (e.g., if deleted from Notion)."""
-        with self.db_manager.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute('DELETE FROM notion_notebook_sync WHERE notebook_uuid = ?', (notebook_uuid,))
-            cursor.execute('DELETE FROM notion_page_sync WHERE notebook_uuid = ?', (notebook_uuid,))
-            conn.commit()
+        def remove(conn):
+            conn.execute('DELETE FROM notion_notebook_sync WHERE notebook_uuid = ?', (notebook_uuid,))
+            conn.execute('DELETE FROM notion_page_sync WHERE notebook_uuid = ?', (notebook_uuid,))
+        
+        self.db_manager.write(remove)
     
     def _calculate_content_hash(self, pages_data: List[Tuple]) -> str:
         """Calculate hash of all page content for a notebook."""
@@ -0,0 +1,170 @@
+"""
+Local index of the Notion pages that belong to our notebooks.
+
+Finding a notebook's page used to cost one `databases.query` per notebook.
+The index maps notebook UUID -> (Notion page ID, last_edited_time, property
+hash) for one Notion database and is:
+
+- bulk-populated with a single paginated `databases.query`
+- refreshed incrementally with a `last_edited_time` filter
+- kept current from our own page creates/updates
+
+so lookups are local and a library-wide sync needs only a handful of list
+calls.
+"""
+
+import logging
+import time
+from typing import Any, Callable, ContextManager, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+NOTEBOOK_UUID_PROPERTY = "Notebook UUID"
+
+
+class NotionPageIndex:
+    """notebook_uuid -> Notion page mapping for one Notion database."""
+
+    def __init__(self, database_id: str, connection_factory: Callable[[], ContextManager],
+                 write: Optional[Callable[[Callable], Any]] = None, refresh_interval: float = 60):
+        """
+        Args:
+            database_id: Notion database the pages live in
+            connection_factory: Returns a context manager yielding a connection to
+                the main DB and committing on exit (NotionNotebookSync._audit_conn)
+            write: Runs a write command on the main DB's writer
+                (NotionNotebookSync._audit_write); defaults to a connection_factory connection
+            refresh_interval: Minimum seconds between miss-triggered refreshes
+        """
+        self.database_id = database_id
+        self._conn = connection_factory
+        self._write = write or self._write_on_connection
+        self.refresh_interval = refresh_interval
+        self._last_refresh = 0.0
+        self._ensure_table()
+
+    def _write_on_connection(self, command: Callable) -> Any:
+        with self._conn() as conn:
+            return command(conn)
+
+    def _ensure_table(self) -> None:
+        with self._conn() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS notion_page_index (
+                    database_id TEXT NOT NULL,
+                    notebook_uuid TEXT NOT NULL,
+                    notion_page_id TEXT NOT NULL,
+                    last_edited_time TEXT,   -- Notion's timestamp (refresh watermark)
+                    property_hash TEXT,      -- Hash of the properties we last pushed
+                    indexed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    PRIMARY KEY (database_id, notebook_uuid)
+                )
+            ''')
+            conn.execute('''
+                CREATE INDEX IF NOT EXISTS idx_notion_page_index_page
+                ON notion_page_index(notion_page_id)
+            ''')
+
+    def get_entry(self, notebook_uuid: str) -> Optional[Dict[str, Any]]:
+        """Indexed page for a notebook, or None if unknown."""
+        with self._conn() as conn:
+            row = conn.execute('''
+                SELECT notion_page_id, last_edited_time, property_hash
+                FROM notion_page_index
+                WHERE database_id = ? AND notebook_uuid = ?
+            ''', (self.database_id, notebook_uuid)).fetchone()
+        if not row:
+            return None
+        return {'page_id': row[0], 'last_edited_time': row[1], 'property_hash': row[2]}
+
+    def lookup(self, notebook_uuid: str) -> Optional[str]:
+        """Notion page ID for a notebook from the local index only."""
+        entry = self.get_entry(notebook_uuid)
+        return entry['page_id'] if entry else None
+
+    def record(self, notebook_uuid: str, page_id: str, last_edited_time: Optional[str] = None,
+               property_hash: Optional[str] = None) -> None:
+        """Record a page we created/updated (or saw while listing the database)."""
+        self._write(lambda conn: self._upsert(conn, [(notebook_uuid, page_id, last_edited_time, property_hash)]))
+
+    def _upsert(self, conn, rows: List[Tuple[str, str, Optional[str], Optional[str]]]) -> None:
+        conn.executemany('''
+            INSERT INTO notion_page_index
+            (database_id, notebook_uuid, notion_page_id, last_edited_time, property_hash)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(database_id, notebook_uuid) DO UPDATE SET
+                notion_page_id = excluded.notion_page_id,
+                last_edited_time = COALESCE(excluded.last_edited_time, last_edited_time),
+                property_hash = CASE
+                    WHEN excluded.notion_page_id != notion_page_id THEN excluded.property_hash
+                    ELSE COALESCE(excluded.property_hash, property_hash)
+                END,
+                indexed_at = CURRENT_TIMESTAMP
+        ''', [(self.database_id, *row) for row in rows])
+
+    def remove_page(self, page_id: str) -> None:
+        """Drop a page that no longer exists (deleted/archived in Notion)."""
+        self._write(lambda conn: conn.execute(
+            'DELETE FROM notion_page_index WHERE database_id = ? AND notion_page_id = ?',
+            (self.database_id, page_id)))
+        logger.info(f"🗂️ Removed stale Notion page {page_id} from page index")
+
+    def get_watermark(self) -> Optional[str]:
+        """Newest last_edited_time in the index, or None if it was never populated."""
+        with self._conn() as conn:
+            row = conn.execute('SELECT MAX(last_edited_time) FROM notion_page_index WHERE database_id = ?',
+                               (self.database_id,)).fetchone()
+        return row[0] if row else None
+
+    def refresh(self, client, force: bool = False) -> int:
+        """
+        List the database and index every notebook page.
+
+        The first refresh lists all pages; later ones only pages edited since the
+        newest indexed last_edited_time. Unless forced, refreshes are throttled to
+        one per `refresh_interval`.
+
+        Returns:
+            Number of pages indexed
+        """
+        if not force and time.time() - self._last_refresh < self.refresh_interval:
+            return 0
+
+        watermark = self.get_watermark()
+        query: Dict[str, Any] = {'database_id': self.database_id, 'page_size': 100}
+        if watermark:
+            query['filter'] = {'timestamp': 'last_edited_time', 'last_edited_time': {'on_or_after': watermark}}
+
+        indexed = 0
+        requests = 0
+        seen = set()
+        while True:
+            response = client.databases.query(**query)
+            requests += 1
+            rows = []
+            for page in response.get('results', []):
+                notebook_uuid = _notebook_uuid(page)
+                if not notebook_uuid:
+                    continue
+                if notebook_uuid in seen:
+                    logger.warning(f"⚠️ Multiple Notion pages for notebook {notebook_uuid}; indexing {page['id']}")
+                seen.add(notebook_uuid)
+                rows.append((notebook_uuid, page['id'], page.get('last_edited_time'), None))
+            if rows:
+                self._write(lambda conn: self._upsert(conn, rows))
+                indexed += len(rows)
+            if not (response.get('has_more') and response.get('next_cursor')):
+                break
+            query['start_cursor'] = response['next_cursor']
+
+        self._last_refresh = time.time()
+        logger.info(f"🗂️ Notion page index {'updated' if watermark else 'populated'}: "
+                    f"{indexed} pages in {requests} requests")
+        return indexed
+
+
+def _notebook_uuid(page: Dict[str, Any]) -> Optional[str]:
+    """The 'Notebook UUID' rich_text property of a database page."""
+    rich_text = page.get('properties', {}).get(NOTEBOOK_UUID_PROPERTY, {}).get('rich_text', [])
+    value = ''.join(part.get('plain_text') or part.get('text', {}).get('content', '') for part in rich_text)
+    return value.strip() or None
@@ -0,0 +1,75 @@
+"""
+Token bucket shared by Notion API callers.
+
+Notion allows an average of about three requests per second per integration.
+Callers reserve a token before every request; the bucket hands out wait times
+instead of blocking under its lock, so the same instance works from threads,
+synchronous code and any asyncio event loop.
+
+The notebook sync client (pages, metadata, blocks, database queries) is paced
+through an httpx request hook; the todo export acquires tokens explicitly so
+its worker pool can wait without blocking the event loop.
+"""
+
+import asyncio
+import threading
+import time
+from typing import Dict
+
+# Notion's documented average rate limit
+NOTION_REQUESTS_PER_SECOND = 3.0
+
+
+class NotionTokenBucket:
+    """Token bucket allowing short bursts up to `capacity` at `rate` requests/second."""
+
+    def __init__(self, rate: float = NOTION_REQUESTS_PER_SECOND, capacity: float = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take a token and return how long to wait before using it."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def acquire(self) -> None:
+        """Block until a request may be sent."""
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self) -> None:
+        """Wait (without blocking the event loop) until a request may be sent."""
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+_shared_bucket = None
+_shared_lock = threading.Lock()
+
+
+def get_notion_bucket() -> NotionTokenBucket:
+    """Process-wide bucket, so concurrent Notion syncs share one budget."""
+    global _shared_bucket
+    with _shared_lock:
+        if _shared_bucket is None:
+            _shared_bucket = NotionTokenBucket()
+        return _shared_bucket
+
+
+def httpx_event_hooks(bucket: NotionTokenBucket = None) -> Dict[str, list]:
+    """Event hooks for an httpx.Client that take a token before every request it sends."""
+    bucket = bucket or get_notion_bucket()
+
+    def on_request(request):
+        bucket.acquire()
+
+    return {'request': [on_request], 'response': []}
@@ -8,17 +8,22 @@ creating a page for each notebook with content organized by pages in reverse ord
 
 import os
 import re
+import json
+import hashlib
 import contextlib
 import logging
 import sqlite3
-import time
 from typing import List, Dict, Optional, Tuple
 from dataclasses import dataclass
 from datetime import datetime
 
 from .notion_markdown import MarkdownToNotionConverter
 from .notion_incremental import NotionSyncTracker, should_sync_notebook, log_sync_decision
+from .notion_page_index import NotionPageIndex
+from .notion_rate_limit import httpx_event_hooks as rate_limit_hooks
+from ..core.database import get_database_writer
 from ..core.notebook_paths import update_notebook_metadata
+from ..utils import metrics
 
 try:
     from notion_client import Client
@@ -106,15 +111,16 @@ class NotionNotebookSync:
         if not NOTION_AVAILABLE:
             raise ImportError("notion-client package not installed. Run: pip install notion-client")
         
-        # Configure SSL verification
+        # Configure SSL verification; every request waits for the shared Notion token bucket
         import httpx
-        if verify_ssl:
-            self.client = Client(auth=notion_token)
-        else:
+        event_hooks = rate_limit_hooks()
+        for hook_type, hooks in metrics.httpx_event_hooks('notion').items():
+            event_hooks[hook_type].extend(hooks)
+        if not verify_ssl:
             # Create client with SSL verification disabled
             logger.warning("⚠️ SSL verification disabled for Notion API calls")
-            http_client = httpx.Client(verify=False)
-            self.client = Client(auth=notion_token, client=http_client)
+        http_client = httpx.Client(verify=verify_ssl, event_hooks=event_hooks)
+        self.client = Client(auth=notion_token, client=http_client)
             
         self.database_id = database_id
         self.markdown_converter = MarkdownToNotionConverter()
@@ -138,6 +144,13 @@ class NotionNotebookSync:
         logger.info(f"🧾 Notion sync audit enabled — run_id={self.run_id} "
                     f"(table notion_sync_audit in {self.audit_db_path})")
 
+        # Local notebook_uuid -> page index (same DB as the audit trail)
+        try:
+            self.page_index = NotionPageIndex(database_id, self._audit_conn, self._audit_write)
+        except Exception as e:
+            logger.warning(f"⚠️ Notion page index unavailable, querying Notion per notebook: {e}")
+            self.page_index = None
+
     @contextlib.contextmanager
     def _audit_conn(self):
         """Yield a connection to the MAIN db for audit writes and commit on success.
@@ -157,6 +170,12 @@ class NotionNotebookSync:
             finally:
                 conn.close()
 
+    def _audit_write(self, command):
+        """Run a write command on the MAIN db through its database writer."""
+        if self.db_manager is not None:
+            return self.db_manager.write(command)
+        return get_database_writer(self.audit_db_path).write(command)
+
     def _ensure_audit_table(self) -> None:
         """Create the append-only notion_sync_audit table if it doesn't exist."""
         try:
@@ -185,14 +204,13 @@ class NotionNotebookSync:
                possible_duplicate: bool = False) -> None:
         """Record one Notion write to the audit trail. Never raises (must not break a sync)."""
         try:
-            with self._audit_conn() as con:
-                con.execute('''
-                    INSERT INTO notion_sync_audit
-                    (run_id, operation, notebook_uuid, notebook_name, page_number,
-                     notion_page_id, notion_block_id, possible_duplicate)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (self.run_id, operation, notebook_uuid, notebook_name, page_number,
-                      notion_page_id, notion_block_id, 1 if possible_duplicate else 0))
+            self._audit_write(lambda con: con.execute('''
+                INSERT INTO notion_sync_audit
+                (run_id, operation, notebook_uuid, notebook_name, page_number,
+                 notion_page_id, notion_block_id, possible_duplicate)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (self.run_id, operation, notebook_uuid, notebook_name, page_number,
+                  notion_page_id, notion_block_id, 1 if possible_duplicate else 0)))
         except Exception as e:
             logger.warning(f"⚠️ notion audit write failed ({operation}): {e}")
         # Surface in the live log too (each block_append = one block created on Notion)
@@ -227,66 +245,155 @@ class NotionNotebookSync:
         except Exception as e:
             logger.warning(f"⚠️ Could not audit created page blocks for {page_id}: {e}")
 
+    def _index_page(self, notebook_uuid: Optional[str], response: Optional[Dict],
+                    properties_hash: Optional[str] = None) -> None:
+        """Keep the page index current from a pages.create/pages.update response."""
+        if not self.page_index or not notebook_uuid or not response or not response.get("id"):
+            return
+        try:
+            self.page_index.record(notebook_uuid, response["id"], response.get("last_edited_time"),
+                                   properties_hash)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not update Notion page index for {notebook_uuid}: {e}")
+
+    def _forget_missing_page(self, page_id: str, error: Exception) -> None:
+        """Drop an indexed page that Notion reports as deleted or archived."""
+        if self.page_index and (getattr(error, 'code', None) == 'object_not_found'
+                                or 'archived' in str(error).lower()):
+            try:
+                self.page_index.remove_page(page_id)
+            except Exception as e:
+                logger.warning(f"⚠️ Could not update Notion page index: {e}")
+
+    def build_metadata_properties(self, notebook: Notebook) -> Dict:
+        """
+        Metadata properties for a notebook page.
+
+        Excludes the volatile "Last Updated" stamp so the payload (and its hash)
+        only changes when the notebook itself does.
+        """
+        properties = {
+            "Name": {
+                "title": [
+                    {
+                        "text": {
+                            "content": notebook.name
+                        }
+                    }
+                ]
+            },
+            "Total Pages": {
+                "number": notebook.total_pages
+            }
+        }
+        
+        if notebook.metadata:
+            # Add path information
+            if notebook.metadata.full_path:
+                properties["reMarkable Path"] = {
+                    "rich_text": [
+                        {
+                            "text": {
+                                "content": notebook.metadata.full_path
+                            }
+                        }
+                    ]
+                }
+            
+            # Add path tags
+            if notebook.metadata.path_tags:
+                properties["Tags"] = {
+                    "multi_select": [
+                        {"name": tag} for tag in notebook.metadata.path_tags
+                    ]
+                }
+            
+            # Add last modified date
+            if notebook.metadata.last_modified:
+                properties["Last Modified"] = {
+                    "date": {
+                        "start": notebook.metadata.last_modified.isoformat()
+                    }
+                }
+            
+            # Add last opened date
+            if notebook.metadata.last_opened:
+                properties["Last Viewed"] = {
+                    "date": {
+                        "start": notebook.metadata.last_opened.isoformat()
+                    }
+                }
+        
+        return properties
+
+    @staticmethod
+    def property_hash(properties: Dict) -> str:
+        """Stable hash of a property payload."""
+        return hashlib.sha256(json.dumps(properties, sort_keys=True, default=str).encode()).hexdigest()
+
+    def push_metadata_updates(self, notebooks: List[Notebook]) -> int:
+        """
+        Push metadata properties for notebooks whose payload changed since the last push.
+
+        Notebooks whose property hash matches the one stored in the page index are
+        skipped; the rest are sent as one burst of pages.update calls, paced by the
+        shared Notion token bucket.
+
+        Returns:
+            Number of pages updated
+        """
+        pending = []
+        unchanged = 0
+        for notebook in notebooks:
+            try:
+                existing_page_id = self.find_existing_page(notebook.uuid)
+                if not existing_page_id:
+                    logger.debug(f"⚠️ No existing Notion page found for: {notebook.name}")
+                    continue
+                
+                properties = self.build_metadata_properties(notebook)
+                properties_hash = self.property_hash(properties)
+                entry = self.page_index.get_entry(notebook.uuid) if self.page_index else None
+                if entry and entry['page_id'] == existing_page_id and entry['property_hash'] == properties_hash:
+                    unchanged += 1
+                    continue
+                pending.append((notebook, existing_page_id, properties, properties_hash))
+            except Exception as e:
+                logger.error(f"Failed to prepare Notion metadata for {notebook.name}: {e}")
+        
+        if unchanged:
+            logger.info(f"⏭️ Notion metadata unchanged for {unchanged} notebooks - skipping update")
+        
+        updated_count = 0
+        for notebook, page_id, properties, properties_hash in pending:
+            try:
+                logger.debug(f"📝 Updating Notion metadata for: {notebook.name}")
+                properties["Last Updated"] = {"date": {"start": datetime.now().isoformat()}}
+                # Update only properties, not content
+                response = self.client.pages.update(page_id=page_id, properties=properties)
+                self._index_page(notebook.uuid, response, properties_hash)
+                updated_count += 1
+            except APIResponseError as e:
+                logger.error(f"Failed to update Notion metadata for {notebook.name}: {e}")
+                self._forget_missing_page(page_id, e)
+            except Exception as e:
+                logger.error(f"Failed to update Notion metadata for {notebook.name}: {e}")
+        
+        return updated_count
+
     def refresh_notion_metadata_for_specific_notebooks(self, db_connection, notebook_uuids: set) -> int:
         """Refresh Notion metadata properties only for specific notebooks."""
         if not notebook_uuids:
             logger.debug("No notebooks specified for Notion metadata refresh")
             return 0
             
-        refreshed_count = 0
         logger.info(f"🔄 Refreshing Notion metadata for {len(notebook_uuids)} changed notebooks...")
         
         # Fetch notebooks that have changed metadata
         notebooks = self.fetch_notebooks_from_db(db_connection, refresh_changed_metadata=False)
         changed_notebooks = [nb for nb in notebooks if nb.uuid in notebook_uuids]
         
-        for notebook in changed_notebooks:
-            try:
-                existing_page_id = self.find_existing_page(notebook.uuid)
-                
-                if existing_page_id:
-                    logger.debug(f"📝 Updating Notion metadata for: {notebook.name}")
-                    
-                    # Build metadata properties
-                    properties = {
-                        "Total Pages": {"number": notebook.total_pages},
-                        "Last Updated": {"date": {"start": datetime.now().isoformat()}}
-                    }
-                    
-                    if notebook.metadata:
-                        # Add path tags
-                        if notebook.metadata.path_tags:
-                            properties["Tags"] = {
-                                "multi_select": [
-                                    {"name": tag} for tag in notebook.metadata.path_tags
-                                ]
-                            }
-                        
-                        # Add last modified date
-                        if notebook.metadata.last_modified:
-                            properties["Last Modified"] = {
-                                "date": {
-                                    "start": notebook.metadata.last_modified.isoformat()
-                                }
-                            }
-                        
-                        # Add last viewed date
-                        if notebook.metadata.last_opened:
-                            properties["Last Viewed"] = {
-                                "date": {
-                                    "start": notebook.metadata.last_opened.isoformat()
-                                }
-                            }
-                    
-                    # Update only properties, not content
-                    self.client.pages.update(page_id=existing_page_id, properties=properties)
-                    refreshed_count += 1
-                    
-                else:
-                    logger.debug(f"⚠️ No existing Notion page found for: {notebook.name}")
-                    
-            except Exception as e:
-                logger.error(f"Failed to update Notion metadata for {notebook.name}: {e}")
+        refreshed_count = self.push_metadata_updates(changed_notebooks)
         
         logger.info(f"✅ Refreshed Notion metadata for {refreshed_count} notebooks")
         return refreshed_count
@@ -371,17 +478,10 @@ class NotionNotebookSync:
             Notion page ID of created page
         """
         try:
-            # Prepare page properties
-            properties = {
-                "Name": {
-                    "title": [
-                        {
-                            "text": {
-                                "content": notebook.name
-                            }
-                        }
-                    ]
-                },
+            # Same metadata properties as push_metadata_updates, plus the fields only set on create
+            metadata_properties = self.build_metadata_properties(notebook)
+            properties = dict(metadata_properties)
+            properties.update({
                 "Notebook UUID": {
                     "rich_text": [
                         {
@@ -391,54 +491,12 @@ class NotionNotebookSync:
                         }
                     ]
                 },
-                "Total Pages": {
-                    "number": notebook.total_pages
-                },
                 "Last Updated": {
                     "date": {
                         "start": datetime.now().isoformat()
                     }
                 }
-            }
-            
-            # Add metadata properties if available
-            if notebook.metadata:
-                # Add path information
-                if notebook.metadata.full_path:
-                    properties["reMarkable Path"] = {
-                        "rich_text": [
-                            {
-                                "text": {
-                                    "content": notebook.metadata.full_path
-                                }
-                            }
-                        ]
-                    }
-                
-                # Add path tags
-                if notebook.metadata.path_tags:
-                    properties["Tags"] = {
-                        "multi_select": [
-                            {"name": tag} for tag in notebook.metadata.path_tags
-                        ]
-                    }
-                
-                # Add last modified date
-                if notebook.metadata.last_modified:
-                    properties["Last Modified"] = {
-                        "date": {
-                            "start": notebook.metadata.last_modified.isoformat()
-                        }
-                    }
-                
-                # Add last opened date
-                if notebook.metadata.last_opened:
-                    properties["Last Viewed"] = {
-                        "date": {
-                            "start": notebook.metadata.last_opened.isoformat()
-                        }
-                    }
-            
+            })
             
             # Create children blocks (page content)
             children = self._create_page_content_blocks(notebook)
@@ -451,6 +509,8 @@ class NotionNotebookSync:
             )
             
             page_id = response["id"]
+            self._index_page(getattr(notebook, 'uuid', None), response,
+                             self.property_hash(metadata_properties))
             logger.info(f"✅ Created Notion page for notebook: {notebook.name} (page_id={page_id})")
             self._audit('page_create', notebook_uuid=getattr(notebook, 'uuid', None),
                         notebook_name=notebook.name, notion_page_id=page_id)
@@ -643,8 +703,8 @@ class NotionNotebookSync:
         backlog_pages_sorted = sorted(backlog_pages, key=lambda p: p.page_number, reverse=True)
 
         # Apply rate limiting: max pages per sync to avoid Notion API limits
+        # (requests are paced by the shared Notion token bucket)
         MAX_PAGES_PER_SYNC = 50
-        DELAY_BETWEEN_PAGES = 0.35  # ~3 requests/second to stay under Notion's rate limit
 
         # Prioritize: sync ALL new pages first, then fill remaining slots with backlog
         changed_pages_sorted = new_pages_sorted.copy()
@@ -674,10 +734,6 @@ class NotionNotebookSync:
         for i, page in enumerate(changed_pages_sorted, 1):
             page_toggle = self._create_page_toggle_block(page)
 
-            # Rate limiting: add delay between API calls
-            if i > 1:  # Don't delay before first request
-                time.sleep(DELAY_BETWEEN_PAGES)
-
             # Insert after the last inserted block to maintain descending order
             result = self.client.blocks.children.append(
                 block_id=page_id,
@@ -707,42 +763,37 @@ class NotionNotebookSync:
     
     def _store_page_block_mapping(self, notebook_uuid: str, page_number: int, notion_page_id: str, notion_block_id: str, page_content: str = None):
         """Store the mapping between notebook page and Notion block ID, and track synced content."""
-        try:
-            # We need database access - this should be passed in or made available
-            from ..core.database import DatabaseManager
-            import hashlib
-            db = DatabaseManager('./data/remarkable_pipeline.db')
+        def store(conn):
+            cursor = conn.cursor()
 
-            with db.get_connection() as conn:
-                cursor = conn.cursor()
+            # Store in notion_page_blocks table (legacy)
+            cursor.execute('''
+                INSERT OR REPLACE INTO notion_page_blocks
+                (notebook_uuid, page_number, notion_page_id, notion_block_id, updated_at)
+                VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+            ''', (notebook_uuid, page_number, notion_page_id, notion_block_id))
 
-                # Store in notion_page_blocks table (legacy)
-                cursor.execute('''
-                    INSERT OR REPLACE INTO notion_page_blocks
-                    (notebook_uuid, page_number, notion_page_id, notion_block_id, updated_at)
-                    VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
-                ''', (notebook_uuid, page_number, notion_page_id, notion_block_id))
+            # Also update notion_page_sync table with the block ID, sync timestamp, and synced content (legacy)
+            cursor.execute('''
+                UPDATE notion_page_sync
+                SET notion_block_id = ?, last_synced = CURRENT_TIMESTAMP, last_synced_content = ?
+                WHERE notebook_uuid = ? AND page_number = ?
+            ''', (notion_block_id, page_content, notebook_uuid, page_number))
 
-                # Also update notion_page_sync table with the block ID, sync timestamp, and synced content (legacy)
+            # NEW: Store in page_sync_records table for per-page tracking
+            if page_content:
+                content_hash = hashlib.sha256(page_content.encode('utf-8')).hexdigest()
                 cursor.execute('''
-                    UPDATE notion_page_sync
-                    SET notion_block_id = ?, last_synced = CURRENT_TIMESTAMP, last_synced_content = ?
-                    WHERE notebook_uuid = ? AND page_number = ?
-                ''', (notion_block_id, page_content, notebook_uuid, page_number))
-
-                # NEW: Store in page_sync_records table for per-page tracking
-                if page_content:
-                    content_hash = hashlib.sha256(page_content.encode('utf-8')).hexdigest()
-                    cursor.execute('''
-                        INSERT OR REPLACE INTO page_sync_records
-                        (notebook_uuid, page_number, content_hash, target_name, notion_page_id,
-                         notion_block_id, status, synced_at, updated_at)
-                        VALUES (?, ?, ?, 'notion', ?, ?, 'success', CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
-                    ''', (notebook_uuid, page_number, content_hash, notion_page_id, notion_block_id))
-                    logger.debug(f"✅ Created page sync record: {notebook_uuid} page {page_number}")
+                    INSERT OR REPLACE INTO page_sync_records
+                    (notebook_uuid, page_number, content_hash, target_name, notion_page_id,
+                     notion_block_id, status, synced_at, updated_at)
+                    VALUES (?, ?, ?, 'notion', ?, ?, 'success', CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
+                ''', (notebook_uuid, page_number, content_hash, notion_page_id, notion_block_id))
+                logger.debug(f"✅ Created page sync record: {notebook_uuid} page {page_number}")
 
-                conn.commit()
-                logger.debug(f"📎 Stored block mapping: {notebook_uuid} page {page_number} -> {notion_block_id}")
+        try:
+            self._audit_write(store)
+            logger.debug(f"📎 Stored block mapping: {notebook_uuid} page {page_number} -> {notion_block_id}")
 
         except Exception as e:
             logger.warning(f"Failed to store block mapping for {notebook_uuid} page {page_number}: {e}")
@@ -780,57 +831,13 @@ class NotionNotebookSync:
         """Update an existing Notion page with incremental content changes."""
         try:
             # Update page properties
-            properties = {
-                "Total Pages": {
-                    "number": notebook.total_pages
-                },
-                "Last Updated": {
-                    "date": {
-                        "start": datetime.now().isoformat()
-                    }
-                }
-            }
-            
-            # Add metadata properties if available
-            if notebook.metadata:
-                # Add path information
-                if notebook.metadata.full_path:
-                    properties["reMarkable Path"] = {
-                        "rich_text": [
-                            {
-                                "text": {
-                                    "content": notebook.metadata.full_path
-                                }
-                            }
-                        ]
-                    }
-                
-                # Add path tags
-                if notebook.metadata.path_tags:
-                    properties["Tags"] = {
-                        "multi_select": [
-                            {"name": tag} for tag in notebook.metadata.path_tags
-                        ]
-                    }
-                
-                # Add last modified date
-                if notebook.metadata.last_modified:
-                    properties["Last Modified"] = {
-                        "date": {
-                            "start": notebook.metadata.last_modified.isoformat()
-                        }
-                    }
-                
-                # Add last opened date
-                if notebook.metadata.last_opened:
-                    properties["Last Viewed"] = {
-                        "date": {
-                            "start": notebook.metadata.last_opened.isoformat()
-                        }
-                    }
+            properties = self.build_metadata_properties(notebook)
+            properties_hash = self.property_hash(properties)
+            properties["Last Updated"] = {"date": {"start": datetime.now().isoformat()}}
             
             # Update properties
-            self.client.pages.update(page_id=page_id, properties=properties)
+            response = self.client.pages.update(page_id=page_id, properties=properties)
+            self._index_page(getattr(notebook, 'uuid', None), response, properties_hash)
             self._audit('page_update', notebook_uuid=getattr(notebook, 'uuid', None),
                         notebook_name=notebook.name, notion_page_id=page_id)
 
@@ -861,10 +868,26 @@ class NotionNotebookSync:
             
         except APIResponseError as e:
             logger.error(f"❌ Failed to update Notion page for {notebook.name}: {e}")
+            self._forget_missing_page(page_id, e)
             raise
     
     def find_existing_page(self, notebook_uuid: str) -> Optional[str]:
         """Find existing Notion page for a notebook by UUID."""
+        if self.page_index:
+            try:
+                page_id = self.page_index.lookup(notebook_uuid)
+                if page_id:
+                    return page_id
+                # Unknown locally: pick up pages created elsewhere (throttled), then look again
+                self.page_index.refresh(self.client)
+                page_id = self.page_index.lookup(notebook_uuid)
+                if page_id:
+                    return page_id
+                # Still unknown - the refresh may have been throttled, so ask Notion
+                # directly rather than risk creating a duplicate page
+            except Exception as e:
+                logger.warning(f"⚠️ Notion page index lookup failed, querying Notion: {e}")
+
         try:
             # Search for pages with matching UUID
             response = self.client.databases.query(
@@ -879,6 +902,7 @@ class NotionNotebookSync:
             
             if response["results"]:
                 page = response["results"][0]
+                self._index_page(notebook_uuid, page)
                 return page["id"]
             return None
             
@@ -1024,6 +1048,13 @@ class NotionNotebookSync:
         
         logger.info(f"🚀 Intelligent sync: {len(filtered_notebooks)} notebooks to analyze...")
         
+        # One paginated listing instead of a query per notebook
+        if self.page_index:
+            try:
+                self.page_index.refresh(self.client, force=True)
+            except Exception as e:
+                logger.warning(f"⚠️ Could not refresh Notion page index: {e}")
+        
         if self.sync_tracker is None:
             # Fallback to simple sync mode
             logger.info(f"📄 Using simple sync mode for {len(filtered_notebooks)} notebooks...")
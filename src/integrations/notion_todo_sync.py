@@ -5,21 +5,30 @@ Notion Todo Sync Service - Manages exporting todos to Notion Tasks database.
 
 import os
 import sys
+import time
+import asyncio
 import httpx
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
 from notion_client import Client
+from notion_client.errors import APIResponseError
 
 # Add project root to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
 from src.core.database import DatabaseManager
+from src.utils import metrics
+from src.integrations.notion_rate_limit import get_notion_bucket
 import logging
 
+# Export records are committed in batches of this many todos
+EXPORT_RECORD_BATCH_SIZE = 25
+
 class NotionTodoSync:
     """Service for syncing todos to Notion Tasks database."""
     
-    def __init__(self, notion_token: str, tasks_database_id: str, db_path: str = './data/remarkable_pipeline.db'):
+    def __init__(self, notion_token: str, tasks_database_id: str, db_path: str = './data/remarkable_pipeline.db',
+                 max_workers: int = 4):
         """
         Initialize the Notion todo sync service.
         
@@ -27,13 +36,17 @@ class NotionTodoSync:
             notion_token: Notion API token
             tasks_database_id: ID of the Notion Tasks database
             db_path: Path to the local SQLite database
+            max_workers: Concurrent export workers (all share the Notion token bucket)
         """
         self.tasks_database_id = tasks_database_id
         self.db = DatabaseManager(db_path)
         self.logger = logging.getLogger("NotionTodoSync")
+        self.max_workers = max(1, max_workers)
+        self.rate_limiter = get_notion_bucket()
+        self.request_count = 0
         
         # Initialize Notion client with SSL disabled for compatibility
-        http_client = httpx.Client(verify=False)
+        http_client = httpx.Client(verify=False, event_hooks=metrics.httpx_event_hooks('notion'))
         self.client = Client(auth=notion_token, client=http_client)
     
     def get_notion_workspace_url(self) -> str:
@@ -90,6 +103,76 @@ class NotionTodoSync:
             
             return cursor.fetchall()
     
+    def _build_todo_page(self, todo_data: Tuple, notebook_name: str) -> Tuple[Dict, List[Dict]]:
+        """Properties and source-context children for a todo's Notion page."""
+        (todo_id, text, actual_date, page_number, confidence, completed, 
+         _, notion_page_id, notion_block_id, created_at) = todo_data
+        
+        # Prepare Notion page properties
+        properties = {
+            "Name": {"title": [{"text": {"content": text}}]},
+            "Done": {"checkbox": bool(completed)},
+            "Notes": {"rich_text": [{"text": {"content": f"Source: {notebook_name}, Page {page_number}, Confidence: {confidence:.2f}"}}]},
+            "Tags": {"multi_select": [{"name": "remarkable"}]}
+        }
+        
+        # Add actual date if available
+        if actual_date:
+            properties["Due Date"] = {"date": {"start": actual_date}}
+        
+        # Page content with source link
+        content_blocks = []
+        if notion_page_id and notion_block_id:
+            source_link = self.create_block_link(notion_page_id, notion_block_id)
+            
+            content_blocks = [
+                {
+                    "type": "heading_3",
+                    "heading_3": {
+                        "rich_text": [{"type": "text", "text": {"content": "📝 Source Context"}}]
+                    }
+                },
+                {
+                    "type": "paragraph",
+                    "paragraph": {
+                        "rich_text": [
+                            {"type": "text", "text": {"content": "Found in: "}},
+                            {"type": "text", "text": {"content": f"{notebook_name}, Page {page_number}", "link": {"url": source_link}}}
+                        ]
+                    }
+                },
+                {
+                    "type": "paragraph",
+                    "paragraph": {
+                        "rich_text": [{"type": "text", "text": {"content": "Click the link above to view the full context where this todo was found."}}]
+                    }
+                }
+            ]
+        
+        return properties, content_blocks
+    
+    def _create_todo_page(self, properties: Dict, children: List[Dict]) -> Dict:
+        """
+        Create the todo page with its source context inline (one request).
+        
+        Callers must acquire a rate-limit token first. If Notion rejects the
+        children, the page is created without them, as the source context
+        is optional.
+        """
+        kwargs = {"parent": {"database_id": self.tasks_database_id}, "properties": properties}
+        self.request_count += 1
+        if not children:
+            return self.client.pages.create(**kwargs)
+        try:
+            return self.client.pages.create(children=children, **kwargs)
+        except APIResponseError as e:
+            if getattr(e, 'code', None) != 'validation_error':
+                raise
+            self.logger.debug(f"Could not add source content: {e}")
+            self.rate_limiter.acquire()
+            self.request_count += 1
+            return self.client.pages.create(**kwargs)
+    
     def export_todo_to_notion(self, todo_data: Tuple, notebook_name: str) -> Optional[str]:
         """
         Export a single todo to Notion Tasks database.
@@ -101,68 +184,25 @@ class NotionTodoSync:
         Returns:
             Notion page ID if successful, None otherwise
         """
-        (todo_id, text, actual_date, page_number, confidence, completed, 
-         _, notion_page_id, notion_block_id, created_at) = todo_data
-        
+        todo_id = todo_data[0]
         try:
-            # Prepare Notion page properties
-            properties = {
-                "Name": {"title": [{"text": {"content": text}}]},
-                "Done": {"checkbox": bool(completed)},
-                "Notes": {"rich_text": [{"text": {"content": f"Source: {notebook_name}, Page {page_number}, Confidence: {confidence:.2f}"}}]},
-                "Tags": {"multi_select": [{"name": "remarkable"}]}
-            }
-            
-            # Add actual date if available
-            if actual_date:
-                properties["Due Date"] = {"date": {"start": actual_date}}
+            properties, children = self._build_todo_page(todo_data, notebook_name)
+            self.rate_limiter.acquire()
+            response = self._create_todo_page(properties, children)
+            return response['id']
             
-            # Create the todo page in Notion
-            response = self.client.pages.create(
-                parent={"database_id": self.tasks_database_id},
-                properties=properties
-            )
-            
-            notion_page_id_created = response['id']
-            
-            # Add page content with source link
-            source_link = None
-            if notion_page_id and notion_block_id:
-                source_link = self.create_block_link(notion_page_id, notion_block_id)
-                
-                content_blocks = [
-                    {
-                        "type": "heading_3",
-                        "heading_3": {
-                            "rich_text": [{"type": "text", "text": {"content": "📝 Source Context"}}]
-                        }
-                    },
-                    {
-                        "type": "paragraph",
-                        "paragraph": {
-                            "rich_text": [
-                                {"type": "text", "text": {"content": "Found in: "}},
-                                {"type": "text", "text": {"content": f"{notebook_name}, Page {page_number}", "link": {"url": source_link}}}
-                            ]
-                        }
-                    },
-                    {
-                        "type": "paragraph",
-                        "paragraph": {
-                            "rich_text": [{"type": "text", "text": {"content": "Click the link above to view the full context where this todo was found."}}]
-                        }
-                    }
-                ]
-                
-                try:
-                    self.client.blocks.children.append(
-                        block_id=notion_page_id_created,
-                        children=content_blocks
-                    )
-                except Exception as e:
-                    self.logger.debug(f"Could not add source content: {e}")
-            
-            return notion_page_id_created
+        except Exception as e:
+            self.logger.error(f"Failed to export todo {todo_id}: {e}")
+            return None
+    
+    async def _export_todo_async(self, todo_data: Tuple, notebook_name: str) -> Optional[str]:
+        """export_todo_to_notion for the worker pool: waits for the bucket without blocking the loop."""
+        todo_id = todo_data[0]
+        try:
+            properties, children = self._build_todo_page(todo_data, notebook_name)
+            await self.rate_limiter.acquire_async()
+            response = await asyncio.to_thread(self._create_todo_page, properties, children)
+            return response['id']
             
         except Exception as e:
             self.logger.error(f"Failed to export todo {todo_id}: {e}")
@@ -170,22 +210,29 @@ class NotionTodoSync:
     
     def record_export(self, todo_id: int, notion_page_id: str, export_timestamp: str):
         """Record the todo export in the tracking table."""
+        self.record_exports([(todo_id, notion_page_id)], export_timestamp)
+    
+    def record_exports(self, exports: List[Tuple[int, str]], export_timestamp: str):
+        """Record several (todo_id, notion_page_id) exports in one transaction."""
+        if not exports:
+            return
         with self.db.get_connection() as conn:
             cursor = conn.cursor()
             
             # Store in tracking table
-            cursor.execute('''
+            cursor.executemany('''
                 INSERT OR REPLACE INTO notion_todo_sync 
                 (todo_id, notion_page_id, notion_database_id, exported_at, last_updated)
                 VALUES (?, ?, ?, ?, ?)
-            ''', (todo_id, notion_page_id, self.tasks_database_id, export_timestamp, export_timestamp))
+            ''', [(todo_id, page_id, self.tasks_database_id, export_timestamp, export_timestamp)
+                  for todo_id, page_id in exports])
             
             # Update legacy field
-            cursor.execute('''
+            cursor.executemany('''
                 UPDATE todos 
                 SET notion_exported_at = ?
                 WHERE id = ?
-            ''', (export_timestamp, todo_id))
+            ''', [(export_timestamp, todo_id) for todo_id, _ in exports])
             
             conn.commit()
     
@@ -241,11 +288,9 @@ class NotionTodoSync:
             self.logger.info("DRY RUN - No changes made")
             return {"exported": 0, "errors": 0, "total": len(todos_to_export)}
         
-        # Export todos
-        exported_count = 0
-        error_count = 0
+        # Export todos through the worker pool
         export_timestamp = datetime.now().isoformat()
-        
+        jobs = []
         for notebook_name, notebook_todos in by_notebook.items():
             for todo in notebook_todos:
                 # Reconstruct tuple for export function
@@ -254,18 +299,66 @@ class NotionTodoSync:
                     todo['confidence'], todo['completed'], notebook_name,
                     todo['notion_page_id'], todo['notion_block_id'], todo['created_at']
                 )
+                jobs.append((todo_data, notebook_name))
+        
+        requests_before = self.request_count
+        started = time.monotonic()
+        exported_count, error_count = asyncio.run(self._export_todos(jobs, export_timestamp))
+        elapsed = time.monotonic() - started
+        
+        requests = self.request_count - requests_before
+        requests_per_todo = round(requests / len(jobs), 2) if jobs else 0
+        todos_per_minute = round(exported_count / elapsed * 60, 1) if elapsed > 0 else 0
+        
+        self.logger.info(f"Todo sync complete: {exported_count} exported, {error_count} errors "
+                         f"({requests} requests, {requests_per_todo}/todo, {todos_per_minute} todos/min)")
+        return {"exported": exported_count, "errors": error_count, "total": len(todos_to_export),
+                "requests": requests, "requests_per_todo": requests_per_todo,
+                "todos_per_minute": todos_per_minute}
+    
+    async def _export_todos(self, jobs: List[Tuple[Tuple, str]], export_timestamp: str) -> Tuple[int, int]:
+        """
+        Export todos with `max_workers` concurrent workers.
+        
+        Returns:
+            (exported_count, error_count)
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        for job in jobs:
+            queue.put_nowait(job)
+        
+        pending: List[Tuple[int, str]] = []
+        counts = {'exported': 0, 'errors': 0}
+        
+        def flush():
+            if pending:
+                self.record_exports(pending, export_timestamp)
+                pending.clear()
+        
+        async def worker():
+            while True:
+                try:
+                    todo_data, notebook_name = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
                 
-                notion_page_id = self.export_todo_to_notion(todo_data, notebook_name)
-                
+                notion_page_id = await self._export_todo_async(todo_data, notebook_name)
                 if notion_page_id:
-                    self.record_export(todo['id'], notion_page_id, export_timestamp)
-                    exported_count += 1
-                    self.logger.debug(f"Exported: {todo['text'][:50]}...")
+                    pending.append((todo_data[0], notion_page_id))
+                    counts['exported'] += 1
+                    self.logger.debug(f"Exported: {todo_data[1][:50]}...")
+                    if len(pending) >= EXPORT_RECORD_BATCH_SIZE:
+                        flush()
                 else:
-                    error_count += 1
+                    counts['errors'] += 1
+        
+        try:
+            await asyncio.gather(*(worker() for _ in range(min(self.max_workers, len(jobs)))))
+        finally:
+            # Record whatever was exported, even if the run was interrupted
+            flush()
         
-        self.logger.info(f"Todo sync complete: {exported_count} exported, {error_count} errors")
-        return {"exported": exported_count, "errors": error_count, "total": len(todos_to_export)}
+        return counts['exported'], counts['errors']
     
     def get_export_stats(self) -> Dict[str, int]:
         """Get statistics about exported todos."""
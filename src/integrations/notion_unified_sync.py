@@ -514,50 +514,8 @@ class NotionSyncTarget(SyncTarget):
                 notebooks = self.notion_client.fetch_notebooks_from_db(conn, refresh_changed_metadata=False)
                 changed_notebooks = [nb for nb in notebooks if nb.uuid in notebook_uuids]
 
-                for notebook in changed_notebooks:
-                    try:
-                        existing_page_id = self.notion_client.find_existing_page(notebook.uuid)
-
-                        if existing_page_id:
-                            self.logger.debug(f"📝 Updating Notion metadata for: {notebook.name}")
-
-                            # Build metadata properties
-                            properties = {
-                                "Total Pages": {"number": notebook.total_pages},
-                                "Last Updated": {"date": {"start": datetime.now().isoformat()}}
-                            }
-
-                            if notebook.metadata:
-                                # Add path tags
-                                if notebook.metadata.path_tags:
-                                    properties["Tags"] = {
-                                        "multi_select": [{"name": tag} for tag in notebook.metadata.path_tags]
-                                    }
-
-                                # Add last modified if available
-                                if notebook.metadata.last_modified:
-                                    properties["Last Modified"] = {
-                                        "date": {"start": notebook.metadata.last_modified.isoformat()}
-                                    }
-
-                                # Add last viewed (last_opened) if available
-                                if notebook.metadata.last_opened:
-                                    properties["Last Viewed"] = {
-                                        "date": {"start": notebook.metadata.last_opened.isoformat()}
-                                    }
-
-                            # Debug: Log what we're sending to Notion
-                            self.logger.debug(f"Sending properties to Notion for {notebook.name}: {properties}")
-
-                            # Update the Notion page properties
-                            response = self.notion_client.client.pages.update(page_id=existing_page_id, properties=properties)
-                            refreshed_count += 1
-                            self.logger.info(f"✅ Updated metadata for {notebook.name} - Response: {response.get('id', 'No ID')}")
-                        else:
-                            self.logger.debug(f"⏭️ No existing Notion page found for {notebook.name} - skipping metadata refresh")
-
-                    except Exception as e:
-                        self.logger.error(f"❌ Failed to refresh metadata for {notebook.name}: {e}")
+            # Unchanged payloads are skipped; the rest go out as one paced burst
+            refreshed_count = self.notion_client.push_metadata_updates(changed_notebooks)
 
         except Exception as e:
             self.logger.error(f"❌ Error during metadata refresh: {e}")
@@ -18,15 +18,22 @@ import logging
 import sqlite3
 import time
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 import aiohttp
 
+from ..core.database import write_through
 from ..core.sync_engine import SyncTarget, SyncItem, SyncResult, SyncStatus, SyncItemType
 from ..core.book_metadata import BookMetadataManager
+from ..utils import metrics
 
 logger = logging.getLogger(__name__)
 
 
+def normalize_book_key(title: Optional[str], author: Optional[str]) -> Tuple[str, str]:
+    """Case- and whitespace-insensitive (title, author) key for matching Readwise books."""
+    return (' '.join((title or '').lower().split()), ' '.join((author or '').lower().split()))
+
+
 class ReadwiseAPIClient:
     """
     Async client for Readwise API v2.
@@ -53,7 +60,8 @@ class ReadwiseAPIClient:
                 'Authorization': f'Token {self.access_token}',
                 'Content-Type': 'application/json'
             },
-            timeout=aiohttp.ClientTimeout(total=30)
+            timeout=aiohttp.ClientTimeout(total=30),
+            trace_configs=metrics.aiohttp_trace_configs('readwise')
         )
         return self
     
@@ -126,12 +134,13 @@ class ReadwiseAPIClient:
             self.logger.error(f"Network error importing highlights: {e}")
             raise
     
-    async def get_books(self, page_size: int = 1000) -> List[Dict[str, Any]]:
+    async def get_books(self, page_size: int = 1000, updated_after: Optional[str] = None) -> List[Dict[str, Any]]:
         """
-        Get list of books/documents in Readwise.
+        Get list of books/documents in Readwise, following pagination.
         
         Args:
             page_size: Number of books per page
+            updated_after: Only return books updated after this ISO timestamp (`updated__gt`)
             
         Returns:
             List of book dictionaries with id, title, author, etc.
@@ -139,14 +148,25 @@ class ReadwiseAPIClient:
         if not self.session:
             raise RuntimeError("Client not initialized. Use async context manager.")
         
-        await self._rate_limit()
+        books: List[Dict[str, Any]] = []
+        url: Optional[str] = f"{self.base_url}/books/"
+        params: Optional[Dict[str, Any]] = {"page_size": page_size}
+        if updated_after:
+            params["updated__gt"] = updated_after
         
         try:
-            params = {"page_size": page_size}
-            async with self.session.get(f"{self.base_url}/books/", params=params) as response:
-                response.raise_for_status()
-                data = await response.json()
-                return data.get('results', [])
+            while url:
+                await self._rate_limit()
+                async with self.session.get(url, params=params) as response:
+                    response.raise_for_status()
+                    data = await response.json()
+                books.extend(data.get('results', []))
+                # `next` already carries page and filter parameters
+                url, params = data.get('next'), None
+            
+            self.logger.debug(f"Fetched {len(books)} books from Readwise"
+                              + (f" updated after {updated_after}" if updated_after else ""))
+            return books
                 
         except aiohttp.ClientError as e:
             self.logger.error(f"Error fetching books: {e}")
@@ -156,6 +176,8 @@ class ReadwiseAPIClient:
         """
         Find a book in Readwise by title and author.
         
+        Fetches the whole catalog; prefer ReadwiseBookCache for repeated lookups.
+        
         Args:
             title: Book title to search for
             author: Book author to search for
@@ -164,16 +186,10 @@ class ReadwiseAPIClient:
             Book dictionary if found, None otherwise
         """
         books = await self.get_books()
-        
-        # Normalize strings for comparison (case-insensitive, strip whitespace)
-        title_norm = title.strip().lower() if title else ""
-        author_norm = author.strip().lower() if author else ""
+        key = normalize_book_key(title, author)
         
         for book in books:
-            book_title = (book.get('title', '') or '').strip().lower()
-            book_author = (book.get('author', '') or '').strip().lower()
-            
-            if book_title == title_norm and book_author == author_norm:
+            if normalize_book_key(book.get('title'), book.get('author')) == key:
                 self.logger.debug(f"Found existing book: {book.get('title')} by {book.get('author')} (ID: {book.get('id')})")
                 return book
         
@@ -208,6 +224,115 @@ class ReadwiseAPIClient:
             return False
 
 
+class ReadwiseBookCache:
+    """
+    Local copy of the Readwise book catalog, indexed by normalized (title, author).
+    
+    The first refresh pages through the full catalog; later refreshes only
+    request books with `updated__gt` the newest `updated` timestamp seen, so
+    lookups are a single indexed query and the API is only hit on a miss.
+    """
+    
+    def __init__(self, db_connection: sqlite3.Connection, refresh_interval: float = 300):
+        self.db_connection = db_connection
+        self.refresh_interval = refresh_interval  # Minimum seconds between miss-triggered refreshes
+        self._last_refresh = 0.0
+        self.logger = logging.getLogger(f"{__name__}.ReadwiseBookCache")
+        self._ensure_table()
+    
+    def _ensure_table(self) -> None:
+        write_through(self.db_connection, self._create_table)
+    
+    @staticmethod
+    def _create_table(conn: sqlite3.Connection) -> None:
+        cursor = conn.cursor()
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS readwise_books (
+                readwise_book_id INTEGER PRIMARY KEY,
+                title TEXT,
+                author TEXT,
+                title_norm TEXT NOT NULL,
+                author_norm TEXT NOT NULL,
+                category TEXT,
+                num_highlights INTEGER,
+                updated TEXT,  -- Readwise's own last-updated timestamp (refresh watermark)
+                cached_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_readwise_books_title_author
+            ON readwise_books(title_norm, author_norm)
+        ''')
+    
+    def lookup(self, title: str, author: str) -> Optional[int]:
+        """Readwise book ID for a title/author, from the local cache only."""
+        title_norm, author_norm = normalize_book_key(title, author)
+        cursor = self.db_connection.cursor()
+        cursor.execute('''
+            SELECT readwise_book_id FROM readwise_books
+            WHERE title_norm = ? AND author_norm = ?
+            ORDER BY updated DESC LIMIT 1
+        ''', (title_norm, author_norm))
+        row = cursor.fetchone()
+        return row[0] if row else None
+    
+    def store_books(self, books: List[Dict[str, Any]]) -> None:
+        """Insert or update cached books from Readwise /books/ results."""
+        rows = []
+        for book in books:
+            if not book.get('id'):
+                continue
+            title_norm, author_norm = normalize_book_key(book.get('title'), book.get('author'))
+            rows.append((book['id'], book.get('title'), book.get('author'), title_norm, author_norm,
+                         book.get('category'), book.get('num_highlights'), book.get('updated')))
+        
+        write_through(self.db_connection, lambda conn: conn.executemany('''
+            INSERT INTO readwise_books
+            (readwise_book_id, title, author, title_norm, author_norm, category, num_highlights, updated)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(readwise_book_id) DO UPDATE SET
+                title = excluded.title,
+                author = excluded.author,
+                title_norm = excluded.title_norm,
+                author_norm = excluded.author_norm,
+                category = COALESCE(excluded.category, category),
+                num_highlights = COALESCE(excluded.num_highlights, num_highlights),
+                updated = COALESCE(excluded.updated, updated),
+                cached_at = CURRENT_TIMESTAMP
+        ''', rows))
+    
+    def remember(self, readwise_book_id: int, title: str, author: str) -> None:
+        """Cache a book learned from an import response (no `updated`, so the watermark is unaffected)."""
+        self.store_books([{'id': readwise_book_id, 'title': title, 'author': author}])
+    
+    def get_watermark(self) -> Optional[str]:
+        """Newest Readwise `updated` timestamp in the cache, or None if it was never populated."""
+        cursor = self.db_connection.cursor()
+        cursor.execute('SELECT MAX(updated) FROM readwise_books')
+        row = cursor.fetchone()
+        return row[0] if row else None
+    
+    async def refresh(self, client: ReadwiseAPIClient, force: bool = False) -> int:
+        """
+        Bring the cache up to date: full pagination the first time, `updated__gt` afterwards.
+        
+        Unless forced, refreshes are throttled to one per `refresh_interval`.
+        
+        Returns:
+            Number of books fetched
+        """
+        if not force and time.time() - self._last_refresh < self.refresh_interval:
+            return 0
+        
+        watermark = self.get_watermark()
+        books = await client.get_books(updated_after=watermark)
+        self.store_books(books)
+        self._last_refresh = time.time()
+        
+        self.logger.info(f"📚 Readwise book cache {'updated' if watermark else 'populated'}: {len(books)} books")
+        return len(books)
+
+
 class ReadwiseSyncTarget(SyncTarget):
     """
     Readwise implementation of the unified sync target interface.
@@ -217,7 +342,8 @@ class ReadwiseSyncTarget(SyncTarget):
     """
     
     def __init__(self, access_token: str, db_connection: Optional[sqlite3.Connection] = None,
-                 author_name: str = "reMarkable", default_category: str = "books"):
+                 author_name: str = "reMarkable", default_category: str = "books",
+                 book_cache_refresh_interval: float = 300):
         super().__init__("readwise")
         self.access_token = access_token
         self.author_name = author_name
@@ -227,6 +353,14 @@ class ReadwiseSyncTarget(SyncTarget):
         # Book metadata manager for rich metadata
         self.book_metadata_manager = BookMetadataManager(db_connection) if db_connection else None
         self.db_connection = db_connection
+        
+        # Local Readwise catalog for title/author -> book ID lookups
+        self.book_cache = None
+        if db_connection:
+            try:
+                self.book_cache = ReadwiseBookCache(db_connection, refresh_interval=book_cache_refresh_interval)
+            except Exception as e:
+                self.logger.warning(f"Readwise book cache unavailable, using API lookups: {e}")
     
     async def sync_item(self, item: SyncItem) -> SyncResult:
         """Sync a single item to Readwise."""
@@ -345,6 +479,8 @@ class ReadwiseSyncTarget(SyncTarget):
                             # Store the mapping if we don't have it yet
                             if not self.get_readwise_book_id(notebook_uuid):
                                 self.store_readwise_book_mapping(notebook_uuid, book_id)
+                            if self.book_cache:
+                                self.book_cache.remember(book_id, title, author)
                             break
                 
                 return SyncResult(
@@ -603,36 +739,40 @@ class ReadwiseSyncTarget(SyncTarget):
             return
         
         try:
-            cursor = self.db_connection.cursor()
-            cursor.execute('''
+            write_through(self.db_connection, lambda conn: conn.execute('''
                 INSERT OR REPLACE INTO readwise_book_mapping 
                 (notebook_uuid, readwise_book_id)
                 VALUES (?, ?)
-            ''', (notebook_uuid, readwise_book_id))
-            
-            self.db_connection.commit()
+            ''', (notebook_uuid, readwise_book_id)))
             self.logger.info(f"Stored book mapping: notebook {notebook_uuid} -> Readwise ID {readwise_book_id}")
             
         except Exception as e:
             self.logger.error(f"Error storing Readwise book mapping: {e}")
     
     async def get_or_find_readwise_book_id(self, notebook_uuid: str, title: str, author: str) -> Optional[int]:
-        """Get Readwise book ID, checking both local mapping and Readwise API."""
+        """Get Readwise book ID, checking the local mapping, the book cache and then the Readwise API."""
         # First check local mapping
         book_id = self.get_readwise_book_id(notebook_uuid)
         if book_id:
             return book_id
         
-        # If not found locally, check Readwise API
         try:
-            async with self.client as client:
-                book = await client.find_book_by_title_author(title, author)
-                if book:
-                    book_id = book.get('id')
-                    if book_id:
-                        # Store the mapping for future use
-                        self.store_readwise_book_mapping(notebook_uuid, book_id)
-                        return book_id
+            if self.book_cache:
+                # Cached catalog; only refresh (incrementally) from the API on a miss
+                book_id = self.book_cache.lookup(title, author)
+                if book_id is None:
+                    async with self.client as client:
+                        await self.book_cache.refresh(client)
+                    book_id = self.book_cache.lookup(title, author)
+            else:
+                async with self.client as client:
+                    book = await client.find_book_by_title_author(title, author)
+                    book_id = book.get('id') if book else None
+            
+            if book_id:
+                # Store the mapping for future use
+                self.store_readwise_book_mapping(notebook_uuid, book_id)
+                return book_id
         
         except Exception as e:
             self.logger.error(f"Error checking Readwise for existing book: {e}")
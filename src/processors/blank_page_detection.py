@@ -0,0 +1,94 @@
+"""
+Pre-OCR blank page detection.
+
+Template-only and nearly empty pages used to be rendered and sent to Gemini,
+which answered with a "This appears to be a blank page" placeholder that sync
+then had to filter out. The classifier looks at the parsed strokes instead
+(ink stroke count, total ink length, ink bounding-box area) and lets the
+extractor record such pages as blank without an API call.
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import Optional
+
+from ..core.rm_scene import ParsedScene
+from ..utils import metrics
+
+logger = logging.getLogger(__name__)
+
+# Default OCR cost estimate per page (same figure as analyze_directory)
+DEFAULT_COST_PER_PAGE = 0.003
+
+
+@dataclass
+class BlankPageThresholds:
+    """A page is blank when it has no ink, or stays within all three limits."""
+    max_strokes: int = 3
+    max_ink_length: float = 150.0       # Screen units (226 dpi), summed over ink strokes
+    max_bbox_area: float = 10000.0      # Screen units², ink bounding box
+
+
+class BlankPageClassifier:
+    """Decides from a ParsedScene whether a page is worth OCR, and counts what was skipped."""
+
+    def __init__(self, thresholds: Optional[BlankPageThresholds] = None, enabled: bool = True,
+                 cost_per_page: float = DEFAULT_COST_PER_PAGE):
+        self.thresholds = thresholds or BlankPageThresholds()
+        self.enabled = enabled
+        self.cost_per_page = cost_per_page
+        self.skipped_pages = 0
+
+    @classmethod
+    def from_config(cls, config) -> 'BlankPageClassifier':
+        get = config.get if config else (lambda key, default=None: default)
+        prefix = 'processing.ocr.blank_page_detection'
+        return cls(
+            thresholds=BlankPageThresholds(
+                max_strokes=get(f'{prefix}.max_strokes', 3),
+                max_ink_length=get(f'{prefix}.max_ink_length', 150.0),
+                max_bbox_area=get(f'{prefix}.max_bbox_area', 10000.0),
+            ),
+            enabled=get(f'{prefix}.enabled', True),
+            cost_per_page=get(f'{prefix}.estimated_cost_per_page', DEFAULT_COST_PER_PAGE),
+        )
+
+    @property
+    def estimated_cost_saved(self) -> float:
+        return self.skipped_pages * self.cost_per_page
+
+    def classify(self, scene: Optional[ParsedScene]) -> Optional[str]:
+        """
+        Returns:
+            Reason the page is blank, or None if it should be OCR'd (including
+            when it could not be parsed)
+        """
+        if not self.enabled or scene is None:
+            return None
+        # Typed text and highlights are content even without handwriting
+        if scene.text_lines or scene.glyphs:
+            return None
+
+        ink = scene.ink_mask()
+        strokes = int(ink.sum())
+        if strokes == 0:
+            return "no ink"
+
+        limits = self.thresholds
+        if strokes > limits.max_strokes:
+            return None
+        ink_length = float(scene.stroke_lengths()[ink].sum())
+        if ink_length > limits.max_ink_length:
+            return None
+        x_min, x_max, y_min, y_max = scene.ink_bbox()
+        bbox_area = (x_max - x_min) * (y_max - y_min)
+        if bbox_area > limits.max_bbox_area:
+            return None
+        return f"{strokes} strokes, ink length {ink_length:.0f}, area {bbox_area:.0f}"
+
+    def record_skip(self, notebook_uuid: str, page_number: int, reason: str) -> None:
+        """Count a page recorded as blank without OCR."""
+        self.skipped_pages += 1
+        metrics.inc('ocr_blank_pages_skipped', notebook=notebook_uuid)
+        metrics.inc('ocr_estimated_cost_saved_usd', self.cost_per_page)
+        logger.info(f"    ⬜ Page {page_number}: Blank ({reason}) - recorded without OCR")
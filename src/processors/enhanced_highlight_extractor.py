@@ -26,6 +26,8 @@ from dataclasses import dataclass
 from pathlib import Path
 from collections import defaultdict
 
+from ..core.rm_scene import get_scene_cache
+
 # Configure logging
 logger = logging.getLogger(__name__)
 
@@ -303,15 +305,21 @@ class EnhancedHighlightExtractor:
         logger.debug(f"Processing .rm file: {rm_file_path}")
         
         try:
-            # Read binary content (same as original)
-            with open(rm_file_path, 'rb') as f:
-                binary_content = f.read()
-            
-            logger.debug(f"Read {len(binary_content)} bytes from {os.path.basename(rm_file_path)}")
-            
-            # Extract ASCII text sequences (same as original)
-            raw_text = self._extract_ascii_text(binary_content)
-            logger.debug(f"Extracted {len(raw_text)} ASCII sequences")
+            # v6 pages: glyph ranges from the shared parse-once scene cache
+            scene = get_scene_cache().load(rm_file_path)
+            raw_text = scene.highlight_texts() if scene is not None else []
+            if raw_text:
+                logger.debug(f"Read {len(raw_text)} glyph ranges from {os.path.basename(rm_file_path)}")
+            else:
+                # Read binary content (same as original)
+                with open(rm_file_path, 'rb') as f:
+                    binary_content = f.read()
+                
+                logger.debug(f"Read {len(binary_content)} bytes from {os.path.basename(rm_file_path)}")
+                
+                # Extract ASCII text sequences (same as original)
+                raw_text = self._extract_ascii_text(binary_content)
+                logger.debug(f"Extracted {len(raw_text)} ASCII sequences")
             
             # Clean and filter text (same as original)
             cleaned_text = self._clean_extracted_text(raw_text)
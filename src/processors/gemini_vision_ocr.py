@@ -3,7 +3,12 @@ Gemini Vision OCR Engine for reMarkable Integration.
 
 Uses Google Gemini's vision capabilities for handwritten text recognition.
 Replaces the previous Claude Vision engine: Gemini accepts PDF bytes natively,
-so there is no PDF→image conversion and no rate limiter.
+so there is no PDF→image conversion; cropped PNG/WebP payloads from
+ocr_payload are accepted as well. Request concurrency is governed by the
+shared adaptive limiter in ocr_rate_control; slow requests can be hedged
+with a duplicate request (ocr_hedging). Several pages can be
+sent in one request (processing.ocr.pages_per_request) using a page-separator
+contract; see process_files().
 
 The public surface (BoundingBox, OCRResult, ProcessingResult, and the engine's
 is_available / can_process / process_file methods) matches the old
@@ -15,6 +20,7 @@ import logging
 import re
 import sqlite3
 import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Any, Dict, List, Optional
@@ -31,8 +37,15 @@ except (ImportError, ModuleNotFoundError) as e:
 # Database and events
 from ..core.events import get_event_bus, EventType
 
+# Shared adaptive concurrency limiter
+from .ocr_rate_control import get_ocr_limiter, get_throttle_info
+from .ocr_hedging import get_ocr_hedger
+from .ocr_payload import MIME_TYPES
+
 # Configuration
 from ..utils.config import Config
+from ..utils import metrics
+from ..utils.cancellation import CancellationToken, OperationCancelled, is_cancelled
 
 # API key management
 from ..utils.api_keys import get_google_api_key
@@ -85,6 +98,7 @@ class ProcessingResult:
     ocr_results: List[OCRResult]
     error_message: Optional[str] = None
     processing_time_ms: Optional[int] = None
+    input_tokens: Optional[int] = None  # Prompt tokens (a batched request's share per page)
 
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -93,7 +107,8 @@ class ProcessingResult:
             'processor_type': self.processor_type,
             'ocr_results': [result.to_dict() for result in self.ocr_results],
             'error_message': self.error_message,
-            'processing_time_ms': self.processing_time_ms
+            'processing_time_ms': self.processing_time_ms,
+            'input_tokens': self.input_tokens
         }
 
 
@@ -114,6 +129,43 @@ def _strip_wrapping_code_fence(text: str) -> str:
     return stripped
 
 
+# Separator contract for multi-page requests: every page's transcription starts
+# with a line containing exactly "<<<PAGE n>>>" (n = 1-based position in the request).
+PAGE_SEPARATOR = "<<<PAGE {n}>>>"
+_PAGE_SEPARATOR_RE = re.compile(r'^[ \t]*<<<PAGE (\d+)>>>[ \t]*$', re.MULTILINE)
+
+BATCH_PROMPT_SUFFIX = """
+
+MULTI-PAGE REQUEST:
+You are given {count} separate pages, each as its own PDF or image, in order. Apply the
+instructions above to every page independently. Start each page's transcription
+with a line containing exactly <<<PAGE n>>>, where n is the page number from 1 to
+{count} (e.g. {first_separator}), followed by that page's Markdown. Output all {count}
+separators, even for blank pages. Do not merge content across pages and do not
+add any other text."""
+
+
+def _split_batch_response(text: str, expected_pages: int) -> Optional[List[str]]:
+    """Split a multi-page response on page separators.
+
+    Returns one transcription per page, or None if the separators don't match
+    the contract (wrong count, wrong order, or text before the first separator).
+    """
+    matches = list(_PAGE_SEPARATOR_RE.finditer(text))
+    if len(matches) != expected_pages:
+        return None
+    if [int(m.group(1)) for m in matches] != list(range(1, expected_pages + 1)):
+        return None
+    if text[:matches[0].start()].strip():
+        return None
+
+    pages = []
+    for i, match in enumerate(matches):
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(text)
+        pages.append(_strip_wrapping_code_fence(text[match.end():end]))
+    return pages
+
+
 class GeminiVisionOCREngine:
     """OCR engine using Google Gemini's vision capabilities for handwritten text."""
 
@@ -147,6 +199,13 @@ class GeminiVisionOCREngine:
         # whole notebook indefinitely. A page that exceeds it raises, is caught below,
         # and is skipped — the rest of the notebook continues.
         self.request_timeout_s = self.config.get('processing.ocr.request_timeout_seconds', 120)
+        # Pages packed into one request by process_files(); 1 disables batching
+        self.pages_per_request = max(1, int(self.config.get('processing.ocr.pages_per_request', 1) or 1))
+        # All engines share one AIMD limiter; throttled calls wait and are retried
+        self.limiter = get_ocr_limiter(self.config)
+        self.max_throttle_retries = self.config.get('processing.ocr.concurrency.max_throttle_retries', 3)
+        # Requests slower than recent ones get a duplicate; the first response wins
+        self.hedger = get_ocr_hedger(self.config)
 
         # Initialize Gemini client
         self.client = None
@@ -238,10 +297,15 @@ Return only the formatted Markdown text, no explanations, no surrounding code fe
         """Check if file can be processed."""
         if not self.is_available():
             return False
-        return file_path.lower().endswith('.pdf')
+        return Path(file_path).suffix.lower() in MIME_TYPES
+
+    def process_file(self, file_path: str,
+                     cancel_token: Optional[CancellationToken] = None) -> ProcessingResult:
+        """Process a single-page PDF (or PNG/WebP page image) using Gemini Vision OCR.
 
-    def process_file(self, file_path: str) -> ProcessingResult:
-        """Process a single-page PDF file using Gemini Vision OCR."""
+        A cancelled token skips the request (or stops waiting for a concurrency
+        slot); a request already sent runs to completion.
+        """
         start_time = time.time()
 
         if not self.is_available():
@@ -262,68 +326,27 @@ Return only the formatted Markdown text, no explanations, no surrounding code fe
                 error_message="File cannot be processed"
             )
 
-        try:
-            logger.info(f"Processing PDF with Gemini Vision OCR: {file_path}")
-
-            pdf_bytes = Path(file_path).read_bytes()
+        if is_cancelled(cancel_token):
+            return self._cancelled_result(file_path, cancel_token)
 
-            response = self.client.models.generate_content(
-                model=self.model,
-                contents=[
-                    types.Part.from_bytes(data=pdf_bytes, mime_type="application/pdf"),
-                    self.ocr_prompt,
-                ],
-            )
+        try:
+            logger.info(f"Processing page with Gemini Vision OCR: {file_path}")
 
-            text = _strip_wrapping_code_fence(response.text or "")
-
-            # Optional token accounting for cost visibility
-            input_tokens = output_tokens = 0
-            usage = getattr(response, 'usage_metadata', None)
-            if usage:
-                input_tokens = getattr(usage, 'prompt_token_count', 0) or 0
-                output_tokens = getattr(usage, 'candidates_token_count', 0) or 0
-
-            ocr_results: List[OCRResult] = []
-            if text:
-                # The caller always passes a single-page PDF; the whole document
-                # is one page. Bounding box is unused by Gemini (no per-region data).
-                ocr_results.append(OCRResult(
-                    text=text,
-                    confidence=self.confidence_threshold,
-                    bounding_box=BoundingBox(x=0, y=0, width=0, height=0),
-                    language='en',
-                    page_number=1,
-                ))
-                logger.debug(f"Extracted {len(text)} characters")
-            else:
-                logger.warning(f"Gemini returned no text for {file_path}")
-
-            # Emit OCR completed event
-            event_bus = get_event_bus()
-            if event_bus:
-                event_bus.emit(EventType.OCR_COMPLETED, {
-                    'file_path': file_path,
-                    'text_count': len(ocr_results),
-                    'page_count': 1,
-                    'processor_type': self.processor_type,
-                    'total_confidence': self.confidence_threshold if ocr_results else 0.0,
-                })
+            text, input_tokens, output_tokens = self._generate([
+                self._file_part(file_path),
+                self.ocr_prompt,
+            ], cancel_token=cancel_token)
 
-            processing_time = int((time.time() - start_time) * 1000)
+            result = self._build_result(file_path, _strip_wrapping_code_fence(text), start_time)
+            result.input_tokens = input_tokens
             logger.info(
-                f"Gemini Vision OCR completed: {len(ocr_results)} page(s), "
-                f"{input_tokens} in / {output_tokens} out tokens, {processing_time}ms"
-            )
-
-            return ProcessingResult(
-                success=True,
-                file_path=file_path,
-                processor_type=self.processor_type,
-                ocr_results=ocr_results,
-                processing_time_ms=processing_time
+                f"Gemini Vision OCR completed: {len(result.ocr_results)} page(s), "
+                f"{input_tokens} in / {output_tokens} out tokens, {result.processing_time_ms}ms"
             )
+            return result
 
+        except OperationCancelled:
+            return self._cancelled_result(file_path, cancel_token)
         except Exception as e:
             logger.error(f"Gemini Vision OCR processing failed for {file_path}: {e}")
             processing_time = int((time.time() - start_time) * 1000)
@@ -337,6 +360,186 @@ Return only the formatted Markdown text, no explanations, no surrounding code fe
                 processing_time_ms=processing_time
             )
 
+    def process_files(self, file_paths: List[str],
+                      cancel_token: Optional[CancellationToken] = None) -> List[ProcessingResult]:
+        """Process several single-page PDFs, packing up to pages_per_request pages per call.
+
+        Results are returned in input order. A batch whose response does not
+        match the page-separator contract is retried one page at a time.
+        """
+        size = self.pages_per_request
+        chunks = [file_paths[i:i + size] for i in range(0, len(file_paths), size)]
+
+        def process_chunk(chunk: List[str]) -> List[ProcessingResult]:
+            if len(chunk) == 1:
+                return [self.process_file(chunk[0], cancel_token)]
+            return self._process_batch(chunk, cancel_token)
+
+        if len(chunks) <= 1 or self.limiter.max_limit <= 1:
+            return [result for chunk in chunks for result in process_chunk(chunk)]
+
+        # Requests run concurrently; the shared limiter decides how many are in flight
+        with ThreadPoolExecutor(max_workers=min(len(chunks), self.limiter.max_limit)) as executor:
+            chunk_results = list(executor.map(process_chunk, chunks))
+        return [result for results in chunk_results for result in results]
+
+    def _process_batch(self, file_paths: List[str],
+                       cancel_token: Optional[CancellationToken] = None) -> List[ProcessingResult]:
+        """Send several single-page PDFs in one request and split the response per page."""
+        start_time = time.time()
+
+        if is_cancelled(cancel_token):
+            return [self._cancelled_result(f, cancel_token) for f in file_paths]
+
+        if not self.is_available() or not all(self.can_process(f) for f in file_paths):
+            return [self.process_file(f, cancel_token) for f in file_paths]
+
+        try:
+            logger.info(f"Processing {len(file_paths)} pages with Gemini Vision OCR in one request")
+
+            contents: List[Any] = []
+            for n, file_path in enumerate(file_paths, 1):
+                contents.append(f"Page {n}:")
+                contents.append(self._file_part(file_path))
+            contents.append(self.ocr_prompt + BATCH_PROMPT_SUFFIX.format(
+                count=len(file_paths),
+                first_separator=PAGE_SEPARATOR.format(n=1),
+            ))
+
+            text, input_tokens, output_tokens = self._generate(contents, len(file_paths), cancel_token)
+            page_texts = _split_batch_response(_strip_wrapping_code_fence(text), len(file_paths))
+
+        except OperationCancelled:
+            return [self._cancelled_result(f, cancel_token) for f in file_paths]
+        except Exception as e:
+            logger.warning(f"Batched Gemini OCR request failed ({e}), falling back to single pages")
+            return [self.process_file(f, cancel_token) for f in file_paths]
+
+        if page_texts is None:
+            logger.warning(
+                f"Batched Gemini OCR response did not contain {len(file_paths)} page separators, "
+                f"falling back to single pages"
+            )
+            return [self.process_file(f, cancel_token) for f in file_paths]
+
+        results = [
+            self._build_result(file_path, page_text, start_time)
+            for file_path, page_text in zip(file_paths, page_texts)
+        ]
+        for result in results:
+            result.input_tokens = round(input_tokens / len(file_paths))
+        processing_time = int((time.time() - start_time) * 1000)
+        logger.info(
+            f"Gemini Vision OCR completed: {len(file_paths)} pages in one request, "
+            f"{input_tokens} in / {output_tokens} out tokens, {processing_time}ms"
+        )
+        return results
+
+    def _file_part(self, file_path: str):
+        """Request part for a page file, typed by its suffix (PDF, PNG or WebP)."""
+        return types.Part.from_bytes(
+            data=Path(file_path).read_bytes(),
+            mime_type=MIME_TYPES[Path(file_path).suffix.lower()],
+        )
+
+    def _generate(self, contents: List[Any], page_count: int = 1,
+                  cancel_token: Optional[CancellationToken] = None):
+        """Call Gemini and return (text, input_tokens, output_tokens).
+
+        Requests are admitted by the shared concurrency limiter; 429/503 responses
+        are retried (after the limiter's backoff) up to max_throttle_retries times.
+        With hedging enabled, a slow request is duplicated and the first response used.
+        Raises OperationCancelled if cancel_token is cancelled before a request is sent.
+        """
+        def request():
+            with self.limiter.slot(cancel_token, size=page_count), metrics.stage('ocr_request', model=self.model, pages=page_count):
+                return self.client.models.generate_content(
+                    model=self.model,
+                    contents=contents,
+                )
+
+        def can_hedge():
+            return not is_cancelled(cancel_token) and self._has_free_slot()
+
+        for attempt in range(self.max_throttle_retries + 1):
+            if cancel_token is not None:
+                cancel_token.raise_if_cancelled()
+            try:
+                response = self.hedger.call(request, page_count, can_hedge=can_hedge)
+                break
+            except Exception as e:
+                is_throttle, retry_after = get_throttle_info(e)
+                if not is_throttle or attempt >= self.max_throttle_retries:
+                    raise
+                logger.warning(
+                    f"Gemini throttled OCR request (attempt {attempt + 1}/{self.max_throttle_retries + 1}"
+                    f"{f', retry after {retry_after:.0f}s' if retry_after else ''}), retrying"
+                )
+
+        # Optional token accounting for cost visibility
+        input_tokens = output_tokens = 0
+        usage = getattr(response, 'usage_metadata', None)
+        if usage:
+            input_tokens = getattr(usage, 'prompt_token_count', 0) or 0
+            output_tokens = getattr(usage, 'candidates_token_count', 0) or 0
+
+        metrics.inc('ocr_pages_total', page_count, model=self.model)
+        metrics.inc('ocr_tokens_total', input_tokens, model=self.model, direction='input')
+        metrics.inc('ocr_tokens_total', output_tokens, model=self.model, direction='output')
+
+        return response.text or "", input_tokens, output_tokens
+
+    def _cancelled_result(self, file_path: str, cancel_token: CancellationToken) -> ProcessingResult:
+        logger.info(f"Gemini Vision OCR skipped for {file_path}: cancelled ({cancel_token.reason})")
+        return ProcessingResult(
+            success=False,
+            file_path=file_path,
+            processor_type=self.processor_type,
+            ocr_results=[],
+            error_message=f"Cancelled: {cancel_token.reason}"
+        )
+
+    def _has_free_slot(self) -> bool:
+        """Whether the limiter could admit another request right now (hedges only use spare capacity)."""
+        stats = self.limiter.get_stats()
+        return stats['in_flight'] < stats['limit'] and stats['paused_for_s'] == 0
+
+    def _build_result(self, file_path: str, text: str, start_time: float) -> ProcessingResult:
+        """Wrap one page's transcription in a ProcessingResult and emit OCR_COMPLETED."""
+        ocr_results: List[OCRResult] = []
+        if text:
+            # Each file is a single-page PDF; the whole document is one page.
+            # Bounding box is unused by Gemini (no per-region data).
+            ocr_results.append(OCRResult(
+                text=text,
+                confidence=self.confidence_threshold,
+                bounding_box=BoundingBox(x=0, y=0, width=0, height=0),
+                language='en',
+                page_number=1,
+            ))
+            logger.debug(f"Extracted {len(text)} characters")
+        else:
+            logger.warning(f"Gemini returned no text for {file_path}")
+
+        # Emit OCR completed event
+        event_bus = get_event_bus()
+        if event_bus:
+            event_bus.emit(EventType.OCR_COMPLETED, {
+                'file_path': file_path,
+                'text_count': len(ocr_results),
+                'page_count': 1,
+                'processor_type': self.processor_type,
+                'total_confidence': self.confidence_threshold if ocr_results else 0.0,
+            })
+
+        return ProcessingResult(
+            success=True,
+            file_path=file_path,
+            processor_type=self.processor_type,
+            ocr_results=ocr_results,
+            processing_time_ms=int((time.time() - start_time) * 1000)
+        )
+
 
 # Test function / smoke test
 if __name__ == "__main__":
@@ -10,16 +10,49 @@ Key features:
 2. Confidence-based replacement (keep higher confidence versions)
 3. Positional awareness using bounding box proximity
 4. Smart similarity scoring with customizable thresholds
+5. Batched scoring: one similarity matrix per page (rapidfuzz cdist when installed)
+6. Optional library-wide duplicate search via MinHash/LSH
 """
 
+import json
 import logging
-from typing import List, Dict, Optional, Tuple, Any
+import zlib
+from collections import defaultdict
+from typing import List, Dict, Optional, Tuple, Any, Set
 from dataclasses import dataclass
 from difflib import SequenceMatcher
 import re
 
+import numpy as np
+
+try:
+    from rapidfuzz import fuzz
+    from rapidfuzz.process import cdist
+    RAPIDFUZZ_AVAILABLE = True
+except ImportError:
+    RAPIDFUZZ_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+# Common OCR confusions, mapped to one canonical spelling. Applied once per
+# string; two texts whose canonical forms match differ only by OCR confusions.
+OCR_CONFUSIONS = {
+    'aleniq': 'aveniq', 'avaniq': 'aveniq', 'aveniq': 'aveniq',  # Specific example from user
+    'mt1': 'mti', 'mii': 'mti', 'mti': 'mti',                    # Another specific example
+    'rn': 'm',     # rn vs m
+    'cl': 'd',     # cl vs d
+    'nn': 'n',     # double n vs single n
+    'vv': 'w',     # vv vs w
+    '1': 'l', 'i': 'l',   # l, 1, I confusion
+    '0': 'o', 'q': 'o',   # O, 0, Q confusion
+}
+_OCR_CONFUSION_PATTERN = re.compile(
+    '|'.join(re.escape(key) for key in sorted(OCR_CONFUSIONS, key=len, reverse=True))
+)
+
+# Added to the sequence similarity when two texts differ only by OCR confusions
+OCR_MATCH_BOOST = 0.2
+
 
 @dataclass
 class TodoCandidate:
@@ -35,6 +68,85 @@ class TodoCandidate:
     date_extracted: Optional[str] = None
     
 
+@dataclass(frozen=True)
+class PreparedText:
+    """A todo text normalized once for repeated comparisons."""
+    normalized: str
+    ocr_form: str
+    words: frozenset
+
+
+class TodoMinHashIndex:
+    """
+    MinHash/LSH index over todo texts.
+    
+    Each text is reduced to a MinHash signature of its character shingles; the
+    signature is split into bands and texts sharing any band bucket become
+    candidate pairs. Finding near-duplicates across N todos is then roughly
+    linear in N instead of comparing all N^2 pairs. Candidates still need to
+    be verified with a real similarity score.
+    """
+    
+    _PRIME = (1 << 31) - 1  # Keeps (a * x + b) within uint64 for 32-bit shingle hashes
+    
+    def __init__(self, num_perm: int = 128, bands: int = 32, shingle_size: int = 3, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be divisible by bands ({bands})")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, self._PRIME, size=num_perm).astype(np.uint64)
+        self._b = rng.randint(0, self._PRIME, size=num_perm).astype(np.uint64)
+        self._buckets: List[Dict[bytes, List[Any]]] = [defaultdict(list) for _ in range(bands)]
+        self._keys: List[Any] = []
+    
+    def __len__(self) -> int:
+        return len(self._keys)
+    
+    def signature(self, text: str) -> np.ndarray:
+        """MinHash signature of the text's character shingles."""
+        k = self.shingle_size
+        shingles = {text[i:i + k] for i in range(max(1, len(text) - k + 1))}
+        hashes = np.fromiter(
+            (zlib.crc32(shingle.encode('utf-8')) for shingle in shingles),
+            dtype=np.uint64, count=len(shingles)
+        )
+        return ((np.outer(hashes, self._a) + self._b) % self._PRIME).min(axis=0)
+    
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        return [signature[band * self.rows:(band + 1) * self.rows].tobytes() for band in range(self.bands)]
+    
+    def add(self, key: Any, text: str) -> None:
+        """Index a text under a caller-chosen key (e.g. todo ID)."""
+        for bucket, band_key in zip(self._buckets, self._band_keys(self.signature(text))):
+            bucket[band_key].append(key)
+        self._keys.append(key)
+    
+    def query(self, text: str) -> Set[Any]:
+        """Keys of indexed texts that share at least one band with this text."""
+        matches = set()
+        for bucket, band_key in zip(self._buckets, self._band_keys(self.signature(text))):
+            matches.update(bucket.get(band_key, ()))
+        return matches
+    
+    def candidate_pairs(self) -> Set[Tuple[Any, Any]]:
+        """All pairs of indexed keys that share a bucket (each pair once, in insertion order)."""
+        order = {key: position for position, key in enumerate(self._keys)}
+        pairs = set()
+        for bucket in self._buckets:
+            for keys in bucket.values():
+                if len(keys) < 2:
+                    continue
+                for i, key1 in enumerate(keys):
+                    for key2 in keys[i + 1:]:
+                        if key1 != key2:
+                            pairs.add((key1, key2) if order[key1] < order[key2] else (key2, key1))
+        return pairs
+
+
 class IntelligentTodoDeduplicator:
     """Handles intelligent deduplication of todos with OCR variations."""
     
@@ -62,22 +174,76 @@ class IntelligentTodoDeduplicator:
         """
         if not text1 or not text2:
             return 0.0
+        return float(self.similarity_matrix([text1], [text2])[0, 0])
+    
+    def similarity_matrix(self, texts1: List[str], texts2: List[str],
+                          score_cutoff: float = 0.0) -> np.ndarray:
+        """
+        Similarity of every text in `texts1` to every text in `texts2`.
         
-        # Normalize texts for comparison
-        norm1 = self._normalize_text(text1)
-        norm2 = self._normalize_text(text2)
+        Each text is normalized once. The sequence similarity for all pairs is
+        computed in one rapidfuzz `cdist` call (falling back to SequenceMatcher);
+        word overlap and OCR matching are only evaluated for pairs that can
+        still reach `score_cutoff`. Scores below the cutoff are reported as 0.
+        """
+        prepared1 = [self.prepare_text(text) for text in texts1]
+        prepared2 = [self.prepare_text(text) for text in texts2]
+        scores = np.zeros((len(prepared1), len(prepared2)), dtype=np.float64)
+        if not prepared1 or not prepared2:
+            return scores
+        
+        # Upper bound of the combined score is 0.7 * sequence + 0.3 (words) + 0.1 (OCR boost)
+        sequence_cutoff = max(0.0, (score_cutoff - 0.3 - 0.5 * OCR_MATCH_BOOST) / 0.7)
+        sequence = self._sequence_matrix(
+            [p.normalized for p in prepared1], [p.normalized for p in prepared2], sequence_cutoff
+        )
         
-        if norm1 == norm2:
+        for i, j in zip(*np.nonzero(sequence >= sequence_cutoff)):
+            score = self._combine_scores(prepared1[i], prepared2[j], float(sequence[i, j]))
+            if score >= score_cutoff:
+                scores[i, j] = score
+        return scores
+    
+    def prepare_text(self, text: str) -> PreparedText:
+        """Normalize a text and compute its OCR-canonical form and word set."""
+        normalized = self._normalize_text(text)
+        return PreparedText(
+            normalized=normalized,
+            ocr_form=_OCR_CONFUSION_PATTERN.sub(lambda m: OCR_CONFUSIONS[m.group(0)], normalized),
+            words=frozenset(normalized.split())
+        )
+    
+    @staticmethod
+    def _sequence_matrix(texts1: List[str], texts2: List[str], cutoff: float) -> np.ndarray:
+        """Plain sequence similarity (0-1) for all pairs."""
+        if RAPIDFUZZ_AVAILABLE:
+            return cdist(texts1, texts2, scorer=fuzz.ratio, dtype=np.float64,
+                         score_cutoff=cutoff * 100) / 100.0
+        
+        matrix = np.zeros((len(texts1), len(texts2)), dtype=np.float64)
+        for i, text1 in enumerate(texts1):
+            matcher = SequenceMatcher(None, text1)
+            for j, text2 in enumerate(texts2):
+                matcher.set_seq2(text2)
+                matrix[i, j] = matcher.ratio()
+        return matrix
+    
+    @staticmethod
+    def _combine_scores(text1: PreparedText, text2: PreparedText, basic_similarity: float) -> float:
+        """Weighted score of sequence similarity, OCR-confusion match and word overlap."""
+        if not text1.normalized or not text2.normalized:
+            return 0.0
+        if text1.normalized == text2.normalized:
             return 1.0
         
-        # Use SequenceMatcher for basic similarity
-        basic_similarity = SequenceMatcher(None, norm1, norm2).ratio()
-        
-        # Boost score for common OCR substitution patterns
-        ocr_adjusted_similarity = self._adjust_for_ocr_patterns(text1, text2, basic_similarity)
+        # Boost score when the difference is explained by OCR substitutions
+        ocr_adjusted_similarity = basic_similarity
+        if text1.ocr_form == text2.ocr_form:
+            ocr_adjusted_similarity = min(1.0, basic_similarity + OCR_MATCH_BOOST)
         
         # Consider word order and structure
-        word_similarity = self._calculate_word_similarity(norm1, norm2)
+        union = text1.words | text2.words
+        word_similarity = len(text1.words & text2.words) / len(union) if union else 0.0
         
         # Combined score with weighting
         final_score = (
@@ -101,49 +267,6 @@ class IntelligentTodoDeduplicator:
         
         return normalized
     
-    def _adjust_for_ocr_patterns(self, text1: str, text2: str, base_score: float) -> float:
-        """Adjust similarity score based on common OCR substitution patterns."""
-        
-        # Common OCR character substitutions
-        ocr_substitutions = [
-            ('l', '1', 'I'),     # l, 1, I confusion
-            ('O', '0', 'Q'),     # O, 0, Q confusion  
-            ('rn', 'm'),         # rn vs m
-            ('cl', 'd'),         # cl vs d
-            ('nn', 'n'),         # double n vs single n
-            ('vv', 'w'),         # vv vs w
-            ('Aveniq', 'Aleniq', 'Avaniq'),  # Specific example from user
-            ('MTI', 'MT1', 'MII'), # Another specific example
-        ]
-        
-        text1_lower = text1.lower()
-        text2_lower = text2.lower()
-        
-        # Check if the difference can be explained by OCR substitutions
-        for substitutions in ocr_substitutions:
-            for i, sub1 in enumerate(substitutions):
-                for sub2 in substitutions[i+1:]:
-                    # Check both directions
-                    if text1_lower.replace(sub1, sub2) == text2_lower:
-                        return min(1.0, base_score + 0.2)  # Boost score
-                    if text2_lower.replace(sub1, sub2) == text1_lower:
-                        return min(1.0, base_score + 0.2)  # Boost score
-        
-        return base_score
-    
-    def _calculate_word_similarity(self, text1: str, text2: str) -> float:
-        """Calculate similarity based on word overlap."""
-        words1 = set(text1.split())
-        words2 = set(text2.split())
-        
-        if not words1 or not words2:
-            return 0.0
-        
-        intersection = words1.intersection(words2)
-        union = words1.union(words2)
-        
-        return len(intersection) / len(union) if union else 0.0
-    
     def calculate_position_distance(self, bbox1: Optional[Dict], bbox2: Optional[Dict]) -> float:
         """Calculate distance between two bounding boxes."""
         if not bbox1 or not bbox2:
@@ -167,26 +290,35 @@ class IntelligentTodoDeduplicator:
         
         Returns list of (existing_todo, similarity_score) tuples sorted by similarity.
         """
-        similarities = []
+        return self._find_similar_in_page([new_todo], existing_todos)[0]
+    
+    def _find_similar_in_page(self,
+                              new_todos: List[TodoCandidate],
+                              existing_todos: List[Dict]) -> List[List[Tuple[Dict, float]]]:
+        """find_similar_todos for several candidates, scored with one similarity matrix."""
+        results: List[List[Tuple[Dict, float]]] = [[] for _ in new_todos]
+        if not new_todos or not existing_todos:
+            return results
+        
+        text_similarities = self.similarity_matrix(
+            [todo.text for todo in new_todos],
+            [existing.get('text', '') or '' for existing in existing_todos],
+            score_cutoff=self.similarity_threshold
+        )
         
-        for existing in existing_todos:
+        for i, j in zip(*np.nonzero(text_similarities)):
+            new_todo, existing = new_todos[i], existing_todos[j]
+            
             # Only compare todos from the same page
             if str(existing.get('page_number')) != str(new_todo.page_number):
                 continue
             
-            # Calculate text similarity
-            text_similarity = self.calculate_similarity(new_todo.text, existing.get('text', ''))
-            
-            if text_similarity < self.similarity_threshold:
-                continue
-            
             # Calculate position similarity if bounding boxes available
             position_bonus = 0.0
             if new_todo.bounding_box and existing.get('bounding_box'):
                 try:
                     existing_bbox = existing.get('bounding_box')
                     if isinstance(existing_bbox, str):
-                        import json
                         existing_bbox = json.loads(existing_bbox)
                     
                     distance = self.calculate_position_distance(new_todo.bounding_box, existing_bbox)
@@ -195,12 +327,47 @@ class IntelligentTodoDeduplicator:
                 except (ValueError, TypeError) as e:
                     logger.debug(f"Error parsing bounding box: {e}")
             
-            final_similarity = min(1.0, text_similarity + position_bonus)
-            similarities.append((existing, final_similarity))
+            final_similarity = min(1.0, float(text_similarities[i, j]) + position_bonus)
+            results[i].append((existing, final_similarity))
+        
+        # Sort by similarity score (highest first), keeping the existing order for ties
+        for similarities in results:
+            similarities.sort(key=lambda x: x[1], reverse=True)
+        return results
+    
+    def find_cross_page_duplicates(self, todos: List[Dict],
+                                   index: Optional[TodoMinHashIndex] = None) -> List[Tuple[Dict, Dict, float]]:
+        """
+        Find near-duplicate todos anywhere in the library (across pages and notebooks).
         
-        # Sort by similarity score (highest first)
-        similarities.sort(key=lambda x: x[1], reverse=True)
-        return similarities
+        MinHash/LSH narrows the search to candidate pairs, which are then
+        verified with the regular similarity score.
+        
+        Args:
+            todos: Todo rows with at least 'text' (typically also 'id', 'notebook_uuid', 'page_number')
+            index: Optional pre-configured index (e.g. different band/row tuning)
+            
+        Returns:
+            (todo, duplicate_todo, similarity) tuples sorted by similarity
+        """
+        index = index or TodoMinHashIndex()
+        prepared = [self.prepare_text(todo.get('text', '') or '') for todo in todos]
+        for position, text in enumerate(prepared):
+            if text.normalized:
+                index.add(position, text.ocr_form)
+        
+        duplicates = []
+        for i, j in index.candidate_pairs():
+            basic_similarity = self._sequence_matrix(
+                [prepared[i].normalized], [prepared[j].normalized], 0.0
+            )[0, 0]
+            score = self._combine_scores(prepared[i], prepared[j], float(basic_similarity))
+            if score >= self.similarity_threshold:
+                duplicates.append((todos[i], todos[j], score))
+        
+        duplicates.sort(key=lambda x: x[2], reverse=True)
+        logger.debug(f"Cross-page dedup: {len(todos)} todos, {len(duplicates)} duplicate pairs")
+        return duplicates
     
     def should_replace_existing(self, 
                               new_todo: TodoCandidate, 
@@ -264,8 +431,9 @@ class IntelligentTodoDeduplicator:
         final_todos = []
         todos_to_delete = []
         
-        for new_todo in new_todos:
-            similar_todos = self.find_similar_todos(new_todo, existing_todos)
+        page_similarities = self._find_similar_in_page(new_todos, existing_todos)
+        
+        for new_todo, similar_todos in zip(new_todos, page_similarities):
             
             if not similar_todos:
                 # No similar todos found, add as new
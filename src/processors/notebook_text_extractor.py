@@ -18,14 +18,19 @@ import logging
 import sqlite3
 import tempfile
 import fnmatch
-from typing import List, Dict, Optional, Tuple, Any
+from typing import List, Dict, Optional, Set, Tuple, Any
 from dataclasses import dataclass
 from pathlib import Path
 import time
 
 # Import our existing components
-from .gemini_vision_ocr import GeminiVisionOCREngine, OCRResult
+from .gemini_vision_ocr import GeminiVisionOCREngine, OCRResult, BoundingBox
 from ..core.rm_parser import RemarkableParser
+from ..core.rm_scene import file_sha256, get_scene_cache
+from .blank_page_detection import BlankPageClassifier
+from .ocr_payload import OCRPayloadOptimizer
+from .page_pipeline import StagedPagePipeline
+from .region_ocr import RegionOCRPlanner, RegionUpdate, TextSegment, page_segment, segments_text
 
 
 @dataclass
@@ -47,9 +52,11 @@ class NotebookProcessingResult:
             self.todos = []
         if self.processed_page_numbers is None:
             self.processed_page_numbers = set()
-from ..core.database import DatabaseManager
+from ..core.database import DatabaseManager, write_through
 from ..core.events import get_event_bus, EventType
 from ..core.notebook_paths import update_notebook_metadata
+from ..utils import metrics
+from ..utils.cancellation import CancellationToken, is_cancelled
 from ..core.sync_hooks import get_hook_manager, track_page_operation, track_todo_operation
 from .intelligent_todo_deduplication import IntelligentTodoDeduplicator, create_todo_candidate
 
@@ -88,6 +95,7 @@ class NotebookPage:
     page_number: int
     rm_file_path: Path
     ocr_results: List[OCRResult]
+    text_segments: Optional[List[Dict[str, Any]]] = None  # Set when merged from a region update
 
 
 @dataclass
@@ -363,6 +371,7 @@ class NotebookTextExtractor:
         self.filter_pdf_epub = False  # Filter out notebooks with associated PDF/EPUB files
         self.max_pages = None  # Maximum pages to process per notebook (for testing)
         self.notebook_filter_list = None  # List of notebook UUIDs/names to process selectively
+        self._triaged_versions = {}  # (notebook_uuid, page_uuid) -> (.rm hash, ink fingerprint) when triaged
         
         # OCR Engine: Gemini Vision (best for handwriting)
         logger.info("Initializing Gemini Vision OCR...")
@@ -371,6 +380,18 @@ class NotebookTextExtractor:
             confidence_threshold=confidence_threshold
         )
         
+        # Pages with (almost) no ink are recorded as blank without an OCR call
+        self.blank_page_classifier = BlankPageClassifier.from_config(self.ocr_engine.config)
+        # Pages that only gained strokes can be updated by OCR'ing just the new region
+        self.region_planner = RegionOCRPlanner.from_config(self.ocr_engine.config)
+        # Pages are sent cropped to their ink, in the smallest of PNG/WebP/PDF
+        self.payload_optimizer = OCRPayloadOptimizer.from_config(self.ocr_engine.config)
+        # process_directory can overlap discovery, rendering, OCR and storage across notebooks
+        self.pipeline = StagedPagePipeline.from_config(self.ocr_engine.config)
+        # Periodic scene cache prunes keep only the page versions region OCR can still use
+        if self.db_manager:
+            get_scene_cache(self.ocr_engine.config).keep_provider = self._scene_cache_digests
+        
         logger.info(f"Notebook Text Extractor initialized")
         logger.info(f"  OCR available: {self.ocr_engine.is_available()}")
         logger.info(f"  Language: {language}")
@@ -386,6 +407,12 @@ class NotebookTextExtractor:
         else:
             return None
     
+    def _write(self, command):
+        """Run a write command on the database writer (in-memory connections write directly)."""
+        if self.db_manager:
+            return self.db_manager.write(command)
+        return write_through(self.db_connection, command)
+    
     def is_available(self) -> bool:
         """Check if the extractor is ready to process files."""
         return self.ocr_engine.is_available()
@@ -473,15 +500,84 @@ class NotebookTextExtractor:
     
     def _calculate_rm_file_hash(self, rm_file_path: str) -> str:
         """Calculate hash of .rm file content for change detection."""
-        import hashlib
         try:
-            with open(rm_file_path, 'rb') as f:
-                content = f.read()
-            return hashlib.sha256(content).hexdigest()
+            # Memoized on (size, mtime) and shared with the scene cache
+            return file_sha256(rm_file_path)
         except Exception as e:
             logger.debug(f"Error calculating hash for {rm_file_path}: {e}")
             return ""
     
+    def _scene_cache_digests(self, directory_path: Optional[str] = None) -> Optional[Set[str]]:
+        """
+        Content hashes whose parsed scenes are still needed: each page's current
+        .rm file and the version last stored for it (what region OCR diffs against).
+        
+        Returns:
+            Set of hashes, or None if the pages or stored versions can't be listed
+        """
+        directory = Path(directory_path or self.data_directory)
+        if not directory.is_dir():
+            return None
+        
+        db_conn = self._get_db_connection()
+        if db_conn is None:
+            return None
+        try:
+            rows = db_conn.execute(
+                "SELECT DISTINCT page_content_hash FROM notebook_text_extractions WHERE page_content_hash IS NOT NULL"
+            ).fetchall()
+        finally:
+            if self.db_manager:
+                db_conn.close()
+        
+        digests = {row[0] for row in rows}
+        for rm_file in directory.glob('*/*.rm'):
+            try:
+                digests.add(file_sha256(str(rm_file)))
+            except OSError:
+                continue
+        return digests
+    
+    def prune_scene_cache(self, directory_path: Optional[str] = None) -> int:
+        """Delete cached scenes of page versions that are neither current nor last stored."""
+        try:
+            keep = self._scene_cache_digests(directory_path)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not list scene cache entries in use: {e}")
+            keep = None
+        return get_scene_cache(self.ocr_engine.config).prune(keep)
+    
+    def _calculate_ink_fingerprint(self, rm_file_path: str) -> Optional[str]:
+        """Fingerprint of a page's stroke geometry, or None if it can't be parsed (non-v6 pages)."""
+        try:
+            scene = get_scene_cache(self.ocr_engine.config).load(rm_file_path)
+            return scene.ink_fingerprint() if scene is not None else None
+        except Exception as e:
+            logger.debug(f"Error calculating ink fingerprint for {rm_file_path}: {e}")
+            return None
+    
+    def _is_ink_unchanged(self, notebook_uuid: str, page_uuid: str, page_number: int,
+                          rm_file_path: str, current_hash: str, stored_fingerprint: Optional[str]) -> bool:
+        """
+        Check whether a page whose .rm hash changed still holds the same ink.
+        
+        The tablet rewrites v6 files (CRDT bookkeeping, layer metadata) without
+        touching the strokes. When the geometry fingerprint still matches, the
+        stored raw hash is moved forward for bookkeeping and OCR is skipped.
+        """
+        if not stored_fingerprint:
+            return False
+        if self._calculate_ink_fingerprint(rm_file_path) != stored_fingerprint:
+            return False
+        
+        self._write(lambda conn: conn.execute("""
+            UPDATE notebook_text_extractions SET page_content_hash = ?
+            WHERE notebook_uuid = ? AND page_uuid = ?
+        """, (current_hash, notebook_uuid, page_uuid)))
+        metrics.inc('ocr_reocr_avoided', notebook=notebook_uuid)
+        logger.info(f"    🖋️ Page {page_number}: Ink unchanged (file rewritten) - skipping re-OCR")
+        return True
+    
     def _notebook_needs_processing(self, notebook_uuid: str, notebook_name: str, content_file: str, notebook_dir: str) -> bool:
         """
         Check if a notebook needs processing by checking individual page files and their content hashes.
@@ -544,7 +640,7 @@ class NotebookTextExtractor:
                     
                     # Check if page exists in database
                     cursor.execute('''
-                        SELECT page_content_hash, created_at 
+                        SELECT page_content_hash, ink_fingerprint 
                         FROM notebook_text_extractions 
                         WHERE notebook_uuid = ? AND page_uuid = ? 
                         LIMIT 1
@@ -569,11 +665,14 @@ class NotebookTextExtractor:
                     stored_hash = db_result[0] if db_result[0] else ""
                     current_hash = self._calculate_rm_file_hash(rm_file_path)
                     
-                    if current_hash != stored_hash:
+                    if current_hash == stored_hash:
+                        logger.debug(f"    📄 Page {page_num}: No changes")
+                    elif self._is_ink_unchanged(notebook_uuid, page_uuid, page_num,
+                                                rm_file_path, current_hash, db_result[1]):
+                        continue
+                    else:
                         logger.debug(f"    📄 Page {page_num}: Content changed (hash mismatch)")
                         changed_pages += 1
-                    else:
-                        logger.debug(f"    📄 Page {page_num}: No changes")
                 
                 total_changes = new_pages + changed_pages
                 if total_changes > 0:
@@ -624,16 +723,19 @@ class NotebookTextExtractor:
         
         return notebooks
     
-    def process_notebook(self, notebook_info: Dict[str, Any], input_path: str) -> NotebookTextResult:
+    def process_notebook(self, notebook_info: Dict[str, Any], input_path: str,
+                         cancel_token: Optional[CancellationToken] = None) -> NotebookTextResult:
         """
         Process a single notebook and extract all text.
         
         Args:
             notebook_info: Notebook information from find_notebooks()
             input_path: Base path containing the notebook files
+            cancel_token: Checked at page boundaries; once cancelled, no further
+                pages are OCR'd and the pages finished so far are stored
             
         Returns:
-            NotebookTextResult with extracted text
+            NotebookTextResult with extracted text (success=False if cancelled)
         """
         start_time = time.time()
         
@@ -645,159 +747,247 @@ class NotebookTextExtractor:
         
         # Metadata is refreshed globally at startup, no need to refresh per-notebook
         
-        # Check if this is a handwritten notebook that should have OCR applied
-        if not self._is_handwritten_notebook(uuid, doc_name):
-            logger.info(f"⏭️ Skipping non-handwritten document (no OCR needed): {doc_name}")
-            return NotebookTextResult(
-                notebook_name=doc_name,
-                notebook_uuid=uuid,
-                pages=[],
-                todos=[],
-                success=False,
-                error_message=f"Document type does not require OCR: {doc_name}",
-                processing_time_ms=0
-            )
-        
-        if not self.is_available():
-            return NotebookTextResult(
-                success=False,
-                notebook_uuid=uuid,
-                notebook_name=doc_name,
-                pages=[],
-                total_text_regions=0,
-                processing_time_ms=0,
-                todos=[],
-                error_message="OCR engine not available"
-            )
+        skipped = self._notebook_preflight(uuid, doc_name)
+        if skipped:
+            return skipped
         
         try:
-            # Read content file to get page list
-            with open(content_file, 'r', encoding='utf-8') as f:
-                content = json.load(f)
-            
-            # Get page list - try multiple approaches for different .content formats
-            page_uuid_list = []
-            
-            # Method 1: formatVersion-specific handling
-            if content.get('formatVersion') == 1:
-                page_uuid_list = content.get('pages', [])
-            elif content.get('formatVersion') == 2:
-                pages = content.get('cPages', {}).get('pages', [])
-                page_uuid_list = [page['id'] for page in pages if 'deleted' not in page]
-            # Method 2: Fallback - direct pages array (common in many versions including v5)
-            elif 'pages' in content:
-                page_uuid_list = content.get('pages', [])
-            else:
-                raise ValueError(f"Unknown format version: {content.get('formatVersion')} and no 'pages' array found")
-            
-            if not page_uuid_list:
-                raise ValueError("No pages found in notebook")
-            
-            logger.info(f"  Found {len(page_uuid_list)} pages")
-            
-            # Apply page limit if specified
-            if self.max_pages and len(page_uuid_list) > self.max_pages:
-                original_count = len(page_uuid_list)
-                page_uuid_list = page_uuid_list[:self.max_pages]
-                logger.info(f"  Limited to first {len(page_uuid_list)} pages (out of {original_count})")
+            page_uuid_list = self._notebook_page_uuids(content_file)
             
             # Process each page
             processed_pages = []
-            total_text_regions = 0
             
             with tempfile.TemporaryDirectory(prefix='notebook_text_extractor_') as tmpdir:
                 tmpdir = Path(tmpdir)
                 
+                pending_pages = []
+                region_pages = []
+                blank_pages = 0
+                
                 for page_num, page_uuid in enumerate(page_uuid_list, 1):
-                    logger.info(f"  🔍 Checking page {page_num}/{len(page_uuid_list)} (UUID: {page_uuid})")
-                    
-                    # Check if this page was already processed (incremental processing)
-                    notebook_dir_for_check = os.path.join(input_path, uuid)
-                    already_processed = self._is_page_already_processed(uuid, page_uuid, page_num, notebook_dir_for_check)
-                    if already_processed:
-                        logger.info(f"    ⏩ Page {page_num}: Already processed, skipping")
+                    if is_cancelled(cancel_token):
+                        break
+                    triage = self._triage_page(uuid, page_uuid, page_num, len(page_uuid_list), input_path)
+                    if triage is None:
                         continue
-                    else:
-                        logger.info(f"    🔄 Page {page_num}: Processing (new or changed)")
                     
-                    # Find the .rm file for this page
-                    page_rm_file = Path(input_path) / uuid / f"{page_uuid}.rm"
+                    page_rm_file, blank_page, region_update = triage
+                    if blank_page:
+                        processed_pages.append(blank_page)
+                        blank_pages += 1
+                    elif region_update:
+                        region_pages.append((page_rm_file, page_uuid, page_num, region_update))
+                    else:
+                        pending_pages.append((page_rm_file, page_uuid, page_num))
+                
+                if blank_pages:
+                    logger.info(f"  ⬜ {blank_pages} blank pages recorded without OCR "
+                                f"(~${blank_pages * self.blank_page_classifier.cost_per_page:.3f} saved)")
+                
+                # Pages that only gained strokes: OCR the new region, full page if that fails
+                if region_pages and not is_cancelled(cancel_token):
+                    processed_pages.extend(self._process_region_pages(region_pages, tmpdir, pending_pages,
+                                                                      cancel_token))
+                
+                # OCR pending pages, several per request when batching is enabled and
+                # several requests at a time as allowed by the engine's concurrency limiter
+                batch_size = self.ocr_engine.pages_per_request * self.ocr_engine.limiter.max_limit
+                for i in range(0, len(pending_pages), batch_size):
+                    if is_cancelled(cancel_token):
+                        break
+                    batch = pending_pages[i:i + batch_size]
                     
-                    if not page_rm_file.exists():
-                        logger.warning(f"  Page {page_num} .rm file not found: {page_rm_file}")
+                    try:
+                        # Convert pages to PDF and extract text
+                        if len(batch) == 1:
+                            page_results = [self._process_single_page(*batch[0], tmpdir, cancel_token)]
+                        else:
+                            page_results = self._process_page_batch(batch, tmpdir, cancel_token)
+                    except Exception as e:
+                        logger.error(f"    ✗ Pages {batch[0][2]}-{batch[-1][2]}: Error processing - {e}")
                         continue
                     
-                    try:
-                        # Convert page to PDF and extract text
-                        page_result = self._process_single_page(
-                            page_rm_file, page_uuid, page_num, tmpdir
-                        )
-                        
+                    for (_, _, page_num), page_result in zip(batch, page_results):
                         if page_result:
                             processed_pages.append(page_result)
-                            total_text_regions += len(page_result.ocr_results)
                             logger.debug(f"    ✓ Page {page_num}: {len(page_result.ocr_results)} text regions")
                         else:
                             logger.warning(f"    ✗ Page {page_num}: No text extracted")
-                    
-                    except Exception as e:
-                        logger.error(f"    ✗ Page {page_num}: Error processing - {e}")
-                        continue
-            
-            processing_time = int((time.time() - start_time) * 1000)
-            
-            # Store results in database if available
-            if (self.db_connection or self.db_manager) and processed_pages:
-                self._store_notebook_results(uuid, doc_name, processed_pages, input_path)
-            
-            # Emit completion event
-            event_bus = get_event_bus()
-            if event_bus:
-                event_bus.emit(EventType.TEXT_EXTRACTION_COMPLETED, {
-                    'notebook_uuid': uuid,
-                    'notebook_name': doc_name,
-                    'page_count': len(processed_pages),
-                    'text_regions': total_text_regions,
-                    'processing_time_ms': processing_time
-                })
-            
-            logger.info(f"  ✓ Completed: {total_text_regions} text regions from {len(processed_pages)} pages")
-            
-            # Create result and extract todos
-            result = NotebookTextResult(
-                success=True,
-                notebook_uuid=uuid,
-                notebook_name=doc_name,
-                pages=processed_pages,
-                total_text_regions=total_text_regions,
-                processing_time_ms=processing_time,
-                todos=[]
-            )
-            
-            # Extract todos from the text
-            result.todos = result.extract_todos()
-            logger.info(f"  ✓ Extracted {len(result.todos)} todo items")
-            
-            # Store todos in database if available
-            if (self.db_connection or self.db_manager) and result.todos:
-                self._store_todos(result.todos)
             
+            # Pages finished before a cancellation are stored like any others
+            result = self._finish_notebook(uuid, doc_name, processed_pages, blank_pages, input_path, start_time)
+            if is_cancelled(cancel_token):
+                logger.warning(f"  ⏹️ {doc_name}: Cancelled ({cancel_token.reason}) - "
+                               f"kept {len(processed_pages)} finished pages, the rest on the next run")
+                metrics.inc('notebook_cancellations_total', reason=cancel_token.reason)
+                result.success = False
+                result.error_message = f"Cancelled: {cancel_token.reason}"
             return result
             
         except Exception as e:
-            processing_time = int((time.time() - start_time) * 1000)
-            logger.error(f"  ✗ Error processing notebook {doc_name}: {e}")
-            
+            return self._notebook_error_result(uuid, doc_name, e, start_time)
+    
+    def _notebook_preflight(self, notebook_uuid: str, notebook_name: str) -> Optional[NotebookTextResult]:
+        """Result for a notebook that won't be OCR'd at all, or None if it should be processed."""
+        # Check if this is a handwritten notebook that should have OCR applied
+        if not self._is_handwritten_notebook(notebook_uuid, notebook_name):
+            logger.info(f"⏭️ Skipping non-handwritten document (no OCR needed): {notebook_name}")
+            return NotebookTextResult(
+                notebook_name=notebook_name,
+                notebook_uuid=notebook_uuid,
+                pages=[],
+                todos=[],
+                success=False,
+                error_message=f"Document type does not require OCR: {notebook_name}",
+                processing_time_ms=0
+            )
+        
+        if not self.is_available():
             return NotebookTextResult(
                 success=False,
-                notebook_uuid=uuid,
-                notebook_name=doc_name,
+                notebook_uuid=notebook_uuid,
+                notebook_name=notebook_name,
                 pages=[],
                 total_text_regions=0,
-                processing_time_ms=processing_time,
+                processing_time_ms=0,
                 todos=[],
-                error_message=str(e)
+                error_message="OCR engine not available"
             )
+        return None
+    
+    def _notebook_page_uuids(self, content_file: Path) -> List[str]:
+        """Page UUIDs of a notebook from its .content file, limited to max_pages."""
+        with open(content_file, 'r', encoding='utf-8') as f:
+            content = json.load(f)
+        
+        # Get page list - try multiple approaches for different .content formats
+        page_uuid_list = []
+        
+        # Method 1: formatVersion-specific handling
+        if content.get('formatVersion') == 1:
+            page_uuid_list = content.get('pages', [])
+        elif content.get('formatVersion') == 2:
+            pages = content.get('cPages', {}).get('pages', [])
+            page_uuid_list = [page['id'] for page in pages if 'deleted' not in page]
+        # Method 2: Fallback - direct pages array (common in many versions including v5)
+        elif 'pages' in content:
+            page_uuid_list = content.get('pages', [])
+        else:
+            raise ValueError(f"Unknown format version: {content.get('formatVersion')} and no 'pages' array found")
+        
+        if not page_uuid_list:
+            raise ValueError("No pages found in notebook")
+        
+        logger.info(f"  Found {len(page_uuid_list)} pages")
+        
+        # Apply page limit if specified
+        if self.max_pages and len(page_uuid_list) > self.max_pages:
+            original_count = len(page_uuid_list)
+            page_uuid_list = page_uuid_list[:self.max_pages]
+            logger.info(f"  Limited to first {len(page_uuid_list)} pages (out of {original_count})")
+        
+        return page_uuid_list
+    
+    def _triage_page(self, notebook_uuid: str, page_uuid: str, page_number: int, page_count: int,
+                     input_path: str) -> Optional[Tuple[Path, Optional[NotebookPage], Optional[RegionUpdate]]]:
+        """
+        Decide what a page needs before any rendering.
+        
+        Returns:
+            None if the page is unchanged or missing; otherwise its .rm file and
+            either a blank NotebookPage (no OCR), a RegionUpdate (region OCR), or
+            neither (full-page OCR)
+        """
+        logger.info(f"  🔍 Checking page {page_number}/{page_count} (UUID: {page_uuid})")
+        
+        # Check if this page was already processed (incremental processing)
+        notebook_dir_for_check = os.path.join(input_path, notebook_uuid)
+        if self._is_page_already_processed(notebook_uuid, page_uuid, page_number, notebook_dir_for_check):
+            logger.info(f"    ⏩ Page {page_number}: Already processed, skipping")
+            return None
+        logger.info(f"    🔄 Page {page_number}: Processing (new or changed)")
+        
+        # Find the .rm file for this page
+        page_rm_file = Path(input_path) / notebook_uuid / f"{page_uuid}.rm"
+        if not page_rm_file.exists():
+            logger.warning(f"  Page {page_number} .rm file not found: {page_rm_file}")
+            return None
+        
+        # Stored with the page's text: the version that gets rendered, not the file as
+        # it is when the notebook is stored (strokes may have been added meanwhile)
+        self._triaged_versions[(notebook_uuid, page_uuid)] = (
+            self._calculate_rm_file_hash(str(page_rm_file)), self._calculate_ink_fingerprint(str(page_rm_file)))
+        
+        blank_reason = self._blank_page_reason(page_rm_file)
+        if blank_reason:
+            self.blank_page_classifier.record_skip(notebook_uuid, page_number, blank_reason)
+            return page_rm_file, self._blank_page(page_rm_file, page_uuid, page_number), None
+        
+        return page_rm_file, None, self._plan_region_update(notebook_uuid, page_uuid, page_number, page_rm_file)
+    
+    def _finish_notebook(self, notebook_uuid: str, notebook_name: str, processed_pages: List[NotebookPage],
+                         blank_pages: int, input_path: str, start_time: float) -> NotebookTextResult:
+        """Store a notebook's new pages and todos and build its result."""
+        # Blank pages carry a single empty region
+        total_text_regions = sum(len(page.ocr_results) for page in processed_pages) - blank_pages
+        processing_time = int((time.time() - start_time) * 1000)
+        
+        # Store results in database if available
+        if (self.db_connection or self.db_manager) and processed_pages:
+            with metrics.stage('db_store', notebook=notebook_uuid):
+                self._store_notebook_results(notebook_uuid, notebook_name, processed_pages, input_path)
+        
+        # Emit completion event
+        event_bus = get_event_bus()
+        if event_bus:
+            event_bus.emit(EventType.TEXT_EXTRACTION_COMPLETED, {
+                'notebook_uuid': notebook_uuid,
+                'notebook_name': notebook_name,
+                'page_count': len(processed_pages),
+                'blank_pages': blank_pages,
+                'text_regions': total_text_regions,
+                'processing_time_ms': processing_time
+            })
+        
+        logger.info(f"  ✓ Completed: {total_text_regions} text regions from {len(processed_pages)} pages"
+                    f"{f' ({blank_pages} blank)' if blank_pages else ''}")
+        
+        # Create result and extract todos
+        result = NotebookTextResult(
+            success=True,
+            notebook_uuid=notebook_uuid,
+            notebook_name=notebook_name,
+            pages=processed_pages,
+            total_text_regions=total_text_regions,
+            processing_time_ms=processing_time,
+            todos=[]
+        )
+        
+        # Extract todos from the text
+        result.todos = result.extract_todos()
+        logger.info(f"  ✓ Extracted {len(result.todos)} todo items")
+        
+        # Store todos in database if available
+        if (self.db_connection or self.db_manager) and result.todos:
+            self._store_todos(result.todos)
+        
+        return result
+    
+    def _notebook_error_result(self, notebook_uuid: str, notebook_name: str, error: Exception,
+                               start_time: float) -> NotebookTextResult:
+        processing_time = int((time.time() - start_time) * 1000)
+        logger.error(f"  ✗ Error processing notebook {notebook_name}: {error}")
+        
+        return NotebookTextResult(
+            success=False,
+            notebook_uuid=notebook_uuid,
+            notebook_name=notebook_name,
+            pages=[],
+            total_text_regions=0,
+            processing_time_ms=processing_time,
+            todos=[],
+            error_message=str(error)
+        )
     
     def _is_page_already_processed(self, notebook_uuid: str, page_uuid: str, page_number: int, notebook_dir: str) -> bool:
         """Check if a page was already processed and .rm file content hasn't changed."""
@@ -823,21 +1013,27 @@ class NotebookTextExtractor:
                 # Direct connection - use it directly
                 cursor = self.db_connection.cursor()
                 cursor.execute("""
-                    SELECT page_content_hash FROM notebook_text_extractions 
+                    SELECT page_content_hash, ink_fingerprint FROM notebook_text_extractions 
                     WHERE notebook_uuid = ? AND page_uuid = ? AND page_number = ?
                     LIMIT 1
                 """, (notebook_uuid, page_uuid, page_number))
                 result = cursor.fetchone()
+                if result and result[0] != current_hash and self._is_ink_unchanged(
+                        notebook_uuid, page_uuid, page_number, rm_file_path, current_hash, result[1]):
+                    return True
             else:
                 # Using db_manager - use proper context manager
                 with self.db_manager.get_connection() as conn:
                     cursor = conn.cursor()
                     cursor.execute("""
-                        SELECT page_content_hash FROM notebook_text_extractions 
+                        SELECT page_content_hash, ink_fingerprint FROM notebook_text_extractions 
                         WHERE notebook_uuid = ? AND page_uuid = ? AND page_number = ?
                         LIMIT 1
                     """, (notebook_uuid, page_uuid, page_number))
                     result = cursor.fetchone()
+                    if result and result[0] != current_hash and self._is_ink_unchanged(
+                            notebook_uuid, page_uuid, page_number, rm_file_path, current_hash, result[1]):
+                        return True
             
             if not result:
                 logger.debug(f"    🔍 Page {page_number}: Not found in database - will process")
@@ -853,75 +1049,300 @@ class NotebookTextExtractor:
             logger.warning(f"    🔍 Page {page_number}: Error checking if already processed: {e}")
             return False  # If check fails, process the page
     
+    def _blank_page_reason(self, rm_file: Path) -> Optional[str]:
+        """Why a page can skip OCR as blank, or None if it needs OCR."""
+        try:
+            scene = get_scene_cache(self.ocr_engine.config).load(str(rm_file))
+            return self.blank_page_classifier.classify(scene)
+        except Exception as e:
+            logger.debug(f"Blank page check failed for {rm_file.name}: {e}")
+            return None
+    
+    def _blank_page(self, rm_file: Path, page_uuid: str, page_number: int) -> NotebookPage:
+        """A page stored as blank: one empty-text region, which sync already ignores."""
+        return NotebookPage(
+            page_uuid=page_uuid,
+            page_number=page_number,
+            rm_file_path=rm_file,
+            ocr_results=[OCRResult(
+                text='',
+                confidence=1.0,
+                bounding_box=BoundingBox(0, 0, 0, 0),
+                language='',
+                page_number=page_number
+            )]
+        )
+    
     def _process_single_page(
         self,
         rm_file: Path,
         page_uuid: str,
         page_number: int,
-        temp_dir: Path
+        temp_dir: Path,
+        cancel_token: Optional[CancellationToken] = None
     ) -> Optional[NotebookPage]:
-        """Process a single page: .rm → SVG → PDF → OCR."""
+        """Process a single page: .rm → SVG → PDF/PNG/WebP → OCR."""
+        if self._debug_force_ocr_failure(page_number) or is_cancelled(cancel_token):
+            return None
+
+        try:
+            payload_file = self._render_page_payload(rm_file, page_number, temp_dir)
+            if not payload_file:
+                return None
 
-        # DEBUG: Force OCR failure for testing - set DEBUG_FORCE_OCR_FAIL_PAGES to list of page numbers
+            # Perform OCR on the rendered page
+            ocr_result = self.ocr_engine.process_file(str(payload_file), cancel_token)
+            return self._page_from_ocr_result(ocr_result, rm_file, page_uuid, page_number)
+            
+        except Exception as e:
+            logger.error(f"Error processing page {page_number}: {e}")
+            return None
+    
+    def _process_page_batch(
+        self,
+        pages: List[Tuple[Path, str, int]],
+        temp_dir: Path,
+        cancel_token: Optional[CancellationToken] = None
+    ) -> List[Optional[NotebookPage]]:
+        """Process several pages together: each .rm → SVG → PDF/PNG/WebP, then one OCR call for all of them.
+
+        Args:
+            pages: (rm_file, page_uuid, page_number) tuples
+
+        Returns:
+            One NotebookPage (or None on failure) per input page, in order
+        """
+        results: List[Optional[NotebookPage]] = [None] * len(pages)
+        rendered = []  # (index, payload_file)
+
+        for index, (rm_file, page_uuid, page_number) in enumerate(pages):
+            if is_cancelled(cancel_token):
+                break
+            if self._debug_force_ocr_failure(page_number):
+                continue
+            try:
+                payload_file = self._render_page_payload(rm_file, page_number, temp_dir)
+                if payload_file:
+                    rendered.append((index, payload_file))
+            except Exception as e:
+                logger.error(f"Error rendering page {page_number}: {e}")
+
+        if not rendered:
+            return results
+
+        ocr_results = self.ocr_engine.process_files([str(payload_file) for _, payload_file in rendered],
+                                                    cancel_token)
+        for (index, _), ocr_result in zip(rendered, ocr_results):
+            rm_file, page_uuid, page_number = pages[index]
+            results[index] = self._page_from_ocr_result(ocr_result, rm_file, page_uuid, page_number)
+
+        return results
+    
+    def _plan_region_update(self, notebook_uuid: str, page_uuid: str, page_number: int,
+                            rm_file: Path) -> Optional[RegionUpdate]:
+        """Plan a region-only OCR for a page that was OCR'd before, or None for full-page OCR."""
+        if not self.region_planner.enabled or not (self.db_connection or self.db_manager):
+            return None
+        
+        db_conn = self._get_db_connection()
+        try:
+            cursor = db_conn.cursor()
+            cursor.execute('''
+                SELECT text, page_content_hash, text_segments FROM notebook_text_extractions 
+                WHERE notebook_uuid = ? AND page_uuid = ? 
+                ORDER BY id
+            ''', (notebook_uuid, page_uuid))
+            rows = cursor.fetchall()
+        except Exception as e:
+            logger.debug(f"Region OCR lookup failed for page {page_number}: {e}")
+            return None
+        finally:
+            if self.db_manager:
+                db_conn.close()
+        
+        if not rows or not rows[0][1]:
+            return None
+        
+        scene_cache = get_scene_cache(self.ocr_engine.config)
+        previous = scene_cache.load_digest(rows[0][1])
+        current = scene_cache.load(str(rm_file))
+        if previous is None or current is None:
+            logger.debug(f"Region OCR not possible for page {page_number} (previous version not cached)")
+            return None
+        
+        if rows[0][2]:
+            segments = [TextSegment.from_dict(segment) for segment in json.loads(rows[0][2])]
+        else:
+            segment = page_segment(previous, '\n\n'.join(row[0] for row in rows if row[0]))
+            segments = [segment] if segment else []
+        
+        update = self.region_planner.plan(previous, current, segments)
+        if update:
+            x_min, x_max, y_min, y_max = update.crop
+            logger.info(f"    ✂️ Page {page_number}: {len(update.strokes)} new strokes - "
+                        f"OCR of region only ({x_max - x_min:.0f}x{y_max - y_min:.0f})")
+        return update
+    
+    def _process_region_pages(
+        self,
+        region_pages: List[Tuple[Path, str, int, RegionUpdate]],
+        temp_dir: Path,
+        pending_pages: List[Tuple[Path, str, int]],
+        cancel_token: Optional[CancellationToken] = None
+    ) -> List[NotebookPage]:
+        """OCR the new region of each page and merge it into the stored text.
+        
+        Pages whose region can't be rendered or transcribed are added to
+        pending_pages for full-page OCR.
+        """
+        rendered = []  # (region page, pdf_file)
+        for region_page in region_pages:
+            rm_file, page_uuid, page_number, update = region_page
+            try:
+                pdf_file = self._render_region_payload(rm_file, page_number, update, temp_dir)
+            except Exception as e:
+                logger.warning(f"    ✂️ Page {page_number}: Region render failed ({e}) - full page OCR")
+                pdf_file = None
+            if pdf_file:
+                rendered.append((region_page, pdf_file))
+            else:
+                pending_pages.append((rm_file, page_uuid, page_number))
+        
+        if not rendered:
+            return []
+        
+        merged_pages = []
+        ocr_results = self.ocr_engine.process_files([str(pdf_file) for _, pdf_file in rendered], cancel_token)
+        for ((rm_file, page_uuid, page_number, update), _), ocr_result in zip(rendered, ocr_results):
+            page = self._page_from_ocr_result(ocr_result, rm_file, page_uuid, page_number)
+            if not page:
+                logger.warning(f"    ✂️ Page {page_number}: Region OCR failed - full page OCR")
+                pending_pages.append((rm_file, page_uuid, page_number))
+                continue
+            merged_pages.append(self._merge_region_page(page, update))
+        
+        return merged_pages
+    
+    def _merge_region_page(self, page: NotebookPage, update: RegionUpdate) -> NotebookPage:
+        """Replace a region's transcription with the page text it merges into."""
+        region_text = '\n\n'.join(result.text for result in page.ocr_results if result.text)
+        segments = update.merged_segments(region_text)
+        first = page.ocr_results[0]
+        page.ocr_results = [OCRResult(
+            text=segments_text(segments),
+            confidence=first.confidence,
+            bounding_box=first.bounding_box,
+            language=first.language,
+            page_number=page.page_number
+        )]
+        page.text_segments = [segment.to_dict() for segment in segments]
+        metrics.inc('ocr_region_pages', notebook=page.rm_file_path.parent.name)
+        return page
+    
+    def _render_region_payload(self, rm_file: Path, page_number: int, update: RegionUpdate,
+                               temp_dir: Path) -> Optional[Path]:
+        """Render only a page's appended strokes, cropped to their region, at device scale."""
+        scene = get_scene_cache(self.ocr_engine.config).load(str(rm_file))
+        if scene is None:
+            return None
+        
+        # Without payload optimization still render a PDF of the region's own size
+        optimizer = self.payload_optimizer if self.payload_optimizer.enabled else OCRPayloadOptimizer(formats=('pdf',))
+        with metrics.stage('render', notebook=rm_file.parent.name):
+            payload = optimizer.build(scene, temp_dir / f"page_{page_number:03d}_region",
+                                      strokes=update.strokes, crop=update.crop)
+        return payload.path if payload else None
+    
+    def _render_page_payload(self, rm_file: Path, page_number: int, temp_dir: Path) -> Optional[Path]:
+        """Render a page for OCR: ink-cropped and size-optimized for v6 pages, full-page PDF otherwise."""
+        if self.payload_optimizer.is_available():
+            scene = get_scene_cache(self.ocr_engine.config).load(str(rm_file))
+            if scene is not None:
+                with metrics.stage('render', notebook=rm_file.parent.name):
+                    payload = self.payload_optimizer.build(scene, temp_dir / f"page_{page_number:03d}")
+                if payload:
+                    return payload.path
+                logger.warning(f"⚠️ Page {page_number}: Optimized payload failed, falling back to full-page PDF")
+        return self._render_page_pdf(rm_file, page_number, temp_dir)
+    
+    def _page_text_segments(self, page: NotebookPage) -> Optional[str]:
+        """JSON text segments to store for a page (one page-wide segment after full-page OCR)."""
+        segments = page.text_segments
+        if segments is None:
+            text = '\n\n'.join(result.text for result in page.ocr_results if result.text)
+            scene = get_scene_cache(self.ocr_engine.config).load(str(page.rm_file_path)) if text else None
+            segment = page_segment(scene, text) if scene is not None else None
+            segments = [segment.to_dict()] if segment else None
+        return json.dumps(segments) if segments is not None else None
+    
+    def _debug_force_ocr_failure(self, page_number: int) -> bool:
+        """Check DEBUG_FORCE_OCR_FAIL_PAGES to simulate OCR failures for testing."""
         # Example: export DEBUG_FORCE_OCR_FAIL_PAGES="29,30" to force failures on pages 29 and 30
-        import os
         debug_fail_pages = os.environ.get('DEBUG_FORCE_OCR_FAIL_PAGES', '')
         if debug_fail_pages:
             try:
                 fail_pages = [int(p.strip()) for p in debug_fail_pages.split(',') if p.strip().isdigit()]
                 if page_number in fail_pages:
                     logger.warning(f"🔍 DEBUG: Forcing OCR failure for page {page_number} (DEBUG_FORCE_OCR_FAIL_PAGES={debug_fail_pages})")
-                    return None
+                    return True
             except Exception as e:
                 logger.debug(f"Error parsing DEBUG_FORCE_OCR_FAIL_PAGES: {e}")
-
-        try:
-            # Convert .rm to SVG using rm_parser (supports both v5 and v6)
-            svg_file = temp_dir / f"page_{page_number:03d}.svg"
-            # Extract notebook UUID and page UUID from file path
-            # rm_file should be like: /path/uuid/page_uuid.rm
-            notebook_uuid = rm_file.parent.name
-            page_uuid_from_file = rm_file.stem
-            
-            page_info = self.rm_parser.convert_page_to_svg(
+        return False
+    
+    def _render_page_pdf(self, rm_file: Path, page_number: int, temp_dir: Path) -> Optional[Path]:
+        """Render a page's .rm file to a single-page PDF via SVG."""
+        # Convert .rm to SVG using rm_parser (supports both v5 and v6)
+        svg_file = temp_dir / f"page_{page_number:03d}.svg"
+        # Extract notebook UUID and page UUID from file path
+        # rm_file should be like: /path/uuid/page_uuid.rm
+        notebook_uuid = rm_file.parent.name
+        page_uuid_from_file = rm_file.stem
+        
+        with metrics.stage('render', notebook=notebook_uuid):
+            self.rm_parser.convert_page_to_svg(
                 notebook_uuid, page_uuid_from_file, str(svg_file)
             )
-            
-            if not svg_file.exists():
-                logger.error(f"Failed to create SVG for page {page_number}")
-                return None
-            
-            # Convert SVG to PDF
-            pdf_file = temp_dir / f"page_{page_number:03d}.pdf"
-            if not self._svg_to_pdf(svg_file, pdf_file):
-                logger.error(f"Failed to create PDF for page {page_number}")
-                return None
-            
-            # Perform OCR on PDF
-            ocr_result = self.ocr_engine.process_file(str(pdf_file))
+        
+        if not svg_file.exists():
+            logger.error(f"Failed to create SVG for page {page_number}")
+            return None
+        
+        # Convert SVG to PDF
+        pdf_file = temp_dir / f"page_{page_number:03d}.pdf"
+        with metrics.stage('svg_to_pdf', notebook=notebook_uuid):
+            converted = self._svg_to_pdf(svg_file, pdf_file)
+        if not converted:
+            logger.error(f"Failed to create PDF for page {page_number}")
+            return None
+        
+        return pdf_file
+    
+    def _page_from_ocr_result(self, ocr_result, rm_file: Path, page_uuid: str,
+                              page_number: int) -> Optional[NotebookPage]:
+        """Turn an OCR ProcessingResult into a NotebookPage, or None if nothing usable came back."""
+        # DEBUG: Log OCR result details
+        logger.info(f"🔍 DEBUG: Page {page_number} OCR result - success: {ocr_result.success}, results count: {len(ocr_result.ocr_results) if hasattr(ocr_result, 'ocr_results') and ocr_result.ocr_results else 0}")
 
-            # DEBUG: Log OCR result details
-            logger.info(f"🔍 DEBUG: Page {page_number} OCR result - success: {ocr_result.success}, results count: {len(ocr_result.ocr_results) if hasattr(ocr_result, 'ocr_results') and ocr_result.ocr_results else 0}")
+        if not ocr_result.success:
+            logger.error(f"OCR failed for page {page_number}: {ocr_result.error_message}")
+            return None
 
-            if not ocr_result.success:
-                logger.error(f"OCR failed for page {page_number}: {ocr_result.error_message}")
-                return None
+        # Check if OCR results are empty (successful call but no content extracted)
+        if not ocr_result.ocr_results or len(ocr_result.ocr_results) == 0:
+            logger.warning(f"OCR succeeded for page {page_number} but no text regions found - treating as failed")
+            return None
 
-            # Check if OCR results are empty (successful call but no content extracted)
-            if not ocr_result.ocr_results or len(ocr_result.ocr_results) == 0:
-                logger.warning(f"OCR succeeded for page {page_number} but no text regions found - treating as failed")
-                return None
+        payload_file = Path(ocr_result.file_path)
+        if payload_file.exists():
+            logger.info(f"    📦 Page {page_number}: {payload_file.suffix[1:]} payload "
+                        f"{payload_file.stat().st_size / 1024:.1f} KB, {ocr_result.input_tokens or 0} prompt tokens")
 
-            return NotebookPage(
-                page_uuid=page_uuid,
-                page_number=page_number,
-                rm_file_path=rm_file,
-                ocr_results=ocr_result.ocr_results
-            )
-            
-        except Exception as e:
-            logger.error(f"Error processing page {page_number}: {e}")
-            return None
+        return NotebookPage(
+            page_uuid=page_uuid,
+            page_number=page_number,
+            rm_file_path=rm_file,
+            ocr_results=ocr_result.ocr_results
+        )
     
     def _svg_to_pdf(self, svg_file: Path, pdf_file: Path) -> bool:
         """Convert SVG to PDF using rsvg-convert."""
@@ -966,15 +1387,12 @@ class NotebookTextExtractor:
         input_path: str = None
     ):
         """Store notebook text extraction results in database."""
-        db_conn = self._get_db_connection()
-        if not db_conn:
+        if not (self.db_connection or self.db_manager):
             return
         
         try:
-            cursor = db_conn.cursor()
-            
             # Create notebook_text_extractions table if it doesn't exist
-            cursor.execute('''
+            self._write(lambda conn: conn.execute('''
                 CREATE TABLE IF NOT EXISTS notebook_text_extractions (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
                     notebook_uuid TEXT NOT NULL,
@@ -988,40 +1406,44 @@ class NotebookTextExtractor:
                     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                     UNIQUE(notebook_uuid, page_uuid, text, confidence)
                 )
-            ''')
+            '''))
             
             # Process and store results per page for interruption safety
             for page in pages:
-                # Clear existing results for this specific page
-                cursor.execute(
-                    'DELETE FROM notebook_text_extractions WHERE notebook_uuid = ? AND page_uuid = ?', 
-                    (notebook_uuid, page.page_uuid)
-                )
-                
-                # Calculate page content hash
-                page_hash = self._calculate_page_content_hash(page, input_path, notebook_uuid)
+                # Calculate page content hash and ink fingerprint
+                page_hash, ink_fingerprint = self._stored_page_version(page, input_path, notebook_uuid)
+                text_segments = self._page_text_segments(page)
+                rows = [(
+                    notebook_uuid,
+                    notebook_name,
+                    page.page_uuid,
+                    page.page_number,
+                    result.text,
+                    result.confidence,
+                    json.dumps(result.bounding_box.to_dict()),
+                    result.language,
+                    page_hash,
+                    ink_fingerprint,
+                    text_segments
+                ) for result in page.ocr_results]
                 
-                # Insert new results for this page
-                for result in page.ocr_results:
-                    cursor.execute('''
+                def replace_page(conn, page_uuid=page.page_uuid, rows=rows):
+                    # Clear existing results for this specific page
+                    conn.execute(
+                        'DELETE FROM notebook_text_extractions WHERE notebook_uuid = ? AND page_uuid = ?', 
+                        (notebook_uuid, page_uuid)
+                    )
+                    # Insert new results for this page
+                    conn.executemany('''
                         INSERT INTO notebook_text_extractions 
                         (notebook_uuid, notebook_name, page_uuid, page_number, 
-                         text, confidence, bounding_box, language, page_content_hash)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    ''', (
-                        notebook_uuid,
-                        notebook_name,
-                        page.page_uuid,
-                        page.page_number,
-                        result.text,
-                        result.confidence,
-                        json.dumps(result.bounding_box.to_dict()),
-                        result.language,
-                        page_hash
-                    ))
+                         text, confidence, bounding_box, language, page_content_hash, ink_fingerprint,
+                         text_segments)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ''', rows)
                 
-                # Commit after each page for interruption safety
-                db_conn.commit()
+                # One committed write per page for interruption safety
+                self._write(replace_page)
                 logger.debug(f"✅ Saved page {page.page_number} to database")
                 
                 # Track page change for event-driven sync
@@ -1029,7 +1451,7 @@ class NotebookTextExtractor:
                     page_content = '\n'.join(result.text for result in page.ocr_results)
                     page_data = {
                         'text': page_content,
-                        'language': result.language if page.ocr_results else None,
+                        'language': page.ocr_results[-1].language if page.ocr_results else None,
                         'content_hash': page_hash,
                         'total_regions': len(page.ocr_results)
                     }
@@ -1043,9 +1465,6 @@ class NotebookTextExtractor:
             
         except Exception as e:
             logger.error(f"Error storing notebook results: {e}")
-        finally:
-            if self.db_manager:  # Close the connection if we created it
-                db_conn.close()
     
     def _calculate_page_content_hash(self, page: NotebookPage, input_path: str = None, notebook_uuid: str = None) -> str:
         """Calculate hash of page content for change detection based on source .rm file."""
@@ -1066,6 +1485,26 @@ class NotebookTextExtractor:
         content_string = '|'.join(content_parts)
         return hashlib.md5(content_string.encode('utf-8')).hexdigest()
     
+    def _stored_page_version(self, page: NotebookPage, input_path: str = None,
+                             notebook_uuid: str = None) -> Tuple[str, Optional[str]]:
+        """(.rm hash, ink fingerprint) to store with a page: as triaged, else as the file is now."""
+        triaged = self._triaged_versions.pop((notebook_uuid, page.page_uuid), None)
+        if triaged and triaged[0]:
+            return triaged
+        return (self._calculate_page_content_hash(page, input_path, notebook_uuid),
+                self._calculate_page_ink_fingerprint(page, input_path, notebook_uuid))
+    
+    def _calculate_page_ink_fingerprint(self, page: NotebookPage, input_path: str = None,
+                                        notebook_uuid: str = None) -> Optional[str]:
+        """Ink fingerprint of the page's source .rm file, if it can be located and parsed."""
+        candidates = [page.rm_file_path]
+        if input_path and notebook_uuid:
+            candidates.append(os.path.join(input_path, notebook_uuid, f"{page.page_uuid}.rm"))
+        for rm_file_path in candidates:
+            if rm_file_path and os.path.exists(rm_file_path):
+                return self._calculate_ink_fingerprint(str(rm_file_path))
+        return None
+    
     def _store_notebook_results_incremental(
         self, 
         notebook_uuid: str, 
@@ -1078,74 +1517,68 @@ class NotebookTextExtractor:
         Returns:
             Set of page numbers that were actually updated
         """
-        db_conn = self._get_db_connection()
-        if not db_conn:
+        if not (self.db_connection or self.db_manager):
             logger.error(f"❌ No database connection available for storing {notebook_name}")
             return set()
         
         logger.info(f"💾 Starting incremental storage for {notebook_name} ({len(pages)} pages)")
         
         try:
-            cursor = db_conn.cursor()
             updated_pages = 0
             total_regions = 0
             updated_page_numbers = set()
             
             # For each page that was processed
             for page in pages:
-                page_hash = self._calculate_page_content_hash(page, input_path, notebook_uuid)
-                
-                # Check if this page needs updating
-                cursor.execute('''
-                    SELECT page_content_hash FROM notebook_text_extractions 
-                    WHERE notebook_uuid = ? AND page_uuid = ? 
-                    LIMIT 1
-                ''', (notebook_uuid, page.page_uuid))
-                
-                existing_hash = cursor.fetchone()
+                page_hash, ink_fingerprint = self._stored_page_version(page, input_path, notebook_uuid)
+                text_segments = self._page_text_segments(page)
+                rows = [(
+                    notebook_uuid,
+                    notebook_name,
+                    page.page_uuid,
+                    page.page_number,
+                    result.text,
+                    result.confidence,
+                    json.dumps(result.bounding_box.to_dict()),
+                    result.language,
+                    page_hash,
+                    ink_fingerprint,
+                    text_segments
+                ) for result in page.ocr_results]
                 
+                def update_page(conn, page_uuid=page.page_uuid, page_hash=page_hash, rows=rows):
+                    # Check if this page needs updating
+                    existing_hash = conn.execute('''
+                        SELECT page_content_hash FROM notebook_text_extractions 
+                        WHERE notebook_uuid = ? AND page_uuid = ? 
+                        LIMIT 1
+                    ''', (notebook_uuid, page_uuid)).fetchone()
+                    if existing_hash and existing_hash[0] == page_hash:
+                        return False
+                    
+                    # Delete old entries for this specific page, then insert the new ones
+                    conn.execute('''
+                        DELETE FROM notebook_text_extractions 
+                        WHERE notebook_uuid = ? AND page_uuid = ?
+                    ''', (notebook_uuid, page_uuid))
+                    conn.executemany('''
+                        INSERT INTO notebook_text_extractions 
+                        (notebook_uuid, notebook_name, page_uuid, page_number, 
+                         text, confidence, bounding_box, language, page_content_hash, ink_fingerprint,
+                         text_segments)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ''', rows)
+                    return True
                 
-                if existing_hash and existing_hash[0] == page_hash:
+                # Check and update in one committed write per page for interruption safety
+                if not self._write(update_page):
                     logger.debug(f"Page {page.page_number} unchanged, skipping")
                     continue
                 
-                # Page has changed - update it
-                logger.info(f"💾 Updating page {page.page_number} in notebook {notebook_name}")
                 updated_pages += 1
                 updated_page_numbers.add(page.page_number)
-                
-                # Delete old entries for this specific page
-                cursor.execute('''
-                    DELETE FROM notebook_text_extractions 
-                    WHERE notebook_uuid = ? AND page_uuid = ?
-                ''', (notebook_uuid, page.page_uuid))
-                logger.debug(f"🗑️ Deleted old entries for page {page.page_number}")
-                
-                # Insert new entries for this page
-                regions_for_page = 0
-                for result in page.ocr_results:
-                    cursor.execute('''
-                        INSERT INTO notebook_text_extractions 
-                        (notebook_uuid, notebook_name, page_uuid, page_number, 
-                         text, confidence, bounding_box, language, page_content_hash)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    ''', (
-                        notebook_uuid,
-                        notebook_name,
-                        page.page_uuid,
-                        page.page_number,
-                        result.text,
-                        result.confidence,
-                        json.dumps(result.bounding_box.to_dict()),
-                        result.language,
-                        page_hash
-                    ))
-                    total_regions += 1
-                    regions_for_page += 1
-                
-                # Commit after each page for interruption safety
-                db_conn.commit()
-                logger.info(f"✅ Saved page {page.page_number} to database ({regions_for_page} text regions)")
+                total_regions += len(rows)
+                logger.info(f"✅ Saved page {page.page_number} to database ({len(rows)} text regions)")
             
             if updated_pages > 0:
                 logger.info(f"Updated {updated_pages} pages with {total_regions} text regions for notebook {notebook_name}")
@@ -1156,11 +1589,7 @@ class NotebookTextExtractor:
                 
         except Exception as e:
             logger.error(f"Error in incremental notebook update: {e}")
-            db_conn.rollback()
             return set()
-        finally:
-            if self.db_manager:  # Close the connection if we created it
-                db_conn.close()
     
     def _refresh_single_notebook_metadata(self, notebook_uuid: str, metadata: dict) -> None:
         """Refresh metadata for a single notebook in the database."""
@@ -1169,31 +1598,33 @@ class NotebookTextExtractor:
             return
 
         try:
-            with self.db_manager.get_connection() as conn:
-                cursor = conn.cursor()
+            # Update the specific notebook's metadata in database
+            updated = self.db_manager.write(lambda conn: conn.execute('''
+                UPDATE notebook_metadata
+                SET last_modified = ?, last_opened = ?, last_opened_page = ?
+                WHERE notebook_uuid = ?
+            ''', (
+                metadata.get('lastModified'),
+                metadata.get('lastOpened'),
+                metadata.get('lastOpenedPage'),
+                notebook_uuid
+            )).rowcount)
 
-                # Update the specific notebook's metadata in database
-                cursor.execute('''
-                    UPDATE notebook_metadata
-                    SET last_modified = ?, last_opened = ?, last_opened_page = ?
-                    WHERE notebook_uuid = ?
-                ''', (
-                    metadata.get('lastModified'),
-                    metadata.get('lastOpened'),
-                    metadata.get('lastOpenedPage'),
-                    notebook_uuid
-                ))
-
-                if cursor.rowcount > 0:
-                    logger.info(f"✅ Updated metadata for notebook {notebook_uuid}: last_opened={metadata.get('lastOpened')}")
-                else:
-                    logger.debug(f"No metadata record found to update for notebook {notebook_uuid}")
+            if updated > 0:
+                logger.info(f"✅ Updated metadata for notebook {notebook_uuid}: last_opened={metadata.get('lastOpened')}")
+            else:
+                logger.debug(f"No metadata record found to update for notebook {notebook_uuid}")
 
         except Exception as e:
             logger.warning(f"Failed to refresh single notebook metadata: {e}")
 
-    def process_notebook_incremental(self, notebook_uuid: str, force_reprocess: bool = False) -> NotebookProcessingResult:
-        """Process notebook with incremental updates."""
+    def process_notebook_incremental(self, notebook_uuid: str, force_reprocess: bool = False,
+                                     cancel_token: Optional[CancellationToken] = None) -> NotebookProcessingResult:
+        """Process notebook with incremental updates.
+        
+        A cancelled cancel_token stops OCR at the next page boundary; pages
+        finished before that are stored and reported in processed_page_numbers.
+        """
         notebook_name = "Unknown Notebook"  # Initialize default value
         try:
             # Refresh metadata for this specific notebook from source file
@@ -1271,7 +1702,7 @@ class NotebookTextExtractor:
             
             logger.info(f"Processing notebook: {notebook_name}")
             # Pass the parent directory, not the notebook directory itself
-            result = self.process_notebook(notebook_info, parent_dir)
+            result = self.process_notebook(notebook_info, parent_dir, cancel_token)
             
             if result.success:
                 # Convert NotebookTextResult to NotebookProcessingResult
@@ -1291,7 +1722,8 @@ class NotebookTextExtractor:
                 if force_reprocess:
                     # For force reprocess, store again to override incremental logic
                     logger.info(f"Force reprocessing - additional storage to override incremental logic")
-                    self._store_notebook_results(notebook_uuid, notebook_name, result.pages if hasattr(result, 'pages') else [], parent_dir)
+                    with metrics.stage('db_store', notebook=notebook_uuid):
+                        self._store_notebook_results(notebook_uuid, notebook_name, result.pages if hasattr(result, 'pages') else [], parent_dir)
                 
                 # Track which pages were processed (for return value)
                 if hasattr(result, 'pages') and result.pages:
@@ -1315,7 +1747,9 @@ class NotebookTextExtractor:
                     success=False,
                     notebook_uuid=notebook_uuid,
                     notebook_name=notebook_name,
-                    error_message=result.error_message if hasattr(result, 'error_message') else "Processing failed"
+                    error_message=result.error_message if hasattr(result, 'error_message') else "Processing failed",
+                    # A cancelled run still stored the pages it finished
+                    processed_page_numbers={page.page_number for page in result.pages}
                 )
             
             
@@ -1330,15 +1764,13 @@ class NotebookTextExtractor:
     
     def _store_todos(self, todos: List[TodoItem]):
         """Store extracted todos in database with intelligent deduplication."""
-        db_conn = self._get_db_connection()
-        if not db_conn:
+        if not (self.db_connection or self.db_manager):
             return
         
         if not todos:
             return
         
         try:
-            cursor = db_conn.cursor()
             logger.info(f"Processing {len(todos)} todos with intelligent deduplication...")
             
             # Group todos by page for efficient deduplication
@@ -1356,143 +1788,144 @@ class NotebookTextExtractor:
                 confidence_improvement_threshold=0.1
             )
             
-            total_new = 0
-            total_updated = 0
-            total_skipped = 0
+            def store(conn):
+                # Reads and writes for all pages in one writer transaction
+                total_new = 0
+                total_updated = 0
+                total_skipped = 0
             
-            # Track operations for later (outside the main transaction)
-            tracking_operations = []
+                # Track operations for later (outside the write transaction)
+                tracking_operations = []
+                cursor = conn.cursor()
             
-            # Process each page
-            for (notebook_uuid, page_number), page_todos in todos_by_page.items():
-                logger.debug(f"Processing {len(page_todos)} todos for page {page_number}")
+                # Process each page
+                for (notebook_uuid, page_number), page_todos in todos_by_page.items():
+                    logger.debug(f"Processing {len(page_todos)} todos for page {page_number}")
                 
-                # Get existing todos for this page
-                cursor.execute('''
-                    SELECT id, text, confidence, created_at, actual_date, completed
-                    FROM todos 
-                    WHERE notebook_uuid = ? AND page_number = ?
-                    ORDER BY created_at DESC
-                ''', (notebook_uuid, str(page_number)))
+                    # Get existing todos for this page
+                    cursor.execute('''
+                        SELECT id, text, confidence, created_at, actual_date, completed
+                        FROM todos 
+                        WHERE notebook_uuid = ? AND page_number = ?
+                        ORDER BY created_at DESC
+                    ''', (notebook_uuid, str(page_number)))
                 
-                existing_todos = []
-                for row in cursor.fetchall():
-                    existing_todos.append({
-                        'id': row[0],
-                        'text': row[1],
-                        'confidence': row[2],
-                        'created_at': row[3],
-                        'actual_date': row[4],
-                        'completed': row[5],
-                        'page_number': page_number
-                    })
+                    existing_todos = []
+                    for row in cursor.fetchall():
+                        existing_todos.append({
+                            'id': row[0],
+                            'text': row[1],
+                            'confidence': row[2],
+                            'created_at': row[3],
+                            'actual_date': row[4],
+                            'completed': row[5],
+                            'page_number': page_number
+                        })
                 
-                # Convert todos to candidates
-                todo_candidates = []
-                for todo in page_todos:
-                    # Convert date to ISO format
-                    actual_date_iso = None
-                    if hasattr(todo, 'date_extracted') and todo.date_extracted:
-                        try:
-                            date_parts = todo.date_extracted.split('-')
-                            if len(date_parts) == 3:
-                                day, month, year = date_parts
-                                actual_date_iso = f"{year}-{month.zfill(2)}-{day.zfill(2)}"
-                        except (ValueError, AttributeError):
-                            logger.debug(f"Could not convert date {todo.date_extracted} to ISO format")
+                    # Convert todos to candidates
+                    todo_candidates = []
+                    for todo in page_todos:
+                        # Convert date to ISO format
+                        actual_date_iso = None
+                        if hasattr(todo, 'date_extracted') and todo.date_extracted:
+                            try:
+                                date_parts = todo.date_extracted.split('-')
+                                if len(date_parts) == 3:
+                                    day, month, year = date_parts
+                                    actual_date_iso = f"{year}-{month.zfill(2)}-{day.zfill(2)}"
+                            except (ValueError, AttributeError):
+                                logger.debug(f"Could not convert date {todo.date_extracted} to ISO format")
                     
-                    candidate = create_todo_candidate(
-                        text=todo.text,
-                        notebook_uuid=todo.notebook_uuid,
-                        page_number=todo.page_number,
-                        page_uuid=todo.page_uuid,  # Add page UUID for linking
-                        confidence=todo.confidence,
-                        date_extracted=actual_date_iso
-                    )
-                    todo_candidates.append(candidate)
+                        candidate = create_todo_candidate(
+                            text=todo.text,
+                            notebook_uuid=todo.notebook_uuid,
+                            page_number=todo.page_number,
+                            page_uuid=todo.page_uuid,  # Add page UUID for linking
+                            confidence=todo.confidence,
+                            date_extracted=actual_date_iso
+                        )
+                        todo_candidates.append(candidate)
                 
-                # Deduplicate todos for this page
-                final_todos, todos_to_delete = deduplicator.deduplicate_todos_for_page(
-                    todo_candidates, existing_todos
-                )
+                    # Deduplicate todos for this page
+                    final_todos, todos_to_delete = deduplicator.deduplicate_todos_for_page(
+                        todo_candidates, existing_todos
+                    )
                 
-                # Store the final todos
-                for candidate in final_todos:
-                    if candidate.existing_id:
-                        # Update existing todo
-                        cursor.execute('''
-                            UPDATE todos 
-                            SET text = ?, confidence = ?, actual_date = ?, updated_at = CURRENT_TIMESTAMP
-                            WHERE id = ?
-                        ''', (
-                            candidate.text,
-                            candidate.confidence,
-                            candidate.date_extracted,
-                            candidate.existing_id
-                        ))
-                        total_updated += 1
+                    # Store the final todos
+                    for candidate in final_todos:
+                        if candidate.existing_id:
+                            # Update existing todo
+                            cursor.execute('''
+                                UPDATE todos 
+                                SET text = ?, confidence = ?, actual_date = ?, updated_at = CURRENT_TIMESTAMP
+                                WHERE id = ?
+                            ''', (
+                                candidate.text,
+                                candidate.confidence,
+                                candidate.date_extracted,
+                                candidate.existing_id
+                            ))
+                            total_updated += 1
                         
-                        # Defer tracking update until after transaction
-                        todo_data = {
-                            'text': candidate.text,
-                            'completed': False,  # Default for new extraction
-                            'confidence': candidate.confidence,
-                            'actual_date': candidate.date_extracted,
-                            'notebook_uuid': candidate.notebook_uuid,
-                            'page_number': candidate.page_number
-                        }
-                        tracking_operations.append(('UPDATE', candidate.existing_id, todo_data))
-                    else:
-                        # Insert new todo
-                        cursor.execute('''
-                            INSERT INTO todos 
-                            (notebook_uuid, page_uuid, source_file, title, text, page_number, completed, confidence, created_at, actual_date, updated_at)
-                            VALUES (?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP, ?, CURRENT_TIMESTAMP)
-                        ''', (
-                            candidate.notebook_uuid,
-                            candidate.page_uuid,  # Use actual page UUID for linking
-                            next((t.notebook_name for t in page_todos if t.text == candidate.text), ''),  # source_file
-                            candidate.text[:100],  # title
-                            candidate.text,
-                            str(candidate.page_number),
-                            False,  # completed - default for new extraction
-                            candidate.confidence,
-                            candidate.date_extracted
-                        ))
-                        todo_id = cursor.lastrowid
-                        total_new += 1
+                            # Defer tracking update until after transaction
+                            todo_data = {
+                                'text': candidate.text,
+                                'completed': False,  # Default for new extraction
+                                'confidence': candidate.confidence,
+                                'actual_date': candidate.date_extracted,
+                                'notebook_uuid': candidate.notebook_uuid,
+                                'page_number': candidate.page_number
+                            }
+                            tracking_operations.append(('UPDATE', candidate.existing_id, todo_data))
+                        else:
+                            # Insert new todo
+                            cursor.execute('''
+                                INSERT INTO todos 
+                                (notebook_uuid, page_uuid, source_file, title, text, page_number, completed, confidence, created_at, actual_date, updated_at)
+                                VALUES (?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP, ?, CURRENT_TIMESTAMP)
+                            ''', (
+                                candidate.notebook_uuid,
+                                candidate.page_uuid,  # Use actual page UUID for linking
+                                next((t.notebook_name for t in page_todos if t.text == candidate.text), ''),  # source_file
+                                candidate.text[:100],  # title
+                                candidate.text,
+                                str(candidate.page_number),
+                                False,  # completed - default for new extraction
+                                candidate.confidence,
+                                candidate.date_extracted
+                            ))
+                            todo_id = cursor.lastrowid
+                            total_new += 1
                         
-                        # Defer tracking insert until after transaction
-                        todo_data = {
-                            'text': candidate.text,
-                            'completed': False,
-                            'confidence': candidate.confidence,
-                            'actual_date': candidate.date_extracted,
-                            'notebook_uuid': candidate.notebook_uuid,
-                            'page_number': candidate.page_number
-                        }
-                        tracking_operations.append(('INSERT', todo_id, todo_data))
+                            # Defer tracking insert until after transaction
+                            todo_data = {
+                                'text': candidate.text,
+                                'completed': False,
+                                'confidence': candidate.confidence,
+                                'actual_date': candidate.date_extracted,
+                                'notebook_uuid': candidate.notebook_uuid,
+                                'page_number': candidate.page_number
+                            }
+                            tracking_operations.append(('INSERT', todo_id, todo_data))
                 
-                # Calculate skipped todos
-                total_skipped += len(page_todos) - len(final_todos)
+                    # Calculate skipped todos
+                    total_skipped += len(page_todos) - len(final_todos)
+                
+                return tracking_operations, total_new, total_updated, total_skipped
             
-            db_conn.commit()
+            tracking_operations, total_new, total_updated, total_skipped = self._write(store)
             logger.info(f"✅ Todo processing complete: {total_new} new, {total_updated} updated, {total_skipped} skipped (similar)")
             
         except Exception as e:
             logger.error(f"Error storing todos with intelligent deduplication: {e}")
-            db_conn.rollback()
-        finally:
-            if self.db_manager:  # Close the connection if we created it
-                db_conn.close()
+            return
         
-        # Execute deferred tracking operations AFTER database connection is closed
-        if 'tracking_operations' in locals():
-            for operation_type, todo_id, todo_data in tracking_operations:
-                try:
-                    track_todo_operation(operation_type, todo_id, data=todo_data, trigger_source='text_extractor')
-                except Exception as e:
-                    logger.warning(f"Failed to track todo {operation_type.lower()} for {todo_id}: {e}")
+        # Execute deferred tracking operations AFTER the todos are committed
+        for operation_type, todo_id, todo_data in tracking_operations:
+            try:
+                track_todo_operation(operation_type, todo_id, data=todo_data, trigger_source='text_extractor')
+            except Exception as e:
+                logger.warning(f"Failed to track todo {operation_type.lower()} for {todo_id}: {e}")
     
     def _load_notebook_list(self, notebook_list_file: str) -> set:
         """Load notebook UUIDs/names from file for selective processing."""
@@ -1556,6 +1989,11 @@ class NotebookTextExtractor:
             elif len(notebooks) == 0:
                 logger.warning("No notebooks matched the filter list. Check UUIDs/names in the list file.")
         
+        if self.pipeline.enabled and notebooks and self.is_available():
+            with tempfile.TemporaryDirectory(prefix='notebook_text_extractor_') as tmpdir:
+                results = self.pipeline.run(self, notebooks, directory_path, Path(tmpdir))
+            notebooks = []
+        
         # Process each notebook
         for i, notebook in enumerate(notebooks, 1):
             logger.info(f"[{i}/{len(notebooks)}] Processing: {notebook['name']}")
@@ -1587,6 +2025,7 @@ class NotebookTextExtractor:
         
         logger.info(f"Text extraction complete: {successful}/{len(results)} notebooks, {total_regions} total text regions")
         
+        self.prune_scene_cache(directory_path)
         return results
     
     def analyze_directory(self, directory_path: str, cost_per_page: float = 0.003) -> Dict[str, NotebookAnalysis]:
@@ -1996,7 +2435,8 @@ def extract_text_from_directory(
     include_pdf_epub: bool = False,
     max_pages: Optional[int] = None,
     notebook_list: Optional[str] = None,
-    exclude_notebooks: Optional[Dict] = None
+    exclude_notebooks: Optional[Dict] = None,
+    pipeline: Optional[bool] = None
 ) -> Dict[str, NotebookTextResult]:
     """
     Standalone function to extract text from all notebooks in a directory.
@@ -2012,6 +2452,7 @@ def extract_text_from_directory(
         max_pages: Maximum pages to process per notebook (for testing)
         notebook_list: Path to file containing notebook UUIDs or names to process
         exclude_notebooks: Dict with 'names' and 'uuids' lists for exclusion
+        pipeline: Use the staged pipeline (None = processing.pipeline.enabled)
         
     Returns:
         Dictionary mapping notebook UUIDs to results
@@ -2022,8 +2463,10 @@ def extract_text_from_directory(
     
     try:
         with (db_manager.get_connection() if db_manager else sqlite3.connect(":memory:")) as conn:
+            # With a database, each step opens its own connection (the pipeline runs steps in threads)
             extractor = NotebookTextExtractor(
-                db_connection=conn,
+                db_connection=None if db_manager else conn,
+                db_manager=db_manager,
                 language=language,
                 confidence_threshold=confidence_threshold,
                 exclude_notebooks=exclude_notebooks
@@ -2048,6 +2491,9 @@ def extract_text_from_directory(
                 extractor.notebook_filter_list = extractor._load_notebook_list(notebook_list)
                 logger.info(f"Notebook filter enabled: Will process {len(extractor.notebook_filter_list)} specified notebooks")
             
+            if pipeline is not None:
+                extractor.pipeline.enabled = pipeline
+            
             results = extractor.process_directory(directory_path)
             
             # Export individual text files if requested
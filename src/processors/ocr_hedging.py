@@ -0,0 +1,226 @@
+"""
+Hedged OCR requests.
+
+Most Gemini responses arrive within a few seconds, but a few take much longer,
+and one of those holds its notebook until it returns or hits the request
+timeout. When hedging is enabled, a request that is still outstanding after
+the `percentile` latency of recent requests gets a second, identical request,
+and whichever succeeds first is used. The late response is discarded when it
+arrives (a synchronous Gemini call cannot be cancelled).
+
+Extra requests are limited in two ways:
+
+- a token bucket: every request adds `budget_fraction` of a token (up to
+  `budget_burst`), and a hedge spends one token,
+- hedges are only sent when the shared concurrency limiter has a free slot,
+  so they use spare capacity and do not delay other pages.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, TimeoutError, wait
+from typing import Any, Callable, Deque, Dict, Optional, TypeVar
+
+from ..utils import metrics
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+# Request threads are created on demand; this only bounds primary + hedge calls in flight
+HEDGE_WORKERS = 32
+
+
+class RequestHedger:
+    """Sends a duplicate of slow requests and returns whichever finishes first."""
+
+    def __init__(
+        self,
+        enabled: bool = False,
+        percentile: float = 0.95,
+        min_samples: int = 20,
+        window: int = 200,
+        min_delay_seconds: float = 2.0,
+        max_delay_seconds: float = 60.0,
+        budget_fraction: float = 0.05,
+        budget_burst: float = 3.0
+    ):
+        """
+        Args:
+            enabled: Hedge requests at all
+            percentile: Latency percentile of recent requests after which a hedge is sent
+            min_samples: Recent requests needed before hedging starts
+            window: Recent latencies kept per request size
+            min_delay_seconds: Never hedge earlier than this
+            max_delay_seconds: Never wait longer than this before hedging
+            budget_fraction: Hedges allowed per request on average (0.05 = 5% extra requests)
+            budget_burst: Hedges that may be sent back to back
+        """
+        self.enabled = enabled
+        self.percentile = min(max(percentile, 0.0), 1.0)
+        self.min_samples = max(1, min_samples)
+        self.window = max(self.min_samples, window)
+        self.min_delay_seconds = min_delay_seconds
+        self.max_delay_seconds = max(min_delay_seconds, max_delay_seconds)
+        self.budget_fraction = budget_fraction
+        self.budget_burst = budget_burst
+
+        self._latencies: Dict[int, Deque[float]] = {}
+        self._tokens = budget_burst
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._stats = {
+            'requests': 0,
+            'hedged': 0,
+            'hedge_wins': 0,
+            'skipped_budget': 0,
+            'skipped_busy': 0,
+        }
+
+    @classmethod
+    def from_config(cls, config) -> 'RequestHedger':
+        get = config.get if config else (lambda key, default=None: default)
+        prefix = 'processing.ocr.hedging'
+        return cls(
+            enabled=get(f'{prefix}.enabled', False),
+            percentile=get(f'{prefix}.percentile', 0.95),
+            min_samples=get(f'{prefix}.min_samples', 20),
+            window=get(f'{prefix}.window', 200),
+            min_delay_seconds=get(f'{prefix}.min_delay_seconds', 2.0),
+            max_delay_seconds=get(f'{prefix}.max_delay_seconds', 60.0),
+            budget_fraction=get(f'{prefix}.budget_fraction', 0.05),
+            budget_burst=get(f'{prefix}.budget_burst', 3.0),
+        )
+
+    def record_latency(self, seconds: float, page_count: int = 1) -> None:
+        """Add the latency of a successful request (pages per request are tracked separately)."""
+        with self._lock:
+            latencies = self._latencies.get(page_count)
+            if latencies is None:
+                latencies = self._latencies[page_count] = deque(maxlen=self.window)
+            latencies.append(seconds)
+
+    def delay(self, page_count: int = 1) -> Optional[float]:
+        """Seconds to wait before hedging, or None until enough latencies are known."""
+        with self._lock:
+            latencies = sorted(self._latencies.get(page_count, ()))
+        if len(latencies) < self.min_samples:
+            return None
+        value = latencies[min(len(latencies) - 1, int(self.percentile * len(latencies)))]
+        return min(max(value, self.min_delay_seconds), self.max_delay_seconds)
+
+    def call(self, request: Callable[[], T], page_count: int = 1,
+             can_hedge: Optional[Callable[[], bool]] = None) -> T:
+        """
+        Run a request, hedging it if it is slower than recent requests.
+
+        Args:
+            request: Performs one request; must be safe to run twice concurrently
+            page_count: Pages in the request (latencies are compared per size)
+            can_hedge: Checked before sending a hedge (e.g. concurrency slot free)
+
+        Returns:
+            The first successful result; if both attempts fail, the primary's error is raised
+        """
+        if not self.enabled:
+            return request()
+
+        with self._lock:
+            self._stats['requests'] += 1
+            self._tokens = min(self.budget_burst, self._tokens + self.budget_fraction)
+
+        delay = self.delay(page_count)
+        if delay is None:
+            return self._timed(request, page_count)
+
+        primary = self._get_executor().submit(self._timed, request, page_count)
+        try:
+            return primary.result(timeout=delay)
+        except TimeoutError:
+            pass
+
+        if can_hedge is not None and not can_hedge():
+            self._skip('skipped_busy')
+            return primary.result()
+        with self._lock:
+            budget_left = self._tokens >= 1.0
+            if budget_left:
+                self._tokens -= 1.0
+        if not budget_left:
+            self._skip('skipped_budget')
+            return primary.result()
+
+        logger.debug(f"Hedging OCR request ({page_count} page(s)) after {delay:.1f}s")
+        hedge = self._get_executor().submit(self._timed, request, page_count)
+        wait([primary, hedge], return_when=FIRST_COMPLETED)
+        first, second = (primary, hedge) if primary.done() else (hedge, primary)
+        winner = first
+        if first.exception() is not None:
+            # The other attempt may still succeed
+            wait([second])
+            winner = second if second.exception() is None else primary
+
+        won = winner is hedge and hedge.exception() is None
+        with self._lock:
+            self._stats['hedged'] += 1
+            self._stats['hedge_wins'] += int(won)
+        metrics.inc('ocr_hedges_total', outcome='won' if won else 'lost')
+        return winner.result()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Counters, win rate and the current hedge delay for single-page requests."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['budget_tokens'] = round(self._tokens, 2)
+        stats['win_rate'] = stats['hedge_wins'] / stats['hedged'] if stats['hedged'] else 0.0
+        stats['extra_request_ratio'] = stats['hedged'] / stats['requests'] if stats['requests'] else 0.0
+        stats['delay_s'] = self.delay()
+        return stats
+
+    def _timed(self, request: Callable[[], T], page_count: int) -> T:
+        start = time.monotonic()
+        result = request()
+        self.record_latency(time.monotonic() - start, page_count)
+        return result
+
+    def _skip(self, reason: str) -> None:
+        with self._lock:
+            self._stats[reason] += 1
+        metrics.inc('ocr_hedges_total', outcome=reason)
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=HEDGE_WORKERS, thread_name_prefix='ocr-hedge')
+            return self._executor
+
+
+# Global hedger shared by all OCR engines, so latency history survives engine re-creation
+_ocr_hedger = None
+_ocr_hedger_lock = threading.Lock()
+
+
+def get_ocr_hedger(config=None) -> RequestHedger:
+    """Get the process-wide OCR request hedger, creating it from config on first use."""
+    global _ocr_hedger
+    with _ocr_hedger_lock:
+        if _ocr_hedger is None:
+            _ocr_hedger = RequestHedger.from_config(config)
+            metrics.register_collector(_hedger_gauges)
+        return _ocr_hedger
+
+
+def _hedger_gauges():
+    """Expose the shared hedger's win rate and delay as metrics gauges."""
+    if _ocr_hedger is None or not _ocr_hedger.enabled:
+        return []
+    stats = _ocr_hedger.get_stats()
+    gauges = [
+        ('ocr_hedge_win_rate', {}, stats['win_rate']),
+        ('ocr_hedge_extra_request_ratio', {}, stats['extra_request_ratio']),
+    ]
+    if stats['delay_s'] is not None:
+        gauges.append(('ocr_hedge_delay_seconds', {}, stats['delay_s']))
+    return gauges
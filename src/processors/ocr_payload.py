@@ -0,0 +1,221 @@
+"""
+Ink-cropped, size-optimized OCR payloads.
+
+Pages used to be sent to Gemini as full 157x210 mm PDFs however little of the
+page was written on. The optimizer crops the rendering to the ink (plus a
+margin), renders it as a grayscale raster at a DPI chosen for handwriting and
+as a PDF, and hands the OCR engine the candidate with the fewest estimated
+prompt tokens, using file size only to break ties. Payload sizes are recorded
+per page so the savings can be compared against the reported prompt tokens.
+
+Gemini bills a PDF page at a flat token count, but an image larger than one
+tile per tile, so a full page raster can cost several times the PDF even when
+the file is smaller. Rasters only win for crops that fit in a single tile.
+
+Rendering uses rsvg-convert, like the existing PDF path. Grayscale conversion
+and WebP need Pillow; without it the optimizer chooses between PNG and PDF.
+"""
+
+import logging
+import math
+import shutil
+import subprocess
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Optional, Set, Tuple
+
+from ..core.rm_scene import ParsedScene, scene_to_svg
+from ..utils import metrics
+
+try:
+    from PIL import Image
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# reMarkable screen resolution; .rm coordinates are screen pixels
+SCREEN_DPI = 226
+
+# Payload formats the OCR engine can upload, by file suffix
+MIME_TYPES = {
+    '.pdf': 'application/pdf',
+    '.png': 'image/png',
+    '.webp': 'image/webp',
+}
+
+# Gemini prompt tokens: a PDF page, or an image with both sides <= 384 px, is one
+# 258-token unit; larger images are split into 768x768 px tiles of 258 tokens each
+TOKENS_PER_TILE = 258
+SMALL_IMAGE_PX = 384
+TILE_PX = 768
+
+
+def estimate_prompt_tokens(fmt: str, width_px: int = 0, height_px: int = 0) -> int:
+    """Estimated Gemini prompt tokens for one page uploaded in this format."""
+    if fmt == 'pdf' or (width_px <= SMALL_IMAGE_PX and height_px <= SMALL_IMAGE_PX):
+        return TOKENS_PER_TILE
+    return math.ceil(width_px / TILE_PX) * math.ceil(height_px / TILE_PX) * TOKENS_PER_TILE
+
+
+@dataclass
+class OCRPayload:
+    """The file chosen for upload and what the alternatives would have cost."""
+    path: Path
+    format: str
+    size_bytes: int
+    crop: Tuple[float, float, float, float]
+    candidates: Dict[str, int] = field(default_factory=dict)  # format -> bytes
+    estimated_tokens: int = 0
+
+
+class OCRPayloadOptimizer:
+    """Renders a page (or region) to the cheapest of the configured payload formats."""
+
+    def __init__(self, enabled: bool = True, margin: float = 32.0, dpi: int = 150,
+                 formats: Tuple[str, ...] = ('png', 'webp', 'pdf'), grayscale: bool = True):
+        """
+        Args:
+            enabled: Optimize payloads at all (off = full-page PDF as before)
+            margin: Screen units kept around the ink when cropping
+            dpi: Raster resolution; 150 keeps fineliner strokes 2+ px wide
+            formats: Candidate formats; fewest estimated prompt tokens wins, then fewest bytes
+            grayscale: Convert raster candidates to 8-bit grayscale (needs Pillow)
+        """
+        self.enabled = enabled
+        self.margin = margin
+        self.dpi = dpi
+        self.formats = tuple(fmt.lower() for fmt in formats)
+        self.grayscale = grayscale
+
+    @classmethod
+    def from_config(cls, config) -> 'OCRPayloadOptimizer':
+        get = config.get if config else (lambda key, default=None: default)
+        prefix = 'processing.ocr.payload'
+        return cls(
+            enabled=get(f'{prefix}.enabled', False),
+            margin=get(f'{prefix}.margin', 32.0),
+            dpi=get(f'{prefix}.dpi', 150),
+            formats=tuple(get(f'{prefix}.formats', ['png', 'webp', 'pdf'])),
+            grayscale=get(f'{prefix}.grayscale', True),
+        )
+
+    def is_available(self) -> bool:
+        return self.enabled and shutil.which('rsvg-convert') is not None
+
+    def crop_box(self, scene: ParsedScene) -> Tuple[float, float, float, float]:
+        """Ink and typed-text extent plus margin, clipped to the page; the whole page if it is empty."""
+        page = scene.bbox
+        xs, ys = [], []
+        ink_bbox = scene.ink_bbox()
+        if ink_bbox:
+            xs.extend(ink_bbox[:2])
+            ys.extend(ink_bbox[2:])
+        for xpos, ypos, _, _ in scene.text_lines:
+            xs.append(xpos)
+            ys.append(ypos)
+        if not xs:
+            return page
+        # Typed text lines are anchored at their left/baseline, so keep the page width for them
+        if scene.text_lines:
+            xs.extend(page[:2])
+        return (max(page[0], min(xs) - self.margin), min(page[1], max(xs) + self.margin),
+                max(page[2], min(ys) - self.margin), min(page[3], max(ys) + self.margin))
+
+    def build(self, scene: ParsedScene, output_stem: Path, strokes: Optional[Set[int]] = None,
+              crop: Optional[Tuple[float, float, float, float]] = None) -> Optional[OCRPayload]:
+        """
+        Render the scene (or the given strokes) and keep the cheapest payload.
+
+        Args:
+            scene: Parsed page
+            output_stem: Path without suffix for the rendered files
+            strokes: Only render these strokes (region OCR)
+            crop: Area to render (default: crop_box(scene))
+
+        Returns:
+            OCRPayload, or None if no candidate could be rendered
+        """
+        crop = crop or self.crop_box(scene)
+        svg_file = output_stem.with_suffix('.svg')
+        with open(svg_file, 'wt') as outfile:
+            scene_to_svg(scene, outfile, strokes=strokes, crop=crop)
+
+        width_units = crop[1] - crop[0] + 1
+        height_units = crop[3] - crop[2] + 1
+        width_px = max(1, round(width_units * self.dpi / SCREEN_DPI))
+        height_px = max(1, round(height_units * self.dpi / SCREEN_DPI))
+        candidates: Dict[str, Path] = {}
+
+        if 'pdf' in self.formats:
+            pdf_file = output_stem.with_suffix('.pdf')
+            # Same physical scale as the device, so a cropped page is not enlarged
+            if self._rsvg_convert(svg_file, pdf_file, 'pdf',
+                                  f'{width_units / SCREEN_DPI * 25.4:.2f}mm',
+                                  f'{height_units / SCREEN_DPI * 25.4:.2f}mm'):
+                candidates['pdf'] = pdf_file
+
+        if 'png' in self.formats or 'webp' in self.formats:
+            png_file = output_stem.with_suffix('.png')
+            if self._rsvg_convert(svg_file, png_file, 'png', str(width_px), str(height_px)):
+                candidates.update(self._raster_candidates(png_file, output_stem))
+
+        if not candidates:
+            return None
+
+        sizes = {fmt: path.stat().st_size for fmt, path in candidates.items()}
+        tokens = {fmt: estimate_prompt_tokens(fmt, width_px, height_px) for fmt in candidates}
+        best = min(sizes, key=lambda fmt: (tokens[fmt], sizes[fmt]))
+        metrics.inc('ocr_payloads_total', format=best)
+        metrics.inc('ocr_payload_bytes_total', sizes[best], format=best)
+        metrics.inc('ocr_payload_estimated_tokens_total', tokens[best], format=best)
+        logger.debug(f"OCR payload {output_stem.name}: {best} (~{tokens[best]} tokens, {sizes[best]} bytes; "
+                     f"{', '.join(f'{fmt} ~{tokens[fmt]} tok/{size} B' for fmt, size in sorted(sizes.items()))})")
+        return OCRPayload(path=candidates[best], format=best, size_bytes=sizes[best], crop=crop,
+                          candidates=sizes, estimated_tokens=tokens[best])
+
+    def _raster_candidates(self, png_file: Path, output_stem: Path) -> Dict[str, Path]:
+        """PNG (grayscale if possible) and WebP versions of the rendered raster."""
+        candidates = {}
+        if not PIL_AVAILABLE:
+            if 'png' in self.formats:
+                candidates['png'] = png_file
+            return candidates
+
+        try:
+            with Image.open(png_file) as image:
+                image = image.convert('L' if self.grayscale else 'RGB')
+                if 'png' in self.formats:
+                    image.save(png_file, format='PNG', optimize=True)
+                    candidates['png'] = png_file
+                if 'webp' in self.formats:
+                    # Lossless, so stroke edges are exactly what the PNG would show
+                    webp_file = output_stem.with_suffix('.webp')
+                    image.save(webp_file, format='WEBP', lossless=True, method=6)
+                    candidates['webp'] = webp_file
+        except Exception as e:
+            logger.warning(f"⚠️ Could not optimize raster payload {png_file.name}: {e}")
+            if 'png' in self.formats and png_file.exists():
+                candidates['png'] = png_file
+        return candidates
+
+    def _rsvg_convert(self, svg_file: Path, output_file: Path, fmt: str, width: str, height: str) -> bool:
+        command = [
+            'rsvg-convert',
+            f'--format={fmt}',
+            f'--width={width}',
+            f'--height={height}',
+            '--background-color=white',
+            f'--output={output_file}',
+            str(svg_file)
+        ]
+        try:
+            result = subprocess.run(command, capture_output=True, timeout=30)
+        except Exception as e:
+            logger.warning(f"⚠️ rsvg-convert ({fmt}) failed for {svg_file.name}: {e}")
+            return False
+        if result.returncode != 0:
+            logger.warning(f"⚠️ rsvg-convert ({fmt}) error for {svg_file.name}: {result.stderr.decode().strip()}")
+            return False
+        return output_file.exists()
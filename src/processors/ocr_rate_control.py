@@ -0,0 +1,314 @@
+"""
+Adaptive concurrency control for OCR requests.
+
+A single AIMD (additive-increase / multiplicative-decrease) limiter is shared by
+every OCR caller in the process. It admits at most `limit` concurrent requests:
+
+- each healthy response grows the limit by roughly one request per window,
+- a 429/503 or a latency spike shrinks it multiplicatively,
+- retry-after hints (or a default backoff) pause new requests entirely.
+
+This finds the highest sustainable request rate for the current quota without
+manual tuning, instead of relying only on per-request timeouts.
+"""
+
+import logging
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from statistics import median
+from typing import Any, Dict, Optional, Tuple
+
+from ..utils import metrics
+from ..utils.cancellation import CancellationToken, OperationCancelled
+
+logger = logging.getLogger(__name__)
+
+# Status codes that mean "slow down" rather than "this request is broken"
+THROTTLE_STATUS_CODES = (429, 503)
+
+_RETRY_DELAY_RE = re.compile(r"retryDelay['\"]?\s*[:=]\s*['\"]?(\d+(?:\.\d+)?)s", re.IGNORECASE)
+
+# Latencies needed for a size before its median is used to detect spikes
+MIN_BASELINE_SAMPLES = 5
+
+
+def get_throttle_info(error: Exception) -> Tuple[bool, Optional[float]]:
+    """
+    Classify an API error.
+
+    Returns:
+        Tuple of (is_throttle, retry_after_seconds). retry_after_seconds comes
+        from a Retry-After header or a google.rpc.RetryInfo retryDelay, if present.
+    """
+    code = getattr(error, 'code', None) or getattr(error, 'status_code', None)
+    if not isinstance(code, int):
+        response = getattr(error, 'response', None)
+        code = getattr(response, 'status_code', None)
+    if code not in THROTTLE_STATUS_CODES:
+        return False, None
+
+    retry_after = None
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None)
+    if headers:
+        try:
+            retry_after = float(headers.get('retry-after'))
+        except (TypeError, ValueError):
+            retry_after = None
+
+    if retry_after is None:
+        match = _RETRY_DELAY_RE.search(str(getattr(error, 'details', '') or error))
+        if match:
+            retry_after = float(match.group(1))
+
+    return True, retry_after
+
+
+class AdaptiveConcurrencyLimiter:
+    """Thread-safe AIMD concurrency limiter."""
+
+    def __init__(
+        self,
+        initial_limit: int = 1,
+        min_limit: int = 1,
+        max_limit: int = 4,
+        decrease_factor: float = 0.5,
+        latency_spike_factor: float = 2.0,
+        default_backoff_seconds: float = 10.0,
+        latency_window: int = 20,
+        name: str = "ocr"
+    ):
+        """
+        Args:
+            initial_limit: Concurrency window to start with
+            min_limit: Window never shrinks below this
+            max_limit: Window never grows above this
+            decrease_factor: Multiplier applied to the window on throttling/latency spikes
+            latency_spike_factor: A response slower than this multiple of the
+                baseline (median of recent latencies) counts as a spike; baselines are
+                kept per request size, so a multi-page batch is compared with other batches
+            default_backoff_seconds: Pause after a throttle without retry-after hint
+            latency_window: Recent successful latencies kept per request size
+            name: Label used in logs
+        """
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.decrease_factor = decrease_factor
+        self.latency_spike_factor = latency_spike_factor
+        self.default_backoff_seconds = default_backoff_seconds
+        self.latency_window = max(MIN_BASELINE_SAMPLES, latency_window)
+        self.name = name
+
+        self._limit = float(min(max(initial_limit, self.min_limit), self.max_limit))
+        self._in_flight = 0
+        self._blocked_until = 0.0
+        self._last_decrease = 0.0
+        self._latencies: Dict[int, deque] = {}  # pages per request -> recent latencies
+        self._condition = threading.Condition()
+        self._stats = {
+            'requests': 0,
+            'successes': 0,
+            'errors': 0,
+            'throttled': 0,
+            'latency_backoffs': 0,
+            'wait_time_s': 0.0,
+        }
+
+    @property
+    def limit(self) -> int:
+        """Current concurrency window."""
+        return int(self._limit)
+
+    def acquire(self, cancel_token: Optional[CancellationToken] = None) -> None:
+        """Block until a request may be sent.
+
+        Raises:
+            OperationCancelled: cancel_token was cancelled while waiting
+        """
+        start = time.monotonic()
+        with self._condition:
+            while True:
+                now = time.monotonic()
+                if cancel_token is not None and cancel_token.cancelled:
+                    raise OperationCancelled(cancel_token.reason)
+                if now < self._blocked_until:
+                    # Wake up at least once a second to notice cancellation during long pauses
+                    self._condition.wait(min(self._blocked_until - now, 1.0))
+                elif self._in_flight >= int(self._limit):
+                    self._condition.wait(1.0)
+                else:
+                    break
+            self._in_flight += 1
+            self._stats['requests'] += 1
+            self._stats['wait_time_s'] += time.monotonic() - start
+
+    def release(self, latency: Optional[float] = None, throttled: bool = False,
+                retry_after: Optional[float] = None, error: bool = False, size: int = 1) -> None:
+        """
+        Return a slot and feed the outcome back into the window.
+
+        Args:
+            latency: Request duration in seconds (successful requests only)
+            throttled: The API answered 429/503
+            retry_after: Seconds the API asked us to wait, if known
+            error: The request failed for a non-throttle reason (window unchanged)
+            size: Pages in the request; latency is compared with requests of the same size
+        """
+        with self._condition:
+            self._in_flight = max(0, self._in_flight - 1)
+            now = time.monotonic()
+
+            if throttled:
+                self._stats['throttled'] += 1
+                backoff = retry_after if retry_after is not None else self.default_backoff_seconds
+                self._blocked_until = max(self._blocked_until, now + backoff)
+                self._decrease(now, f"throttled, pausing {backoff:.1f}s", size)
+            elif error:
+                self._stats['errors'] += 1
+            else:
+                self._stats['successes'] += 1
+                if latency is not None:
+                    self._on_latency(latency, now, size)
+
+            self._condition.notify_all()
+
+    def _baseline(self, size: int) -> Optional[float]:
+        """Median recent latency for requests of this size, once enough are known."""
+        latencies = self._latencies.get(size)
+        if not latencies or len(latencies) < MIN_BASELINE_SAMPLES:
+            return None
+        return median(latencies)
+
+    def _on_latency(self, latency: float, now: float, size: int = 1) -> None:
+        baseline = self._baseline(size)
+        if baseline is not None and latency > baseline * self.latency_spike_factor:
+            self._stats['latency_backoffs'] += 1
+            self._decrease(now, f"latency spike {latency:.1f}s vs baseline {baseline:.1f}s "
+                                f"({size} page(s) per request)", size)
+        else:
+            # Additive increase: about +1 per full window of healthy responses
+            old_limit = int(self._limit)
+            self._limit = min(self.max_limit, self._limit + 1.0 / max(self._limit, 1.0))
+            if int(self._limit) > old_limit:
+                logger.info(f"📈 {self.name} concurrency window: {old_limit} → {int(self._limit)}")
+
+        # A median moves as much up as down, so ordinary variance between pages
+        # doesn't make the fastest recent response the yardstick
+        latencies = self._latencies.get(size)
+        if latencies is None:
+            latencies = self._latencies[size] = deque(maxlen=self.latency_window)
+        latencies.append(latency)
+
+    def _decrease(self, now: float, reason: str, size: int = 1) -> None:
+        # One decrease per baseline latency: a burst of in-flight failures from the
+        # same overload shouldn't collapse the window repeatedly
+        cooldown = self._baseline(size) or 1.0
+        if now - self._last_decrease < cooldown:
+            return
+        self._last_decrease = now
+
+        old_limit = int(self._limit)
+        self._limit = max(float(self.min_limit), self._limit * self.decrease_factor)
+        logger.warning(f"📉 {self.name} concurrency window: {old_limit} → {int(self._limit)} ({reason})")
+
+    @contextmanager
+    def slot(self, cancel_token: Optional[CancellationToken] = None, size: int = 1):
+        """Acquire a slot for one request and report its outcome on exit.
+
+        Exceptions are classified with get_throttle_info(): 429/503 shrink the
+        window and pause new requests, other errors leave the window unchanged.
+        A cancelled token stops the wait for a slot with OperationCancelled.
+        `size` is the number of pages in the request (see release()).
+        """
+        permit = OCRPermit(self, size)
+        permit.start(cancel_token)
+        try:
+            yield permit
+        except Exception as e:
+            if not permit.released:
+                is_throttle, retry_after = get_throttle_info(e)
+                permit.finish(throttled=is_throttle, retry_after=retry_after, error=not is_throttle)
+            raise
+        else:
+            if not permit.released:
+                permit.finish()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get the current window and throttle counters."""
+        with self._condition:
+            stats = dict(self._stats)
+            stats.update({
+                'limit': int(self._limit),
+                'min_limit': self.min_limit,
+                'max_limit': self.max_limit,
+                'in_flight': self._in_flight,
+                'baseline_latency_s': self._baseline(1),
+                'baseline_latency_by_size': {size: self._baseline(size) for size in self._latencies},
+                'paused_for_s': max(0.0, self._blocked_until - time.monotonic()),
+            })
+        return stats
+
+
+class OCRPermit:
+    """One admitted request; measures its latency and reports the outcome once."""
+
+    def __init__(self, limiter: AdaptiveConcurrencyLimiter, size: int = 1):
+        self.limiter = limiter
+        self.size = size
+        self.released = False
+        self._started = 0.0
+
+    def start(self, cancel_token: Optional[CancellationToken] = None) -> None:
+        self.limiter.acquire(cancel_token)
+        self._started = time.monotonic()
+
+    def finish(self, throttled: bool = False, retry_after: Optional[float] = None,
+               error: bool = False) -> None:
+        if self.released:
+            return
+        self.released = True
+        latency = None if (throttled or error) else time.monotonic() - self._started
+        self.limiter.release(latency=latency, throttled=throttled, retry_after=retry_after, error=error,
+                             size=self.size)
+
+
+# Global limiter instance shared by all OCR callers
+_ocr_limiter = None
+_ocr_limiter_lock = threading.Lock()
+
+
+def get_ocr_limiter(config=None) -> AdaptiveConcurrencyLimiter:
+    """Get the process-wide OCR limiter, creating it from config on first use."""
+    global _ocr_limiter
+    with _ocr_limiter_lock:
+        if _ocr_limiter is None:
+            get = config.get if config else (lambda key, default=None: default)
+            _ocr_limiter = AdaptiveConcurrencyLimiter(
+                initial_limit=get('processing.ocr.concurrency.initial', 1),
+                min_limit=get('processing.ocr.concurrency.min', 1),
+                max_limit=get('processing.ocr.concurrency.max', 4),
+                decrease_factor=get('processing.ocr.concurrency.decrease_factor', 0.5),
+                latency_spike_factor=get('processing.ocr.concurrency.latency_spike_factor', 2.0),
+                default_backoff_seconds=get('processing.ocr.concurrency.default_backoff_seconds', 10.0),
+                latency_window=get('processing.ocr.concurrency.latency_window', 20),
+                name="OCR"
+            )
+            metrics.register_collector(_limiter_gauges)
+        return _ocr_limiter
+
+
+def _limiter_gauges():
+    """Expose the shared limiter's state as metrics gauges."""
+    if _ocr_limiter is None:
+        return []
+    stats = _ocr_limiter.get_stats()
+    return [
+        ('ocr_concurrency_limit', {}, stats['limit']),
+        ('ocr_in_flight_requests', {}, stats['in_flight']),
+        ('ocr_throttled_requests', {}, stats['throttled']),
+        ('ocr_latency_backoffs', {}, stats['latency_backoffs']),
+        ('ocr_paused_seconds', {}, stats['paused_for_s']),
+    ]
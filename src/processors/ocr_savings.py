@@ -0,0 +1,82 @@
+"""
+OCR savings report from watcher logs.
+
+Change detection and blank-page detection both log one line per page they
+keep away from the OCR API. Counting those lines over a log file shows what
+the skips are worth without any extra bookkeeping in the database.
+"""
+
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from .blank_page_detection import DEFAULT_COST_PER_PAGE
+
+logger = logging.getLogger(__name__)
+
+# Substrings of the per-page log lines written by NotebookTextExtractor
+PAGE_QUEUED_MARKER = 'Processing (new or changed)'
+INK_UNCHANGED_MARKER = 'Ink unchanged (file rewritten)'
+BLANK_PAGE_MARKER = 'recorded without OCR'
+
+# Default logging.format starts with %(asctime)s, e.g. "2026-10-18 09:15:02,123"
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+TIMESTAMP_LENGTH = 19
+
+
+def summarize_ocr_savings(log_file: str, days: int = 7, now: Optional[datetime] = None,
+                          cost_per_page: float = DEFAULT_COST_PER_PAGE) -> Dict[str, Any]:
+    """
+    Count OCR calls avoided in the last `days` days of a log file.
+
+    Args:
+        log_file: Log written with the default logging.format
+        days: Size of the window ending at `now`
+        now: End of the window (defaults to the current time)
+        cost_per_page: Estimated OCR cost of one page (USD)
+
+    Returns:
+        Per-day and total counts of queued pages, rewritten-but-unchanged
+        pages, blank pages and OCR calls made, plus the estimated savings
+    """
+    now = now or datetime.now()
+    since = now - timedelta(days=days)
+    per_day = defaultdict(lambda: {'queued': 0, 'ink_unchanged': 0, 'blank': 0})
+
+    with open(log_file, 'r', encoding='utf-8', errors='replace') as f:
+        for line in f:
+            if INK_UNCHANGED_MARKER in line:
+                counter = 'ink_unchanged'
+            elif BLANK_PAGE_MARKER in line and 'Blank (' in line:
+                counter = 'blank'
+            elif PAGE_QUEUED_MARKER in line:
+                counter = 'queued'
+            else:
+                continue
+            try:
+                timestamp = datetime.strptime(line[:TIMESTAMP_LENGTH], TIMESTAMP_FORMAT)
+            except ValueError:
+                continue
+            if since <= timestamp <= now:
+                per_day[timestamp.date().isoformat()][counter] += 1
+
+    totals = {'queued': 0, 'ink_unchanged': 0, 'blank': 0}
+    for counts in per_day.values():
+        # Blank pages are queued first and then skipped, so they are not OCR calls
+        counts['ocr_calls'] = max(counts['queued'] - counts['blank'], 0)
+        counts['avoided'] = counts['ink_unchanged'] + counts['blank']
+        for key in totals:
+            totals[key] += counts[key]
+    totals['ocr_calls'] = max(totals['queued'] - totals['blank'], 0)
+    totals['avoided'] = totals['ink_unchanged'] + totals['blank']
+
+    attempted = totals['ocr_calls'] + totals['avoided']
+    return {
+        'since': since.isoformat(timespec='seconds'),
+        'until': now.isoformat(timespec='seconds'),
+        'days': dict(sorted(per_day.items())),
+        'totals': totals,
+        'avoided_ratio': totals['avoided'] / attempted if attempted else 0.0,
+        'estimated_cost_saved': totals['avoided'] * cost_per_page,
+    }
@@ -0,0 +1,488 @@
+"""
+Staged page pipeline for whole-library text extraction.
+
+process_directory used to handle one notebook at a time, and within it one
+batch of pages at a time, so rendering (CPU), OCR (network) and SQLite writes
+never overlapped. The pipeline splits the work into four stages joined by
+bounded queues:
+
+    discovery ──▶ render ──▶ OCR ──▶ persistence
+    (change check,  (process   (threads under   (one writer:
+     blank/region    pool)      the shared OCR   results, todos,
+     triage)                    limiter)         events)
+
+A full queue makes the stage before it wait, so a slow OCR backend holds back
+rendering instead of filling the temp directory. Discovery and persistence run
+on the event loop thread, which is the only thread that touches the database
+connection. Per-stage utilization and queue depths are reported at the end.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Set, Tuple
+
+from ..core.rm_scene import SceneCache, get_scene_cache
+from ..utils import metrics
+from .ocr_payload import OCRPayloadOptimizer
+from .region_ocr import RegionUpdate
+
+if TYPE_CHECKING:
+    from .notebook_text_extractor import NotebookPage, NotebookTextExtractor, NotebookTextResult
+
+logger = logging.getLogger(__name__)
+
+# Scene cache of a render worker process (None in the main process)
+_worker_scene_cache: Optional[SceneCache] = None
+
+_last_stats: Optional['PipelineStats'] = None
+
+
+def _init_render_worker(cache_directory: Optional[str]) -> None:
+    global _worker_scene_cache
+    _worker_scene_cache = SceneCache(cache_directory, memory_entries=4)
+
+
+def render_payload(rm_file: str, output_stem: str, optimizer: OCRPayloadOptimizer,
+                   strokes: Optional[Set[int]] = None,
+                   crop: Optional[Tuple[float, float, float, float]] = None) -> Optional[str]:
+    """
+    Render one v6 page (or region) to its OCR payload; runs in a render worker.
+
+    Returns:
+        Payload path, or None if the page is not v6 or could not be rendered
+    """
+    scene = (_worker_scene_cache or get_scene_cache()).load(rm_file)
+    if scene is None:
+        return None
+    payload = optimizer.build(scene, Path(output_stem), strokes=strokes, crop=crop)
+    return str(payload.path) if payload else None
+
+
+@dataclass
+class StageStats:
+    """Work done by one stage and the depth of the queue feeding it."""
+    name: str
+    workers: int
+    queue_capacity: int = 0
+    items: int = 0
+    busy_seconds: float = 0.0
+    queue_samples: int = 0
+    queue_depth_total: int = 0
+    queue_depth_max: int = 0
+
+    def sample_queue(self, queue: asyncio.Queue) -> None:
+        depth = queue.qsize()
+        self.queue_samples += 1
+        self.queue_depth_total += depth
+        self.queue_depth_max = max(self.queue_depth_max, depth)
+
+    @property
+    def queue_depth_avg(self) -> float:
+        return self.queue_depth_total / self.queue_samples if self.queue_samples else 0.0
+
+    def utilization(self, wall_seconds: float) -> float:
+        """Share of the run the stage's workers spent working (0-1)."""
+        capacity = wall_seconds * self.workers
+        return min(self.busy_seconds / capacity, 1.0) if capacity > 0 else 0.0
+
+
+@dataclass
+class PipelineStats:
+    """Throughput and per-stage figures of one pipeline run."""
+    stages: Dict[str, StageStats] = field(default_factory=dict)
+    wall_seconds: float = 0.0
+    notebooks: int = 0
+    pages_ocr: int = 0
+    pages_blank: int = 0
+    pages_failed: int = 0
+
+    @property
+    def pages_per_minute(self) -> float:
+        pages = self.pages_ocr + self.pages_blank
+        return pages / self.wall_seconds * 60 if self.wall_seconds > 0 else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'wall_seconds': round(self.wall_seconds, 2),
+            'notebooks': self.notebooks,
+            'pages_ocr': self.pages_ocr,
+            'pages_blank': self.pages_blank,
+            'pages_failed': self.pages_failed,
+            'pages_per_minute': round(self.pages_per_minute, 1),
+            'stages': {
+                name: {
+                    'workers': stage.workers,
+                    'items': stage.items,
+                    'busy_seconds': round(stage.busy_seconds, 2),
+                    'utilization': round(stage.utilization(self.wall_seconds), 3),
+                    'queue_capacity': stage.queue_capacity,
+                    'queue_depth_avg': round(stage.queue_depth_avg, 2),
+                    'queue_depth_max': stage.queue_depth_max,
+                }
+                for name, stage in self.stages.items()
+            },
+        }
+
+    def format_report(self) -> List[str]:
+        """Human-readable summary, one line per entry."""
+        lines = [
+            f"{self.pages_ocr} pages OCR'd, {self.pages_blank} blank, {self.pages_failed} failed "
+            f"from {self.notebooks} notebooks in {self.wall_seconds:.1f}s ({self.pages_per_minute:.1f} pages/min)"
+        ]
+        for name, stage in self.stages.items():
+            queue = (f"queue avg {stage.queue_depth_avg:.1f} / max {stage.queue_depth_max} of {stage.queue_capacity}"
+                     if stage.queue_capacity else "no input queue")
+            lines.append(f"{name:<12} {stage.workers:>2} workers, {stage.items:>5} items, "
+                         f"{stage.utilization(self.wall_seconds):>4.0%} busy, {queue}")
+        return lines
+
+
+def last_pipeline_stats() -> Optional[PipelineStats]:
+    """Stats of the most recent pipeline run in this process, if any."""
+    return _last_stats
+
+
+@dataclass
+class _NotebookRun:
+    """A notebook in flight: finished once discovery and every page job are done."""
+    info: Dict[str, Any]
+    start_time: float
+    temp_dir: Path
+    pages: List['NotebookPage'] = field(default_factory=list)
+    blank_pages: int = 0
+    pending: int = 1  # Page jobs in flight, plus one until discovery is done
+
+
+@dataclass
+class _PageJob:
+    run: _NotebookRun
+    rm_file: Path
+    page_uuid: str
+    page_number: int
+    region: Optional[RegionUpdate] = None
+    payload_file: Optional[Path] = None
+
+
+class StagedPagePipeline:
+    """Runs NotebookTextExtractor's per-page steps as concurrent, queue-connected stages."""
+
+    def __init__(self, enabled: bool = False, render_workers: int = 0, ocr_workers: int = 0,
+                 queue_size: int = 16):
+        """
+        Args:
+            enabled: Use the pipeline for process_directory (off = one notebook at a time)
+            render_workers: Render processes (0 = one per CPU, at most 8)
+            ocr_workers: Concurrent OCR requests (0 = the OCR limiter's maximum)
+            queue_size: Capacity of each queue between stages
+        """
+        self.enabled = enabled
+        self.render_workers = render_workers
+        self.ocr_workers = ocr_workers
+        self.queue_size = queue_size
+
+    @classmethod
+    def from_config(cls, config) -> 'StagedPagePipeline':
+        get = config.get if config else (lambda key, default=None: default)
+        prefix = 'processing.pipeline'
+        return cls(
+            enabled=get(f'{prefix}.enabled', False),
+            render_workers=get(f'{prefix}.render_workers', 0),
+            ocr_workers=get(f'{prefix}.ocr_workers', 0),
+            queue_size=get(f'{prefix}.queue_size', 16),
+        )
+
+    def run(self, extractor: 'NotebookTextExtractor', notebooks: List[Dict[str, Any]],
+            input_path: str, temp_dir: Path) -> Dict[str, 'NotebookTextResult']:
+        """
+        Process notebooks through the pipeline.
+
+        Args:
+            extractor: Extractor whose checks, rendering, OCR engine and storage are used
+            notebooks: Notebooks from find_notebooks(), already filtered
+            input_path: Base path containing the notebook files
+            temp_dir: Directory for rendered payloads
+
+        Returns:
+            Dictionary mapping notebook UUIDs to results, in notebook order
+        """
+        global _last_stats
+        render_workers = self.render_workers or min(multiprocessing.cpu_count(), 8)
+        ocr_workers = self.ocr_workers or extractor.ocr_engine.limiter.max_limit
+        stats = PipelineStats(stages={
+            'discovery': StageStats('discovery', 1),
+            'render': StageStats('render', render_workers, self.queue_size),
+            'ocr': StageStats('ocr', ocr_workers, self.queue_size),
+            'persistence': StageStats('persistence', 1, self.queue_size),
+        })
+        logger.info(f"🏭 Staged pipeline: {render_workers} render processes, {ocr_workers} OCR workers, "
+                    f"queues of {self.queue_size}")
+
+        results: Dict[str, 'NotebookTextResult'] = {}
+        started = time.monotonic()
+        cache_directory = get_scene_cache(extractor.ocr_engine.config).directory
+        # Spawned, not forked: the parent already runs OCR and logging threads
+        with ProcessPoolExecutor(max_workers=render_workers, mp_context=multiprocessing.get_context('spawn'),
+                                 initializer=_init_render_worker,
+                                 initargs=(str(cache_directory) if cache_directory else None,)) as pool, \
+                ThreadPoolExecutor(max_workers=ocr_workers, thread_name_prefix='ocr') as ocr_executor:
+            asyncio.run(_PipelineRun(self, extractor, input_path, temp_dir, pool, ocr_executor,
+                                     stats, results).run(notebooks))
+        stats.wall_seconds = time.monotonic() - started
+        stats.notebooks = len(results)
+
+        for name, stage in stats.stages.items():
+            metrics.inc('pipeline_stage_items_total', stage.items, stage=name)
+            metrics.inc('pipeline_stage_busy_seconds_total', stage.busy_seconds, stage=name)
+        for line in stats.format_report():
+            logger.info(f"🏭 {line}")
+        _last_stats = stats
+
+        return {notebook['uuid']: results[notebook['uuid']] for notebook in notebooks
+                if notebook['uuid'] in results}
+
+
+class _PipelineRun:
+    """State of one pipeline run: the queues and the coroutines of each stage."""
+
+    def __init__(self, pipeline: StagedPagePipeline, extractor: 'NotebookTextExtractor', input_path: str,
+                 temp_dir: Path, pool: ProcessPoolExecutor, ocr_executor: ThreadPoolExecutor,
+                 stats: PipelineStats, results: Dict[str, 'NotebookTextResult']):
+        self.extractor = extractor
+        self.input_path = input_path
+        self.temp_dir = temp_dir
+        self.pool = pool
+        self.ocr_executor = ocr_executor
+        self.stats = stats
+        self.results = results
+        self.render_queue: asyncio.Queue = asyncio.Queue(pipeline.queue_size)
+        self.ocr_queue: asyncio.Queue = asyncio.Queue(pipeline.queue_size)
+        self.store_queue: asyncio.Queue = asyncio.Queue(pipeline.queue_size)
+        # Pre-v6 pages go through rm_parser, which is not thread-safe
+        self.legacy_render_lock = asyncio.Lock()
+
+    async def run(self, notebooks: List[Dict[str, Any]]) -> None:
+        render_tasks = [asyncio.create_task(self._render_stage())
+                        for _ in range(self.stats.stages['render'].workers)]
+        ocr_tasks = [asyncio.create_task(self._ocr_stage()) for _ in range(self.stats.stages['ocr'].workers)]
+        persist_task = asyncio.create_task(self._persistence_stage())
+
+        # Each stage is closed once the one before it has drained
+        await self._discovery_stage(notebooks)
+        for _ in render_tasks:
+            await self.render_queue.put(None)
+        await asyncio.gather(*render_tasks)
+        for _ in ocr_tasks:
+            await self.ocr_queue.put(None)
+        await asyncio.gather(*ocr_tasks)
+        await self.store_queue.put(None)
+        await persist_task
+
+    async def _take(self, queue: asyncio.Queue, stage: str) -> Any:
+        self.stats.stages[stage].sample_queue(queue)
+        return await queue.get()
+
+    async def _offload(self, func, *args) -> Any:
+        """Run a blocking extractor step (scene parsing, database work) off the event loop.
+
+        An extractor bound to one sqlite connection may only use it from this
+        thread, so its steps run inline.
+        """
+        if self.extractor.db_connection is not None:
+            return func(*args)
+        return await asyncio.to_thread(func, *args)
+
+    def _record(self, stage: str, started: float) -> None:
+        stats = self.stats.stages[stage]
+        stats.items += 1
+        stats.busy_seconds += time.monotonic() - started
+
+    async def _discovery_stage(self, notebooks: List[Dict[str, Any]]) -> None:
+        """Triage every page of every notebook; blank pages skip straight to persistence."""
+        extractor = self.extractor
+        for index, notebook in enumerate(notebooks, 1):
+            uuid, name = notebook['uuid'], notebook['name']
+            logger.info(f"[{index}/{len(notebooks)}] Discovering: {name}")
+            run = _NotebookRun(info=notebook, start_time=time.time(), temp_dir=self.temp_dir / uuid)
+
+            try:
+                skipped = await self._offload(extractor._notebook_preflight, uuid, name)
+                if skipped:
+                    self.results[uuid] = skipped
+                    continue
+                page_uuids = extractor._notebook_page_uuids(notebook['content_file'])
+            except Exception as e:
+                self.results[uuid] = extractor._notebook_error_result(uuid, name, e, run.start_time)
+                continue
+            run.temp_dir.mkdir(parents=True, exist_ok=True)
+
+            for page_number, page_uuid in enumerate(page_uuids, 1):
+                started = time.monotonic()
+                try:
+                    triage = await self._offload(extractor._triage_page, uuid, page_uuid, page_number,
+                                                 len(page_uuids), self.input_path)
+                except Exception as e:
+                    logger.error(f"    ✗ Page {page_number}: Change check failed - {e}")
+                    triage = None
+                self._record('discovery', started)
+                if triage is None:
+                    continue
+
+                rm_file, blank_page, region_update = triage
+                if blank_page:
+                    run.pages.append(blank_page)
+                    run.blank_pages += 1
+                    self.stats.pages_blank += 1
+                    continue
+                run.pending += 1
+                await self.render_queue.put(_PageJob(run, rm_file, page_uuid, page_number, region_update))
+
+            if run.blank_pages:
+                logger.info(f"  ⬜ {run.blank_pages} blank pages recorded without OCR "
+                            f"(~${run.blank_pages * extractor.blank_page_classifier.cost_per_page:.3f} saved)")
+            await self.store_queue.put((run, None))
+
+    async def _render_stage(self) -> None:
+        while True:
+            job = await self._take(self.render_queue, 'render')
+            if job is None:
+                return
+            started = time.monotonic()
+            try:
+                job.payload_file = await self._render(job)
+            except Exception as e:
+                logger.error(f"Error rendering page {job.page_number}: {e}")
+                job.payload_file = None
+            self._record('render', started)
+
+            if job.payload_file:
+                await self.ocr_queue.put(job)
+            else:
+                self.stats.pages_failed += 1
+                await self.store_queue.put((job.run, None))
+
+    async def _render(self, job: _PageJob) -> Optional[Path]:
+        """Render a job's payload in the process pool, full page if its region can't be rendered."""
+        extractor = self.extractor
+        if extractor._debug_force_ocr_failure(job.page_number):
+            return None
+        loop = asyncio.get_running_loop()
+        stem = job.run.temp_dir / f"page_{job.page_number:03d}"
+
+        if job.region:
+            # Without payload optimization still render a PDF of the region's own size
+            optimizer = (extractor.payload_optimizer if extractor.payload_optimizer.enabled
+                         else OCRPayloadOptimizer(formats=('pdf',)))
+            payload = None
+            if optimizer.is_available():
+                payload = await loop.run_in_executor(self.pool, render_payload, str(job.rm_file),
+                                                     f"{stem}_region", optimizer, job.region.strokes,
+                                                     job.region.crop)
+            if payload:
+                return Path(payload)
+            logger.warning(f"    ✂️ Page {job.page_number}: Region render failed - full page OCR")
+            job.region = None
+
+        if extractor.payload_optimizer.is_available():
+            payload = await loop.run_in_executor(self.pool, render_payload, str(job.rm_file), str(stem),
+                                                 extractor.payload_optimizer)
+            if payload:
+                return Path(payload)
+        async with self.legacy_render_lock:
+            return await asyncio.to_thread(extractor._render_page_pdf, job.rm_file, job.page_number,
+                                           job.run.temp_dir)
+
+    async def _ocr_stage(self) -> None:
+        """OCR payloads, up to pages_per_request per call, as many calls as there are workers."""
+        engine = self.extractor.ocr_engine
+        loop = asyncio.get_running_loop()
+        while True:
+            job = await self._take(self.ocr_queue, 'ocr')
+            if job is None:
+                return
+            jobs = [job]
+            closing = False
+            while len(jobs) < engine.pages_per_request:
+                try:
+                    next_job = self.ocr_queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    break
+                if next_job is None:
+                    closing = True
+                    break
+                jobs.append(next_job)
+
+            started = time.monotonic()
+            try:
+                ocr_results = await loop.run_in_executor(self.ocr_executor, engine.process_files,
+                                                         [str(job.payload_file) for job in jobs])
+            except Exception as e:
+                logger.error(f"    ✗ Pages {', '.join(str(job.page_number) for job in jobs)}: Error processing - {e}")
+                ocr_results = [None] * len(jobs)
+            for job, ocr_result in zip(jobs, ocr_results):
+                # A failed page must still reach persistence, or its notebook never finishes
+                try:
+                    page = await self._page_from_result(job, ocr_result)
+                except Exception as e:
+                    logger.error(f"    ✗ Page {job.page_number}: Error processing - {e}")
+                    page = None
+                self._record('ocr', started)
+                started = time.monotonic()
+                if page:
+                    self.stats.pages_ocr += 1
+                else:
+                    self.stats.pages_failed += 1
+                    logger.warning(f"    ✗ Page {job.page_number}: No text extracted")
+                await self.store_queue.put((job.run, page))
+            if closing:
+                return
+
+    async def _page_from_result(self, job: _PageJob, ocr_result) -> Optional['NotebookPage']:
+        extractor = self.extractor
+        page = None
+        if ocr_result is not None:
+            page = extractor._page_from_ocr_result(ocr_result, job.rm_file, job.page_uuid, job.page_number)
+        if not job.region:
+            return page
+        if page:
+            return extractor._merge_region_page(page, job.region)
+
+        # Region OCR failed: render and transcribe the whole page instead
+        logger.warning(f"    ✂️ Page {job.page_number}: Region OCR failed - full page OCR")
+        job.region = None
+        job.payload_file = await self._render(job)
+        if not job.payload_file:
+            return None
+        ocr_result = await asyncio.get_running_loop().run_in_executor(
+            self.ocr_executor, extractor.ocr_engine.process_file, str(job.payload_file))
+        return extractor._page_from_ocr_result(ocr_result, job.rm_file, job.page_uuid, job.page_number)
+
+    async def _persistence_stage(self) -> None:
+        """Collect finished pages; store each notebook once all of its pages are done."""
+        extractor = self.extractor
+        while True:
+            item = await self._take(self.store_queue, 'persistence')
+            if item is None:
+                return
+            run, page = item
+            if page:
+                run.pages.append(page)
+            run.pending -= 1
+            if run.pending:
+                continue
+
+            uuid, name = run.info['uuid'], run.info['name']
+            started = time.monotonic()
+            pages = sorted(run.pages, key=lambda notebook_page: notebook_page.page_number)
+            try:
+                result = await self._offload(extractor._finish_notebook, uuid, name, pages, run.blank_pages,
+                                             self.input_path, run.start_time)
+                logger.info(f"  ✓ {name}: {result.total_text_regions} text regions")
+            except Exception as e:
+                result = extractor._notebook_error_result(uuid, name, e, run.start_time)
+            self._record('persistence', started)
+            self.results[uuid] = result
@@ -0,0 +1,162 @@
+"""
+Region-incremental OCR for pages that only gained new strokes.
+
+While taking notes, an already transcribed page usually changes by one more
+line at a time, and re-rendering and re-transcribing the whole page pays for
+every existing line again. The planner diffs the page's strokes against the
+version that was last OCR'd. When strokes were only appended, in an area clear
+of existing ink and of existing text blocks, just that area is OCR'd and the
+result is merged into the stored Markdown by vertical position. Anything it
+cannot place with confidence falls back to full-page OCR.
+"""
+
+import logging
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from ..core.rm_scene import ERASER_TOOLS, ParsedScene
+from ..utils import metrics
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class TextSegment:
+    """A block of the page's Markdown and the vertical extent (screen units) it was transcribed from."""
+    y_min: float
+    y_max: float
+    text: str
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'TextSegment':
+        return cls(y_min=float(data['y_min']), y_max=float(data['y_max']), text=data['text'])
+
+
+@dataclass
+class RegionUpdate:
+    """Plan for OCR'ing only the strokes appended since the last transcription."""
+    strokes: Set[int]                               # Indices of appended strokes in the current scene
+    ink_bbox: Tuple[float, float, float, float]     # x_min, x_max, y_min, y_max of the appended ink
+    crop: Tuple[float, float, float, float]         # ink_bbox plus padding, rendered for OCR
+    segments: List[TextSegment] = field(default_factory=list)  # Stored segments of the previous version
+
+    def merged_segments(self, text: str) -> List[TextSegment]:
+        """Previous segments plus the region's transcription, in vertical order."""
+        new_segment = TextSegment(y_min=round(self.ink_bbox[2], 1), y_max=round(self.ink_bbox[3], 1), text=text)
+        return sorted(self.segments + [new_segment], key=lambda segment: segment.y_min)
+
+
+def page_segment(scene: ParsedScene, text: str) -> Optional[TextSegment]:
+    """The whole page's transcription as one segment spanning its ink and typed text."""
+    if not text.strip():
+        return None
+    y_values = [line[1] for line in scene.text_lines]
+    ink_bbox = scene.ink_bbox()
+    if ink_bbox:
+        y_values.extend(ink_bbox[2:])
+    if not y_values:
+        return None
+    return TextSegment(y_min=round(min(y_values), 1), y_max=round(max(y_values), 1), text=text)
+
+
+def segments_text(segments: List[TextSegment]) -> str:
+    """Page Markdown assembled from segments (same separator sync uses between regions)."""
+    return '\n\n'.join(segment.text.strip() for segment in segments if segment.text.strip())
+
+
+class RegionOCRPlanner:
+    """Decides whether a changed page can be updated by OCR'ing only its new strokes."""
+
+    def __init__(self, enabled: bool = False, padding: float = 24.0, max_region_fraction: float = 0.5):
+        """
+        Args:
+            enabled: Plan region updates at all (off = always full-page OCR)
+            padding: Margin (screen units) around the new ink that must be clear of old ink
+            max_region_fraction: Largest crop, as a fraction of the page area, worth a region update
+        """
+        self.enabled = enabled
+        self.padding = padding
+        self.max_region_fraction = max_region_fraction
+
+    @classmethod
+    def from_config(cls, config) -> 'RegionOCRPlanner':
+        get = config.get if config else (lambda key, default=None: default)
+        prefix = 'processing.ocr.region_incremental'
+        return cls(
+            enabled=get(f'{prefix}.enabled', False),
+            padding=get(f'{prefix}.padding', 24.0),
+            max_region_fraction=get(f'{prefix}.max_region_fraction', 0.5),
+        )
+
+    def _fallback(self, reason: str) -> None:
+        metrics.inc('ocr_region_fallbacks', reason=reason)
+        logger.debug(f"Region OCR not possible ({reason}) - full page OCR")
+        return None
+
+    def plan(self, previous: ParsedScene, current: ParsedScene,
+             segments: List[TextSegment]) -> Optional[RegionUpdate]:
+        """
+        Args:
+            previous: Scene of the version that was last OCR'd
+            current: Scene of the page as it is now
+            segments: Text segments stored for the previous version
+
+        Returns:
+            RegionUpdate, or None if the page needs full-page OCR
+        """
+        if previous.text_lines != current.text_lines or previous.highlight_texts() != current.highlight_texts():
+            return self._fallback('text_changed')
+
+        # Ink without stored text (e.g. a page stored as blank) was never transcribed;
+        # OCR'ing only the new strokes would leave it out for good
+        if not segments and previous.ink_bbox() is not None:
+            return self._fallback('untranscribed_ink')
+
+        # Multiset difference of stroke digests: every old stroke must still be there
+        remaining = Counter(previous.stroke_digests())
+        appended = []
+        for index, digest in enumerate(current.stroke_digests()):
+            if remaining[digest] > 0:
+                remaining[digest] -= 1
+            else:
+                appended.append(index)
+        if +remaining:
+            return self._fallback('strokes_removed')
+        if not appended:
+            return self._fallback('no_new_strokes')
+        if np.isin(current.stroke_tool[appended], ERASER_TOOLS).any():
+            return self._fallback('eraser')
+
+        offsets = current.stroke_offsets
+        point_index = np.concatenate([np.arange(offsets[i], offsets[i + 1]) for i in appended])
+        xy = current.absolute_xy()[point_index]
+        if not len(xy):
+            return self._fallback('no_new_strokes')
+        ink_bbox = (float(xy[:, 0].min()), float(xy[:, 0].max()), float(xy[:, 1].min()), float(xy[:, 1].max()))
+        crop = (ink_bbox[0] - self.padding, ink_bbox[1] + self.padding,
+                ink_bbox[2] - self.padding, ink_bbox[3] + self.padding)
+
+        page_x_min, page_x_max, page_y_min, page_y_max = current.bbox
+        page_area = (page_x_max - page_x_min) * (page_y_max - page_y_min)
+        if page_area > 0 and (crop[1] - crop[0]) * (crop[3] - crop[2]) > self.max_region_fraction * page_area:
+            return self._fallback('region_too_large')
+
+        old_xy = previous.absolute_xy()
+        if len(old_xy):
+            old_xy = old_xy[np.repeat(previous.ink_mask(), np.diff(previous.stroke_offsets))]
+            inside = ((old_xy[:, 0] >= crop[0]) & (old_xy[:, 0] <= crop[1]) &
+                      (old_xy[:, 1] >= crop[2]) & (old_xy[:, 1] <= crop[3]))
+            if inside.any():
+                return self._fallback('overlaps_ink')
+
+        # The region must fit between text blocks so its position in the Markdown is unambiguous
+        if any(segment.y_min <= crop[3] and segment.y_max >= crop[2] for segment in segments):
+            return self._fallback('overlaps_text')
+
+        return RegionUpdate(strokes=set(appended), ink_bbox=ink_bbox, crop=crop, segments=list(segments))
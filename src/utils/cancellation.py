@@ -0,0 +1,47 @@
+"""
+Cooperative cancellation for long-running work in executor threads.
+
+A thread running in an executor cannot be stopped from outside: when the
+watcher gives up on a notebook, the thread keeps OCRing pages unless it is
+told to stop. A CancellationToken is that message. The owner calls cancel();
+the worker checks the token at safe points (page boundaries, before an OCR
+request) and stops there. Work finished before that point is kept.
+"""
+
+import threading
+from typing import Optional
+
+
+class OperationCancelled(Exception):
+    """Raised by CancellationToken.raise_if_cancelled() once the token is cancelled."""
+
+
+class CancellationToken:
+    """Thread-safe, one-way cancellation flag with a reason."""
+
+    def __init__(self):
+        self._event = threading.Event()
+        self.reason: Optional[str] = None
+
+    def cancel(self, reason: str = "cancelled") -> None:
+        """Ask the work to stop at its next check; the first reason is kept."""
+        if not self._event.is_set():
+            self.reason = reason
+            self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def raise_if_cancelled(self) -> None:
+        if self._event.is_set():
+            raise OperationCancelled(self.reason)
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Sleep up to `timeout` seconds, returning early (True) if cancelled."""
+        return self._event.wait(timeout)
+
+
+def is_cancelled(token: Optional[CancellationToken]) -> bool:
+    """Whether an optional token has been cancelled (None never is)."""
+    return token is not None and token.cancelled
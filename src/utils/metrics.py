@@ -0,0 +1,382 @@
+"""
+Lightweight pipeline instrumentation.
+
+Collects per-stage duration histograms and counters for the
+.rm → SVG → PDF → OCR → store → sync pipeline and renders them in the
+Prometheus text format. Metrics are off by default; when disabled every
+helper returns after a single flag check, so call sites can stay
+instrumented in hot paths.
+
+Usage:
+    from src.utils import metrics
+
+    with metrics.stage('render', notebook=notebook_uuid):
+        ...
+    metrics.inc('ocr_tokens_total', 1200, direction='input')
+
+Exposure:
+    - `watch` serves /metrics on metrics.host:metrics.port while running
+    - batch commands write a snapshot on exit (metrics.snapshot_file),
+      printed by `remarkable-integration metrics dump`
+"""
+
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+METRIC_PREFIX = 'remarkable_'
+
+# Seconds; spans sub-millisecond DB writes up to multi-minute OCR batches
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+METRIC_HELP = {
+    'stage_duration_seconds': 'Duration of pipeline stages (render, svg_to_pdf, ocr_request, db_store, change_tracking, notion_call, readwise_call)',
+    'stage_errors_total': 'Pipeline stage executions that raised an exception',
+    'ocr_pages_total': 'Pages sent to the OCR engine',
+    'ocr_tokens_total': 'OCR tokens by direction (input/output)',
+    'api_requests_total': 'HTTP requests to sync targets by status code',
+}
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+_enabled = False
+
+
+class _Histogram:
+    __slots__ = ('counts', 'sum', 'count')
+
+    def __init__(self, bucket_count: int):
+        self.counts = [0] * (bucket_count + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+
+class MetricsRegistry:
+    """Thread-safe store of counters and histograms keyed by (name, labels)."""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self._counters: Dict[Tuple[str, LabelKey], float] = {}
+        self._histograms: Dict[Tuple[str, LabelKey], _Histogram] = {}
+        self._collectors: List[Callable[[], Iterable[Tuple[str, Dict[str, Any], float]]]] = []
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(name: str, labels: Dict[str, Any]) -> Tuple[str, LabelKey]:
+        return name, tuple(sorted((k, str(v)) for k, v in labels.items() if v is not None))
+
+    def inc(self, name: str, value: float, labels: Dict[str, Any]) -> None:
+        key = self._key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0.0) + value
+
+    def observe(self, name: str, value: float, labels: Dict[str, Any]) -> None:
+        key = self._key(name, labels)
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = i
+                break
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = _Histogram(len(self.buckets))
+            histogram.counts[index] += 1
+            histogram.sum += value
+            histogram.count += 1
+
+    def register_collector(self, collector: Callable[[], Iterable[Tuple[str, Dict[str, Any], float]]]) -> None:
+        """Register a callable returning (name, labels, value) gauges, evaluated at export time."""
+        with self._lock:
+            self._collectors.append(collector)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Get a JSON-serializable copy of all metrics."""
+        with self._lock:
+            counters = [
+                {'name': name, 'labels': dict(labels), 'value': value}
+                for (name, labels), value in self._counters.items()
+            ]
+            histograms = [
+                {'name': name, 'labels': dict(labels), 'counts': list(h.counts), 'sum': h.sum, 'count': h.count}
+                for (name, labels), h in self._histograms.items()
+            ]
+            collectors = list(self._collectors)
+
+        gauges = []
+        for collector in collectors:
+            try:
+                gauges.extend(
+                    {'name': name, 'labels': labels, 'value': value}
+                    for name, labels, value in collector()
+                )
+            except Exception as e:
+                logger.debug(f"Metrics collector failed: {e}")
+
+        return {
+            'generated_at': datetime.now().isoformat(),
+            'buckets': list(self.buckets),
+            'counters': counters,
+            'histograms': histograms,
+            'gauges': gauges,
+        }
+
+
+_registry = MetricsRegistry()
+
+
+class _NoopTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NOOP_TIMER = _NoopTimer()
+
+
+class _StageTimer:
+    __slots__ = ('labels', 'start')
+
+    def __init__(self, labels: Dict[str, Any]):
+        self.labels = labels
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _registry.observe('stage_duration_seconds', time.perf_counter() - self.start, self.labels)
+        if exc_type is not None:
+            _registry.inc('stage_errors_total', 1, self.labels)
+        return False
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def enable() -> None:
+    global _enabled
+    _enabled = True
+
+
+def disable() -> None:
+    global _enabled
+    _enabled = False
+
+
+def get_registry() -> MetricsRegistry:
+    return _registry
+
+
+def stage(name: str, **labels):
+    """Time a pipeline stage: `with metrics.stage('render', notebook=uuid): ...`"""
+    if not _enabled:
+        return _NOOP_TIMER
+    labels['stage'] = name
+    return _StageTimer(labels)
+
+
+def inc(name: str, value: float = 1, **labels) -> None:
+    """Increment a counter."""
+    if _enabled:
+        _registry.inc(name, value, labels)
+
+
+def observe(name: str, value: float, **labels) -> None:
+    """Record a value in a histogram."""
+    if _enabled:
+        _registry.observe(name, value, labels)
+
+
+def register_collector(collector: Callable[[], Iterable[Tuple[str, Dict[str, Any], float]]]) -> None:
+    """Register a gauge collector (only evaluated when metrics are exported)."""
+    _registry.register_collector(collector)
+
+
+def _format_labels(labels: Dict[str, Any], extra: Optional[Tuple[str, str]] = None) -> str:
+    items = sorted(labels.items())
+    if extra:
+        items.append(extra)
+    if not items:
+        return ''
+    escaped = []
+    for key, value in items:
+        value = str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+        escaped.append(f'{key}="{value}"')
+    return '{' + ','.join(escaped) + '}'
+
+
+def render_prometheus(snapshot: Optional[Dict[str, Any]] = None) -> str:
+    """Render a snapshot (default: the live registry) in the Prometheus text format."""
+    snapshot = snapshot or _registry.snapshot()
+    buckets = snapshot.get('buckets', list(DEFAULT_BUCKETS))
+    lines: List[str] = []
+    declared = set()
+
+    def declare(name: str, metric_type: str) -> str:
+        full_name = METRIC_PREFIX + name
+        if full_name not in declared:
+            declared.add(full_name)
+            if name in METRIC_HELP:
+                lines.append(f"# HELP {full_name} {METRIC_HELP[name]}")
+            lines.append(f"# TYPE {full_name} {metric_type}")
+        return full_name
+
+    for entry in sorted(snapshot.get('counters', []), key=lambda e: e['name']):
+        full_name = declare(entry['name'], 'counter')
+        lines.append(f"{full_name}{_format_labels(entry['labels'])} {entry['value']:g}")
+
+    for entry in sorted(snapshot.get('gauges', []), key=lambda e: e['name']):
+        full_name = declare(entry['name'], 'gauge')
+        lines.append(f"{full_name}{_format_labels(entry['labels'])} {entry['value']:g}")
+
+    for entry in sorted(snapshot.get('histograms', []), key=lambda e: e['name']):
+        full_name = declare(entry['name'], 'histogram')
+        cumulative = 0
+        for bound, count in zip(list(buckets) + ['+Inf'], entry['counts']):
+            cumulative += count
+            le = bound if bound == '+Inf' else f"{bound:g}"
+            lines.append(f"{full_name}_bucket{_format_labels(entry['labels'], ('le', le))} {cumulative}")
+        lines.append(f"{full_name}_sum{_format_labels(entry['labels'])} {entry['sum']:g}")
+        lines.append(f"{full_name}_count{_format_labels(entry['labels'])} {entry['count']}")
+
+    return '\n'.join(lines) + '\n'
+
+
+def save_snapshot(path: str, command: Optional[str] = None) -> None:
+    """Write the current metrics to a JSON snapshot file."""
+    snapshot = _registry.snapshot()
+    snapshot['command'] = command
+    try:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(snapshot, f, indent=2)
+        logger.info(f"📊 Metrics snapshot written to {path}")
+    except Exception as e:
+        logger.warning(f"Could not write metrics snapshot to {path}: {e}")
+
+
+def load_snapshot(path: str) -> Optional[Dict[str, Any]]:
+    """Load a snapshot written by save_snapshot()."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+# HTTP exposure
+
+class _MetricsRequestHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?')[0] != '/metrics':
+            self.send_error(404)
+            return
+        body = render_prometheus().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug(f"metrics endpoint: {format % args}")
+
+
+def start_http_server(host: str = '127.0.0.1', port: int = 9464) -> Optional[ThreadingHTTPServer]:
+    """Serve /metrics in a daemon thread. Returns the server, or None if it couldn't bind."""
+    try:
+        server = ThreadingHTTPServer((host, port), _MetricsRequestHandler)
+    except OSError as e:
+        logger.warning(f"Could not start metrics endpoint on {host}:{port}: {e}")
+        return None
+
+    thread = threading.Thread(target=server.serve_forever, name='metrics-http', daemon=True)
+    thread.start()
+    logger.info(f"📊 Metrics endpoint: http://{host}:{port}/metrics")
+    return server
+
+
+# Client integrations
+
+def httpx_event_hooks(target: str) -> Dict[str, list]:
+    """Event hooks timing every request of an httpx.Client (empty when metrics are disabled)."""
+    if not _enabled:
+        return {}
+
+    def on_request(request):
+        request.extensions['metrics_start'] = time.perf_counter()
+
+    def on_response(response):
+        start = response.request.extensions.get('metrics_start')
+        parts = [p for p in response.request.url.path.split('/') if p]
+        endpoint = parts[1] if len(parts) > 1 else (parts[0] if parts else '')
+        operation = f"{response.request.method} {endpoint}"
+        if start is not None:
+            observe('stage_duration_seconds', time.perf_counter() - start,
+                    stage=f'{target}_call', target=target, operation=operation)
+        inc('api_requests_total', target=target, status=response.status_code)
+
+    return {'request': [on_request], 'response': [on_response]}
+
+
+def aiohttp_trace_configs(target: str) -> list:
+    """TraceConfigs timing every request of an aiohttp.ClientSession (empty when disabled)."""
+    if not _enabled:
+        return []
+
+    import aiohttp
+
+    async def on_request_start(session, context, params):
+        context.metrics_start = time.perf_counter()
+
+    async def on_request_end(session, context, params):
+        parts = [p for p in params.url.path.split('/') if p]
+        operation = f"{params.method} {parts[-1] if parts else ''}"
+        observe('stage_duration_seconds', time.perf_counter() - context.metrics_start,
+                stage=f'{target}_call', target=target, operation=operation)
+        inc('api_requests_total', target=target, status=params.response.status)
+
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_request_start.append(on_request_start)
+    trace_config.on_request_end.append(on_request_end)
+    return [trace_config]
+
+
+def configure(config, command: Optional[str] = None) -> bool:
+    """
+    Enable metrics from config (metrics.enabled) or the REMARKABLE_METRICS env var.
+
+    When enabled, a snapshot is written to metrics.snapshot_file on exit so
+    batch runs can be inspected with `metrics dump`.
+    """
+    env = os.getenv('REMARKABLE_METRICS', '').lower()
+    enabled = env in ('1', 'true', 'yes') if env else bool(config.get('metrics.enabled', False))
+    if not enabled:
+        return False
+
+    enable()
+    snapshot_file = config.get('metrics.snapshot_file', './data/metrics_snapshot.json')
+    if snapshot_file:
+        atexit.register(save_snapshot, snapshot_file, command)
+    return True
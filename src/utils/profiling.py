@@ -0,0 +1,288 @@
+"""
+Built-in profiling for CLI commands.
+
+`remarkable-integration --profile MODE <command>` wraps any subcommand:
+
+- cprofile: deterministic profile of the main thread, written as .pstats
+  (open with `python -m pstats`, snakeviz, or gprof2dot)
+- wall:     sampling profiler over all threads, written as collapsed stacks
+  (.folded — feed to flamegraph.pl or drop into speedscope.app)
+- alloc:    tracemalloc top-N allocation report (.txt)
+
+Every artifact gets a .json sidecar with the command, library size and git
+revision, so runs from different days/commits can be compared.
+
+The watcher can also start/stop a wall-clock sampler at runtime:
+    kill -USR2 <watch pid>   # start sampling
+    kill -USR2 <watch pid>   # stop and write the .folded file
+"""
+
+import cProfile
+import json
+import logging
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+PROFILE_MODES = ('cprofile', 'wall', 'alloc')
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+
+
+def get_git_revision() -> Optional[str]:
+    """Short git revision of the source tree, with '-dirty' if it has local changes."""
+    try:
+        revision = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=PROJECT_ROOT,
+            capture_output=True, text=True, timeout=5
+        ).stdout.strip()
+        if not revision:
+            return None
+        dirty = subprocess.run(
+            ['git', 'status', '--porcelain', '--untracked-files=no'], cwd=PROJECT_ROOT,
+            capture_output=True, text=True, timeout=5
+        ).stdout.strip()
+        return f"{revision}-dirty" if dirty else revision
+    except Exception:
+        return None
+
+
+def get_library_size(library_dir: Optional[str]) -> Dict[str, Any]:
+    """Count documents and pages in a reMarkable sync folder."""
+    if not library_dir or not os.path.isdir(library_dir):
+        return {'path': library_dir, 'items': None, 'pages': None}
+    root = Path(library_dir)
+    return {
+        'path': str(root),
+        'items': sum(1 for _ in root.glob('*.metadata')),
+        'pages': sum(1 for _ in root.glob('*/*.rm')),
+    }
+
+
+class SamplingProfiler:
+    """Wall-clock sampler: periodically records every thread's stack as collapsed stacks."""
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self.sample_count = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        self.samples.clear()
+        self.sample_count = 0
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="SamplingProfiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5.0)
+        self._thread = None
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                    frame = frame.f_back
+                stack.append(names.get(thread_id, str(thread_id)))
+                self.samples[';'.join(reversed(stack))] += 1
+            self.sample_count += 1
+
+    def write_folded(self, path: Path) -> None:
+        """Write samples in the collapsed-stack format used by flamegraph.pl and speedscope."""
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in self.samples.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class ProfileSession:
+    """One profiling run around a CLI command."""
+
+    def __init__(self, mode: str, command: Optional[str], output_dir: str = './data/profiles',
+                 library_dir: Optional[str] = None, sample_interval: float = 0.005,
+                 alloc_top_n: int = 25, alloc_frames: int = 1):
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Unknown profile mode '{mode}' (expected one of {', '.join(PROFILE_MODES)})")
+        self.mode = mode
+        self.command = command or 'cli'
+        self.output_dir = Path(output_dir)
+        self.library_dir = library_dir
+        self.alloc_top_n = alloc_top_n
+        self.alloc_frames = alloc_frames
+
+        self._profiler: Optional[cProfile.Profile] = None
+        self._sampler = SamplingProfiler(sample_interval) if mode == 'wall' else None
+        self._started_at: Optional[datetime] = None
+        self._start_time = 0.0
+        self._stopped = False
+
+    def start(self) -> None:
+        self._started_at = datetime.now()
+        self._start_time = time.perf_counter()
+        if self.mode == 'cprofile':
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        elif self.mode == 'wall':
+            self._sampler.start()
+        else:
+            tracemalloc.start(self.alloc_frames)
+        logger.info(f"🔬 Profiling '{self.command}' ({self.mode})")
+
+    def stop(self) -> Optional[Path]:
+        """Stop profiling and write the artifact; safe to call more than once."""
+        if self._stopped or self._started_at is None:
+            return None
+        self._stopped = True
+        duration = time.perf_counter() - self._start_time
+
+        try:
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+            base = self.output_dir / f"{self.command}-{self._started_at.strftime('%Y%m%d-%H%M%S')}-{self.mode}"
+
+            if self.mode == 'cprofile':
+                self._profiler.disable()
+                artifact = base.with_suffix('.pstats')
+                self._profiler.dump_stats(str(artifact))
+                extra = {}
+            elif self.mode == 'wall':
+                self._sampler.stop()
+                artifact = base.with_suffix('.folded')
+                self._sampler.write_folded(artifact)
+                extra = {'samples': self._sampler.sample_count, 'sample_interval_s': self._sampler.interval}
+            else:
+                snapshot = tracemalloc.take_snapshot()
+                current, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                artifact = base.with_suffix('.txt')
+                extra = {'current_bytes': current, 'peak_bytes': peak}
+                self._write_alloc_report(artifact, snapshot, current, peak)
+
+            write_run_info(artifact, self.command, self.mode, self.library_dir, self._started_at, duration, extra)
+            logger.info(f"🔬 Profile written to {artifact}")
+            return artifact
+        except Exception as e:
+            logger.warning(f"Failed to write profile: {e}")
+            return None
+
+    def _write_alloc_report(self, path: Path, snapshot, current: int, peak: int) -> None:
+        snapshot = snapshot.filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ))
+        stats = snapshot.statistics('lineno' if self.alloc_frames <= 1 else 'traceback')
+        total = sum(stat.size for stat in stats)
+
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(f"# command: {self.command}\n")
+            f.write(f"# still allocated: {total / 1024:.1f} KiB in {len(stats)} locations "
+                    f"(current {current / 1024:.1f} KiB, peak {peak / 1024:.1f} KiB)\n\n")
+            for rank, stat in enumerate(stats[:self.alloc_top_n], 1):
+                frame = stat.traceback[0]
+                f.write(f"#{rank}: {frame.filename}:{frame.lineno}: "
+                        f"{stat.size / 1024:.1f} KiB in {stat.count} blocks\n")
+                if self.alloc_frames > 1:
+                    for line in stat.traceback.format()[2:]:
+                        f.write(f"    {line}\n")
+
+
+def write_run_info(artifact: Path, command: str, mode: str, library_dir: Optional[str],
+                   started_at: datetime, duration: float, extra: Optional[Dict[str, Any]] = None) -> None:
+    """Write the .json sidecar that makes profile artifacts comparable across runs."""
+    info = {
+        'command': command,
+        'argv': sys.argv[1:],
+        'mode': mode,
+        'artifact': artifact.name,
+        'started_at': started_at.isoformat(),
+        'duration_s': round(duration, 3),
+        'git_revision': get_git_revision(),
+        'library': get_library_size(library_dir),
+        'python': sys.version.split()[0],
+    }
+    info.update(extra or {})
+    with open(artifact.with_suffix(artifact.suffix + '.json'), 'w', encoding='utf-8') as f:
+        json.dump(info, f, indent=2)
+
+
+def _library_dir(config) -> Optional[str]:
+    return (config.get('remarkable.source_directory')
+            or config.get('remarkable.local_sync_directory'))
+
+
+def start_session(config, mode: str, command: Optional[str]) -> ProfileSession:
+    """Create and start a profiling session for a CLI command from config."""
+    session = ProfileSession(
+        mode,
+        command,
+        output_dir=config.get('profiling.output_dir', './data/profiles'),
+        library_dir=_library_dir(config),
+        sample_interval=config.get('profiling.sample_interval_ms', 5) / 1000.0,
+        alloc_top_n=config.get('profiling.alloc_top_n', 25),
+        alloc_frames=config.get('profiling.alloc_frames', 1),
+    )
+    session.start()
+    return session
+
+
+class SignalToggledProfiler:
+    """Starts/stops a wall-clock sampler each time a signal arrives (long-running commands)."""
+
+    def __init__(self, config, command: str):
+        self.config = config
+        self.command = command
+        self._session: Optional[ProfileSession] = None
+        self._lock = threading.Lock()
+
+    def install(self) -> bool:
+        """Install the signal handler; returns False where the signal isn't available."""
+        signal_name = self.config.get('profiling.toggle_signal', 'SIGUSR2')
+        signum = getattr(signal, signal_name, None)
+        if signum is None:
+            logger.debug(f"Profiling toggle signal {signal_name} not available on this platform")
+            return False
+        try:
+            signal.signal(signum, lambda *_: self.toggle())
+        except ValueError as e:  # Not in the main thread
+            logger.warning(f"Could not install profiling toggle: {e}")
+            return False
+        logger.info(f"🔬 Send {signal_name} to pid {os.getpid()} to start/stop the sampling profiler")
+        return True
+
+    def toggle(self) -> None:
+        with self._lock:
+            if self._session is None:
+                self._session = start_session(self.config, 'wall', self.command)
+            else:
+                session, self._session = self._session, None
+                # Write from a thread: the signal handler runs on the main thread
+                threading.Thread(target=session.stop, name="ProfileWriter", daemon=True).start()
+
+    def stop(self) -> None:
+        with self._lock:
+            if self._session is not None:
+                self._session.stop()
+                self._session = None
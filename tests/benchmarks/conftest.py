@@ -0,0 +1,146 @@
+"""
+Fixtures for the pipeline benchmark suite.
+
+The library size is controlled by environment variables so the same suite
+can run as a quick smoke check or against a library the size of a real one:
+
+    BENCH_NOTEBOOKS=500 BENCH_PAGES=10 pytest tests/benchmarks
+
+No baseline is committed and a plain run never fails on timing. To compare
+two versions, record a baseline locally with pytest-benchmark's storage
+(timings are machine-specific, so record it on the machine you compare on):
+
+    # Record a baseline (stored under tests/benchmarks/baselines/<machine>/)
+    pytest tests/benchmarks --benchmark-storage=tests/benchmarks/baselines --benchmark-save=baseline
+
+    # Then fail if any benchmark's mean regressed more than 25% against it
+    pytest tests/benchmarks --benchmark-storage=tests/benchmarks/baselines \
+        --benchmark-compare=0001 --benchmark-compare-fail=mean:25%
+"""
+
+import os
+import random
+import sqlite3
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from src.core.database import DatabaseManager
+from src.core.notebook_paths import update_notebook_metadata
+from src.processors.notebook_text_extractor import NotebookTextExtractor
+
+from .synthetic_library import HIGHLIGHT_SENTENCES, LibrarySpec, generate_library
+
+
+def _env_int(name: str, default: int) -> int:
+    return int(os.environ.get(name, default))
+
+
+@pytest.fixture(scope="session")
+def library_spec() -> LibrarySpec:
+    return LibrarySpec(
+        notebooks=_env_int("BENCH_NOTEBOOKS", 100),
+        pages_per_notebook=_env_int("BENCH_PAGES", 5),
+        strokes_per_page=_env_int("BENCH_STROKES", 40),
+        rm_versions=tuple(os.environ.get("BENCH_RM_VERSIONS", "v3,v5,v6").split(",")),
+        pdfs=_env_int("BENCH_PDFS", 10),
+        epubs=_env_int("BENCH_EPUBS", 10),
+        seed=_env_int("BENCH_SEED", 1234),
+    )
+
+
+@pytest.fixture(scope="session")
+def library(tmp_path_factory, library_spec):
+    """A synthetic reMarkable sync folder, generated once per session."""
+    return generate_library(tmp_path_factory.mktemp("remarkable") / "library", library_spec)
+
+
+@pytest.fixture(scope="session")
+def data_dir(tmp_path_factory):
+    return str(tmp_path_factory.mktemp("data"))
+
+
+@pytest.fixture(scope="session")
+def db_manager(tmp_path_factory, library, data_dir):
+    """A database in steady state: metadata, OCR text, todos and highlights for the whole library."""
+    manager = DatabaseManager(str(tmp_path_factory.mktemp("db") / "bench.db"), backup_enabled=False)
+    with manager.get_connection() as conn:
+        update_notebook_metadata(str(library.root), conn, data_dir)
+        _ensure_sync_columns(conn)
+        _seed_content(conn, library)
+    return manager
+
+
+@pytest.fixture(scope="session")
+def extractor(library, db_manager):
+    return NotebookTextExtractor(
+        data_directory=str(library.root),
+        db_manager=db_manager,
+        exclude_notebooks={'names': [], 'uuids': []}
+    )
+
+
+def _ensure_sync_columns(conn: sqlite3.Connection) -> None:
+    """Add the columns/tables that scripts/ migrations create on real installs."""
+    for statement in (
+        'ALTER TABLE todos ADD COLUMN actual_date TEXT',
+        'ALTER TABLE todos ADD COLUMN notion_exported_at TEXT',
+        'ALTER TABLE enhanced_highlights ADD COLUMN updated_at TIMESTAMP',
+    ):
+        try:
+            conn.execute(statement)
+        except sqlite3.OperationalError:
+            pass  # Column already exists
+
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS notion_page_blocks (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            notebook_uuid TEXT NOT NULL,
+            page_number INTEGER NOT NULL,
+            notion_page_id TEXT NOT NULL,
+            notion_block_id TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE(notebook_uuid, page_number)
+        )
+    ''')
+    conn.commit()
+
+
+def _seed_content(conn: sqlite3.Connection, library) -> None:
+    """Store OCR text for every notebook page (with current hashes) plus todos and highlights."""
+    import hashlib
+
+    rng = random.Random(library.spec.seed)
+    extractions, todos, highlights = [], [], []
+
+    for uuid in library.notebooks:
+        name = f"Notebook {uuid[:8]}"
+        for page_number, page_uuid in enumerate(library.pages[uuid], 1):
+            page_hash = hashlib.sha256(library.page_file(uuid, page_uuid).read_bytes()).hexdigest()
+            text = ' '.join(rng.sample(HIGHLIGHT_SENTENCES, 3))
+            extractions.append((uuid, name, page_uuid, page_number, text, 0.9, page_hash))
+            if page_number == 1:
+                todos.append((uuid, page_uuid, str(library.content_file(uuid)), name,
+                              f"Follow up on {text[:40]}", str(page_number), 0.9, '2026-01-15'))
+
+    for uuid in library.pdfs + library.epubs:
+        for n, sentence in enumerate(HIGHLIGHT_SENTENCES):
+            highlights.append((str(library.content_file(uuid)), f"Document {uuid[:8]}",
+                               sentence, sentence, str(n + 1), 0.9))
+
+    conn.executemany('''
+        INSERT INTO notebook_text_extractions
+        (notebook_uuid, notebook_name, page_uuid, page_number, text, confidence, page_content_hash)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    ''', extractions)
+    conn.executemany('''
+        INSERT INTO todos (notebook_uuid, page_uuid, source_file, title, text, page_number, confidence, actual_date)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ''', todos)
+    conn.executemany('''
+        INSERT INTO enhanced_highlights (source_file, title, original_text, corrected_text, page_number, confidence)
+        VALUES (?, ?, ?, ?, ?, ?)
+    ''', highlights)
+    conn.commit()
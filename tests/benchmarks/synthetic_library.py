@@ -0,0 +1,435 @@
+#!/usr/bin/env python3
+"""
+Synthetic reMarkable library generator.
+
+Builds a directory that looks like a reMarkable desktop sync folder:
+nested folders, handwritten notebooks with v3/v5/v6 .rm pages, PDFs and
+EPUBs with highlight .rm files, and the matching .metadata/.content files.
+Everything is derived from a seed, so the same spec always produces the
+same library.
+
+Usage:
+    python -m tests.benchmarks.synthetic_library /tmp/library --notebooks 200 --versions v5,v6
+"""
+
+import argparse
+import importlib.util
+import json
+import logging
+import random
+import struct
+import uuid as uuid_module
+import zipfile
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+RM_WIDTH = 1404
+RM_HEIGHT = 1872
+
+V3_HEADER = b'reMarkable .lines file, version=3          '
+V5_HEADER = b'reMarkable .lines file, version=5          '
+
+# Sentences used for highlight text (long enough to pass the highlight quality filters)
+HIGHLIGHT_SENTENCES = [
+    "The quick brown fox jumps over the lazy dog near the river bank",
+    "Performance work starts with measuring where the time actually goes",
+    "Small batches and short feedback loops make every change safer",
+    "Die Ergebnisse der Untersuchung wurden im Anhang ausführlich dokumentiert",
+    "A good abstraction hides details that change together behind one name",
+    "Caching only helps when the key captures everything the value depends on",
+]
+
+Stroke = List[Tuple[float, float, float]]  # (x, y, pressure) points
+
+
+@dataclass
+class LibrarySpec:
+    """Shape of a synthetic library."""
+    notebooks: int = 50
+    pages_per_notebook: int = 5
+    strokes_per_page: int = 40  # Stroke density
+    points_per_stroke: int = 30
+    rm_versions: Sequence[str] = ('v5', 'v6')  # Cycled across notebooks: any of v3, v5, v6
+    pdfs: int = 5
+    epubs: int = 5
+    pages_per_document: int = 10
+    highlighted_pages_per_document: int = 3
+    folder_depth: int = 3
+    folders_per_level: int = 2
+    seed: int = 1234
+
+
+@dataclass
+class SyntheticLibrary:
+    """What generate_library() wrote, for use by benchmarks."""
+    root: Path
+    spec: LibrarySpec
+    folders: List[str] = field(default_factory=list)
+    notebooks: List[str] = field(default_factory=list)
+    pdfs: List[str] = field(default_factory=list)
+    epubs: List[str] = field(default_factory=list)
+    pages: Dict[str, List[str]] = field(default_factory=dict)  # document uuid -> page uuids
+    rm_versions: Dict[str, str] = field(default_factory=dict)  # notebook uuid -> version actually written
+
+    @property
+    def documents(self) -> List[str]:
+        return self.notebooks + self.pdfs + self.epubs
+
+    def content_file(self, uuid: str) -> Path:
+        return self.root / f"{uuid}.content"
+
+    def page_file(self, uuid: str, page_uuid: str) -> Path:
+        return self.root / uuid / f"{page_uuid}.rm"
+
+
+def _uuid(rng: random.Random) -> str:
+    return str(uuid_module.UUID(int=rng.getrandbits(128), version=4))
+
+
+# Fixed reference time so the same seed always produces identical files
+BASE_TIMESTAMP_MS = 1_760_000_000_000
+
+
+def _timestamp_ms(rng: random.Random) -> str:
+    return str(BASE_TIMESTAMP_MS - rng.randint(0, 365 * 24 * 3600 * 1000))
+
+
+def make_strokes(rng: random.Random, count: int, points: int) -> List[Stroke]:
+    """Generate handwriting-like strokes: short wobbly runs laid out in text lines."""
+    strokes = []
+    line_height = 70.0
+    for i in range(count):
+        line = i // 12
+        x = 100.0 + (i % 12) * 100.0 + rng.uniform(-10, 10)
+        y = 150.0 + line * line_height + rng.uniform(-5, 5)
+        stroke = []
+        for _ in range(points):
+            x += rng.uniform(0.5, 3.0)
+            y += rng.uniform(-2.0, 2.0)
+            stroke.append((x, y % RM_HEIGHT, rng.uniform(0.3, 1.0)))
+        strokes.append(stroke)
+    return strokes
+
+
+def write_rm_v3_v5(path: Path, strokes: List[Stroke], version: str = 'v5') -> None:
+    """Write a single-layer .rm file in the pre-v6 binary format (ballpoint pen)."""
+    is_v5 = version == 'v5'
+    parts = [V5_HEADER if is_v5 else V3_HEADER, struct.pack('<I', 1), struct.pack('<I', len(strokes))]
+    for stroke in strokes:
+        if is_v5:
+            parts.append(struct.pack('<IIIffI', 2, 0, 0, 2.0, 0.0, len(stroke)))
+        else:
+            parts.append(struct.pack('<IIIfI', 2, 0, 0, 2.0, len(stroke)))
+        for x, y, pressure in stroke:
+            parts.append(struct.pack('<ffffff', x, y, 0.1, 0.0, 2.0, pressure))
+    path.write_bytes(b''.join(parts))
+
+
+def _v6_scene_blocks(lines: list, glyphs: list):
+    """Build the block list for a single-layer v6 scene (requires rmscene)."""
+    from rmscene import CrdtId, LwwValue
+    from rmscene import scene_items as si
+    from rmscene.crdt_sequence import CrdtSequenceItem
+    from rmscene.scene_stream import (
+        AuthorIdsBlock, MigrationInfoBlock, PageInfoBlock, SceneTreeBlock,
+        TreeNodeBlock, SceneGroupItemBlock, SceneLineItemBlock, SceneGlyphItemBlock
+    )
+
+    layer_id = CrdtId(0, 11)
+    blocks = [
+        AuthorIdsBlock(author_uuids={1: uuid_module.UUID(int=1)}),
+        MigrationInfoBlock(migration_id=CrdtId(1, 1), is_device=True),
+        PageInfoBlock(loads_count=1, merges_count=0, text_chars_count=0, text_lines_count=0),
+        SceneTreeBlock(tree_id=layer_id, node_id=CrdtId(0, 0), is_update=True, parent_id=CrdtId(0, 1)),
+        TreeNodeBlock(si.Group(node_id=CrdtId(0, 1))),
+        TreeNodeBlock(si.Group(node_id=layer_id, label=LwwValue(timestamp=CrdtId(0, 12), value="Layer 1"))),
+        SceneGroupItemBlock(parent_id=CrdtId(0, 1), item=CrdtSequenceItem(
+            item_id=CrdtId(0, 13), left_id=CrdtId(0, 0), right_id=CrdtId(0, 0),
+            deleted_length=0, value=layer_id
+        )),
+    ]
+
+    previous = CrdtId(0, 0)
+    for n, value in enumerate(lines + glyphs):
+        item_id = CrdtId(1, 100 + n)
+        item = CrdtSequenceItem(item_id=item_id, left_id=previous, right_id=CrdtId(0, 0),
+                                deleted_length=0, value=value)
+        block_class = SceneLineItemBlock if isinstance(value, si.Line) else SceneGlyphItemBlock
+        blocks.append(block_class(parent_id=layer_id, item=item))
+        previous = item_id
+    return blocks
+
+
+def write_rm_v6(path: Path, strokes: List[Stroke] = (), highlights: Sequence[str] = ()) -> None:
+    """Write a v6 .rm scene with ballpoint strokes and/or text highlights (requires rmscene)."""
+    from rmscene import write_blocks
+    from rmscene import scene_items as si
+
+    lines = [
+        si.Line(
+            color=si.PenColor.BLACK,
+            tool=si.Pen.BALLPOINT_2,
+            points=[si.Point(x - RM_WIDTH / 2, y, 10, 0, 12, int(pressure * 255)) for x, y, pressure in stroke],
+            thickness_scale=2.0,
+            starting_length=0.0,
+        )
+        for stroke in strokes
+    ]
+    glyphs = [
+        si.GlyphRange(
+            start=n * 100, length=len(text), text=text, color=si.PenColor.YELLOW,
+            rectangles=[si.Rectangle(x=-300.0, y=200.0 + 60 * n, w=600.0, h=40.0)],
+        )
+        for n, text in enumerate(highlights)
+    ]
+
+    with open(path, 'wb') as f:
+        write_blocks(f, _v6_scene_blocks(lines, glyphs))
+
+
+def write_highlight_rm(path: Path, highlights: Sequence[str]) -> None:
+    """Write a v6 page holding highlight glyph ranges.
+
+    Without rmscene, fall back to a v6 header followed by the highlight text:
+    the highlight extractor only scans for printable text, so this still
+    exercises its hot path.
+    """
+    try:
+        write_rm_v6(path, highlights=highlights)
+    except ImportError:
+        header = b'reMarkable .lines file, version=6          '
+        body = b''.join(
+            struct.pack('<I', len(text.encode('utf-8'))) + text.encode('utf-8') + b'\x00' * 8
+            for text in highlights
+        )
+        path.write_bytes(header + b'\x00' * 16 + body)
+
+
+def make_pdf(page_count: int, title: str) -> bytes:
+    """Build a minimal valid PDF with one line of text per page."""
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>"]
+    kids = " ".join(f"{3 + 2 * i} 0 R" for i in range(page_count))
+    objects.append(f"<< /Type /Pages /Kids [{kids}] /Count {page_count} >>")
+    font_id = 3 + 2 * page_count
+    for i in range(page_count):
+        content_id = 4 + 2 * i
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 445 594] "
+            f"/Resources << /Font << /F1 {font_id} 0 R >> >> /Contents {content_id} 0 R >>"
+        )
+        stream = f"BT /F1 12 Tf 50 540 Td ({title} - page {i + 1}: {HIGHLIGHT_SENTENCES[i % len(HIGHLIGHT_SENTENCES)]}) Tj ET"
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+    objects.append("<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n".encode('latin-1', errors='replace')
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    for offset in offsets:
+        out += f"{offset:010d} 00000 n \n".encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return bytes(out)
+
+
+def _png_bytes(width: int, height: int) -> bytes:
+    import zlib
+    raw = b''.join(b'\x00' + b'\x80\x40\x20' * width for _ in range(height))
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data) & 0xffffffff)
+
+    return (b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0))
+            + chunk(b'IDAT', zlib.compress(raw)) + chunk(b'IEND', b''))
+
+
+def make_epub(path: Path, title: str, author: str, chapters: int) -> None:
+    """Write a small EPUB 2 with OPF metadata, a cover image and text chapters."""
+    manifest = ['<item id="cover-image" href="cover.png" media-type="image/png"/>']
+    spine = []
+    with zipfile.ZipFile(path, 'w') as epub:
+        epub.writestr('mimetype', 'application/epub+zip', compress_type=zipfile.ZIP_STORED)
+        epub.writestr('META-INF/container.xml',
+                      '<?xml version="1.0"?><container version="1.0" '
+                      'xmlns="urn:oasis:names:tc:opendocument:xmlns:container"><rootfiles>'
+                      '<rootfile full-path="OEBPS/content.opf" media-type="application/oebps-package+xml"/>'
+                      '</rootfiles></container>')
+        epub.writestr('OEBPS/cover.png', _png_bytes(60, 80))
+        for i in range(chapters):
+            paragraphs = ''.join(f'<p>{s}.</p>' for s in HIGHLIGHT_SENTENCES)
+            epub.writestr(f'OEBPS/chapter{i}.xhtml',
+                          f'<html xmlns="http://www.w3.org/1999/xhtml"><body><h1>Chapter {i + 1}</h1>'
+                          f'{paragraphs}</body></html>')
+            manifest.append(f'<item id="ch{i}" href="chapter{i}.xhtml" media-type="application/xhtml+xml"/>')
+            spine.append(f'<itemref idref="ch{i}"/>')
+        epub.writestr('OEBPS/content.opf',
+                      '<?xml version="1.0"?><package xmlns="http://www.idpf.org/2007/opf" version="2.0">'
+                      '<metadata xmlns:dc="http://purl.org/dc/elements/1.1/">'
+                      f'<dc:title>{title}</dc:title><dc:creator>{author}</dc:creator>'
+                      '<dc:publisher>Synthetic Press</dc:publisher><dc:date>2020-01-01</dc:date>'
+                      '<meta name="cover" content="cover-image"/></metadata>'
+                      f'<manifest>{"".join(manifest)}</manifest><spine>{"".join(spine)}</spine></package>')
+
+
+def _write_metadata(root: Path, uuid: str, name: str, parent: str, item_type: str, rng: random.Random) -> None:
+    metadata = {
+        'deleted': False,
+        'lastModified': _timestamp_ms(rng),
+        'lastOpened': _timestamp_ms(rng),
+        'lastOpenedPage': 0,
+        'metadatamodified': False,
+        'modified': False,
+        'parent': parent,
+        'pinned': False,
+        'synced': True,
+        'type': item_type,
+        'version': 1,
+        'visibleName': name,
+    }
+    (root / f"{uuid}.metadata").write_text(json.dumps(metadata, indent=4))
+
+
+def _write_content(root: Path, uuid: str, file_type: str, page_uuids: List[str]) -> None:
+    content = {
+        'fileType': file_type,
+        'formatVersion': 2,
+        'orientation': 'portrait',
+        'pageCount': len(page_uuids),
+        'cPages': {
+            'pages': [
+                {'id': page_uuid, 'idx': {'timestamp': '1:2', 'value': f'b{i:04d}'},
+                 'redir': {'timestamp': '1:2', 'value': i}}
+                for i, page_uuid in enumerate(page_uuids)
+            ]
+        },
+    }
+    (root / f"{uuid}.content").write_text(json.dumps(content, indent=4))
+
+
+def _v6_available() -> bool:
+    return importlib.util.find_spec('rmscene') is not None
+
+
+def generate_library(root: str, spec: Optional[LibrarySpec] = None) -> SyntheticLibrary:
+    """Write a synthetic reMarkable library to `root` and describe what was written."""
+    spec = spec or LibrarySpec()
+    rng = random.Random(spec.seed)
+    root = Path(root)
+    root.mkdir(parents=True, exist_ok=True)
+    library = SyntheticLibrary(root=root, spec=spec)
+
+    # Nested folder tree
+    level = ['']
+    for depth in range(spec.folder_depth):
+        next_level = []
+        for parent in level:
+            for i in range(spec.folders_per_level):
+                folder_uuid = _uuid(rng)
+                _write_metadata(root, folder_uuid, f"Folder {depth}.{len(library.folders)}", parent,
+                                'CollectionType', rng)
+                library.folders.append(folder_uuid)
+                next_level.append(folder_uuid)
+        level = next_level
+    parents = [''] + library.folders
+
+    v6_available = _v6_available()
+    if 'v6' in spec.rm_versions and not v6_available:
+        logger.warning("rmscene not installed - writing v5 pages instead of v6")
+
+    # Handwritten notebooks
+    for n in range(spec.notebooks):
+        notebook_uuid = _uuid(rng)
+        version = spec.rm_versions[n % len(spec.rm_versions)]
+        if version == 'v6' and not v6_available:
+            version = 'v5'
+
+        page_uuids = [_uuid(rng) for _ in range(spec.pages_per_notebook)]
+        page_dir = root / notebook_uuid
+        page_dir.mkdir(exist_ok=True)
+        for page_uuid in page_uuids:
+            strokes = make_strokes(rng, spec.strokes_per_page, spec.points_per_stroke)
+            if version == 'v6':
+                write_rm_v6(page_dir / f"{page_uuid}.rm", strokes)
+            else:
+                write_rm_v3_v5(page_dir / f"{page_uuid}.rm", strokes, version)
+
+        _write_metadata(root, notebook_uuid, f"Notebook {n}", rng.choice(parents), 'DocumentType', rng)
+        _write_content(root, notebook_uuid, 'notebook', page_uuids)
+        library.notebooks.append(notebook_uuid)
+        library.pages[notebook_uuid] = page_uuids
+        library.rm_versions[notebook_uuid] = version
+
+    # PDFs and EPUBs with highlight pages
+    for kind, count in (('pdf', spec.pdfs), ('epub', spec.epubs)):
+        for n in range(count):
+            doc_uuid = _uuid(rng)
+            title = f"Synthetic {kind.upper()} {n}"
+            page_uuids = [_uuid(rng) for _ in range(spec.pages_per_document)]
+
+            if kind == 'pdf':
+                (root / f"{doc_uuid}.pdf").write_bytes(make_pdf(spec.pages_per_document, title))
+            else:
+                make_epub(root / f"{doc_uuid}.epub", title, f"Author {n}", spec.pages_per_document)
+
+            page_dir = root / doc_uuid
+            page_dir.mkdir(exist_ok=True)
+            highlighted = rng.sample(page_uuids, min(spec.highlighted_pages_per_document, len(page_uuids)))
+            for page_uuid in highlighted:
+                texts = rng.sample(HIGHLIGHT_SENTENCES, 2)
+                write_highlight_rm(page_dir / f"{page_uuid}.rm", texts)
+
+            _write_metadata(root, doc_uuid, title, rng.choice(parents), 'DocumentType', rng)
+            _write_content(root, doc_uuid, kind, page_uuids)
+            getattr(library, f"{kind}s").append(doc_uuid)
+            library.pages[doc_uuid] = page_uuids
+
+    logger.info(f"Generated synthetic library in {root}: {len(library.folders)} folders, "
+                f"{len(library.notebooks)} notebooks, {len(library.pdfs)} PDFs, {len(library.epubs)} EPUBs")
+    return library
+
+
+def touch_metadata(library: SyntheticLibrary, fraction: float, seed: int = 0) -> List[str]:
+    """Rename a fraction of documents (as a sync from the tablet would) and return their UUIDs."""
+    rng = random.Random(seed)
+    documents = library.documents
+    changed = rng.sample(documents, max(1, int(len(documents) * fraction)))
+    for uuid in changed:
+        metadata_file = library.root / f"{uuid}.metadata"
+        metadata = json.loads(metadata_file.read_text())
+        metadata['visibleName'] += ' (edited)'
+        metadata['lastModified'] = str(int(metadata['lastModified']) + 1000)
+        metadata_file.write_text(json.dumps(metadata, indent=4))
+    return changed
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Generate a synthetic reMarkable library")
+    parser.add_argument('output', help='Directory to write the library to')
+    parser.add_argument('--notebooks', type=int, default=LibrarySpec.notebooks)
+    parser.add_argument('--pages', type=int, default=LibrarySpec.pages_per_notebook, help='Pages per notebook')
+    parser.add_argument('--strokes', type=int, default=LibrarySpec.strokes_per_page, help='Strokes per page')
+    parser.add_argument('--versions', default=','.join(LibrarySpec.rm_versions), help='Comma-separated: v3,v5,v6')
+    parser.add_argument('--pdfs', type=int, default=LibrarySpec.pdfs)
+    parser.add_argument('--epubs', type=int, default=LibrarySpec.epubs)
+    parser.add_argument('--seed', type=int, default=LibrarySpec.seed)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    generate_library(args.output, LibrarySpec(
+        notebooks=args.notebooks,
+        pages_per_notebook=args.pages,
+        strokes_per_page=args.strokes,
+        rm_versions=tuple(v.strip() for v in args.versions.split(',') if v.strip()),
+        pdfs=args.pdfs,
+        epubs=args.epubs,
+        seed=args.seed,
+    ))
+
+
+if __name__ == '__main__':
+    main()
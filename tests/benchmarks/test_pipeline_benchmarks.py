@@ -0,0 +1,126 @@
+"""
+Benchmarks for the hot paths of a sync/processing pass over a synthetic library.
+
+Each benchmark measures the steady state (library already processed, nothing
+changed), which is what `watch` and repeated `process-all` runs spend most of
+their time on. See conftest.py for sizing and baseline comparison.
+"""
+
+import asyncio
+
+import pytest
+
+from src.core.database import DatabaseManager
+from src.core.notebook_paths import detect_metadata_changes, update_notebook_metadata
+from src.core.rm2svg import RmToSvgConverter
+from src.core.rm_parser import RemarkableParser
+from src.core.rm_scene import SCENE_SUPPORT, SceneCache, scene_to_svg
+from src.core.unified_sync import UnifiedSyncManager
+from src.processors.enhanced_highlight_extractor import EnhancedHighlightExtractor
+
+from .synthetic_library import generate_library, touch_metadata
+
+
+@pytest.mark.benchmark(group="scan")
+def test_find_notebooks(benchmark, extractor, library):
+    notebooks = benchmark(extractor.find_notebooks, str(library.root))
+    assert len(notebooks) == len(library.documents)
+
+
+@pytest.mark.benchmark(group="scan")
+def test_get_all_documents(benchmark, library):
+    parser = RemarkableParser(str(library.root))
+    documents = benchmark(parser.get_all_documents)
+    assert len(documents) >= len(library.documents)
+
+
+@pytest.mark.benchmark(group="scan")
+def test_notebook_needs_processing_unchanged(benchmark, extractor, library):
+    def check_all():
+        return [
+            extractor._notebook_needs_processing(
+                uuid, uuid, str(library.content_file(uuid)), str(library.root / uuid)
+            )
+            for uuid in library.notebooks
+        ]
+
+    results = benchmark(check_all)
+    assert not any(results)
+
+
+@pytest.mark.benchmark(group="scan")
+def test_detect_metadata_changes_unchanged(benchmark, library, db_manager, data_dir):
+    with db_manager.get_connection() as conn:
+        changed = benchmark(detect_metadata_changes, str(library.root), conn, data_dir)
+    # Folders are always reported (only documents are compared), so check documents only
+    assert not changed & set(library.documents)
+
+
+@pytest.mark.benchmark(group="scan")
+def test_detect_metadata_changes_after_edits(benchmark, library, tmp_path, data_dir):
+    # Separate library copy: the edits must not leak into the steady-state benchmarks
+    edited = generate_library(tmp_path / "library", library.spec)
+    db_manager = DatabaseManager(str(tmp_path / "edits.db"), backup_enabled=False)
+    with db_manager.get_connection() as conn:
+        update_notebook_metadata(str(edited.root), conn, data_dir)
+        touched = set(touch_metadata(edited, fraction=0.05))
+        changed = benchmark.pedantic(detect_metadata_changes, args=(str(edited.root), conn, data_dir),
+                                     rounds=5, iterations=1)
+    assert touched <= changed
+
+
+@pytest.mark.benchmark(group="render")
+def test_rm_to_svg(benchmark, library):
+    converter = RmToSvgConverter()
+    pages = [
+        str(library.page_file(uuid, page_uuid))
+        for uuid in library.notebooks if library.rm_versions[uuid] in ('v3', 'v5')
+        for page_uuid in library.pages[uuid]
+    ][:50]
+    if not pages:
+        pytest.skip("no v3/v5 pages in this library")
+
+    results = benchmark(lambda: [converter.convert_to_string(page) for page in pages])
+    assert all(result.success for result in results)
+
+
+@pytest.mark.benchmark(group="render")
+def test_rm_v6_to_svg_cached(benchmark, library, tmp_path):
+    if not SCENE_SUPPORT:
+        pytest.skip("rmscene/rmc not installed")
+    pages = [
+        str(library.page_file(uuid, page_uuid))
+        for uuid in library.notebooks if library.rm_versions[uuid] == 'v6'
+        for page_uuid in library.pages[uuid]
+    ][:50]
+    if not pages:
+        pytest.skip("no v6 pages in this library")
+
+    # Steady state: every page already parsed once, memory cache cold
+    cache = SceneCache(str(tmp_path / "scene_cache"), memory_entries=0)
+    for page in pages:
+        assert cache.load(page) is not None
+
+    def render_all():
+        for page in pages:
+            with open(tmp_path / "page.svg", 'wt') as output:
+                scene_to_svg(cache.load(page), output)
+
+    benchmark(render_all)
+    assert cache.stats['parsed'] == len(pages)
+
+
+@pytest.mark.benchmark(group="highlights")
+def test_highlight_extraction(benchmark, library):
+    highlight_extractor = EnhancedHighlightExtractor()
+    content_files = [str(library.content_file(uuid)) for uuid in library.pdfs + library.epubs]
+
+    results = benchmark(lambda: [highlight_extractor.process_file(path) for path in content_files])
+    assert all(result.success for result in results)
+
+
+@pytest.mark.benchmark(group="sync")
+def test_get_items_needing_sync(benchmark, db_manager):
+    sync_manager = UnifiedSyncManager(db_manager)
+    items = benchmark(lambda: asyncio.run(sync_manager.get_items_needing_sync('notion', limit=1000)))
+    assert items